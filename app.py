@@ -4,37 +4,57 @@ Sistema de Registro de Pagos Diarios
 Interfaz Streamlit para registrar pagos según la estructura especificada
 """
 
-import streamlit as st
-import pandas as pd
+import arranque
+from arranque import importacion, importar
+with importacion('streamlit'):
+    import streamlit as st
 from datetime import datetime, date
-import sqlite3
 import os
-from database import (
-    init_db,
-    obtener_rucs,
-    obtener_ruc_por_numero,
-    registrar_pago,
-    obtener_registros_hoy,
-    obtener_todos_registros,
-    obtener_estadisticas_hoy,
-    actualizar_registro,
-    eliminar_registro,
-    exportar_a_csv,
-    obtener_campanas_unicas,
-    obtener_asesores_unicos,
-    obtener_registros_por_fecha,
-    obtener_promesas_hoy,
-    obtener_estadisticas_promesas_hoy,
-    obtener_resumen_por_asesor_promesa,
-    obtener_resumen_total_por_promesa,
-    obtener_resumen_asesores_diario,
-    obtener_promesas_pendientes,
-    detectar_duplicado_exacto,
-    obtener_ranking_asesores,
-    detectar_monto_anormal,
-    actualizar_rucs_desde_excel,
-    detectar_promesas_caidas
-)
+import sys
+# pandas y NumPy se importan en las páginas que los usan (ver arranque.py)
+with importacion('database'):
+    from database import (
+        conectar,
+        init_db,
+        obtener_rucs,
+        registrar_pago_sin_duplicar,
+        obtener_registros_hoy,
+        buscar_registros,
+        contar_registros,
+        ORDENES_REGISTROS,
+        obtener_estadisticas_hoy,
+        obtener_registro,
+        actualizar_registro_si_version,
+        eliminar_registro,
+        exportar_a_csv,
+        obtener_campanas_unicas,
+        obtener_asesores_unicos,
+        obtener_promesas_hoy,
+        obtener_estadisticas_promesas_hoy,
+        obtener_snapshot_dashboard,
+        obtener_resumen_asesores_diario,
+        obtener_promesas_pendientes,
+        obtener_ranking_asesores,
+        detectar_monto_anormal,
+        obtener_saldo_ruc,
+        obtener_conteos,
+        obtener_tareas_programadas,
+        programar_tarea_ahora,
+        LoteConsultas
+    )
+with importacion('catalogo_rucs'):
+    from catalogo_rucs import obtener_catalogo
+with importacion('programador'):
+    import programador
+with importacion('formato'):
+    from formato import (
+        texto_moneda, texto_fecha, montos, fechas, iconos, nombres_cortos, medallas,
+        columna_moneda, columna_porcentaje, columna_fecha, config_montos,
+        estilo_por_categoria, COLORES_TIPO_PAGO, ICONOS_TAREA, ICONO_TAREA_PENDIENTE
+    )
+
+# Tiempos de esta corrida del script
+cronometro = arranque.Cronometro()
 
 # Configuración
 st.set_page_config(
@@ -176,21 +196,18 @@ st.markdown("""
     </script>
 """, unsafe_allow_html=True)
 
-# Inicializar BD
-init_db()
-
-# Actualizar datos de Deuda Total y Gasto Admin desde Excel
-actualizar_rucs_desde_excel()
+# Inicializar BD (una vez por proceso; se vuelve a verificar si el esquema cambió)
+with cronometro.paso('init_db'):
+    init_db()
 
 # Cargar RUCs desde Excel si la BD está vacía
 @st.cache_resource
 def cargar_rucs_si_necesario():
     """Carga los RUCs desde Excel si la BD está vacía"""
-    conn = sqlite3.connect("pagos.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM rucs")
-    count = cursor.fetchone()[0]
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM rucs")
+        count = cursor.fetchone()[0]
     
     if count == 0:
         # BD vacía, importar datos
@@ -201,7 +218,22 @@ def cargar_rucs_si_necesario():
             st.warning(f"⚠️ No se pudieron cargar los RUCs: {e}")
 
 # Ejecutar carga de RUCs
-cargar_rucs_si_necesario()
+with cronometro.paso('cargar_rucs_si_necesario'):
+    cargar_rucs_si_necesario()
+
+# Tareas de mantenimiento (vencimiento de promesas, Excel de RUCs, estadísticas, resúmenes)
+# en un hilo de fondo, uno por servidor: las páginas solo leen
+@st.cache_resource
+def iniciar_programador():
+    """Inicia el programador de tareas de fondo (None si PAGOS_PROGRAMADOR=0)"""
+    return programador.iniciar_programador()
+
+with cronometro.paso('iniciar_programador'):
+    iniciar_programador()
+
+# Lecturas de esta corrida: el panel de estado y las de la página se envían juntas al
+# pool de hilos de consultas y se esperan recién al dibujarlas
+lote = LoteConsultas().enviar('conteos', obtener_conteos)
 
 # Inicializar sesión para mantener estado del formulario
 if 'ruc_registrado' not in st.session_state:
@@ -211,6 +243,43 @@ if 'ruc_info_encontrada' not in st.session_state:
 if 'pagina_actual' not in st.session_state:
     st.session_state.pagina_actual = "📊 Dashboard"
 
+# Búsqueda de RUC de Registrar Pago (sugerencias del catálogo en memoria)
+@st.fragment
+def buscar_ruc_en_catalogo():
+    """
+    Búsqueda de RUC con sugerencias mientras se escribe (catálogo en memoria): prefijo de
+    RUC o parte de la razón social. Al elegir un RUC se guardan todas sus campañas.
+    """
+    texto = st.text_input("🔍 Número RUC o Razón Social", placeholder="Escribe el RUC o parte de la razón social",
+                          type="search", live=True, key="buscar_ruc")
+    if not texto:
+        return
+    
+    catalogo = obtener_catalogo()
+    ruc_info_list = catalogo.buscar_ruc(texto.strip())
+    if ruc_info_list:
+        # RUC completo: se toma directamente
+        st.session_state.ruc_registrado = texto.strip()
+        st.session_state.ruc_info_encontrada = ruc_info_list
+        st.rerun()
+    
+    sugerencias = dict(catalogo.sugerencias(texto))
+    if not sugerencias:
+        st.error("❌ RUC no encontrado en la base de datos")
+        return
+    
+    def describir(ruc):
+        filas = sugerencias[ruc]
+        campanas = ', '.join(dict.fromkeys(fila[4] or '-' for fila in filas))
+        return f"{ruc} · {filas[0][3]} · {campanas}"
+    
+    elegido = st.selectbox(f"Sugerencias ({len(sugerencias)}):", list(sugerencias),
+                           index=None, format_func=describir, placeholder="Elige un RUC")
+    if elegido:
+        st.session_state.ruc_registrado = elegido
+        st.session_state.ruc_info_encontrada = sugerencias[elegido]
+        st.rerun()
+
 # Título principal
 st.title("💰 Sistema de Registro de Pagos Diarios")
 
@@ -237,7 +306,8 @@ menu_admin = [
     "⏳ Promesas Pendientes",
     "🎯 Promesas de Hoy",
     "📋 Ver Registros",
-    "📂 Exportar Datos"
+    "📂 Exportar Datos",
+    "⚙️ Tareas Programadas"
 ]
 
 # Colores para cada botón
@@ -249,7 +319,8 @@ colores_botones = {
     "⏳ Promesas Pendientes": "#F44336",
     "🎯 Promesas de Hoy": "#E91E63",
     "📋 Ver Registros": "#009688",
-    "📂 Exportar Datos": "#FFC107"
+    "📂 Exportar Datos": "#FFC107",
+    "⚙️ Tareas Programadas": "#607D8B"
 }
 
 # Inicializar sesion de modo admin
@@ -319,13 +390,8 @@ with st.sidebar:
     st.markdown("**📅 ESTADO**")
     st.markdown("")
     
-    # Mostrar estado de la BD
-    registros_total = len(obtener_todos_registros())
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.metric("📊 Registros", registros_total)
-    with col2:
-        st.info("Guardado")
+    # Estado de la BD: se dibuja al final de la corrida, cuando llegan los conteos del lote
+    panel_estado = st.container()
     
     st.divider()
     st.markdown("")
@@ -350,30 +416,10 @@ if opcion == "📊 Dashboard":
             key="fecha_dashboard"
         )
     
-    # Convertir promesas vencidas a PROMESA CAIDA antes de obtener datos
-    detectar_promesas_caidas()
-    
-    # Obtener datos con la fecha seleccionada
-    resumen_gasto = obtener_resumen_total_por_promesa(tipo_pago='gasto', fecha=fecha_filtro)
-    resumen_planilla = obtener_resumen_total_por_promesa(tipo_pago='planilla', fecha=fecha_filtro)
-    resumen_asesor_gasto = obtener_resumen_por_asesor_promesa(tipo_pago='gasto', fecha=fecha_filtro)
-    resumen_asesor_planilla = obtener_resumen_por_asesor_promesa(tipo_pago='planilla', fecha=fecha_filtro)
-    
-    # Obtener todos los registros de la fecha para contar RUCs únicos
-    registros_fecha = obtener_registros_por_fecha(fecha_filtro)
-    
-    # Calcular totales
-    total_gasto = sum(r[2] for r in resumen_gasto) if resumen_gasto else 0
-    total_planilla = sum(r[2] for r in resumen_planilla) if resumen_planilla else 0
-    
-    # Contar RUCs únicos (no duplicados)
-    rucs_unicos = set(r[2] for r in registros_fecha)  # r[2] es el RUC
-    total_rucs_unicos = len(rucs_unicos)
-    
-    # Mantener conteos separados por promesa para las tablas
-    total_rucs_gasto = sum(r[1] for r in resumen_gasto) if resumen_gasto else 0
-    total_rucs_planilla = sum(r[1] for r in resumen_planilla) if resumen_planilla else 0
-    total_general = total_gasto + total_planilla
+    # Todos los datos de la fecha seleccionada en una sola consulta
+    lote.enviar('snapshot', obtener_snapshot_dashboard, fecha_filtro)
+    snapshot = lote.resultado('snapshot')
+    gasto, planilla = snapshot.gasto, snapshot.planilla
     
     # Mostrar fecha seleccionada
     meses = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
@@ -385,18 +431,22 @@ if opcion == "📊 Dashboard":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("💵 Gasto Admin", f"S/. {total_gasto:,.2f}")
+        st.metric("💵 Gasto Admin", texto_moneda(gasto.total_monto))
     
     with col2:
-        st.metric("📋 Planilla", f"S/. {total_planilla:,.2f}")
+        st.metric("📋 Planilla", texto_moneda(planilla.total_monto))
     
     with col3:
-        st.metric("📦 RUCs Gasto", total_rucs_gasto)
+        st.metric("📦 RUCs Gasto", gasto.total_rucs)
     
     with col4:
-        st.metric("📦 RUCs Planilla", total_rucs_planilla)
+        st.metric("📦 RUCs Planilla", planilla.total_rucs)
     
     st.markdown("---")
+    cronometro.marca('primer dibujo Dashboard')
+    
+    # Las tablas de detalle necesitan pandas: se carga después del encabezado y las métricas
+    pd = importar('pandas')
     
     # ===== COLUMNAS LADO A LADO =====
     col_gasto, col_planilla = st.columns(2)
@@ -405,11 +455,11 @@ if opcion == "📊 Dashboard":
     with col_gasto:
         st.subheader("💵 GASTO ADMINISTRATIVO")
         
-        if resumen_gasto:
+        if gasto.por_promesa:
             # Métricas de gasto
-            a_vencer_gasto = [r for r in resumen_gasto if r[0] == 'A VEN...']
-            promesas_caidas_gasto = [r for r in resumen_gasto if r[0] == 'PROMESA CAIDA']
-            cobrado_gasto = [r for r in resumen_gasto if r[0] == 'COBR...']
+            a_vencer_gasto = gasto.promesa('A VEN...')
+            promesas_caidas_gasto = gasto.promesa('PROMESA CAIDA')
+            cobrado_gasto = gasto.promesa('COBR...')
             
             m_col1, m_col2 = st.columns(2)
             
@@ -419,45 +469,36 @@ if opcion == "📊 Dashboard":
                     st.markdown(
                         f"<div style='background-color: #ffcccc; border-left: 4px solid #ff0000; padding: 15px; border-radius: 8px;'>"
                         f"<p style='margin: 0; font-size: 18px; font-weight: bold; color: #cc0000;'>⚠️ Promesas Caídas</p>"
-                        f"<p style='margin: 5px 0; font-size: 24px; color: #cc0000; font-weight: bold;'>S/. {promesas_caidas_gasto[0][2]:,.2f}</p>"
-                        f"<p style='margin: 5px 0; color: #990000;'>📦 {promesas_caidas_gasto[0][1]} RUCs</p>"
+                        f"<p style='margin: 5px 0; font-size: 24px; color: #cc0000; font-weight: bold;'>{texto_moneda(promesas_caidas_gasto[2])}</p>"
+                        f"<p style='margin: 5px 0; color: #990000;'>📦 {promesas_caidas_gasto[1]} RUCs</p>"
                         f"</div>",
                         unsafe_allow_html=True
                     )
                 elif a_vencer_gasto:
-                    st.info(f"⏳ A Vencer\n\n💰 S/. {a_vencer_gasto[0][2]:,.2f}\n\n📦 {a_vencer_gasto[0][1]} RUCs")
+                    st.info(f"⏳ A Vencer\n\n💰 {texto_moneda(a_vencer_gasto[2])}\n\n📦 {a_vencer_gasto[1]} RUCs")
                 else:
                     st.warning("⏳ A Vencer: Sin datos")
             
             with m_col2:
                 if cobrado_gasto:
-                    st.success(f"✅ Cobrado\n\n💰 S/. {cobrado_gasto[0][2]:,.2f}\n\n📦 {cobrado_gasto[0][1]} RUCs")
+                    st.success(f"✅ Cobrado\n\n💰 {texto_moneda(cobrado_gasto[2])}\n\n📦 {cobrado_gasto[1]} RUCs")
                 else:
                     st.warning("✅ Cobrado: Sin datos")
             
             st.markdown("")
             
             # Tabla detalle por asesor
-            if resumen_asesor_gasto:
+            if gasto.por_asesor:
                 st.write("**Detalle por Asesor:**")
-                tabla_gasto = []
-                for asesor, promesa, count, monto in resumen_asesor_gasto:
-                    if promesa == 'PROMESA CAIDA':
-                        estado_icon = '⚠️'
-                    elif promesa == 'A VEN...':
-                        estado_icon = '⏳'
-                    else:
-                        estado_icon = '✅'
-                    
-                    tabla_gasto.append({
-                        'Asesor': asesor.split()[0] if asesor else 'N/A',  # Nombre corto
-                        'Estado': estado_icon,
-                        'Monto': f"S/. {monto:,.0f}",
-                        'RUCs': count
-                    })
-                
-                df_gasto_display = pd.DataFrame(tabla_gasto)
-                st.dataframe(df_gasto_display, use_container_width=True, hide_index=True)
+                detalle = pd.DataFrame(gasto.por_asesor, columns=['Asesor', 'Promesa', 'RUCs', 'Monto'])
+                df_gasto_display = pd.DataFrame({
+                    'Asesor': nombres_cortos(detalle['Asesor']),  # Nombre corto
+                    'Estado': iconos(detalle['Promesa']),
+                    'Monto': detalle['Monto'],
+                    'RUCs': detalle['RUCs']
+                })
+                st.dataframe(df_gasto_display, use_container_width=True, hide_index=True,
+                             column_config={'Monto': columna_moneda(entero=True)})
         else:
             st.warning("⚠️ Sin registros de gasto administrativo")
     
@@ -465,11 +506,11 @@ if opcion == "📊 Dashboard":
     with col_planilla:
         st.subheader("📋 PLANILLA")
         
-        if resumen_planilla:
+        if planilla.por_promesa:
             # Métricas de planilla
-            a_vencer_plan = [r for r in resumen_planilla if r[0] == 'A VEN...']
-            promesas_caidas_plan = [r for r in resumen_planilla if r[0] == 'PROMESA CAIDA']
-            cobrado_plan = [r for r in resumen_planilla if r[0] == 'COBR...']
+            a_vencer_plan = planilla.promesa('A VEN...')
+            promesas_caidas_plan = planilla.promesa('PROMESA CAIDA')
+            cobrado_plan = planilla.promesa('COBR...')
             
             m_col1, m_col2 = st.columns(2)
             
@@ -479,45 +520,36 @@ if opcion == "📊 Dashboard":
                     st.markdown(
                         f"<div style='background-color: #ffcccc; border-left: 4px solid #ff0000; padding: 15px; border-radius: 8px;'>"
                         f"<p style='margin: 0; font-size: 18px; font-weight: bold; color: #cc0000;'>⚠️ Promesas Caídas</p>"
-                        f"<p style='margin: 5px 0; font-size: 24px; color: #cc0000; font-weight: bold;'>S/. {promesas_caidas_plan[0][2]:,.2f}</p>"
-                        f"<p style='margin: 5px 0; color: #990000;'>📦 {promesas_caidas_plan[0][1]} RUCs</p>"
+                        f"<p style='margin: 5px 0; font-size: 24px; color: #cc0000; font-weight: bold;'>{texto_moneda(promesas_caidas_plan[2])}</p>"
+                        f"<p style='margin: 5px 0; color: #990000;'>📦 {promesas_caidas_plan[1]} RUCs</p>"
                         f"</div>",
                         unsafe_allow_html=True
                     )
                 elif a_vencer_plan:
-                    st.info(f"⏳ A Vencer\n\n💰 S/. {a_vencer_plan[0][2]:,.2f}\n\n📦 {a_vencer_plan[0][1]} RUCs")
+                    st.info(f"⏳ A Vencer\n\n💰 {texto_moneda(a_vencer_plan[2])}\n\n📦 {a_vencer_plan[1]} RUCs")
                 else:
                     st.warning("⏳ A Vencer: Sin datos")
             
             with m_col2:
                 if cobrado_plan:
-                    st.success(f"✅ Cobrado\n\n💰 S/. {cobrado_plan[0][2]:,.2f}\n\n📦 {cobrado_plan[0][1]} RUCs")
+                    st.success(f"✅ Cobrado\n\n💰 {texto_moneda(cobrado_plan[2])}\n\n📦 {cobrado_plan[1]} RUCs")
                 else:
                     st.warning("✅ Cobrado: Sin datos")
             
             st.markdown("")
             
             # Tabla detalle por asesor
-            if resumen_asesor_planilla:
+            if planilla.por_asesor:
                 st.write("**Detalle por Asesor:**")
-                tabla_planilla = []
-                for asesor, promesa, count, monto in resumen_asesor_planilla:
-                    if promesa == 'PROMESA CAIDA':
-                        estado_icon = '⚠️'
-                    elif promesa == 'A VEN...':
-                        estado_icon = '⏳'
-                    else:
-                        estado_icon = '✅'
-                    
-                    tabla_planilla.append({
-                        'Asesor': asesor.split()[0] if asesor else 'N/A',  # Nombre corto
-                        'Estado': estado_icon,
-                        'Monto': f"S/. {monto:,.0f}",
-                        'RUCs': count
-                    })
-                
-                df_planilla_display = pd.DataFrame(tabla_planilla)
-                st.dataframe(df_planilla_display, use_container_width=True, hide_index=True)
+                detalle = pd.DataFrame(planilla.por_asesor, columns=['Asesor', 'Promesa', 'RUCs', 'Monto'])
+                df_planilla_display = pd.DataFrame({
+                    'Asesor': nombres_cortos(detalle['Asesor']),  # Nombre corto
+                    'Estado': iconos(detalle['Promesa']),
+                    'Monto': detalle['Monto'],
+                    'RUCs': detalle['RUCs']
+                })
+                st.dataframe(df_planilla_display, use_container_width=True, hide_index=True,
+                             column_config={'Monto': columna_moneda(entero=True)})
         else:
             st.warning("⚠️ Sin registros de planilla")
     
@@ -529,16 +561,16 @@ if opcion == "📊 Dashboard":
     resumen_col1, resumen_col2, resumen_col3, resumen_col4 = st.columns(4)
     
     with resumen_col1:
-        st.metric("💵 Total Gasto Admin", f"S/. {total_gasto:,.2f}")
+        st.metric("💵 Total Gasto Admin", texto_moneda(gasto.total_monto))
     
     with resumen_col2:
-        st.metric("📋 Total Planilla", f"S/. {total_planilla:,.2f}")
+        st.metric("📋 Total Planilla", texto_moneda(planilla.total_monto))
     
     with resumen_col3:
-        st.metric("👥 Total RUCs", total_rucs_unicos)
+        st.metric("👥 Total RUCs", snapshot.rucs_unicos)
     
     with resumen_col4:
-        st.metric("📝 Registros", len(registros_fecha))
+        st.metric("📝 Registros", snapshot.registros)
 
 # ======================== RESUMEN DE ASESORES ========================
 elif opcion == "👥 Resumen de Asesores":
@@ -553,6 +585,8 @@ elif opcion == "👥 Resumen de Asesores":
             key="fecha_asesores"
         )
     
+    pd = importar('pandas')
+    
     # Obtener datos de asesores
     resumen_asesores = obtener_resumen_asesores_diario(fecha=fecha_filtro_asesores)
     
@@ -572,33 +606,26 @@ elif opcion == "👥 Resumen de Asesores":
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("💵 Total Gasto Admin", f"S/. {total_general_ga:,.2f}")
+            st.metric("💵 Total Gasto Admin", texto_moneda(total_general_ga))
         
         with col2:
-            st.metric("📋 Total Planilla", f"S/. {total_general_planilla:,.2f}")
+            st.metric("📋 Total Planilla", texto_moneda(total_general_planilla))
         
         with col3:
-            st.metric("💰 Total Cobrado", f"S/. {total_general_combined:,.2f}")
+            st.metric("💰 Total Cobrado", texto_moneda(total_general_combined))
         
         st.markdown("---")
         
         # Tabla detallada
         st.subheader("📊 Desglose por Asesor")
         
-        tabla_asesores = []
-        for asesor, rucs_ga, rucs_planilla, total_ga, total_planilla in resumen_asesores:
-            total_asesor = total_ga + total_planilla
-            tabla_asesores.append({
-                'Asesor': asesor,
-                'GA (RUCs)': f"{rucs_ga}",
-                'GA (Monto)': f"S/. {total_ga:,.2f}",
-                'Planilla (RUCs)': f"{rucs_planilla}",
-                'Planilla (Monto)': f"S/. {total_planilla:,.2f}",
-                'Total': f"S/. {total_asesor:,.2f}"
-            })
-        
-        df_asesores = pd.DataFrame(tabla_asesores)
-        st.dataframe(df_asesores, use_container_width=True, hide_index=True)
+        df_asesores = pd.DataFrame(resumen_asesores, columns=[
+            'Asesor', 'GA (RUCs)', 'Planilla (RUCs)', 'GA (Monto)', 'Planilla (Monto)'
+        ])
+        df_asesores['Total'] = df_asesores['GA (Monto)'] + df_asesores['Planilla (Monto)']
+        df_asesores = df_asesores[['Asesor', 'GA (RUCs)', 'GA (Monto)', 'Planilla (RUCs)', 'Planilla (Monto)', 'Total']]
+        st.dataframe(df_asesores, use_container_width=True, hide_index=True,
+                     column_config=config_montos(['GA (Monto)', 'Planilla (Monto)', 'Total']))
         
         # Gráfico de comparación
         st.markdown("---")
@@ -608,30 +635,18 @@ elif opcion == "👥 Resumen de Asesores":
         
         with col_chart1:
             # Gráfico de barras - Total por asesor
-            datos_chart = []
-            for asesor, rucs_ga, rucs_planilla, total_ga, total_planilla in resumen_asesores:
-                datos_chart.append({
-                    'Asesor': asesor.split()[0] if asesor and asesor != 'SIN ASESOR' else asesor,
-                    'GA': total_ga,
-                    'Planilla': total_planilla
-                })
-            
-            df_chart = pd.DataFrame(datos_chart)
+            df_chart = pd.DataFrame({
+                'Asesor': nombres_cortos(df_asesores['Asesor']),
+                'GA': df_asesores['GA (Monto)'],
+                'Planilla': df_asesores['Planilla (Monto)']
+            })
             st.bar_chart(df_chart.set_index('Asesor'))
         
         with col_chart2:
             # Gráfico de pie - Distribución total
-            datos_pie = []
-            for asesor, rucs_ga, rucs_planilla, total_ga, total_planilla in resumen_asesores:
-                total_asesor = total_ga + total_planilla
-                if total_asesor > 0:
-                    datos_pie.append({
-                        'Asesor': asesor.split()[0] if asesor and asesor != 'SIN ASESOR' else asesor,
-                        'Total': total_asesor
-                    })
-            
-            if datos_pie:
-                df_pie = pd.DataFrame(datos_pie)
+            con_total = df_asesores[df_asesores['Total'] > 0]
+            if not con_total.empty:
+                df_pie = pd.DataFrame({'Asesor': nombres_cortos(con_total['Asesor']), 'Total': con_total['Total']})
                 st.bar_chart(df_pie.set_index('Asesor'))
     
     else:
@@ -674,11 +689,11 @@ elif opcion == "🏆 Ranking de Asesores":
             fecha_fin = st.date_input("📅 Hasta:", value=date.today())
         titulo_periodo = f"{fecha_inicio} a {fecha_fin}"
     
-    # Obtener ranking
-    ranking = obtener_ranking_asesores(
-        fecha_inicio=fecha_inicio.isoformat(),
-        fecha_fin=fecha_fin.isoformat()
-    )
+    # Obtener ranking (pandas se importa mientras corre la consulta)
+    lote.enviar('ranking', obtener_ranking_asesores,
+                fecha_inicio=fecha_inicio.isoformat(), fecha_fin=fecha_fin.isoformat())
+    pd = importar('pandas')
+    ranking = lote.resultado('ranking')
     
     if ranking:
         # Calcular totales generales
@@ -692,7 +707,7 @@ elif opcion == "🏆 Ranking de Asesores":
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("💰 Total Cobrado", f"S/. {total_general:,.2f}")
+            st.metric("💰 Total Cobrado", texto_moneda(total_general))
         
         with col2:
             st.metric("👥 Asesores Activos", len(ranking))
@@ -705,32 +720,26 @@ elif opcion == "🏆 Ranking de Asesores":
         # Tabla de ranking
         st.subheader("🥇 Ranking Detallado")
         
-        tabla_ranking = []
-        for idx, (asesor, total_rucs, rucs_ga, rucs_plan, total_ga, total_plan, total_cobrado) in enumerate(ranking, 1):
-            porcentaje = (total_cobrado / total_general * 100) if total_general > 0 else 0
-            
-            # Medalla
-            if idx == 1:
-                medal = "🥇"
-            elif idx == 2:
-                medal = "🥈"
-            elif idx == 3:
-                medal = "🥉"
-            else:
-                medal = f"#{idx}"
-            
-            tabla_ranking.append({
-                'Posición': medal,
-                'Asesor': asesor,
-                'Total Cobrado': f"S/. {total_cobrado:,.2f}",
-                '% del Total': f"{porcentaje:.1f}%",
-                'RUCs': total_rucs,
-                'GA': f"{rucs_ga} (S/. {total_ga:,.0f})",
-                'Planilla': f"{rucs_plan} (S/. {total_plan:,.0f})"
-            })
-        
-        df_ranking = pd.DataFrame(tabla_ranking)
-        st.dataframe(df_ranking, use_container_width=True, hide_index=True)
+        datos_ranking = pd.DataFrame(ranking, columns=[
+            'Asesor', 'RUCs', 'GA (RUCs)', 'Planilla (RUCs)', 'GA (Monto)', 'Planilla (Monto)', 'Total Cobrado'
+        ])
+        df_ranking = pd.DataFrame({
+            'Posición': medallas(len(datos_ranking)),
+            'Asesor': datos_ranking['Asesor'],
+            'Total Cobrado': datos_ranking['Total Cobrado'],
+            '% del Total': datos_ranking['Total Cobrado'] / total_general * 100 if total_general > 0 else 0.0,
+            'RUCs': datos_ranking['RUCs'],
+            'GA (RUCs)': datos_ranking['GA (RUCs)'],
+            'GA (Monto)': datos_ranking['GA (Monto)'],
+            'Planilla (RUCs)': datos_ranking['Planilla (RUCs)'],
+            'Planilla (Monto)': datos_ranking['Planilla (Monto)']
+        })
+        st.dataframe(df_ranking, use_container_width=True, hide_index=True, column_config={
+            'Total Cobrado': columna_moneda(),
+            '% del Total': columna_porcentaje(),
+            'GA (Monto)': columna_moneda(entero=True),
+            'Planilla (Monto)': columna_moneda(entero=True)
+        })
         
         st.markdown("---")
         
@@ -739,27 +748,20 @@ elif opcion == "🏆 Ranking de Asesores":
         
         with col1:
             st.subheader("📊 Gráfico de Cobros por Asesor")
-            chart_data = []
-            for asesor, _, _, _, _, _, total_cobrado in ranking:
-                chart_data.append({'Asesor': asesor.split()[0] if asesor and asesor != 'SIN ASESOR' else asesor, 'Cobrado': total_cobrado})
-            
-            if chart_data:
-                df_chart = pd.DataFrame(chart_data)
-                st.bar_chart(df_chart.set_index('Asesor'))
+            df_chart = pd.DataFrame({
+                'Asesor': nombres_cortos(datos_ranking['Asesor']),
+                'Cobrado': datos_ranking['Total Cobrado']
+            })
+            st.bar_chart(df_chart.set_index('Asesor'))
         
         with col2:
             st.subheader("📈 Composición: GA vs Planilla")
-            chart_composicion = []
-            for asesor, _, _, _, total_ga, total_plan, _ in ranking:
-                chart_composicion.append({
-                    'Asesor': asesor.split()[0] if asesor and asesor != 'SIN ASESOR' else asesor,
-                    'GA': total_ga,
-                    'Planilla': total_plan
-                })
-            
-            if chart_composicion:
-                df_comp = pd.DataFrame(chart_composicion)
-                st.bar_chart(df_comp.set_index('Asesor'))
+            df_comp = pd.DataFrame({
+                'Asesor': nombres_cortos(datos_ranking['Asesor']),
+                'GA': datos_ranking['GA (Monto)'],
+                'Planilla': datos_ranking['Planilla (Monto)']
+            })
+            st.bar_chart(df_comp.set_index('Asesor'))
         
         st.markdown("---")
         
@@ -791,9 +793,6 @@ elif opcion == "⏳ Promesas Pendientes":
     
     st.header("⏳ Promesas Pendientes por Cobrar")
     
-    # Convertir promesas vencidas a PROMESA CAIDA antes de obtener datos
-    detectar_promesas_caidas()
-    
     # Filtros en la barra lateral
     with st.sidebar:
         st.markdown("")
@@ -809,23 +808,24 @@ elif opcion == "⏳ Promesas Pendientes":
             key="promesas_fin"
         )
     
-    promesas_pendientes = obtener_promesas_pendientes(
-        fecha_inicio=fecha_inicio.isoformat(),
-        fecha_fin=fecha_fin.isoformat()
-    )
+    lote.enviar('pendientes', obtener_promesas_pendientes,
+                fecha_inicio=fecha_inicio.isoformat(), fecha_fin=fecha_fin.isoformat())
+    pd = importar('pandas')
+    np = importar('numpy')
+    promesas_pendientes = lote.resultado('pendientes')
     
     if promesas_pendientes:
-        # Los datos ya han sido actualizados por detectar_promesas_caidas() al inicio
+        pendientes = pd.DataFrame(promesas_pendientes, columns=[
+            'RUC', 'ID Doc', 'Asesor', 'Campaña', 'Promesa GA', 'Promesa Planilla',
+            'Fecha Pago Programada', 'Última Fecha'
+        ])
+        pendientes['Asesor'] = pendientes['Asesor'].fillna('SIN ASESOR')
         
         # Calcular estadísticas
-        total_promesas = len(promesas_pendientes)
+        total_promesas = len(pendientes)
         
-        # Agrupar por asesor
-        por_asesor = {}
-        for ruc, id_doc, asesor, campana, promesa_ga, promesa_planilla, fecha_pago_pendiente, fecha in promesas_pendientes:
-            if asesor not in por_asesor:
-                por_asesor[asesor] = 0
-            por_asesor[asesor] += 1
+        # Agrupar por asesor (de mayor a menor)
+        por_asesor = pendientes['Asesor'].value_counts()
         
         # Métricas principales con mejor visual
         col1, col2, col3 = st.columns(3)
@@ -847,33 +847,23 @@ elif opcion == "⏳ Promesas Pendientes":
             )
         
         with col3:
-            asesor_top = max(por_asesor.items(), key=lambda x: x[1])[0]
-            asesor_top_count = por_asesor[asesor_top]
-            st.metric("🏆 Mayor Cantidad", f"{asesor_top_count} RUCs")
+            st.metric("🏆 Mayor Cantidad", f"{por_asesor.iloc[0]} RUCs")
         
         st.divider()
         
         # Tabla detallada mejorada
         st.subheader("📋 Detalle de RUCs con Promesas Pendientes")
         
-        tabla_pendientes = []
-        for ruc, id_doc, asesor, campana, promesa_ga, promesa_planilla, fecha_pago_pendiente, fecha in promesas_pendientes:
-            promesa_tipo = ""
-            if promesa_ga == "A VEN...":
-                promesa_tipo = "Gastos Admin"
-            elif promesa_planilla == "A VEN...":
-                promesa_tipo = "Planilla"
-            
-            tabla_pendientes.append({
-                'Asesor': asesor if asesor else 'SIN ASESOR',
-                'RUC': ruc,
-                'Campaña': campana,
-                'Tipo Promesa': promesa_tipo.strip(),
-                'Fecha Pago Programada': fecha_pago_pendiente,
-                'Última Fecha': fecha
-            })
-        
-        df_pendientes = pd.DataFrame(tabla_pendientes)
+        df_pendientes = pd.DataFrame({
+            'Asesor': pendientes['Asesor'],
+            'RUC': pendientes['RUC'],
+            'Campaña': pendientes['Campaña'],
+            'Tipo Promesa': np.select(
+                [pendientes['Promesa GA'] == 'A VEN...', pendientes['Promesa Planilla'] == 'A VEN...'],
+                ['Gastos Admin', 'Planilla'], default=''),
+            'Fecha Pago Programada': fechas(pendientes['Fecha Pago Programada']),
+            'Última Fecha': fechas(pendientes['Última Fecha'])
+        })
         
         # Aplicar estilos a la tabla
         st.dataframe(
@@ -885,8 +875,8 @@ elif opcion == "⏳ Promesas Pendientes":
                 'RUC': st.column_config.TextColumn(width="small"),
                 'Campaña': st.column_config.TextColumn(width="small"),
                 'Tipo Promesa': st.column_config.TextColumn(width="medium"),
-                'Fecha Pago Programada': st.column_config.TextColumn(width="small"),
-                'Última Fecha': st.column_config.TextColumn(width="small"),
+                'Fecha Pago Programada': columna_fecha(width="small"),
+                'Última Fecha': columna_fecha(width="small"),
             }
         )
         
@@ -894,26 +884,14 @@ elif opcion == "⏳ Promesas Pendientes":
         st.markdown("---")
         st.subheader("📊 Resumen por Asesor")
         
-        tabla_asesor = []
-        for asesor, cantidad in sorted(por_asesor.items(), key=lambda x: x[1], reverse=True):
-            tabla_asesor.append({
-                'Asesor': asesor if asesor else 'SIN ASESOR',
-                'Cantidad de Promesas': cantidad
-            })
-        
-        df_asesor = pd.DataFrame(tabla_asesor)
+        df_asesor = por_asesor.rename_axis('Asesor').reset_index(name='Cantidad de Promesas')
         st.dataframe(df_asesor, use_container_width=True, hide_index=True)
         
         # Gráfico
         st.markdown("---")
         st.subheader("📈 Gráfico de Promesas por Asesor")
         
-        chart_data = pd.DataFrame({
-            'Asesor': [a if a else 'SIN ASESOR' for a in por_asesor.keys()],
-            'Cantidad': por_asesor.values()
-        }).sort_values('Cantidad', ascending=False)
-        
-        st.bar_chart(chart_data.set_index('Asesor'))
+        st.bar_chart(por_asesor.rename('Cantidad'))
         
         # Acción: Descargar lista
         st.markdown("---")
@@ -932,10 +910,11 @@ elif opcion == "⏳ Promesas Pendientes":
 elif opcion == "🎯 Promesas de Hoy":
     st.header("🎯 Pagos Prometidos para HOY")
     
-    # Convertir promesas vencidas a PROMESA CAIDA antes de obtener datos
-    detectar_promesas_caidas()
-    
-    promesas_stats = obtener_estadisticas_promesas_hoy()
+    # Métricas y detalle son lecturas independientes: se envían juntas
+    lote.enviar('estadisticas', obtener_estadisticas_promesas_hoy)
+    lote.enviar('promesas', obtener_promesas_hoy)
+    pd = importar('pandas')
+    promesas_stats = lote.resultado('estadisticas')
     
     # Métricas
     col1, col2, col3, col4 = st.columns(4)
@@ -944,13 +923,13 @@ elif opcion == "🎯 Promesas de Hoy":
         st.metric("📦 Promesas Gasto", promesas_stats['promesas_gasto_count'])
     
     with col2:
-        st.metric("💰 Monto Gasto", f"S/. {promesas_stats['promesas_gasto_monto']:,.2f}")
+        st.metric("💰 Monto Gasto", texto_moneda(promesas_stats['promesas_gasto_monto']))
     
     with col3:
         st.metric("📊 Promesas Planilla", promesas_stats['promesas_planilla_count'])
     
     with col4:
-        st.metric("💵 Monto Planilla", f"S/. {promesas_stats['promesas_planilla_monto']:,.2f}")
+        st.metric("💵 Monto Planilla", texto_moneda(promesas_stats['promesas_planilla_monto']))
     
     st.markdown("---")
     
@@ -958,35 +937,34 @@ elif opcion == "🎯 Promesas de Hoy":
     with col1:
         st.success(f"✅ Total Promesas: {promesas_stats['total_promesas']}")
     with col2:
-        st.info(f"💎 Total a Cobrar: S/. {promesas_stats['total_monto_promesas']:,.2f}")
+        st.info(f"💎 Total a Cobrar: {texto_moneda(promesas_stats['total_monto_promesas'])}")
     
     st.markdown("---")
     st.subheader("📋 Detalle de Promesas")
     
-    promesas = obtener_promesas_hoy()
+    promesas = lote.resultado('promesas')
     
     if promesas:
-        # Los datos ya han sido actualizados por detectar_promesas_caidas() al inicio
-        
         df_promesas = pd.DataFrame(promesas, columns=[
             'ID', 'Fecha Reporte', 'RUC', 'ID Doc', 'Campaña', 'Asesor',
             'Promesa', 'Monto', 'Fecha Pago', 'Tipo Pago', 'Observaciones'
         ])
         
-        # Formatear montos
-        df_promesas['Monto'] = df_promesas['Monto'].apply(lambda x: f"S/. {x:,.2f}" if pd.notna(x) and x > 0 else "-")
+        # Montos numéricos y fechas como fecha: el formato lo da column_config
+        df_promesas['Monto'] = montos(df_promesas['Monto'])
+        for col in ['Fecha Reporte', 'Fecha Pago']:
+            df_promesas[col] = fechas(df_promesas[col])
         
         # Colorear por tipo
-        def colorear_fila(row):
-            if row['Tipo Pago'] == 'GASTO':
-                return ['background-color: #ffe6e6'] * len(row)
-            else:
-                return ['background-color: #e6f3ff'] * len(row)
-        
         st.dataframe(
-            df_promesas.style.apply(colorear_fila, axis=1),
+            estilo_por_categoria(df_promesas, 'Tipo Pago', COLORES_TIPO_PAGO),
             use_container_width=True,
-            height=400
+            height=400,
+            column_config={
+                'Monto': columna_moneda(),
+                'Fecha Reporte': columna_fecha(),
+                'Fecha Pago': columna_fecha()
+            }
         )
         
         st.success(f"✓ Total de promesas: {len(promesas)}")
@@ -1009,18 +987,7 @@ elif opcion == "📝 Registrar Pago":
     with col1:
         # Si no hay RUC registrado, mostrar input activo
         if st.session_state.ruc_registrado is None:
-            ruc_numero = st.text_input("🔍 Número RUC", placeholder="Ingresa RUC y presiona Enter")
-            
-            if ruc_numero:
-                # Buscar RUC en BD
-                ruc_info_list = obtener_ruc_por_numero(ruc_numero)
-                
-                if ruc_info_list:
-                    st.session_state.ruc_registrado = ruc_numero
-                    st.session_state.ruc_info_encontrada = ruc_info_list
-                    st.rerun()
-                else:
-                    st.error("❌ RUC no encontrado en la base de datos")
+            buscar_ruc_en_catalogo()
         else:
             # Mostrar RUC deshabilitado
             st.text_input("🔍 Número RUC", value=st.session_state.ruc_registrado, disabled=True)
@@ -1028,6 +995,7 @@ elif opcion == "📝 Registrar Pago":
             if st.button("🔄 Cambiar RUC", use_container_width=False):
                 st.session_state.ruc_registrado = None
                 st.session_state.ruc_info_encontrada = None
+                st.session_state.pop('buscar_ruc', None)
                 st.rerun()
     
     # Si hay RUC registrado, mostrar datos y opciones
@@ -1058,16 +1026,27 @@ elif opcion == "📝 Registrar Pago":
         col_info1, col_info2 = st.columns(2)
         with col_info1:
             if deuda_total and deuda_total > 0:
-                st.metric("💰 Deuda Total", f"S/. {deuda_total:,.2f}")
+                st.metric("💰 Deuda Total", texto_moneda(deuda_total))
             else:
                 st.metric("💰 Deuda Total", "No registrada")
         
         with col_info2:
             if gasto_admin and gasto_admin > 0:
-                st.metric("📊 Gasto Admin", f"S/. {gasto_admin:,.2f}")
+                st.metric("📊 Gasto Admin", texto_moneda(gasto_admin))
             else:
                 st.metric("📊 Gasto Admin", "No registrada")
         
+        # Saldos del RUC según sus registros (pendiente + caído, y lo ya cobrado)
+        saldo_ruc = obtener_saldo_ruc(st.session_state.ruc_registrado)
+        col_saldo1, col_saldo2 = st.columns(2)
+        for col_saldo, clave, titulo in ((col_saldo1, 'ga', "GA"), (col_saldo2, 'planilla', "Planilla")):
+            with col_saldo:
+                saldo = saldo_ruc[clave]
+                st.metric(f"⏳ {titulo} por cobrar", texto_moneda(saldo['por_cobrar']),
+                          help=f"A vencer: {texto_moneda(saldo['pendiente'])} | "
+                               f"Caído: {texto_moneda(saldo['caido'])} | "
+                               f"Cobrado: {texto_moneda(saldo['cobrado'])}")
+        
         st.divider()
         asesores_disponibles = obtener_asesores_unicos()
         asesor_original = ruc_seleccionado[5] or ""
@@ -1108,6 +1087,12 @@ elif opcion == "📝 Registrar Pago":
         with col3:
             fecha_pago_gasto = st.date_input("Fecha de Pago", value=None, key="fecha_gasto")
         
+        if monto_gasto > 0:
+            es_anormal, _, msg_anormal = detectar_monto_anormal(
+                monto_gasto, 'ga', st.session_state.ruc_registrado, campaña)
+            if es_anormal:
+                st.warning(msg_anormal)
+        
         st.markdown("---")
         st.subheader("📊 Planilla")
         
@@ -1123,6 +1108,12 @@ elif opcion == "📝 Registrar Pago":
         with col3:
             fecha_pago_planilla = st.date_input("Fecha de Pago", value=None, key="fecha_plan")
         
+        if monto_planilla > 0:
+            es_anormal, _, msg_anormal = detectar_monto_anormal(
+                monto_planilla, 'planilla', st.session_state.ruc_registrado, campaña)
+            if es_anormal:
+                st.warning(msg_anormal)
+        
         st.markdown("---")
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -1145,8 +1136,8 @@ elif opcion == "📝 Registrar Pago":
                     fecha_pago_gasto_str = fecha_pago_gasto.isoformat() if fecha_pago_gasto else None
                     fecha_pago_planilla_str = fecha_pago_planilla.isoformat() if fecha_pago_planilla else None
                     
-                    # VALIDAR DUPLICADOS EXACTOS
-                    es_duplicado, id_dup, msg_dup = detectar_duplicado_exacto(
+                    # REGISTRAR SOLO SI NO ES UN DUPLICADO EXACTO (verificación e inserción atómicas)
+                    registro_id, id_dup = registrar_pago_sin_duplicar(
                         fecha_reporte=fecha_reporte.isoformat(),
                         ruc=st.session_state.ruc_registrado,
                         id_documento=id_documento,
@@ -1161,28 +1152,14 @@ elif opcion == "📝 Registrar Pago":
                         observaciones=observaciones
                     )
                     
-                    if es_duplicado:
+                    if registro_id is None:
+                        msg_dup = f"⚠️ Duplicado detectado: Este registro ya existe (ID: {id_dup})"
                         st.warning(f"⚠️ **ALERTA DE DUPLICADO**\n\n{msg_dup}\n\n"
                                   f"Los datos del registro que intentas crear ya existen en la BD.\n\n"
-                                  f"📅 Fecha: {fecha_reporte}\n"
+                                  f"📅 Fecha: {texto_fecha(fecha_reporte)}\n"
                                   f"🔢 RUC: {st.session_state.ruc_registrado}\n"
                                   f"👤 Asesor: {asesor}")
                     else:
-                        registro_id = registrar_pago(
-                            fecha_reporte=fecha_reporte.isoformat(),
-                            ruc=st.session_state.ruc_registrado,
-                            id_documento=id_documento,
-                            campaña=campaña,
-                            asesor=asesor,
-                            promesa_ga=promesa_ga_val,
-                            monto_gasto=monto_gasto_val,
-                            fecha_pago_gasto=fecha_pago_gasto_str,
-                            promesa_planilla=promesa_planilla_val,
-                            monto_planilla=monto_planilla_val,
-                            fecha_pago_planilla=fecha_pago_planilla_str,
-                            observaciones=observaciones
-                        )
-                        
                         st.success(f"✅ ¡Pago registrado exitosamente!")
                         st.balloons()
                         
@@ -1194,7 +1171,7 @@ elif opcion == "📝 Registrar Pago":
                         with col1:
                             st.metric("ID Registro", registro_id)
                         with col2:
-                            st.metric("Total Cobrado", f"S/. {(monto_gasto_val or 0) + (monto_planilla_val or 0):,.2f}")
+                            st.metric("Total Cobrado", texto_moneda((monto_gasto_val or 0) + (monto_planilla_val or 0)))
                         with col3:
                             st.metric("RUC", st.session_state.ruc_registrado)
                         
@@ -1220,29 +1197,70 @@ elif opcion == "📝 Registrar Pago":
 # ======================== VER REGISTROS ========================
 elif opcion == "📋 Ver Registros":
     st.header("📋 Ver Registros de Pagos")
+    pd = importar('pandas')
     
-    # Filtros
+    # Filtros (se aplican en SQL: nunca se carga la tabla completa)
     col1, col2, col3 = st.columns(3)
     
     with col1:
         filtro_tipo = st.radio("Mostrar registros:", ["Hoy", "Por Fecha", "Todos"])
     
+    filtros = {}
+    if filtro_tipo == "Hoy":
+        filtros['fecha_desde'] = filtros['fecha_hasta'] = date.today().isoformat()
+        titulo = f"Registros de {date.today().isoformat()}"
+    elif filtro_tipo == "Por Fecha":
+        with col2:
+            rango = st.date_input("Selecciona una fecha o rango", value=(date.today(), date.today()))
+        fecha_desde, fecha_hasta = (rango[0], rango[-1]) if isinstance(rango, (list, tuple)) and rango else (rango, rango)
+        filtros['fecha_desde'], filtros['fecha_hasta'] = fecha_desde.isoformat(), fecha_hasta.isoformat()
+        titulo = (f"Registros de {fecha_desde.isoformat()}" if fecha_desde == fecha_hasta
+                  else f"Registros del {fecha_desde.isoformat()} al {fecha_hasta.isoformat()}")
+    else:
+        titulo = "Todos los registros"
+    
+    with col3:
+        orden = st.selectbox("Ordenar por:", list(ORDENES_REGISTROS), format_func={
+            'reciente': "Fecha de reporte (reciente primero)",
+            'antiguo': "Fecha de reporte (antiguo primero)",
+            'ruc': "RUC",
+            'ultimos_ingresados': "Últimos ingresados",
+        }.get)
+        por_pagina = st.selectbox("Registros por página:", [25, 50, 100, 250], index=1)
+    
+    with st.expander("🔎 Más filtros"):
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            filtros['asesor'] = st.selectbox("Asesor:", [None] + obtener_asesores_unicos(),
+                                             format_func=lambda x: "Todos" if x is None else x)
+            filtros['campaña'] = st.selectbox("Campaña:", [None] + obtener_campanas_unicas(),
+                                              format_func=lambda x: "Todas" if x is None else x)
+        with fcol2:
+            filtros['estado'] = st.selectbox("Estado (GA o Planilla):", [None, 'A VENCER', 'PROMESA CAIDA', 'COBRADO'],
+                                             format_func=lambda x: "Todos" if x is None else x)
+            filtros['ruc_prefijo'] = st.text_input("RUC empieza con:", max_chars=11).strip() or None
+        with fcol3:
+            monto_min = st.number_input("Monto total desde (S/.):", min_value=0.0, value=0.0, step=100.0)
+            monto_max = st.number_input("Monto total hasta (S/.):", min_value=0.0, value=0.0, step=100.0,
+                                        help="0 = sin límite")
+            filtros['monto_min'] = monto_min or None
+            filtros['monto_max'] = monto_max or None
+    
+    # Paginación por clave: se guardan los cursores de las páginas visitadas
+    # y se vuelve a la primera página cuando cambian los filtros o el orden
+    firma = repr((sorted(filtros.items()), orden, por_pagina))
+    if st.session_state.get('ver_registros_firma') != firma:
+        st.session_state.ver_registros_firma = firma
+        st.session_state.ver_registros_cursores = [None]
+    cursores = st.session_state.ver_registros_cursores
+    
     registros = None
-    titulo = ""
     
     try:
-        if filtro_tipo == "Hoy":
-            registros = obtener_registros_hoy()
-            titulo = f"Registros de {date.today().isoformat()}"
-        
-        elif filtro_tipo == "Por Fecha":
-            fecha_seleccionada = st.date_input("Selecciona una fecha")
-            registros = obtener_registros_por_fecha(fecha_seleccionada.isoformat())
-            titulo = f"Registros de {fecha_seleccionada.isoformat()}"
-        
-        else:
-            registros = obtener_todos_registros()
-            titulo = "Todos los registros"
+        lote.enviar('pagina', buscar_registros, orden, cursores[-1], por_pagina, **filtros)
+        lote.enviar('total', contar_registros, **filtros)
+        registros, siguiente = lote.resultado('pagina')
+        total = lote.resultado('total')
         
         st.subheader(titulo)
         
@@ -1255,23 +1273,26 @@ elif opcion == "📋 Ver Registros":
                 'Observaciones'
             ])
             
-            # Formatear montos
-            for col in ['Monto Gastos Admin', 'Monto Planilla']:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: f"S/. {x:,.2f}" if pd.notna(x) and x > 0 else "-")
+            # Montos numéricos y fechas como fecha: el formato lo da column_config
+            columnas_monto = ['Monto Gastos Admin', 'Monto Planilla']
+            columnas_fecha = ['Fecha Reporte', 'Fecha Pago Gastos Admin', 'Fecha Pago Planilla']
+            for col in columnas_monto:
+                df[col] = montos(df[col])
+            for col in columnas_fecha:
+                df[col] = fechas(df[col])
             
             # Mostrar estadísticas
             st.markdown("---")
             col1, col2, col3 = st.columns(3)
             
+            pagina = len(cursores)
+            paginas = max(1, -(-total // por_pagina))
+            
             with col1:
-                st.metric("Total de Registros", len(registros))
+                st.metric("Total de Registros", f"{total:,}")
             
             with col2:
-                ids_texto = ', '.join(map(str, [r[0] for r in registros][:5]))
-                if len(registros) > 5:
-                    ids_texto += "..."
-                st.metric("IDs de Registros", ids_texto)
+                st.metric("Página", f"{pagina:,} de {paginas:,}")
             
             with col3:
                 st.metric("Registros Mostrados", len(df))
@@ -1280,20 +1301,39 @@ elif opcion == "📋 Ver Registros":
             
             # Mostrar dataframe con scroll
             st.write("**Tabla de Registros:**")
-            st.dataframe(df, use_container_width=True, hide_index=False)
+            st.dataframe(df, use_container_width=True, hide_index=True, column_config={
+                **config_montos(columnas_monto),
+                **{col: columna_fecha() for col in columnas_fecha}
+            })
+            
+            # Navegación entre páginas
+            nav1, nav2, nav3 = st.columns(3)
+            
+            with nav1:
+                if st.button("⏮️ Primera", use_container_width=True, disabled=pagina == 1):
+                    st.session_state.ver_registros_cursores = [None]
+                    st.rerun()
+            
+            with nav2:
+                if st.button("◀️ Anterior", use_container_width=True, disabled=pagina == 1):
+                    cursores.pop()
+                    st.rerun()
+            
+            with nav3:
+                if st.button("Siguiente ▶️", use_container_width=True, disabled=siguiente is None):
+                    cursores.append(siguiente)
+                    st.rerun()
             
             # Botones de acción
             col1, col2 = st.columns(2)
             
             with col1:
-                if st.button("📥 Descargar como CSV"):
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="Descargar CSV",
-                        data=csv,
-                        file_name=f"registros_{date.today().isoformat()}.csv",
-                        mime="text/csv"
-                    )
+                st.download_button(
+                    label="📥 Descargar página como CSV",
+                    data=df.to_csv(index=False),
+                    file_name=f"registros_{date.today().isoformat()}_p{pagina}.csv",
+                    mime="text/csv"
+                )
             
             with col2:
                 if st.button("🔄 Recargar Datos"):
@@ -1307,229 +1347,258 @@ elif opcion == "📋 Ver Registros":
         st.info("Detalles técnicos del error:")
         st.code(str(e))
         
-        # Tabs para Editar y Eliminar
-        tab_editar, tab_eliminar = st.tabs(["✏️ Editar Registro", "🗑️ Eliminar Registro"])
+    # Tabs para Editar y Eliminar (abren el registro por ID: no dependen de la página cargada)
+    tab_editar, tab_eliminar = st.tabs(["✏️ Editar Registro", "🗑️ Eliminar Registro"])
+    
+    # ========== TAB EDITAR ==========
+    with tab_editar:
+        st.subheader("✏️ Editar Registro")
+        
+        # Inicializar session state para contraseña de edición
+        if 'contraseña_editar_correcta' not in st.session_state:
+            st.session_state.contraseña_editar_correcta = False
         
-        # ========== TAB EDITAR ==========
-        with tab_editar:
-            st.subheader("✏️ Editar Registro")
+        # Solicitar contraseña
+        if not st.session_state.contraseña_editar_correcta:
+            col_pass1, col_pass2 = st.columns([3, 1])
             
-            # Inicializar session state para contraseña de edición
-            if 'contraseña_editar_correcta' not in st.session_state:
-                st.session_state.contraseña_editar_correcta = False
+            with col_pass1:
+                contraseña_edit = st.text_input(
+                    "🔐 Ingresa la contraseña para editar registros:",
+                    type="password",
+                    placeholder="Contraseña requerida",
+                    key="pass_editar"
+                )
             
-            # Solicitar contraseña
-            if not st.session_state.contraseña_editar_correcta:
-                col_pass1, col_pass2 = st.columns([3, 1])
-                
-                with col_pass1:
-                    contraseña_edit = st.text_input(
-                        "🔐 Ingresa la contraseña para editar registros:",
-                        type="password",
-                        placeholder="Contraseña requerida",
-                        key="pass_editar"
+            with col_pass2:
+                st.markdown("")
+                st.markdown("")
+                if st.button("✅ Verificar", use_container_width=True, key="btn_verify_edit"):
+                    if contraseña_edit == "calidad":
+                        st.session_state.contraseña_editar_correcta = True
+                        st.success("✓ Contraseña correcta")
+                        st.rerun()
+                    else:
+                        st.error("❌ Contraseña incorrecta")
+        
+        # Si contraseña es correcta, mostrar opciones de edición
+        if st.session_state.contraseña_editar_correcta:
+            st.success("🔓 Acceso desbloqueado")
+            
+            # El registro se abre por ID (o buscando por RUC) con una lectura de una fila
+            col_id, col_ruc = st.columns(2)
+            
+            with col_id:
+                id_buscado = st.number_input(
+                    "ID del registro a editar:",
+                    min_value=1,
+                    value=None,
+                    help="Puedes ver el ID en la primera columna de la tabla",
+                    key="id_editar"
+                )
+            
+            with col_ruc:
+                ruc_buscado = st.text_input("...o busca por RUC:", max_chars=11, key="ruc_editar").strip()
+            
+            if ruc_buscado:
+                encontrados, _ = buscar_registros('reciente', None, 20, ruc_prefijo=ruc_buscado)
+                if encontrados:
+                    id_buscado = st.selectbox(
+                        "Registros del RUC (los 20 más recientes):",
+                        options=[r[0] for r in encontrados],
+                        format_func={r[0]: f"ID {r[0]} · {r[1]} · {r[2]} · {r[5] or ''}" for r in encontrados}.get,
+                        key="select_id_edit"
                     )
-                
-                with col_pass2:
-                    st.markdown("")
-                    st.markdown("")
-                    if st.button("✅ Verificar", use_container_width=True, key="btn_verify_edit"):
-                        if contraseña_edit == "calidad":
-                            st.session_state.contraseña_editar_correcta = True
-                            st.success("✓ Contraseña correcta")
-                            st.rerun()
-                        else:
-                            st.error("❌ Contraseña incorrecta")
+                else:
+                    st.warning("⚠️ No hay registros con ese RUC")
+            
+            if st.button("📂 Abrir registro", disabled=not id_buscado, key="btn_abrir_edit"):
+                st.session_state.registro_editando = obtener_registro(int(id_buscado))
+                if st.session_state.registro_editando is None:
+                    st.warning(f"⚠️ No existe el registro ID {int(id_buscado)}")
+            
+            registro_actual = st.session_state.get('registro_editando')
             
-            # Si contraseña es correcta, mostrar opciones de edición
-            if st.session_state.contraseña_editar_correcta:
-                st.success("🔓 Acceso desbloqueado")
-                st.info("ℹ️ Realiza los cambios necesarios en los campos:")
+            if registro_actual:
+                id_editar, version = registro_actual['id'], registro_actual['version']
+                st.info(f"📋 Editando registro ID: {id_editar} · {registro_actual['ruc']} · "
+                        f"{texto_fecha(registro_actual['fecha_reporte'])} (versión {version})")
                 
-                # Seleccionar registro a editar
-                id_editar = st.selectbox(
-                    "Selecciona el ID del registro a editar:",
-                    options=[r[0] for r in registros],
-                    help="Elige el ID que deseas modificar",
-                    key="select_id_edit"
-                )
+                version_rechazada = st.session_state.pop('conflicto_edicion', None)
+                if version_rechazada is not None:
+                    st.error(f"❌ Otro usuario modificó el registro mientras lo editabas "
+                             f"(versión {version_rechazada} → {version}). Tus cambios no se guardaron: "
+                             "el formulario muestra los valores actuales, revísalos y vuelve a guardar.")
                 
-                # Obtener datos del registro seleccionado
-                registro_actual = next((r for r in registros if r[0] == id_editar), None)
+                # Las claves llevan la versión: al recargar el registro los campos toman los valores nuevos
+                sufijo = f"{id_editar}_{version}"
                 
-                if registro_actual:
-                    st.info(f"📋 Editando registro ID: {id_editar}")
-                    
-                    # Crear formulario de edición
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        promesa_ga_edit = st.text_input(
-                            "Promesa GA:",
-                            value=registro_actual[6] or "",
-                            help="Ej: A VENCER, COBRADO, etc.",
-                            key="promesa_ga_edit"
-                        )
-                        
-                        monto_gasto_edit = st.number_input(
-                            "Monto Gasto Admin:",
-                            value=float(registro_actual[7]) if registro_actual[7] else 0.0,
-                            step=0.01,
-                            key="monto_gasto_edit"
-                        )
-                        
-                        fecha_pago_gasto_edit = st.date_input(
-                            "Fecha Pago Gasto:",
-                            value=datetime.strptime(registro_actual[8], '%Y-%m-%d').date() if registro_actual[8] else date.today(),
-                            format="YYYY-MM-DD",
-                            key="fecha_gasto_edit"
-                        )
+                def fecha_inicial(valor):
+                    try:
+                        return datetime.strptime(valor, '%Y-%m-%d').date()
+                    except (TypeError, ValueError):
+                        return date.today()
+                
+                # Crear formulario de edición
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    promesa_ga_edit = st.text_input(
+                        "Promesa GA:",
+                        value=registro_actual['promesa_ga'] or "",
+                        help="Ej: A VENCER, COBRADO, etc.",
+                        key=f"promesa_ga_edit_{sufijo}"
+                    )
                     
-                    with col2:
-                        promesa_planilla_edit = st.text_input(
-                            "Promesa Planilla:",
-                            value=registro_actual[9] or "",
-                            help="Ej: A VENCER, COBRADO, etc.",
-                            key="promesa_planilla_edit"
-                        )
-                        
-                        monto_planilla_edit = st.number_input(
-                            "Monto Planilla:",
-                            value=float(registro_actual[10]) if registro_actual[10] else 0.0,
-                            step=0.01,
-                            key="monto_planilla_edit"
-                        )
-                        
-                        fecha_pago_planilla_edit = st.date_input(
-                            "Fecha Pago Planilla:",
-                            value=datetime.strptime(registro_actual[11], '%Y-%m-%d').date() if registro_actual[11] else date.today(),
-                            format="YYYY-MM-DD",
-                            key="fecha_planilla_edit"
-                        )
+                    monto_gasto_edit = st.number_input(
+                        "Monto Gasto Admin:",
+                        value=float(registro_actual['monto_gasto'] or 0.0),
+                        step=0.01,
+                        key=f"monto_gasto_edit_{sufijo}"
+                    )
                     
-                    observaciones_edit = st.text_area(
-                        "Observaciones:",
-                        value=registro_actual[12] or "",
-                        height=80,
-                        key="obs_edit"
+                    fecha_pago_gasto_edit = st.date_input(
+                        "Fecha Pago Gasto:",
+                        value=fecha_inicial(registro_actual['fecha_pago_gasto']),
+                        format="YYYY-MM-DD",
+                        key=f"fecha_gasto_edit_{sufijo}"
+                    )
+                
+                with col2:
+                    promesa_planilla_edit = st.text_input(
+                        "Promesa Planilla:",
+                        value=registro_actual['promesa_planilla'] or "",
+                        help="Ej: A VENCER, COBRADO, etc.",
+                        key=f"promesa_planilla_edit_{sufijo}"
                     )
                     
-                    # Botones de acción para editar
-                    col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
+                    monto_planilla_edit = st.number_input(
+                        "Monto Planilla:",
+                        value=float(registro_actual['monto_planilla'] or 0.0),
+                        step=0.01,
+                        key=f"monto_planilla_edit_{sufijo}"
+                    )
                     
-                    with col_btn1:
-                        if st.button("✅ Guardar Cambios", use_container_width=True, type="primary", key="btn_save_edit"):
-                            try:
-                                # Actualizar registro
-                                conn = sqlite3.connect("pagos.db")
-                                cursor = conn.cursor()
-                                
-                                cursor.execute('''
-                                UPDATE registros_pagos 
-                                SET promesa_ga = ?, monto_gasto = ?, fecha_pago_gasto = ?,
-                                    promesa_planilla = ?, monto_planilla = ?, fecha_pago_planilla = ?,
-                                    observaciones = ?
-                                WHERE id = ?
-                                ''', (
-                                    promesa_ga_edit if promesa_ga_edit else None,
-                                    monto_gasto_edit if monto_gasto_edit > 0 else None,
-                                    fecha_pago_gasto_edit.strftime('%Y-%m-%d') if promesa_ga_edit else None,
-                                    promesa_planilla_edit if promesa_planilla_edit else None,
-                                    monto_planilla_edit if monto_planilla_edit > 0 else None,
-                                    fecha_pago_planilla_edit.strftime('%Y-%m-%d') if promesa_planilla_edit else None,
-                                    observaciones_edit,
-                                    id_editar
-                                ))
-                                
-                                conn.commit()
-                                conn.close()
-                                
+                    fecha_pago_planilla_edit = st.date_input(
+                        "Fecha Pago Planilla:",
+                        value=fecha_inicial(registro_actual['fecha_pago_planilla']),
+                        format="YYYY-MM-DD",
+                        key=f"fecha_planilla_edit_{sufijo}"
+                    )
+                
+                observaciones_edit = st.text_area(
+                    "Observaciones:",
+                    value=registro_actual['observaciones'] or "",
+                    height=80,
+                    key=f"obs_edit_{sufijo}"
+                )
+                
+                # Botones de acción para editar
+                col_btn1, col_btn2 = st.columns(2)
+                
+                with col_btn1:
+                    if st.button("✅ Guardar Cambios", use_container_width=True, type="primary", key="btn_save_edit"):
+                        try:
+                            # Solo se guarda si nadie modificó el registro desde que se abrió
+                            guardado, vigente = actualizar_registro_si_version(
+                                id_editar, version,
+                                promesa_ga=promesa_ga_edit if promesa_ga_edit else None,
+                                monto_gasto=monto_gasto_edit if monto_gasto_edit > 0 else None,
+                                fecha_pago_gasto=fecha_pago_gasto_edit.strftime('%Y-%m-%d') if promesa_ga_edit else None,
+                                promesa_planilla=promesa_planilla_edit if promesa_planilla_edit else None,
+                                monto_planilla=monto_planilla_edit if monto_planilla_edit > 0 else None,
+                                fecha_pago_planilla=fecha_pago_planilla_edit.strftime('%Y-%m-%d') if promesa_planilla_edit else None,
+                                observaciones=observaciones_edit
+                            )
+                            
+                            if guardado:
                                 st.success(f"✓ Registro ID {id_editar} actualizado correctamente")
+                                st.session_state.registro_editando = None
                                 st.session_state.contraseña_editar_correcta = False
                                 st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Error al actualizar: {e}")
-                    
-                    with col_btn2:
-                        if st.button("❌ Cancelar", use_container_width=True, key="btn_cancel_edit"):
-                            st.session_state.contraseña_editar_correcta = False
-                            st.rerun()
-                    
-                    with col_btn3:
-                        st.markdown("")
-                        st.markdown("")
-                        if st.button("Cerrar", use_container_width=True, key="btn_close_edit"):
-                            st.session_state.contraseña_editar_correcta = False
-                            st.rerun()
+                            elif vigente is None:
+                                st.error(f"❌ El registro ID {id_editar} fue eliminado por otro usuario")
+                                st.session_state.registro_editando = None
+                            else:
+                                # Conflicto: el formulario se recarga con los valores vigentes
+                                st.session_state.conflicto_edicion = version
+                                st.session_state.registro_editando = vigente
+                                st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ Error al actualizar: {e}")
+                
+                with col_btn2:
+                    if st.button("❌ Cancelar", use_container_width=True, key="btn_cancel_edit"):
+                        st.session_state.registro_editando = None
+                        st.session_state.contraseña_editar_correcta = False
+                        st.rerun()
+    
+    # ========== TAB ELIMINAR ==========
+    with tab_eliminar:
+        st.subheader("🗑️ Eliminar Registro")
+        
+        # Inicializar session state para contraseña
+        if 'contraseña_correcta' not in st.session_state:
+            st.session_state.contraseña_correcta = False
         
-        # ========== TAB ELIMINAR ==========
-        with tab_eliminar:
-            st.subheader("🗑️ Eliminar Registro")
+        # Solicitar contraseña
+        if not st.session_state.contraseña_correcta:
+            col_pass1, col_pass2 = st.columns([3, 1])
             
-            # Inicializar session state para contraseña
-            if 'contraseña_correcta' not in st.session_state:
-                st.session_state.contraseña_correcta = False
+            with col_pass1:
+                contraseña = st.text_input(
+                    "🔐 Ingresa la contraseña para eliminar registros:",
+                    type="password",
+                    placeholder="Contraseña requerida"
+                )
             
-            # Solicitar contraseña
-            if not st.session_state.contraseña_correcta:
-                col_pass1, col_pass2 = st.columns([3, 1])
-                
-                with col_pass1:
-                    contraseña = st.text_input(
-                        "🔐 Ingresa la contraseña para eliminar registros:",
-                        type="password",
-                        placeholder="Contraseña requerida"
-                    )
-                
-                with col_pass2:
-                    st.markdown("")
-                    st.markdown("")
-                    if st.button("✅ Verificar", use_container_width=True):
-                        if contraseña == "calidad":
-                            st.session_state.contraseña_correcta = True
-                            st.success("✓ Contraseña correcta")
+            with col_pass2:
+                st.markdown("")
+                st.markdown("")
+                if st.button("✅ Verificar", use_container_width=True):
+                    if contraseña == "calidad":
+                        st.session_state.contraseña_correcta = True
+                        st.success("✓ Contraseña correcta")
+                        st.rerun()
+                    else:
+                        st.error("❌ Contraseña incorrecta")
+        
+        # Si contraseña es correcta, mostrar opciones de eliminación
+        if st.session_state.contraseña_correcta:
+            st.success("🔓 Acceso desbloqueado")
+            st.warning("⚠️ Estás en modo de eliminación. Sé cuidadoso.")
+            
+            col_elim1, col_elim2, col_elim3 = st.columns([2, 1, 1])
+            
+            with col_elim1:
+                id_registro = st.number_input(
+                    "Ingresa el ID del registro a eliminar:",
+                    min_value=1,
+                    value=None,
+                    help="Puedes ver el ID en la primera columna de la tabla"
+                )
+            
+            with col_elim2:
+                st.markdown("")
+                st.markdown("")
+                if st.button("🗑️ Eliminar", use_container_width=True, type="secondary"):
+                    if id_registro:
+                        try:
+                            eliminar_registro(int(id_registro))
+                            st.success(f"✓ Registro ID {id_registro} eliminado correctamente")
+                            st.session_state.contraseña_correcta = False
                             st.rerun()
-                        else:
-                            st.error("❌ Contraseña incorrecta")
+                        except Exception as e:
+                            st.error(f"❌ Error al eliminar: {e}")
+                    else:
+                        st.warning("⚠️ Por favor ingresa un ID válido")
             
-            # Si contraseña es correcta, mostrar opciones de eliminación
-            if st.session_state.contraseña_correcta:
-                st.success("🔓 Acceso desbloqueado")
-                st.warning("⚠️ Estás en modo de eliminación. Sé cuidadoso.")
-                
-                col_elim1, col_elim2, col_elim3 = st.columns([2, 1, 1])
-                
-                with col_elim1:
-                    id_registro = st.number_input(
-                        "Ingresa el ID del registro a eliminar:",
-                        min_value=1,
-                        value=None,
-                        help="Puedes ver el ID en la primera columna de la tabla"
-                    )
-                
-                with col_elim2:
-                    st.markdown("")
-                    st.markdown("")
-                    if st.button("🗑️ Eliminar", use_container_width=True, type="secondary"):
-                        if id_registro:
-                            try:
-                                eliminar_registro(int(id_registro))
-                                st.success(f"✓ Registro ID {id_registro} eliminado correctamente")
-                                st.session_state.contraseña_correcta = False
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Error al eliminar: {e}")
-                        else:
-                            st.warning("⚠️ Por favor ingresa un ID válido")
-                
-                with col_elim3:
-                    st.markdown("")
-                    st.markdown("")
-                    if st.button("Cerrar", use_container_width=True):
-                        st.session_state.contraseña_correcta = False
-                        st.rerun()
-    else:
-        st.info("ℹ️ No hay registros en la fecha seleccionada")
+            with col_elim3:
+                st.markdown("")
+                st.markdown("")
+                if st.button("Cerrar", use_container_width=True):
+                    st.session_state.contraseña_correcta = False
+                    st.rerun()
 
 # ======================== EXPORTAR DATOS ========================
 elif opcion == "📂 Exportar Datos":
@@ -1560,3 +1629,81 @@ elif opcion == "📂 Exportar Datos":
     - Promesa Planilla, Monto Planilla, Fecha de Pago (Planilla)
     - Observaciones
     """)
+
+# ======================== TAREAS PROGRAMADAS ========================
+elif opcion == "⚙️ Tareas Programadas":
+    st.header("⚙️ Tareas Programadas")
+    pd = importar('pandas')
+    
+    programador_activo = programador.obtener_programador()
+    if programador_activo is not None and programador_activo.activo():
+        st.success(f"🟢 Programador activo en este servidor ({programador_activo.proceso}), "
+                   f"desde {texto_fecha(programador_activo.inicio, '%d/%m/%Y %H:%M')}")
+    else:
+        st.warning("⚠️ El programador no corre en este servidor (PAGOS_PROGRAMADOR=0): "
+                   "las tareas las ejecuta el worker `python programador.py`")
+    
+    tareas = obtener_tareas_programadas()
+    descripciones = {tarea.nombre: tarea.descripcion for tarea in programador.TAREAS}
+    
+    if tareas:
+        datos = pd.DataFrame(tareas, columns=[
+            'Tarea', 'Estado', 'Próxima', 'Último Inicio', 'Último Fin', 'Duración (ms)',
+            'Resultado', 'Error', 'Ejecuciones', 'Fallos', 'Proceso'
+        ])
+        df_tareas = pd.DataFrame({
+            'Tarea': datos['Tarea'],
+            'Descripción': datos['Tarea'].map(descripciones),
+            'Estado': iconos(datos['Estado'], ICONOS_TAREA, ICONO_TAREA_PENDIENTE) + ' ' + datos['Estado'],
+            'Último Fin': pd.to_datetime(datos['Último Fin'], errors='coerce', format='ISO8601'),
+            'Duración (ms)': datos['Duración (ms)'],
+            'Próxima': pd.to_datetime(datos['Próxima'], errors='coerce', format='ISO8601'),
+            'Ejecuciones': datos['Ejecuciones'],
+            'Fallos': datos['Fallos'],
+            'Resultado': datos['Error'].fillna(datos['Resultado']),
+            'Proceso': datos['Proceso'],
+        })
+        st.dataframe(df_tareas, use_container_width=True, hide_index=True, column_config={
+            'Último Fin': st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm:ss"),
+            'Próxima': st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm"),
+            'Duración (ms)': st.column_config.NumberColumn(format="%.1f"),
+        })
+    else:
+        st.info("ℹ️ Todavía no se ejecutó ninguna tarea")
+    
+    st.markdown("---")
+    st.subheader("▶️ Ejecutar ahora")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        tarea_elegida = st.selectbox("Tarea:", list(descripciones),
+                                     format_func=lambda nombre: f"{nombre} · {descripciones[nombre]}")
+    with col2:
+        st.markdown("")
+        if st.button("▶️ Programar", use_container_width=True):
+            if programar_tarea_ahora(tarea_elegida):
+                if programador_activo is not None:
+                    programador_activo.despertar()
+                st.success(f"✓ {tarea_elegida} se ejecutará en la próxima vuelta del programador")
+            else:
+                st.warning("⚠️ La tarea todavía no se registró; se ejecutará cuando arranque el programador")
+
+# ======================== PANEL DE ESTADO ========================
+# Contadores mantenidos por triggers (no recorre la tabla), leídos en paralelo con la página
+with panel_estado:
+    conteos = lote.resultado('conteos')
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.metric("📊 Registros", f"{conteos['total_registros']:,}", delta=f"{conteos['registros_hoy']:,} hoy",
+                  delta_color="off")
+    with col2:
+        st.info("Guardado")
+    ultima = texto_fecha(conteos['ultima_escritura'], '%d/%m/%Y %H:%M')
+    st.caption(f"🏢 {conteos['rucs']:,} RUCs · Última escritura: {ultima}")
+
+# ======================== TIEMPOS DE ARRANQUE ========================
+if arranque.ACTIVO:
+    cronometro.marca('fin de la corrida')
+    reporte = cronometro.reporte()
+    with st.sidebar.expander("⏱️ Tiempos de arranque"):
+        st.code("\n".join(reporte), language=None)
+    print("\n".join(reporte), file=sys.stderr)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tiempos de arranque de app.py: importaciones por módulo y pasos de cada corrida
+Con PAGOS_TIEMPOS_INICIO=1 app.py muestra el reporte en la barra lateral y lo escribe en la
+consola. Solo usa la biblioteca estándar, para poder importarlo antes que todo lo demás.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ACTIVO = os.environ.get("PAGOS_TIEMPOS_INICIO", "0") not in ("", "0")
+
+# Presupuesto del primer dibujo del Dashboard (encabezado y métricas) desde que empieza la
+# primera corrida del proceso; ver benchmark_arranque.py
+PRESUPUESTO_PRIMER_DIBUJO_MS = 250
+
+# Inicio de la primera corrida: la primera vez que app.py importa este módulo
+INICIO_PROCESO = time.perf_counter()
+
+# Importaciones medidas en el proceso (módulo -> ms); cada módulo se carga una sola vez
+importaciones = {}
+_primera_corrida = True
+# Cronómetro de la última corrida (lo leen benchmark_arranque.py y test_arranque.py)
+ultimo = None
+_lock = threading.Lock()
+
+@contextmanager
+def importacion(modulo):
+    """Mide el import de modulo si todavía no estaba cargado en el proceso"""
+    cargado = modulo in sys.modules
+    inicio = time.perf_counter()
+    yield
+    if not cargado:
+        with _lock:
+            importaciones.setdefault(modulo, (time.perf_counter() - inicio) * 1000)
+
+def importar(modulo):
+    """Importa y retorna modulo, midiendo la carga (para imports diferidos dentro de una página)"""
+    with importacion(modulo):
+        return importlib.import_module(modulo)
+
+class Cronometro:
+    """Pasos de una corrida del script (cada sesión y cada rerun tiene el suyo)"""
+
+    def __init__(self):
+        global _primera_corrida, ultimo
+        self.inicio = time.perf_counter()
+        with _lock:
+            self.primera_corrida, _primera_corrida = _primera_corrida, False
+            ultimo = self
+        self.pasos = []
+
+    @contextmanager
+    def paso(self, nombre):
+        inicio = time.perf_counter()
+        yield
+        self.pasos.append((nombre, (time.perf_counter() - inicio) * 1000))
+
+    def marca(self, nombre):
+        """Registra el tiempo transcurrido desde el inicio (de la corrida o del proceso)"""
+        desde = INICIO_PROCESO if self.primera_corrida else self.inicio
+        self.pasos.append((nombre, (time.perf_counter() - desde) * 1000))
+
+    def reporte(self):
+        """Líneas de texto con las importaciones del proceso y los pasos de esta corrida"""
+        lineas = ["Importaciones (una vez por proceso):"]
+        lineas += [f"  {modulo:<28s} {ms:8.1f} ms" for modulo, ms in importaciones.items()]
+        lineas.append("Pasos de la corrida" + (" (primera del proceso):" if self.primera_corrida else ":"))
+        lineas += [f"  {nombre:<28s} {ms:8.1f} ms" for nombre, ms in self.pasos]
+        lineas.append(f"  {'total':<28s} {(time.perf_counter() - self.inicio) * 1000:8.1f} ms")
+        return lineas
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Asesor de índices: ejecuta EXPLAIN QUERY PLAN sobre cada consulta de database.py
+y marca las que todavía recorren una tabla completa.
+Trabaja sobre una copia de la BD (o una BD sintética), nunca sobre pagos.db directamente.
+Uso: python asesor_indices.py [ruta_bd]
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+# Consultas que por diseño leen toda la tabla (listados completos y exportación)
+RECORRIDOS_ESPERADOS = {
+    'obtener_rucs',
+    'obtener_rucs_con_campanas',
+    'obtener_todos_registros',
+    'obtener_resumen_por_ruc',
+    'exportar_a_csv',
+}
+
+def llamadas_database():
+    """Lista (nombre, llamada) que cubre todas las consultas de database.py"""
+    hoy = date.today().isoformat()
+    en_30 = (date.today() + timedelta(days=30)).isoformat()
+    pago = dict(fecha_reporte=hoy, ruc='20000000001', id_documento='70000001',
+                campaña='FLUJO', asesor='Laura ...', promesa_ga='A VEN...',
+                monto_gasto=100.0, fecha_pago_gasto=hoy)
+
+    return [
+        ('obtener_rucs', database.obtener_rucs),
+        ('obtener_ruc_por_numero', lambda: database.obtener_ruc_por_numero('20000000001')),
+        ('obtener_rucs_con_campanas', database.obtener_rucs_con_campanas),
+        ('obtener_campanas', database.obtener_campanas),
+        ('obtener_ruc_por_id', lambda: database.obtener_ruc_por_id(1)),
+        ('obtener_campanas_unicas', database.obtener_campanas_unicas),
+        ('obtener_asesores_unicos', database.obtener_asesores_unicos),
+        ('detectar_duplicado_exacto', lambda: database.detectar_duplicado_exacto(**pago)),
+        ('registrar_pago', lambda: database.registrar_pago(**pago)),
+        ('registrar_pago_sin_duplicar', lambda: database.registrar_pago_sin_duplicar(**pago)),
+        ('obtener_registros_por_fecha', lambda: database.obtener_registros_por_fecha(hoy)),
+        ('obtener_todos_registros', database.obtener_todos_registros),
+        ('actualizar_registro', lambda: database.actualizar_registro(1, observaciones='x')),
+        ('obtener_ranking_asesores', lambda: database.obtener_ranking_asesores(hoy, en_30)),
+        ('obtener_estadisticas_hoy', database.obtener_estadisticas_hoy),
+        ('obtener_resumen_por_ruc', database.obtener_resumen_por_ruc),
+        ('obtener_promesas_por_fecha', lambda: database.obtener_promesas_por_fecha(hoy)),
+        ('obtener_estadisticas_promesas_hoy', database.obtener_estadisticas_promesas_hoy),
+        ('obtener_resumen_por_asesor_promesa', lambda: (
+            database.obtener_resumen_por_asesor_promesa('gasto', hoy),
+            database.obtener_resumen_por_asesor_promesa('planilla', hoy))),
+        ('obtener_resumen_total_por_promesa', lambda: (
+            database.obtener_resumen_total_por_promesa('gasto', hoy),
+            database.obtener_resumen_total_por_promesa('planilla', hoy))),
+        ('obtener_resumen_asesores_diario', lambda: database.obtener_resumen_asesores_diario(hoy)),
+        ('obtener_promesas_pendientes', database.obtener_promesas_pendientes),
+        ('obtener_estadisticas_montos', database.obtener_estadisticas_montos),
+        ('detectar_monto_anormal', lambda: database.detectar_monto_anormal(100.0, 'ga', '20000000001')),
+        ('detectar_promesas_caidas', database.detectar_promesas_caidas),
+        ('obtener_promesas_caidas', database.obtener_promesas_caidas),
+        ('marcar_promesa_cobrada', lambda: database.marcar_promesa_cobrada(1, 'PLANILLA')),
+        ('obtener_estadisticas_promesas_caidas', database.obtener_estadisticas_promesas_caidas),
+        ('eliminar_registro', lambda: database.eliminar_registro(1)),
+    ]
+
+def _plantilla(sql):
+    """Normaliza una sentencia: reemplaza literales por ? para agrupar repeticiones"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return ' '.join(sql.split())
+
+def analizar_consultas(db_path):
+    """
+    Ejecuta todas las llamadas sobre db_path capturando el SQL emitido
+    y devuelve una lista de dicts: funcion, sql, plan, recorre_tabla
+    """
+    ruta_anterior = database.DB_PATH
+    database.DB_PATH = db_path
+    database.configurar_pool(tamano=1)
+
+    capturadas = []
+    actual = {'funcion': None}
+
+    def traza(sql):
+        if sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+            capturadas.append((actual['funcion'], sql))
+
+    try:
+        database.init_db()
+        with database.conectar() as conn:
+            conn.set_trace_callback(traza)
+
+        for nombre, llamada in llamadas_database():
+            actual['funcion'] = nombre
+            llamada()
+
+        with database.conectar() as conn:
+            conn.set_trace_callback(None)
+
+        vistas = set()
+        resultado = []
+        with database.conectar() as conn:
+            for funcion, sql in capturadas:
+                clave = (funcion, _plantilla(sql))
+                if clave in vistas:
+                    continue
+                vistas.add(clave)
+
+                plan = [fila[3] for fila in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+                recorre = any(
+                    paso.startswith('SCAN ') and 'COVERING INDEX' not in paso
+                    and not paso.startswith('SCAN CONSTANT ROW')
+                    for paso in plan
+                )
+                resultado.append({
+                    'funcion': funcion,
+                    'sql': clave[1],
+                    'plan': plan,
+                    'recorre_tabla': recorre,
+                })
+    finally:
+        database.cerrar_pools()
+        database.DB_PATH = ruta_anterior
+
+    return resultado
+
+def copiar_bd(origen, destino):
+    """Copia una BD SQLite en caliente usando la API de backup"""
+    with sqlite3.connect(origen) as src, sqlite3.connect(destino) as dst:
+        src.backup(dst)
+
+if __name__ == "__main__":
+    origen = sys.argv[1] if len(sys.argv) > 1 else database.DB_PATH
+
+    print("=" * 70)
+    print("ASESOR DE ÍNDICES - EXPLAIN QUERY PLAN")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = os.path.join(tmp, "asesor.db")
+        if os.path.exists(origen):
+            print(f"Analizando copia de: {origen}\n")
+            copiar_bd(origen, copia)
+        else:
+            print("BD no encontrada, usando datos sintéticos (20.000 registros)\n")
+            generar_bd_sintetica(copia, n_registros=20000)
+            with sqlite3.connect(copia) as conn:
+                conn.execute('ANALYZE')
+
+        resultados = analizar_consultas(copia)
+
+    alertas = 0
+    for r in resultados:
+        if r['recorre_tabla'] and r['funcion'] not in RECORRIDOS_ESPERADOS:
+            marca = "❌ RECORRE TABLA"
+            alertas += 1
+        elif r['recorre_tabla']:
+            marca = "ℹ️  Recorrido esperado"
+        else:
+            marca = "✅ Usa índice"
+
+        print(f"{marca} - {r['funcion']}")
+        print(f"    {r['sql'][:110]}")
+        for paso in r['plan']:
+            print(f"      {paso}")
+
+    print("\n" + "=" * 70)
+    print(f"Sentencias analizadas: {len(resultados)}")
+    print(f"Recorridos completos no esperados: {alertas}")
+    print("=" * 70)
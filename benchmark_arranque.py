@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: arranque en frío de app.py hasta el primer dibujo del Dashboard
+Cada medición es un proceso nuevo que ejecuta app.py con AppTest (PAGOS_TIEMPOS_INICIO=1)
+en una carpeta temporal con una BD sintética y una copia del Excel de RUCs. El primer
+dibujo se cuenta desde que app.py empieza a ejecutarse (streamlit ya está importado por
+AppTest; su import se mide aparte). También mide lo que antes se hacía en cada arranque
+y ahora se difiere: importar pandas/NumPy, leer el Excel con openpyxl y verificar el esquema.
+Uso: python benchmark_arranque.py [n_registros] [procesos]   (por defecto 100000 y 5)
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import arranque
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+EXCEL = "DATA ENERO 2026.xlsx"
+
+# Se ejecuta en cada proceso hijo, con la carpeta temporal como directorio de trabajo
+HIJO_APP = '''
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import_streamlit = (time.perf_counter() - inicio) * 1000
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.run()
+import arranque
+primera = dict(arranque.ultimo.pasos)
+at.run()
+json.dump({"streamlit": import_streamlit, "importaciones": arranque.importaciones,
+           "primera": primera, "rerun": dict(arranque.ultimo.pasos),
+           "excepciones": [str(e.value) for e in at.exception],
+           "openpyxl": "openpyxl" in sys.modules, "pandas": "pandas" in sys.modules}, sys.stdout)
+'''
+
+HIJO_DIFERIDO = '''
+import json, time
+tiempos = {}
+inicio = time.perf_counter()
+import pandas, numpy
+tiempos["import pandas + numpy"] = (time.perf_counter() - inicio) * 1000
+import database
+inicio = time.perf_counter()
+database.init_db(forzar=True)
+tiempos["init_db (verificación completa)"] = (time.perf_counter() - inicio) * 1000
+inicio = time.perf_counter()
+database.actualizar_rucs_desde_excel(forzar=True)
+tiempos["actualizar_rucs_desde_excel (cambió)"] = (time.perf_counter() - inicio) * 1000
+inicio = time.perf_counter()
+database.actualizar_rucs_desde_excel()
+tiempos["actualizar_rucs_desde_excel (igual)"] = (time.perf_counter() - inicio) * 1000
+json.dump(tiempos, __import__("sys").stdout)
+'''
+
+def ejecutar(codigo, carpeta, *argumentos):
+    entorno = dict(os.environ, PAGOS_TIEMPOS_INICIO="1",
+                   PYTHONPATH=REPO + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    salida = subprocess.run([sys.executable, "-c", codigo, *argumentos], cwd=carpeta, env=entorno,
+                            capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout)
+
+def mediana(resultados, clave):
+    valores = [r[clave] for r in resultados if clave in r]
+    return statistics.median(valores) if valores else float('nan')
+
+if __name__ == "__main__":
+    n_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(os.path.join(REPO, EXCEL), tmp)
+        subprocess.run([sys.executable, "-c",
+                        f"from datos_sinteticos import generar_bd_sintetica; "
+                        f"generar_bd_sintetica('pagos.db', n_registros={n_registros}, n_rucs=2000, dias=30)"],
+                       cwd=tmp, env=dict(os.environ, PYTHONPATH=REPO), check=True)
+        # Primer arranque: crea los RUCs desde el Excel si la tabla está vacía, no se mide
+        ejecutar(HIJO_APP, tmp, os.path.join(REPO, "app.py"))
+
+        corridas = [ejecutar(HIJO_APP, tmp, os.path.join(REPO, "app.py")) for _ in range(procesos)]
+        diferidos = [ejecutar(HIJO_DIFERIDO, tmp) for _ in range(procesos)]
+
+    print("=" * 76)
+    print(f"ARRANQUE DE app.py - Dashboard ({n_registros:,} registros, mediana de {procesos} procesos)")
+    print("=" * 76)
+    print(f"{'import streamlit (AppTest)':<40s} {statistics.median(c['streamlit'] for c in corridas):>10.1f} ms")
+    for modulo in corridas[0]['importaciones']:
+        print(f"{'import ' + modulo:<40s} {mediana([c['importaciones'] for c in corridas], modulo):>10.1f} ms")
+    print()
+    print("Primera corrida del proceso:")
+    for paso in corridas[0]['primera']:
+        print(f"  {paso:<38s} {mediana([c['primera'] for c in corridas], paso):>10.1f} ms")
+    print("Siguiente corrida (rerun):")
+    for paso in corridas[0]['rerun']:
+        print(f"  {paso:<38s} {mediana([c['rerun'] for c in corridas], paso):>10.1f} ms")
+    print()
+    print("Trabajo que ya no se hace antes del primer dibujo:")
+    for paso in diferidos[0]:
+        print(f"  {paso:<38s} {mediana(diferidos, paso):>10.1f} ms")
+    print()
+
+    primer_dibujo = mediana([c['primera'] for c in corridas], 'primer dibujo Dashboard')
+    # Antes: pandas/NumPy y la verificación del esquema en cada arranque, y el Excel sin
+    # cambios (o leído completo con openpyxl cuando cambió)
+    antes = (primer_dibujo + mediana(diferidos, "import pandas + numpy")
+             + mediana(diferidos, "init_db (verificación completa)"))
+    presupuesto = arranque.PRESUPUESTO_PRIMER_DIBUJO_MS
+    print(f"Primer dibujo del Dashboard: {primer_dibujo:,.1f} ms - presupuesto {presupuesto} ms: "
+          f"{'OK' if primer_dibujo <= presupuesto else 'EXCEDIDO'}")
+    print(f"Antes: ~{antes + mediana(diferidos, 'actualizar_rucs_desde_excel (igual)'):,.1f} ms con el Excel sin cambios, "
+          f"~{antes + mediana(diferidos, 'actualizar_rucs_desde_excel (cambió)'):,.1f} ms si cambió")
+    print(f"openpyxl cargado en el Dashboard: {any(c['openpyxl'] for c in corridas)}   "
+          f"excepciones: {sum(len(c['excepciones']) for c in corridas)}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caché de workbooks leídos (cache_excel.py)
+Compara leer el workbook con pandas.read_excel y con leer_xml (primera carga: lee y guarda el .npz)
+contra cargar desde la caché, contando el hash del archivo (proceso nuevo) y sin él (hash recordado).
+Uso: python benchmark_cache_excel.py [n_filas_sintético]   (por defecto 500000; 0 = solo DATA ENERO)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import cache_excel
+from datos_sinteticos import generar_excel_rucs
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+EXCEL = os.path.join(REPO, "DATA ENERO 2026.xlsx")
+
+def cronometrar(funcion, repeticiones=1):
+    """Mejor tiempo en ms"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempo = (time.perf_counter() - inicio) * 1000
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor, resultado
+
+def sin_hash_recordado(archivo):
+    """Como en un proceso nuevo: vuelve a calcular el SHA-256 del workbook"""
+    cache_excel._hashes.clear()
+    return cache_excel.cargar_excel(archivo)
+
+def medir(nombre, archivo, repeticiones):
+    cache_excel.invalidar()
+    cache_excel._hashes.clear()
+
+    lectura_pandas, _ = cronometrar(lambda: pd.read_excel(archivo))
+    primera, tabla = cronometrar(lambda: cache_excel.cargar_excel(archivo))
+    assert not tabla.desde_cache
+    con_hash, tabla = cronometrar(lambda: sin_hash_recordado(archivo), repeticiones)
+    assert tabla.desde_cache
+    recordado, _ = cronometrar(lambda: cache_excel.cargar_excel(archivo), repeticiones)
+    tamano = sum(e[1] for e in cache_excel._entradas())
+
+    print(f"\n{nombre}: {tabla.filas:,} filas, xlsx {os.path.getsize(archivo) / 2**20:.1f} MB, "
+          f"entrada {tamano / 2**20:.1f} MB")
+    print(f"  {'pandas.read_excel':<36s} {lectura_pandas:>10.1f} ms")
+    print(f"  {'primera carga (leer_xml + guardar)':<36s} {primera:>10.1f} ms")
+    print(f"  {'caché (con hash del archivo)':<36s} {con_hash:>10.1f} ms  ({primera / con_hash:,.0f}x)")
+    print(f"  {'caché (hash recordado)':<36s} {recordado:>10.1f} ms  ({primera / recordado:,.0f}x)")
+
+if __name__ == "__main__":
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_excel.CARPETA = os.path.join(tmp, "cache")
+        print("=" * 64)
+        print("CACHÉ DE WORKBOOKS LEÍDOS")
+        print("=" * 64)
+        medir(os.path.basename(EXCEL), EXCEL, 10)
+
+        if n_filas:
+            sintetico = os.path.join(tmp, f"rucs_{n_filas}.xlsx")
+            generar_excel_rucs(sintetico, n_filas)
+            medir(f"sintético de {n_filas:,} filas", sintetico, 3)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: catálogo de RUCs en memoria (catalogo_rucs.py) vs consultas a la tabla rucs
+Mide la carga y la memoria del índice, y la búsqueda exacta, por prefijo de RUC y por
+palabras de la razón social (frecuentes, raras y sin resultados). Del lado SQL la razón
+social se busca con LIKE '%...%' (la tabla no tiene índice para eso)
+Uso: python benchmark_catalogo_rucs.py [n_rucs]   (por defecto 500000)
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+import catalogo_rucs
+from datos_sinteticos import ASESORES, CAMPANAS
+
+PALABRAS = ['COMERCIAL', 'INVERSIONES', 'SERVICIOS', 'CONSTRUCTORA', 'TRANSPORTES', 'DISTRIBUIDORA',
+            'ANDINA', 'DEL SUR', 'PERÚ', 'NORTE', 'MUÑOZ', 'GARCÍA', 'QUISPE', 'LIMA', 'INDUSTRIAL',
+            'AGRÍCOLA', 'MINERA', 'TEXTIL', 'LOGÍSTICA', 'FARMACÉUTICA']
+FORMAS = ['S.A.C.', 'E.I.R.L.', 'S.A.', 'S.R.L.']
+
+def crear_catalogo(db_path, n_rucs, semilla=7):
+    """BD con n_rucs RUCs de razones sociales variadas"""
+    database.DB_PATH = db_path
+    database.configurar_pool()
+    database.init_db()
+    rnd = random.Random(semilla)
+    filas = []
+    for i in range(n_rucs):
+        ruc = str(rnd.choice([10, 20]) * 10**9 + i * 7)
+        nombre = ' '.join(rnd.sample(PALABRAS, 3)) + f" {i % 997} " + rnd.choice(FORMAS)
+        filas.append((ruc, str(70000000 + i), nombre, CAMPANAS[i % len(CAMPANAS)],
+                      ASESORES[i % len(ASESORES)], round(rnd.uniform(0, 50000), 2), datetime.now().isoformat()))
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, deuda_total, fecha_creacion)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', filas)
+    return [f[0] for f in filas], [f[2] for f in filas]
+
+def sql_prefijo(prefijo, limite=catalogo_rucs.LIMITE_SUGERENCIAS):
+    with database.conectar() as conn:
+        return conn.execute('SELECT * FROM rucs WHERE ruc >= ? AND ruc < ? ORDER BY ruc LIMIT ?',
+                            (prefijo, prefijo + '￿', limite)).fetchall()
+
+def sql_razon_social(fragmento, limite=catalogo_rucs.LIMITE_SUGERENCIAS):
+    with database.conectar() as conn:
+        return conn.execute('SELECT * FROM rucs WHERE razon_social LIKE ? ORDER BY ruc LIMIT ?',
+                            (f'%{fragmento}%', limite)).fetchall()
+
+def medir(funcion, argumentos):
+    """Mediana (µs) de una llamada sobre cada argumento"""
+    tiempos = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcion(argumento)
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tiempos)
+
+if __name__ == "__main__":
+    n_rucs = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    rnd = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rucs, nombres = crear_catalogo(os.path.join(tmp, "benchmark.db"), n_rucs)
+
+        inicio = time.perf_counter()
+        catalogo = catalogo_rucs.obtener_catalogo()
+        carga = (time.perf_counter() - inicio) * 1000
+
+        # Memoria: lo que queda asignado después de armar otra copia del índice
+        tracemalloc.start()
+        copia = catalogo_rucs.cargar_catalogo()
+        memoria, pico = (m / 2**20 for m in tracemalloc.get_traced_memory())
+        tracemalloc.stop()
+        del copia
+
+        print("=" * 76)
+        print(f"CATÁLOGO DE RUCs EN MEMORIA ({len(catalogo):,} RUCs)")
+        print("=" * 76)
+        print(f"Carga: {carga:,.0f} ms   Memoria del índice: {memoria:,.1f} MB (pico al cargar {pico:,.1f} MB)")
+        print()
+
+        exactos = rnd.sample(rucs, 200)
+        prefijos = [ruc[:rnd.randint(3, 8)] for ruc in rnd.sample(rucs, 200)]
+        raros = [nombre.split()[1] + ' ' + nombre.split()[3] for nombre in rnd.sample(nombres, 50)]
+        casos = (
+            ('RUC exacto', exactos, catalogo.buscar_ruc, database.obtener_ruc_por_numero),
+            ('Prefijo de RUC', prefijos, catalogo.buscar_prefijo, sql_prefijo),
+            ('Razón social frecuente', ['comercial', 'munoz', 'norte inv'] * 20,
+             catalogo.buscar_razon_social, sql_razon_social),
+            ('Razón social rara', raros, catalogo.buscar_razon_social, sql_razon_social),
+            ('Razón social sin resultados', ['zzz', 'xq'] * 10, catalogo.buscar_razon_social, sql_razon_social),
+        )
+        print(f"{'Búsqueda':<30s} {'Catálogo':>12s} {'SQL':>14s} {'Mejora':>10s}")
+        for nombre, argumentos, en_memoria, en_sql in casos:
+            rapido = medir(en_memoria, argumentos)
+            lento = medir(en_sql, argumentos[:20])
+            print(f"{nombre:<30s} {rapido:>9.1f} µs {lento:>11.1f} µs {lento / rapido:>9.0f}x")
+        print(f"{'obtener_catalogo (vigente)':<30s} {medir(lambda _: catalogo_rucs.obtener_catalogo(), range(200)):>9.1f} µs")
+        database.cerrar_pools()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: lecturas de cada página en secuencia vs en paralelo (LoteConsultas)
+1. Solo las lecturas de la página (panel de estado incluido), sin caché de consultas
+2. La corrida completa de la página con AppTest, en un proceso con PAGOS_HILOS_CONSULTAS=1
+   (secuencia) y otro con el valor por defecto (paralelo)
+Uso: python benchmark_consultas_paralelas.py [n_registros] [repeticiones]   (por defecto 1000000 y 7)
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+def lecturas_por_pagina():
+    """Lecturas que hace cada página (con los filtros por defecto) además del panel de estado"""
+    hoy = date.today()
+    conteos = (database.obtener_conteos,)
+    return {
+        "📊 Dashboard": dict(conteos=conteos, snapshot=(database.obtener_snapshot_dashboard, hoy)),
+        "🏆 Ranking de Asesores": dict(conteos=conteos, ranking=(database.obtener_ranking_asesores,
+                                                                 hoy.isoformat(), hoy.isoformat())),
+        "⏳ Promesas Pendientes": dict(conteos=conteos, pendientes=(database.obtener_promesas_pendientes,
+                                                                   hoy.isoformat(),
+                                                                   (hoy + timedelta(days=30)).isoformat())),
+        "🎯 Promesas de Hoy": dict(conteos=conteos, estadisticas=(database.obtener_estadisticas_promesas_hoy,),
+                                  promesas=(database.obtener_promesas_hoy,)),
+        "📋 Ver Registros": dict(conteos=conteos, pagina=(database.buscar_registros, 'reciente', None, 50),
+                                total=(database.contar_registros,)),
+    }
+
+def medir(lecturas, paralelo, repeticiones):
+    """Mediana (ms) de un lote con las lecturas"""
+    database.consultar_en_paralelo(paralelo, **lecturas)  # Calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        database.consultar_en_paralelo(paralelo, **lecturas)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+# Corre cada página con AppTest en el proceso hijo y mide at.run()
+HIJO = '''
+import json, statistics, sys, time
+from streamlit.testing.v1 import AppTest
+app, repeticiones, paginas = sys.argv[1], int(sys.argv[2]), json.loads(sys.argv[3])
+tiempos = {}
+for pagina in paginas:
+    at = AppTest.from_file(app, default_timeout=600)
+    at.session_state['pagina_actual'] = pagina
+    at.session_state['modo_admin'] = True
+    at.run()
+    assert not at.exception, (pagina, [e.value for e in at.exception])
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        at.run()
+        muestras.append((time.perf_counter() - inicio) * 1000)
+    tiempos[pagina] = statistics.median(muestras)
+json.dump(tiempos, sys.stdout)
+'''
+
+def medir_paginas(db_dir, hilos, repeticiones, paginas):
+    entorno = dict(os.environ, PYTHONPATH=REPO, PAGOS_CACHE_CONSULTAS="0", PAGOS_PROGRAMADOR="0")
+    if hilos is not None:
+        entorno["PAGOS_HILOS_CONSULTAS"] = str(hilos)
+    salida = subprocess.run([sys.executable, "-c", HIJO, os.path.join(REPO, "app.py"), str(repeticiones),
+                             json.dumps(paginas)], cwd=db_dir, env=entorno, capture_output=True, text=True,
+                            check=True)
+    return json.loads(salida.stdout)
+
+if __name__ == "__main__":
+    n_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "pagos.db")
+        database.configurar_pool()
+        generar_bd_sintetica(database.DB_PATH, n_registros=n_registros, n_rucs=max(n_registros // 50, 100))
+        database.init_db()
+
+        print("=" * 84)
+        print(f"LECTURAS POR PÁGINA EN SECUENCIA VS EN PARALELO ({n_registros:,} registros, "
+              f"{database.HILOS_CONSULTAS} hilos)")
+        print("=" * 84)
+        print(f"{'Página':<26s} {'Lecturas':>8s} {'Secuencia':>12s} {'Paralelo':>12s} {'Mejora':>8s}")
+        for pagina, lecturas in lecturas_por_pagina().items():
+            secuencia = medir(lecturas, False, repeticiones)
+            paralelo = medir(lecturas, True, repeticiones)
+            print(f"{pagina:<26s} {len(lecturas):>8d} {secuencia:>9.1f} ms {paralelo:>9.1f} ms "
+                  f"{secuencia / paralelo:>7.2f}x")
+        database.cerrar_pools()
+
+        # Procesos alternados (secuencia, paralelo, secuencia, paralelo): el mejor de cada modo
+        paginas = list(lecturas_por_pagina())
+        corridas = {1: [], None: []}
+        for _ in range(2):
+            for hilos in corridas:
+                corridas[hilos].append(medir_paginas(tmp, hilos, repeticiones, paginas))
+        secuencia, paralelo = ({p: min(c[p] for c in corridas[h]) for p in paginas} for h in (1, None))
+        print()
+        print("Corrida completa de la página (AppTest, mediana de reruns sin caché):")
+        print(f"{'Página':<26s} {'Secuencia':>21s} {'Paralelo':>12s} {'Mejora':>8s}")
+        for pagina in paginas:
+            print(f"{pagina:<26s} {secuencia[pagina]:>18.1f} ms {paralelo[pagina]:>9.1f} ms "
+                  f"{secuencia[pagina] / paralelo[pagina]:>7.2f}x")
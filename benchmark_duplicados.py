@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latencia de "Registrar Pago" (verificación de duplicado + INSERT)
+con la comparación campo por campo anterior vs la huella de contenido indexada
+Uso: python benchmark_duplicados.py [n_registros]   (por defecto 1000000)
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def detectar_duplicado_anterior(conn, p, indexado=True):
+    """
+    Consulta anterior de detectar_duplicado_exacto (campo por campo), usada como referencia.
+    indexado=False fuerza el recorrido completo que hacía antes de idx_registros_ruc
+    """
+    tabla = 'registros_pagos' if indexado else 'registros_pagos NOT INDEXED'
+    fila = conn.execute(f'''
+    SELECT id FROM {tabla}
+    WHERE fecha_reporte = ? AND ruc = ? AND id_documento = ? AND campaña = ?
+        AND COALESCE(asesor, '') = COALESCE(?, '')
+        AND COALESCE(promesa_ga, '') = COALESCE(?, '')
+        AND COALESCE(monto_gasto, 0) = COALESCE(?, 0)
+        AND COALESCE(fecha_pago_gasto, '') = COALESCE(?, '')
+        AND COALESCE(promesa_planilla, '') = COALESCE(?, '')
+        AND COALESCE(monto_planilla, 0) = COALESCE(?, 0)
+        AND COALESCE(fecha_pago_planilla, '') = COALESCE(?, '')
+        AND COALESCE(observaciones, '') = COALESCE(?, '')
+    LIMIT 1
+    ''', (p['fecha_reporte'], p['ruc'], p['id_documento'], p['campaña'], p.get('asesor'),
+          p.get('promesa_ga'), p.get('monto_gasto'), p.get('fecha_pago_gasto'),
+          p.get('promesa_planilla'), p.get('monto_planilla'), p.get('fecha_pago_planilla'),
+          p.get('observaciones', ''))).fetchone()
+    return fila[0] if fila else None
+
+def _pago(i):
+    return dict(fecha_reporte=date.today().isoformat(), ruc=str(20000000000 + i % 1000),
+                id_documento=str(70000000 + i % 1000), campaña='FLUJO', asesor='Laura ...',
+                promesa_ga='A VEN...', monto_gasto=100.0 + i, fecha_pago_gasto=date.today().isoformat(),
+                observaciones='benchmark')
+
+def envio_anterior(i, indexado=True):
+    """Flujo anterior del formulario: buscar duplicado campo por campo y luego registrar"""
+    pago = _pago(i)
+    with database.conectar() as conn:
+        duplicado = detectar_duplicado_anterior(conn, pago, indexado)
+    if duplicado is None:
+        database.registrar_pago(**pago)
+
+def envio_huella(i):
+    database.registrar_pago_sin_duplicar(**_pago(i))
+
+def medir_envios(envio, desde, n=30):
+    """Mediana en ms de n envíos consecutivos (pagos desde, desde+1, ...)"""
+    tiempos = []
+    for i in range(desde, desde + n):
+        inicio = time.perf_counter()
+        envio(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+if __name__ == "__main__":
+    n_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "benchmark.db")
+        database.configurar_pool()
+        print(f"Generando {n_registros:,} registros...")
+        generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                             n_rucs=max(2000, n_registros // 20), dias=365)
+
+        # Migración: init_db() recrea idx_registros_huella calculando la huella de cada registro
+        with sqlite3.connect(database.DB_PATH) as conn:
+            conn.execute('DROP INDEX idx_registros_huella')
+        database.configurar_pool()
+        inicio = time.perf_counter()
+        database.init_db()
+        migracion = time.perf_counter() - inicio
+
+        sin_indice = medir_envios(lambda i: envio_anterior(i, indexado=False), 0, n=5)
+        anterior = medir_envios(envio_anterior, 100)
+        huella = medir_envios(envio_huella, 1000)
+        repetido = medir_envios(envio_huella, 1000)  # mismos pagos: todos duplicados
+
+        print("=" * 70)
+        print(f"REGISTRAR PAGO - {n_registros:,} registros (mediana por envío)")
+        print("=" * 70)
+        print(f"Migración (índice de huellas):          {migracion:8.2f} s")
+        print(f"Campo por campo, recorrido completo:    {sin_indice:8.2f} ms")
+        print(f"Campo por campo, vía idx_registros_ruc: {anterior:8.2f} ms")
+        print(f"Huella indexada, pago nuevo:            {huella:8.2f} ms")
+        print(f"Huella indexada, duplicado rechazado:   {repetido:8.2f} ms")
+
+        database.cerrar_pools()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tabla de 100k filas formateada celda por celda (anterior) vs con formato.py
+Mide lo que hace la página (armar el DataFrame y formatear) más lo que hace st.dataframe al
+enviarla (Arrow y, si hay Styler, los estilos), para la tabla de Promesas de Hoy con colores
+por tipo, la de Ver Registros y la de Ranking
+Promesas de Hoy se mide también con 30000 filas: con más celdas que styler.render.max_elements
+st.dataframe rechaza el Styler (la forma anterior falla) y formato.py la envía sin colores
+Uso: python benchmark_formato.py [n_filas]   (por defecto 100000)
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+from pandas.io.formats.style import Styler
+from streamlit import dataframe_util
+from streamlit.errors import StreamlitAPIException
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.proto.ArrowData_pb2 import ArrowData
+
+from formato import (
+    montos, fechas, medallas, nombres_cortos, estilo_por_categoria, COLORES_TIPO_PAGO
+)
+
+ASESORES = ['Laura Pérez', 'Carlos Ruiz', 'Ana Torres', 'SIN ASESOR', None]
+
+def datos(n_filas, semilla=1):
+    """Columnas (listas) de Promesas de Hoy"""
+    rnd = random.Random(semilla)
+    hoy = date.today()
+    return {
+        'ID': range(1, n_filas + 1),
+        'Fecha Reporte': [(hoy - timedelta(days=rnd.randint(0, 60))).isoformat() for _ in range(n_filas)],
+        'RUC': [f"20{rnd.randint(0, 10**9 - 1):09d}" for _ in range(n_filas)],
+        'Asesor': [rnd.choice(ASESORES) for _ in range(n_filas)],
+        'Tipo Pago': [rnd.choice(['GASTO', 'PLANILLA']) for _ in range(n_filas)],
+        'Monto': [rnd.choice([None, 0.0, round(rnd.uniform(50, 20000), 2)]) for _ in range(n_filas)],
+        'Fecha Pago': [(hoy + timedelta(days=rnd.randint(-5, 5))).isoformat() for _ in range(n_filas)],
+    }
+
+def enviar(tabla):
+    """Lo que hace st.dataframe con la tabla: estilos (si es Styler) y serialización a Arrow"""
+    if isinstance(tabla, Styler):
+        marshall_styler(ArrowData(), tabla, "benchmark")
+        tabla = tabla.data
+    dataframe_util.convert_anything_to_arrow_bytes(tabla)
+
+# Forma anterior: .apply por celda, recorridos por fila y Styler.apply por fila
+
+def promesas_anterior(df):
+    df = df.copy()
+    df['Monto'] = df['Monto'].apply(lambda x: f"S/. {x:,.2f}" if pd.notna(x) and x > 0 else "-")
+
+    def colorear_fila(row):
+        if row['Tipo Pago'] == 'GASTO':
+            return ['background-color: #ffe6e6'] * len(row)
+        else:
+            return ['background-color: #e6f3ff'] * len(row)
+    return df.style.apply(colorear_fila, axis=1)
+
+def registros_anterior(df):
+    df = df.copy()
+    df['Monto'] = df['Monto'].apply(lambda x: f"S/. {x:,.2f}" if pd.notna(x) and x > 0 else "-")
+    return df
+
+def ranking_anterior(filas):
+    tabla = []
+    total = sum(f[2] or 0 for f in filas)
+    for idx, (asesor, _, monto) in enumerate(filas, 1):
+        monto = monto or 0
+        medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(idx, f"#{idx}")
+        tabla.append({
+            'Posición': medal,
+            'Asesor': asesor.split()[0] if asesor and asesor != 'SIN ASESOR' else (asesor or 'N/A'),
+            'Total Cobrado': f"S/. {monto:,.2f}",
+            '% del Total': f"{monto / total * 100:.1f}%",
+        })
+    return pd.DataFrame(tabla)
+
+# Forma actual: columnas completas con formato.py; el texto lo pone column_config en el navegador
+
+def promesas_vectorizado(df):
+    df = df.copy()
+    df['Monto'] = montos(df['Monto'])
+    for col in ['Fecha Reporte', 'Fecha Pago']:
+        df[col] = fechas(df[col])
+    return estilo_por_categoria(df, 'Tipo Pago', COLORES_TIPO_PAGO)
+
+def registros_vectorizado(df):
+    df = df.copy()
+    df['Monto'] = montos(df['Monto'])
+    for col in ['Fecha Reporte', 'Fecha Pago']:
+        df[col] = fechas(df[col])
+    return df
+
+def ranking_vectorizado(filas):
+    datos_ranking = pd.DataFrame(filas, columns=['Asesor', 'Tipo Pago', 'Total Cobrado'])
+    total = datos_ranking['Total Cobrado'].sum()
+    return pd.DataFrame({
+        'Posición': medallas(len(datos_ranking)),
+        'Asesor': nombres_cortos(datos_ranking['Asesor']),
+        'Total Cobrado': datos_ranking['Total Cobrado'].fillna(0),
+        '% del Total': datos_ranking['Total Cobrado'].fillna(0) / total * 100,
+    })
+
+def medir(funcion, entrada, repeticiones=3):
+    """Mejor tiempo (ms) de formatear y enviar la tabla; None si st.dataframe la rechaza"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        try:
+            enviar(funcion(entrada))
+        except StreamlitAPIException:
+            return None
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos)
+
+def texto(ms):
+    return f"{ms:>9.1f} ms" if ms is not None else f"{'error':>12s}"
+
+if __name__ == "__main__":
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    columnas = datos(n_filas)
+    df = pd.DataFrame(columnas)
+    df_chica = df.head(30000)
+    filas = list(zip(columnas['Asesor'], columnas['Tipo Pago'], columnas['Monto']))
+
+    print("=" * 72)
+    print(f"TABLA DE {n_filas:,} FILAS: FORMATO POR CELDA vs formato.py (incluye envío)")
+    print("=" * 72)
+    print(f"{'Tabla':<32s} {'Anterior':>12s} {'Vectorizado':>14s} {'Mejora':>10s}")
+    for nombre, anterior, vectorizado, entrada in (
+            (f'Promesas de Hoy ({len(df_chica):,})', promesas_anterior, promesas_vectorizado, df_chica),
+            (f'Promesas de Hoy ({n_filas:,})', promesas_anterior, promesas_vectorizado, df),
+            ('Ver Registros', registros_anterior, registros_vectorizado, df),
+            ('Ranking', ranking_anterior, ranking_vectorizado, filas)):
+        antes = medir(anterior, entrada)
+        despues = medir(vectorizado, entrada)
+        mejora = f"{antes / despues:>9.1f}x" if antes is not None else f"{'-':>10s}"
+        print(f"{nombre:<32s} {texto(antes)} {texto(despues):>14s} {mejora}")
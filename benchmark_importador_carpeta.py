@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importación de varios workbooks mensuales (importador_excel.importar_rucs_carpeta)
+Importa los mismos workbooks sintéticos uno tras otro con importar_rucs_excel y con
+importar_rucs_carpeta usando 1, 2, 4... procesos (hasta max_procesos), cada vez en una BD nueva.
+Uso: python benchmark_importador_carpeta.py [n_archivos] [filas_por_archivo] [max_procesos]
+     (por defecto 6, 50000 y os.cpu_count())
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import database
+import importador_excel
+from datos_sinteticos import generar_excel_rucs
+
+MESES = list(importador_excel.MESES)
+
+def bd_nueva(tmp, nombre):
+    database.DB_PATH = os.path.join(tmp, f"{nombre}.db")
+    database.configurar_pool()
+    database.init_db()
+    return database.DB_PATH
+
+def mostrar(nombre, filas, segundos, base):
+    print(f"{nombre:<32s} {segundos:>9.2f} s {filas / segundos:>11,.0f} {base / segundos:>8.2f}x")
+
+if __name__ == "__main__":
+    n_archivos = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    filas = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    max_procesos = min(int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1, n_archivos)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = os.path.join(tmp, "meses")
+        os.makedirs(carpeta)
+        inicio = time.perf_counter()
+        for i in range(n_archivos):
+            generar_excel_rucs(os.path.join(carpeta, f"DATA {MESES[i % 12]} {2026 + i // 12}.xlsx"), filas,
+                               semilla=i, primer_documento=10000000000 + i * filas // 2)
+        print(f"{n_archivos} workbooks de {filas:,} filas generados en {time.perf_counter() - inicio:.1f} s")
+
+        total = n_archivos * filas
+        print("=" * 66)
+        print(f"IMPORTACIÓN DE {n_archivos} WORKBOOKS ({total:,} filas, {os.cpu_count()} núcleos)")
+        print("=" * 66)
+        print(f"{'Importación':<32s} {'Tiempo':>11s} {'Filas/s':>11s} {'Mejora':>9s}")
+
+        bd_nueva(tmp, "secuencial")
+        inicio = time.perf_counter()
+        for archivo in importador_excel.archivos_excel(carpeta):
+            importador_excel.importar_rucs_excel(archivo)
+        base = time.perf_counter() - inicio
+        mostrar("uno tras otro (importar_rucs_excel)", total, base, base)
+
+        procesos = 1
+        while True:
+            bd_nueva(tmp, f"carpeta_{procesos}")
+            resultado = importador_excel.importar_rucs_carpeta(carpeta, procesos=procesos)
+            mostrar(f"importar_rucs_carpeta · {resultado.procesos} procesos", total, resultado.segundos, base)
+            if procesos >= max_procesos:
+                break
+            procesos = min(procesos * 2, max_procesos)
+        print()
+        print(resultado.reporte())
+        database.cerrar_pools()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importar un CSV de pagos grande por bloques con punto de control
+Mide filas/s y pico de memoria de importar_pagos_csv con varios tamaños de bloque, y con un
+solo bloque del tamaño del archivo (lo que hacía importar_datos_nuevos.py: todo en memoria y
+una sola transacción). Cada medición corre en un proceso y una BD nuevos, así el pico de
+memoria es el de esa importación. Al final mide retomar después de un corte a mitad de archivo.
+Uso: python benchmark_importador_csv.py [n_filas] [bloque ...]   (por defecto 1000000 y 1000 5000 20000)
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import database
+import importador_csv
+from datos_sinteticos import generar_csv_pagos
+from importador_excel import memoria_pico
+
+def medir(archivo, db_path, tamano_lote, cortar_en=None):
+    """Importa archivo en una BD nueva. cortar_en: falla después de confirmar esa fila y retoma"""
+    database.DB_PATH = db_path
+    database.configurar_pool()
+    previo = None
+    if cortar_en:
+        def cortar(punto):
+            if punto['fila'] >= cortar_en:
+                raise KeyboardInterrupt
+        try:
+            importador_csv.importar_pagos_csv(archivo, tamano_lote, progreso=cortar)
+        except KeyboardInterrupt:
+            previo = importador_csv.punto_de_control(archivo)['fila']
+    resultado = importador_csv.importar_pagos_csv(archivo, tamano_lote)
+    database.cerrar_pools()
+    return resultado, previo, memoria_pico()
+
+def en_proceso_nuevo(*argumentos):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(medir, *argumentos).result()
+
+if __name__ == "__main__":
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    bloques = [int(b) for b in sys.argv[2:]] or [1000, 5000, 20000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archivo = os.path.join(tmp, "pagos.csv")
+        generar_csv_pagos(archivo, n_filas)
+        print("=" * 70)
+        print(f"IMPORTACIÓN CSV: {n_filas:,} filas ({os.path.getsize(archivo) / 2**20:.0f} MB)")
+        print("=" * 70)
+
+        for i, tamano_lote in enumerate(bloques + [n_filas]):
+            resultado, _, pico = en_proceso_nuevo(archivo, os.path.join(tmp, f"pagos_{i}.db"), tamano_lote)
+            nombre = "un solo bloque (anterior)" if tamano_lote == n_filas else f"bloques de {tamano_lote:,}"
+            print(f"{nombre:<28s} {resultado.segundos:>8.2f} s {resultado.filas_por_segundo:>10,.0f} filas/s "
+                  f"{(pico or 0) / 2**20:>8.0f} MB pico")
+        print(f"  {resultado.reporte()}")
+
+        resultado, previo, _ = en_proceso_nuevo(archivo, os.path.join(tmp, "cortado.db"), bloques[-1], n_filas // 2)
+        print(f"{'retomar después de un corte':<28s} {resultado.segundos:>8.2f} s  ({previo:,} filas ya confirmadas)")
+        print(f"  {resultado.reporte()}")
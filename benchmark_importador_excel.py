@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importación de RUCs desde Excel
+Compara la importación anterior (load_workbook completo + INSERT fila por fila) con
+importador_excel.py (lotes con executemany) leyendo con openpyxl read_only o con leer_xml,
+y mide la memoria pico del proceso con workbooks sintéticos de tamaño creciente.
+Cada medición corre en un proceso aparte.
+Uso: python benchmark_importador_excel.py [n_filas_max] [tamaño_lote]   (por defecto 500000 y 5000)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from datos_sinteticos import generar_excel_rucs
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+EXCEL = os.path.join(REPO, "DATA ENERO 2026.xlsx")
+# La versión anterior tiene todas las celdas en memoria: solo se mide hasta este tamaño
+MAXIMO_ANTERIOR = 100000
+
+# Proceso hijo: BD nueva, importa y devuelve tiempo, conteos y memoria pico
+HIJO = '''
+import json, sqlite3, sys, time
+from datetime import datetime
+import database, importador_excel
+
+modo, archivo, db_path, tamano_lote = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+database.DB_PATH = db_path
+database.init_db()
+
+def anterior():
+    """importar_excel_a_bd antes del importador por lotes"""
+    import openpyxl
+    ws = openpyxl.load_workbook(archivo).active
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    insertados = 0
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        try:
+            campaña, documento, razon_social = row[0], str(int(row[1])) if row[1] else None, row[2]
+            if not documento or not razon_social or not campaña:
+                continue
+            try:
+                cursor.execute("INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (documento, documento, razon_social, campaña, row[6], datetime.now().isoformat()))
+                insertados += 1
+            except sqlite3.IntegrityError:
+                pass
+        except Exception:
+            continue
+    conn.commit()
+    conn.close()
+    return insertados
+
+inicio = time.perf_counter()
+if modo == "anterior":
+    insertados = anterior()
+else:
+    insertados = importador_excel.importar_rucs_excel(archivo, db_path, tamano_lote, lector=modo).insertados
+json.dump({"segundos": time.perf_counter() - inicio, "insertados": insertados,
+           "memoria": importador_excel.memoria_pico()}, sys.stdout)
+'''
+
+def medir(modo, archivo, tmp, tamano_lote):
+    db_path = os.path.join(tmp, f"{modo}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    salida = subprocess.run([sys.executable, "-c", HIJO, modo, archivo, db_path, str(tamano_lote)],
+                            env=dict(os.environ, PYTHONPATH=REPO), capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout)
+
+def mostrar(nombre, filas, resultado):
+    memoria = f"{resultado['memoria'] / 2**20:8.1f} MB" if resultado['memoria'] else f"{'n/d':>11s}"
+    print(f"{nombre:<34s} {filas:>9,d} {resultado['segundos']:>9.2f} s {filas / resultado['segundos']:>11,.0f} "
+          f"{memoria} {resultado['insertados']:>10,d}")
+
+if __name__ == "__main__":
+    n_maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    tamano_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    tamanos = [n for n in (50000, 100000, 250000, 500000) if n < n_maximo] + [n_maximo]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("=" * 86)
+        print(f"IMPORTACIÓN DE RUCs DESDE EXCEL (lotes de {tamano_lote:,} filas)")
+        print("=" * 86)
+        print(f"{'Importación':<34s} {'Filas':>9s} {'Tiempo':>11s} {'Filas/s':>11s} {'Memoria pico':>11s} "
+              f"{'Insertados':>10s}")
+
+        filas_excel = 7110
+        for modo in ("anterior", "openpyxl", "xml"):
+            mostrar(f"{os.path.basename(EXCEL)} · {modo}", filas_excel, medir(modo, EXCEL, tmp, tamano_lote))
+
+        for n in tamanos:
+            archivo = os.path.join(tmp, f"rucs_{n}.xlsx")
+            inicio = time.perf_counter()
+            generar_excel_rucs(archivo, n)
+            print(f"  (workbook sintético de {n:,} filas generado en {time.perf_counter() - inicio:.1f} s, "
+                  f"{os.path.getsize(archivo) / 2**20:.1f} MB)")
+            modos = ("anterior", "openpyxl", "xml") if n <= MAXIMO_ANTERIOR else ("openpyxl", "xml")
+            for modo in modos:
+                mostrar(f"sintético · {modo}", n, medir(modo, archivo, tmp, tamano_lote))
+            os.remove(archivo)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: consultas frecuentes sin y con los índices de INDICES_GESTIONADOS
+Uso: python benchmark_indices.py [n_registros ...]   (por defecto 100000 y 1000000)
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def consultas_frecuentes():
+    """Consultas de las páginas más usadas con sus argumentos"""
+    hoy = date.today().isoformat()
+    return [
+        ('obtener_registros_por_fecha', lambda: database.obtener_registros_por_fecha(hoy)),
+        ('resumen_total_por_promesa (GA+Plan)', lambda: (
+            database.obtener_resumen_total_por_promesa('gasto', hoy),
+            database.obtener_resumen_total_por_promesa('planilla', hoy))),
+        ('resumen_por_asesor_promesa (GA+Plan)', lambda: (
+            database.obtener_resumen_por_asesor_promesa('gasto', hoy),
+            database.obtener_resumen_por_asesor_promesa('planilla', hoy))),
+        ('obtener_resumen_asesores_diario', lambda: database.obtener_resumen_asesores_diario(hoy)),
+        ('obtener_promesas_pendientes', database.obtener_promesas_pendientes),
+        ('obtener_ranking_asesores (hoy)', database.obtener_ranking_asesores),
+        ('obtener_promesas_caidas', database.obtener_promesas_caidas),
+        ('detectar_monto_anormal (RUC)', lambda: database.detectar_monto_anormal(100.0, 'ga', '20000000001')),
+        ('detectar_duplicado_exacto', lambda: database.detectar_duplicado_exacto(
+            hoy, '20000000001', '70000001', 'FLUJO', 'Laura ...', monto_gasto=1.0)),
+    ]
+
+def medir(llamada, repeticiones=5):
+    llamada()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        llamada()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def tiempos_consultas():
+    return {nombre: medir(llamada) for nombre, llamada in consultas_frecuentes()}
+
+if __name__ == "__main__":
+    tamanos = [int(n) for n in sys.argv[1:]] or [100000, 1000000]
+
+    for n_registros in tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "benchmark.db")
+            database.configurar_pool()
+            print(f"\nGenerando {n_registros:,} registros...")
+            generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                                 n_rucs=max(2000, n_registros // 20), dias=365)
+
+            # Antes: sin índices secundarios
+            with sqlite3.connect(database.DB_PATH) as conn:
+                for nombre in database.INDICES_GESTIONADOS:
+                    conn.execute(f'DROP INDEX IF EXISTS {nombre}')
+                conn.execute('ANALYZE')
+            database.configurar_pool()
+            antes = tiempos_consultas()
+
+            # Después: init_db() recrea los índices gestionados
+            inicio = time.perf_counter()
+            database.init_db()
+            creacion = time.perf_counter() - inicio
+            despues = tiempos_consultas()
+
+            print("=" * 78)
+            print(f"{n_registros:,} registros (creación de índices: {creacion:.1f} s)")
+            print("=" * 78)
+            print(f"{'Consulta':40s} {'Sin índices':>12s} {'Con índices':>12s} {'Mejora':>8s}")
+            for nombre in antes:
+                mejora = antes[nombre] / despues[nombre] if despues[nombre] else float('inf')
+                print(f"{nombre:40s} {antes[nombre]:9.2f} ms {despues[nombre]:9.2f} ms {mejora:7.1f}x")
+
+            database.cerrar_pools()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importar pagos con registrar_pago fila por fila vs registrar_pagos_lote
+Uso: python benchmark_lote.py [n_pagos] [n_existentes]   (por defecto 10000 y 100000)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import database
+from datos_sinteticos import generar_bd_sintetica, generar_pagos
+
+if __name__ == "__main__":
+    n_pagos = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_existentes = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    pagos = generar_pagos(n_pagos)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.db")
+        print(f"Generando BD con {n_existentes:,} registros...")
+        generar_bd_sintetica(base, n_registros=n_existentes, n_rucs=max(2000, n_existentes // 20), dias=365)
+
+        print("=" * 70)
+        print(f"IMPORTACIÓN DE {n_pagos:,} PAGOS ({n_existentes:,} registros existentes)")
+        print("=" * 70)
+
+        for nombre, importar in (
+                ('registrar_pago por fila', lambda: [database.registrar_pago(**p) for p in pagos]),
+                ('registrar_pagos_lote', lambda: database.registrar_pagos_lote(pagos, omitir_duplicados=False)),
+                ('registrar_pagos_lote (omite duplicados)', lambda: database.registrar_pagos_lote(pagos))):
+            database.DB_PATH = os.path.join(tmp, "bench.db")
+            with sqlite3.connect(base) as src, sqlite3.connect(database.DB_PATH) as dst:
+                src.backup(dst)
+            database.configurar_pool()
+            database.init_db()
+
+            inicio = time.perf_counter()
+            importar()
+            duracion = time.perf_counter() - inicio
+            print(f"{nombre:42s} {duracion:8.2f} s  {n_pagos / duracion:10,.0f} filas/s")
+
+            database.cerrar_pools()
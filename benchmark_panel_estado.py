@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Benchmark: panel de estado del sidebar (se dibuja en cada rerun de cada página)
+Compara len(obtener_todos_registros()) (sin y con caché de consultas) con obtener_conteos()
+Uso: python benchmark_panel_estado.py [n_registros ...]   (por defecto 10000, 100000 y 1000000)
+"""
+
+import os
+import sys
+import tempfile
+
+import database
+from benchmark_indices import medir
+from datos_sinteticos import generar_bd_sintetica
+
+if __name__ == "__main__":
+    tamanos = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    print("=" * 78)
+    print("PANEL DE ESTADO DEL SIDEBAR (por render)")
+    print("=" * 78)
+    print(f"{'Registros':>10s} {'len(todos)':>14s} {'len(todos) caché':>18s} {'obtener_conteos':>16s}")
+
+    for n_registros in tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "benchmark.db")
+            database.configurar_pool()
+            generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                                 n_rucs=max(2000, n_registros // 20), dias=365)
+            database.limpiar_cache()
+
+            conteos = database.obtener_conteos()
+            assert conteos['total_registros'] == len(database.obtener_todos_registros.sin_cache())
+
+            anterior = medir(lambda: len(database.obtener_todos_registros.sin_cache()), 3)
+            cache = medir(lambda: len(database.obtener_todos_registros()), 3)
+            nuevo = medir(database.obtener_conteos, 20)
+            print(f"{n_registros:>10,} {anterior:>11.2f} ms {cache:>15.2f} ms {nuevo * 1000:>13.1f} µs")
+            database.cerrar_pools()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: consultas de un render completo del Dashboard con y sin pool de conexiones
+Uso: python benchmark_pool.py [n_registros] [repeticiones]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def render_dashboard():
+    """Ejecuta el mismo conjunto de consultas que hace app.py al dibujar el Dashboard"""
+    fecha = date.today()
+    database.init_db()
+    database.obtener_todos_registros()  # Panel de estado del sidebar
+    database.detectar_promesas_caidas()
+    database.obtener_resumen_total_por_promesa(tipo_pago='gasto', fecha=fecha)
+    database.obtener_resumen_total_por_promesa(tipo_pago='planilla', fecha=fecha)
+    database.obtener_resumen_por_asesor_promesa(tipo_pago='gasto', fecha=fecha)
+    database.obtener_resumen_por_asesor_promesa(tipo_pago='planilla', fecha=fecha)
+    database.obtener_registros_por_fecha(fecha)
+
+def medir(tamano_pool, repeticiones):
+    """Retorna la mediana (ms) de un render con el tamaño de pool indicado"""
+    database.configurar_pool(tamano=tamano_pool)
+    render_dashboard()  # Calentamiento
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        render_dashboard()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+if __name__ == "__main__":
+    n_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "benchmark.db")
+        generar_bd_sintetica(database.DB_PATH, n_registros=n_registros)
+
+        print("=" * 60)
+        print(f"BENCHMARK POOL DE CONEXIONES ({n_registros} registros, {repeticiones} renders)")
+        print("=" * 60)
+
+        sin_pool = medir(0, repeticiones)
+        con_pool = medir(database.POOL_SIZE, repeticiones)
+
+        print(f"Sin pool (connect/close por llamada): {sin_pool:8.2f} ms por render (mediana)")
+        print(f"Con pool ({database.POOL_SIZE} conexiones):          {con_pool:8.2f} ms por render (mediana)")
+        print(f"Mejora: {sin_pool / con_pool:.2f}x")
+
+        database.cerrar_pools()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vencimiento de promesas con el bucle anterior vs el motor por conjuntos
+Mide la latencia por llamada en un día "frío" (primera llamada tras el cambio de día)
+y en un día "caliente" (llamadas repetidas dentro del mismo día).
+Uso: python benchmark_promesas.py [n_promesas]   (por defecto 500000)
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def detectar_promesas_caidas_anterior(fecha_actual=None):
+    """Implementación anterior (una fila a la vez en Python), usada como referencia"""
+    if fecha_actual is None:
+        fecha_actual = date.today()
+
+    with database.conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT id, fecha_pago_gasto, estado_ga, fecha_pago_planilla, estado_planilla
+        FROM registros_pagos
+        WHERE (estado_ga IN ('A VENCER', 'PROMESA CAIDA') OR estado_planilla IN ('A VENCER', 'PROMESA CAIDA'))
+        ''')
+
+        caidas_ga = []
+        caidas_planilla = []
+        for registro_id, fecha_ga, estado_ga, fecha_planilla, estado_planilla in cursor.fetchall():
+            for fecha_str, estado, columna, caidas in (
+                    (fecha_ga, estado_ga, 'estado_ga', caidas_ga),
+                    (fecha_planilla, estado_planilla, 'estado_planilla', caidas_planilla)):
+                if not fecha_str or estado not in ('A VENCER', 'PROMESA CAIDA'):
+                    continue
+                try:
+                    fecha_pago = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+                except ValueError:
+                    continue
+                if fecha_pago < fecha_actual and estado == 'A VENCER':
+                    cursor.execute(f'UPDATE registros_pagos SET {columna} = ? WHERE id = ?',
+                                   ('PROMESA CAIDA', registro_id))
+                    caidas.append(registro_id)
+                elif fecha_pago >= fecha_actual and estado == 'PROMESA CAIDA':
+                    cursor.execute(f'UPDATE registros_pagos SET {columna} = ? WHERE id = ?',
+                                   ('A VENCER', registro_id))
+
+        conn.commit()
+    return caidas_ga, caidas_planilla
+
+def _cronometrar(llamada):
+    inicio = time.perf_counter()
+    resultado = llamada()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+if __name__ == "__main__":
+    n_promesas = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    manana = date.today() + timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.db")
+        print(f"Generando {n_promesas:,} registros con promesas pendientes...")
+        generar_bd_sintetica(base, n_registros=n_promesas, n_rucs=20000, dias=365)
+
+        print("=" * 70)
+        print(f"VENCIMIENTO DE PROMESAS - {n_promesas:,} registros")
+        print("=" * 70)
+
+        for nombre, detectar in (('Bucle anterior', detectar_promesas_caidas_anterior),
+                                 ('Motor por conjuntos', database.detectar_promesas_caidas)):
+            database.DB_PATH = os.path.join(tmp, "bench.db")
+            with sqlite3.connect(base) as src, sqlite3.connect(database.DB_PATH) as dst:
+                src.backup(dst)
+            database.configurar_pool()
+            database.init_db()
+
+            # Estado consistente a hoy; el día frío es mañana (vencen las promesas de hoy)
+            detectar(date.today())
+            frio, (caidas_ga, caidas_plan) = _cronometrar(lambda: detectar(manana))
+            calientes = [_cronometrar(lambda: detectar(manana))[0] for _ in range(20)]
+
+            print(f"{nombre}:")
+            print(f"  Día frío:     {frio:10.2f} ms  ({len(caidas_ga) + len(caidas_plan):,} promesas caídas)")
+            print(f"  Día caliente: {statistics.median(calientes):10.3f} ms por llamada (mediana de 20)")
+
+            database.cerrar_pools()
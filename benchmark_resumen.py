@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resúmenes del Dashboard consultando registros_pagos vs resumen_diario
+Con el resumen materializado la latencia no depende del tamaño del historial.
+Uso: python benchmark_resumen.py [n_registros ...]   (por defecto 10000, 100000 y 1000000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from benchmark_indices import medir
+from datos_sinteticos import generar_bd_sintetica
+
+# Las mismas consultas que antes de resumen_diario, directo sobre registros_pagos
+def resumenes_directos(fecha):
+    with database.conectar() as conn:
+        for tipo, (fecha_col, promesa, _, monto) in database.COLUMNAS_TIPO_PAGO.items():
+            conn.execute(f'''
+            SELECT asesor, {promesa}, COUNT(*), SUM({monto}) FROM registros_pagos
+            WHERE {fecha_col} = ? AND {monto} > 0
+            GROUP BY asesor, {promesa} ORDER BY asesor, {promesa}
+            ''', (fecha,)).fetchall()
+            conn.execute(f'''
+            SELECT {promesa}, COUNT(*), SUM({monto}) FROM registros_pagos
+            WHERE {fecha_col} = ? AND {monto} > 0
+            GROUP BY {promesa} ORDER BY {promesa}
+            ''', (fecha,)).fetchall()
+        conn.execute('''
+        SELECT COALESCE(asesor, 'SIN ASESOR'),
+            COUNT(DISTINCT CASE WHEN monto_gasto > 0 THEN ruc END),
+            COUNT(DISTINCT CASE WHEN monto_planilla > 0 THEN ruc END),
+            SUM(CASE WHEN fecha_pago_gasto = ? AND monto_gasto > 0 THEN monto_gasto ELSE 0 END) as ga,
+            SUM(CASE WHEN fecha_pago_planilla = ? AND monto_planilla > 0 THEN monto_planilla ELSE 0 END) as pl
+        FROM registros_pagos WHERE (fecha_pago_gasto = ? OR fecha_pago_planilla = ?)
+        GROUP BY asesor ORDER BY (ga + pl) DESC
+        ''', (fecha, fecha, fecha, fecha)).fetchall()
+
+def resumenes_materializados(fecha):
+    for tipo in database.COLUMNAS_TIPO_PAGO:
+        database.obtener_resumen_por_asesor_promesa(tipo, fecha)
+        database.obtener_resumen_total_por_promesa(tipo, fecha)
+    database.obtener_resumen_asesores_diario(fecha)
+
+if __name__ == "__main__":
+    tamanos = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+    hoy = date.today().isoformat()
+
+    print("=" * 78)
+    print("RESÚMENES DEL DASHBOARD (5 consultas por render)")
+    print("=" * 78)
+    print(f"{'Registros':>10s} {'Directo':>12s} {'Materializado':>14s} {'Mejora':>8s} {'Carga':>14s}")
+
+    for n_registros in tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "benchmark.db")
+            database.configurar_pool()
+            inicio = time.perf_counter()
+            generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                                 n_rucs=max(2000, n_registros // 20), dias=365)
+            carga = n_registros / (time.perf_counter() - inicio)
+
+            directo = medir(lambda: resumenes_directos(hoy))
+            materializado = medir(lambda: resumenes_materializados(hoy))
+            print(f"{n_registros:10,d} {directo:9.2f} ms {materializado:11.2f} ms "
+                  f"{directo / materializado:7.1f}x {carga:9,.0f} reg/s")
+
+            database.cerrar_pools()
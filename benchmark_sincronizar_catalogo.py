@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: poner el catálogo de RUCs al día con un Excel nuevo
+Compara lo que hacía clean_db.py (borrar pagos.db, crearla e importar todos los RUCs) con
+sincronizar_catalogo (solo la diferencia) sobre un catálogo ya cargado, con un Excel que cambia
+una fracción de las entradas y con el mismo Excel sin cambios.
+El workbook ya está en cache_excel en todas las mediciones: se mide el trabajo en la BD.
+Uso: python benchmark_sincronizar_catalogo.py [n_filas] [fracción_cambiada]   (por defecto 100000 y 0.01)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import database
+import importador_excel
+from cache_excel import cargar_excel
+from datos_sinteticos import COLUMNAS_EXCEL, generar_excel_rucs
+from sincronizar_catalogo import sincronizar_catalogo
+
+def modificar_excel(origen, destino, fraccion, semilla=7):
+    """Copia del workbook con la fracción de filas cambiada: la mitad montos, un cuarto quitadas, un cuarto nuevas"""
+    import openpyxl
+
+    rnd = random.Random(semilla)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(COLUMNAS_EXCEL)
+    nuevas = 0
+    for fila in importador_excel.leer_xml(origen):
+        azar = rnd.random()
+        if azar < fraccion / 2:
+            fila = fila[:3] + (round((fila[3] or 0) + 1, 2),) + fila[4:]
+        elif azar < fraccion * 3 / 4:
+            continue
+        elif azar < fraccion:
+            nuevas += 1
+            ws.append((fila[0], 90000000000 + nuevas, f"NUEVA {nuevas} S.A.C.", 100.0, 17.7, '202601', fila[6]))
+        ws.append(fila)
+    wb.save(destino)
+
+def bd_nueva(ruta):
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    database.DB_PATH = ruta
+    database.configurar_pool()
+    database.init_db(forzar=True)
+
+def recargar(ruta, excel):
+    """clean_db.py antes de la sincronización: BD nueva e importación completa"""
+    inicio = time.perf_counter()
+    bd_nueva(ruta)
+    importador_excel.importar_rucs_excel(excel, ruta, lector='cache')
+    return time.perf_counter() - inicio
+
+if __name__ == "__main__":
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    fraccion = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import cache_excel
+        cache_excel.CARPETA = os.path.join(tmp, "cache")
+        excel_1 = os.path.join(tmp, "DATA ENERO 2026.xlsx")
+        excel_2 = os.path.join(tmp, "DATA FEBRERO 2026.xlsx")
+        generar_excel_rucs(excel_1, n_filas)
+        modificar_excel(excel_1, excel_2, fraccion)
+        for excel in (excel_1, excel_2):
+            cargar_excel(excel)
+        db_path = os.path.join(tmp, "pagos.db")
+
+        print("=" * 70)
+        print(f"CATÁLOGO DE RUCs: {n_filas:,} filas, {fraccion:.1%} cambiadas")
+        print("=" * 70)
+        print(f"{'borrar BD y recargar (clean_db anterior)':<44s} {recargar(db_path, excel_2):>8.2f} s")
+
+        recargar(db_path, excel_1)
+        resultado = sincronizar_catalogo(excel_2, db_path)
+        print(f"{'sincronizar_catalogo (Excel con cambios)':<44s} {resultado.segundos:>8.2f} s")
+        print(f"  {resultado.reporte()}")
+        resultado = sincronizar_catalogo(excel_2, db_path)
+        print(f"{'sincronizar_catalogo (mismo Excel)':<44s} {resultado.segundos:>8.2f} s")
+        print(f"  {resultado.reporte()}")
+        database.cerrar_pools()
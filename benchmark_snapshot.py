@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: datos del Dashboard con las cinco consultas anteriores vs obtener_snapshot_dashboard
+Las consultas anteriores eran los totales y el detalle por asesor de gasto y planilla, más los
+registros completos de la fecha para contar RUCs únicos en Python
+Uso: python benchmark_snapshot.py [n_registros ...]   (por defecto 10000, 100000 y 1000000)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Se mide la consulta, no la caché de consultas
+os.environ.setdefault("PAGOS_CACHE_CONSULTAS", "0")
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def dashboard_anterior(fecha):
+    resumen_gasto = database.obtener_resumen_total_por_promesa(tipo_pago='gasto', fecha=fecha)
+    resumen_planilla = database.obtener_resumen_total_por_promesa(tipo_pago='planilla', fecha=fecha)
+    database.obtener_resumen_por_asesor_promesa(tipo_pago='gasto', fecha=fecha)
+    database.obtener_resumen_por_asesor_promesa(tipo_pago='planilla', fecha=fecha)
+    registros_fecha = database.obtener_registros_por_fecha(fecha)
+    total = sum(r[2] for r in resumen_gasto) + sum(r[2] for r in resumen_planilla)
+    return total, len({r[2] for r in registros_fecha}), len(registros_fecha)
+
+def dashboard_snapshot(fecha):
+    snapshot = database.obtener_snapshot_dashboard(fecha)
+    return snapshot.total_general, snapshot.rucs_unicos, snapshot.registros
+
+def medir(funcion, fecha, repeticiones=20):
+    """Mediana (ms) de una llamada"""
+    funcion(fecha)  # Calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(fecha)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+if __name__ == "__main__":
+    tamanos = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+    fecha = date.today().isoformat()
+
+    print("=" * 72)
+    print("DASHBOARD: CINCO CONSULTAS vs SNAPSHOT EN UNA CONSULTA (mediana)")
+    print("=" * 72)
+    print(f"{'Registros':>10s} {'Del día':>9s} {'Anterior':>12s} {'Snapshot':>12s} {'Mejora':>9s}")
+
+    for n_registros in tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "benchmark.db")
+            database.configurar_pool()
+            generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                                 n_rucs=max(2000, n_registros // 20), dias=30)
+
+            # Ambas formas deben mostrar los mismos números
+            anterior, nuevo = dashboard_anterior(fecha), dashboard_snapshot(fecha)
+            assert anterior[1:] == nuevo[1:] and abs(anterior[0] - nuevo[0]) < 0.01, (anterior, nuevo)
+
+            antes = medir(dashboard_anterior, fecha)
+            despues = medir(dashboard_snapshot, fecha)
+            print(f"{n_registros:>10,} {nuevo[2]:>9,} {antes:>9.2f} ms {despues:>9.2f} ms {antes / despues:>8.1f}x")
+            database.cerrar_pools()
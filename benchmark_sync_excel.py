@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sincronización del Excel de RUCs en cada rerun del Dashboard
+Compara la versión anterior (lee el Excel y actualiza fila por fila siempre) con la
+huella del archivo, y mide el rerun completo de app.py con streamlit.testing
+Uso: python benchmark_sync_excel.py [excel] [reruns]   (por defecto DATA ENERO 2026.xlsx y 5)
+"""
+
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+
+import database
+
+EXCEL = "DATA ENERO 2026.xlsx"
+
+def actualizar_rucs_anterior(excel_path=EXCEL):
+    """Versión anterior de actualizar_rucs_desde_excel: lee y actualiza todo en cada llamada"""
+    df = pd.read_excel(excel_path)
+    with database.conectar() as conn:
+        cursor = conn.cursor()
+        for _, row in df.iterrows():
+            documento = str(row.get('DOCUMENTO', '')).strip()
+            deuda_total = float(row.get('DEUDA TOTAL', 0)) if pd.notna(row.get('DEUDA TOTAL')) else None
+            gasto_admin = float(row.get('GASTOS ADMIN', 0)) if pd.notna(row.get('GASTOS ADMIN')) else None
+            cursor.execute('SELECT id FROM rucs WHERE id_documento = ?', (documento,))
+            resultado = cursor.fetchone()
+            if resultado:
+                cursor.execute('UPDATE rucs SET deuda_total = ?, gasto_admin = ? WHERE id = ?',
+                               (deuda_total, gasto_admin, resultado[0]))
+        conn.commit()
+    return True, "Datos del Excel actualizados correctamente"
+
+def cargar_rucs(excel_path):
+    """Carga los RUCs del Excel como import_excel.py"""
+    ws = openpyxl.load_workbook(excel_path, read_only=True).active
+    filas = {}
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        if row[1] and row[2] and row[0]:
+            filas.setdefault(str(int(row[1])), (row[2], row[0], row[6] if len(row) > 6 else None))
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.executemany('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(doc, doc, razon, campaña, asesor, datetime.now().isoformat())
+              for doc, (razon, campaña, asesor) in filas.items()])
+
+def montos_rucs():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('SELECT id_documento, deuda_total, gasto_admin FROM rucs ORDER BY id').fetchall()
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+if __name__ == "__main__":
+    excel = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else EXCEL)
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app = os.path.abspath("app.py")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        shutil.copy(excel, EXCEL)
+        database.DB_PATH = os.path.join(tmp, "pagos.db")
+        database.configurar_pool()
+        database.init_db()
+        cargar_rucs(EXCEL)
+
+        print("=" * 70)
+        print(f"SINCRONIZACIÓN DEL EXCEL ({os.path.getsize(EXCEL):,} bytes)")
+        print("=" * 70)
+
+        # Las dos versiones dejan la tabla rucs igual
+        actualizar_rucs_anterior()
+        esperado = montos_rucs()
+        with sqlite3.connect(database.DB_PATH) as conn:
+            conn.execute('UPDATE rucs SET deuda_total = NULL, gasto_admin = NULL')
+        print(database.actualizar_rucs_desde_excel(forzar=True)[1])
+        assert montos_rucs() == esperado
+
+        print(f"{'anterior (siempre lee y actualiza)':42s} {medir(actualizar_rucs_anterior, reruns):10.2f} ms")
+        print(f"{'con huella, archivo sin cambios':42s} "
+              f"{medir(database.actualizar_rucs_desde_excel, reruns):10.2f} ms")
+        print(f"{'con huella, solo mtime distinto':42s} "
+              f"{medir(lambda: (os.utime(EXCEL), database.actualizar_rucs_desde_excel()), reruns):10.2f} ms")
+        print(f"{'con huella, archivo modificado':42s} "
+              f"{medir(lambda: database.actualizar_rucs_desde_excel(forzar=True), reruns):10.2f} ms")
+
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError:
+            sys.exit(0)
+
+        print("\nRerun del Dashboard (app.py completo):")
+        for nombre, sincronizar in (('anterior', actualizar_rucs_anterior),
+                                    ('con huella', database.actualizar_rucs_desde_excel)):
+            database.actualizar_rucs_desde_excel = sincronizar
+            prueba = AppTest.from_file(app, default_timeout=120)
+            prueba.run()
+            print(f"  {nombre:40s} {medir(prueba.run, reruns):10.2f} ms")
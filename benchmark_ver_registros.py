@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: "Ver Registros > Todos" cargando la tabla completa vs una página por clave
+Mide latencia y memoria máxima (tracemalloc) de la primera página y de una página a mitad de la tabla
+Uso: python benchmark_ver_registros.py [n_registros ...]   (por defecto 10000, 100000 y 1000000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+from formato import montos, fechas
+
+COLUMNAS = ['ID', 'Fecha Reporte', 'RUC', 'ID Doc', 'Campaña', 'Asesor',
+            'Promesa Gastos Admin', 'Monto Gastos Admin', 'Fecha Pago Gastos Admin', 'Estado Gastos Admin',
+            'Promesa Planilla', 'Monto Planilla', 'Fecha Pago Planilla', 'Estado Planilla', 'Observaciones']
+
+def tabla(registros):
+    """DataFrame con montos y fechas listos para column_config, como lo arma la página"""
+    df = pd.DataFrame(registros, columns=COLUMNAS)
+    for col in ['Monto Gastos Admin', 'Monto Planilla']:
+        df[col] = montos(df[col])
+    for col in ['Fecha Reporte', 'Fecha Pago Gastos Admin', 'Fecha Pago Planilla']:
+        df[col] = fechas(df[col])
+    return df
+
+def todos_anterior():
+    return tabla(database.obtener_todos_registros.sin_cache())
+
+def pagina(cursor=None, **filtros):
+    registros, _ = database.buscar_registros.sin_cache('reciente', cursor, 50, **filtros)
+    database.contar_registros.sin_cache(**filtros)
+    return tabla(registros)
+
+def medir(funcion):
+    """(ms, MB máximos) de una llamada"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcion()
+    duracion = (time.perf_counter() - inicio) * 1000
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return duracion, pico
+
+if __name__ == "__main__":
+    tamanos = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    print("=" * 86)
+    print("VER REGISTROS: TABLA COMPLETA vs PÁGINA DE 50 (incluye total y DataFrame)")
+    print("=" * 86)
+    print(f"{'Registros':>10s} {'Todos (anterior)':>22s} {'Página 1':>18s} {'Página a mitad':>18s} {'Filtro asesor':>16s}")
+
+    for n_registros in tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "benchmark.db")
+            database.configurar_pool()
+            generar_bd_sintetica(database.DB_PATH, n_registros=n_registros,
+                                 n_rucs=max(2000, n_registros // 20), dias=365)
+
+            # Cursor de la fila a mitad de la tabla en el orden 'reciente'
+            with database.conectar() as conn:
+                mitad = conn.execute('''
+                SELECT fecha_reporte, ruc, id FROM registros_pagos
+                ORDER BY fecha_reporte DESC, ruc DESC, id DESC LIMIT 1 OFFSET ?
+                ''', (n_registros // 2,)).fetchone()
+
+            resultados = [medir(todos_anterior), medir(pagina), medir(lambda: pagina(mitad)),
+                          medir(lambda: pagina(asesor='Laura ...'))]
+            print(f"{n_registros:>10,} " + ' '.join(f"{ms:>9.1f} ms {mb:>6.1f} MB" for ms, mb in resultados))
+            database.cerrar_pools()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Caché de workbooks ya leídos en formato columnar (un .npz de NumPy por workbook)
+Leer el .xlsx es lo que más tarda en actualizar_rucs_desde_excel, import_excel.py, clean_db.py,
+inspect_excel.py e inspect_campaigns.py: con cargar_excel el workbook se lee una sola vez y las
+siguientes cargas salen del .npz en milisegundos.
+- Clave: SHA-256 del contenido + columnas pedidas (encabezado y tipo) + versión del formato
+- Al guardar un workbook modificado se borran las entradas de sus versiones anteriores
+- La carpeta no pasa de LIMITE_MB: se borran primero las entradas usadas hace más tiempo
+- Textos con codificación de diccionario: códigos int32 + los valores distintos en UTF-8 separados
+  por NUL (no puede aparecer en un .xlsx); números en float64
+La carpeta por defecto es .cache_excel junto a la BD (database.DB_PATH).
+PAGOS_CACHE_EXCEL=0 la desactiva; PAGOS_CACHE_EXCEL_DIR y PAGOS_CACHE_EXCEL_MB cambian carpeta y límite.
+Uso: python cache_excel.py [archivo.xlsx]   (carga el workbook y muestra el estado de la caché)
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+import database
+from importador_excel import EXCEL, LECTORES, normalizar_documento
+
+ACTIVA = os.environ.get("PAGOS_CACHE_EXCEL", "1") != "0"
+CARPETA = os.environ.get("PAGOS_CACHE_EXCEL_DIR")
+LIMITE_MB = float(os.environ.get("PAGOS_CACHE_EXCEL_MB", "256"))
+# Cambia si cambia cómo se guardan las columnas: invalida todas las entradas anteriores
+FORMATO = 1
+
+# Columnas del Excel de RUCs: encabezado -> tipo ('texto', 'documento' o 'numero').
+# Todos los que leen el workbook piden estas mismas columnas y comparten una entrada.
+COLUMNAS_RUCS = {
+    'CAMPAÑA': 'texto',
+    'DOCUMENTO': 'documento',
+    'RAZON SOCIAL': 'texto',
+    'DEUDA TOTAL': 'numero',
+    'GASTOS ADMIN': 'numero',
+    'PERIODOS ASIGNADOS': 'texto',
+    'ASESOR': 'texto',
+}
+
+class TablaExcel(NamedTuple):
+    # Fila de encabezado completa del workbook
+    encabezado: tuple
+    # Encabezado -> arreglo: object (str o None) para textos, float64 (NaN si falta) para números
+    columnas: dict
+    filas: int
+    desde_cache: bool
+
+    def tuplas(self, nombres=None):
+        """Filas como tuplas en el orden de nombres (por defecto todas), con None donde falta el valor"""
+        listas = []
+        for nombre in nombres or self.columnas:
+            valores = self.columnas[nombre].tolist()
+            if self.columnas[nombre].dtype.kind == 'f':
+                valores = [None if v != v else v for v in valores]
+            listas.append(valores)
+        return zip(*listas)
+
+_estadisticas = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+_hashes = {}
+_lock = threading.Lock()
+
+def carpeta():
+    return CARPETA or os.path.join(os.path.dirname(os.path.abspath(database.DB_PATH)), '.cache_excel')
+
+def _hash_contenido(archivo):
+    """SHA-256 del archivo; se recuerda por (ruta, tamaño, fecha de modificación)"""
+    stat = os.stat(archivo)
+    firma = (os.path.abspath(archivo), stat.st_size, stat.st_mtime_ns)
+    if firma not in _hashes:
+        _hashes[firma] = database._hash_archivo(archivo)
+    return _hashes[firma]
+
+def clave(archivo, columnas=COLUMNAS_RUCS):
+    """Nombre de la entrada: hash del contenido + hash de las columnas y el formato"""
+    definicion = json.dumps([FORMATO, list(columnas.items())], ensure_ascii=False)
+    return f"{_hash_contenido(archivo)[:32]}-{hashlib.sha256(definicion.encode()).hexdigest()[:12]}"
+
+def _valor(tipo, valor):
+    if tipo == 'numero':
+        try:
+            return float(valor) if valor not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
+    if valor is None:
+        return None
+    return normalizar_documento(valor) if tipo == 'documento' else str(valor)
+
+def _leer_codificado(archivo, columnas, lector):
+    """Lee el workbook y codifica las columnas. Retorna: (encabezado, filas, arreglos para el .npz)"""
+    filas = iter(LECTORES[lector](archivo, encabezado=True))
+    encabezado = tuple('' if v is None else str(v).strip() for v in next(filas, ()))
+    posiciones = [(nombre, tipo, encabezado.index(nombre) if nombre in encabezado else None)
+                  for nombre, tipo in columnas.items()]
+
+    numeros = {nombre: [] for nombre, tipo, _ in posiciones if tipo == 'numero'}
+    codigos = {nombre: [] for nombre, tipo, _ in posiciones if tipo != 'numero'}
+    diccionarios = {nombre: {} for nombre in codigos}
+    n = 0
+    for fila in filas:
+        n += 1
+        for nombre, tipo, posicion in posiciones:
+            valor = _valor(tipo, fila[posicion] if posicion is not None and posicion < len(fila) else None)
+            if tipo == 'numero':
+                numeros[nombre].append(np.nan if valor is None else valor)
+            elif valor is None:
+                codigos[nombre].append(-1)
+            else:
+                codigos[nombre].append(diccionarios[nombre].setdefault(valor, len(diccionarios[nombre])))
+
+    arreglos = {f'{nombre}|numero': np.array(valores, dtype=np.float64) for nombre, valores in numeros.items()}
+    for nombre, valores in codigos.items():
+        arreglos[f'{nombre}|codigos'] = np.array(valores, dtype=np.int32)
+        arreglos[f'{nombre}|valores'] = np.frombuffer('\0'.join(diccionarios[nombre]).encode('utf-8'),
+                                                      dtype=np.uint8)
+    return encabezado, n, arreglos
+
+def _tabla(encabezado, filas, columnas, arreglos, desde_cache):
+    resultado = {}
+    for nombre, tipo in columnas.items():
+        if tipo == 'numero':
+            resultado[nombre] = arreglos[f'{nombre}|numero']
+        else:
+            # Los códigos se asignan en orden: el mayor + 1 es la cantidad de valores distintos
+            codigos = arreglos[f'{nombre}|codigos']
+            distintos = int(codigos.max()) + 1 if codigos.size else 0
+            texto = arreglos[f'{nombre}|valores'].tobytes().decode('utf-8')
+            valores = texto.split('\0') if distintos else []
+            # Código -1 = sin valor: apunta al None agregado al final
+            resultado[nombre] = np.array(valores + [None], dtype=object)[codigos]
+    return TablaExcel(encabezado, resultado, filas, desde_cache)
+
+def _guardar(ruta, archivo, encabezado, filas, arreglos):
+    """Escribe la entrada en un temporal y la renombra (otro proceso nunca ve una a medias)"""
+    meta = json.dumps({'formato': FORMATO, 'origen': os.path.abspath(archivo),
+                       'encabezado': encabezado, 'filas': filas}, ensure_ascii=False)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'wb') as f:
+        np.savez(f, __meta__=np.array(meta), **arreglos)
+    os.replace(temporal, ruta)
+
+def _cargar(ruta, columnas):
+    with np.load(ruta, allow_pickle=False) as datos:
+        meta = json.loads(str(datos['__meta__']))
+        arreglos = {nombre: datos[nombre] for nombre in datos.files if nombre != '__meta__'}
+    return _tabla(tuple(meta['encabezado']), meta['filas'], columnas, arreglos, True)
+
+def _entradas():
+    """(ruta, bytes, última vez usada) de cada entrada de la carpeta"""
+    if not os.path.isdir(carpeta()):
+        return []
+    entradas = []
+    for nombre in os.listdir(carpeta()):
+        if nombre.endswith('.npz'):
+            ruta = os.path.join(carpeta(), nombre)
+            try:
+                stat = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            entradas.append((ruta, stat.st_size, stat.st_mtime))
+    return entradas
+
+def _origen(ruta):
+    try:
+        with np.load(ruta, allow_pickle=False) as datos:
+            return json.loads(str(datos['__meta__']))['origen']
+    except Exception:
+        return None
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+        return True
+    except FileNotFoundError:
+        return False
+
+def invalidar(archivo=None, conservar=None):
+    """
+    Borra las entradas de un workbook (todas si archivo es None), salvo las del contenido
+    con hash conservar. Retorna: cantidad borrada
+    """
+    origen = os.path.abspath(archivo) if archivo else None
+    borradas = 0
+    for ruta, _, _ in _entradas():
+        if conservar and os.path.basename(ruta).startswith(conservar):
+            continue
+        if origen is None or _origen(ruta) == origen:
+            borradas += _borrar(ruta)
+    return borradas
+
+def _aplicar_limite(conservar):
+    """Borra las entradas usadas hace más tiempo hasta quedar bajo LIMITE_MB"""
+    entradas = sorted(_entradas(), key=lambda e: e[2])
+    total = sum(tamano for _, tamano, _ in entradas)
+    for ruta, tamano, _ in entradas:
+        if total <= LIMITE_MB * 2**20:
+            break
+        if ruta != conservar and _borrar(ruta):
+            total -= tamano
+            with _lock:
+                _estadisticas['desalojos'] += 1
+
+def cargar_excel(archivo=EXCEL, columnas=COLUMNAS_RUCS, lector='xml', usar_cache=None):
+    """
+    Columnas del workbook (buscadas por encabezado en la primera fila) desde la caché, o
+    leyéndolo y guardándolo si no está. Una columna que no existe en el workbook queda vacía.
+    Retorna: TablaExcel
+    """
+    if not (ACTIVA if usar_cache is None else usar_cache):
+        encabezado, filas, arreglos = _leer_codificado(archivo, columnas, lector)
+        return _tabla(encabezado, filas, columnas, arreglos, False)
+
+    ruta = os.path.join(carpeta(), f"{clave(archivo, columnas)}.npz")
+    if os.path.exists(ruta):
+        try:
+            tabla = _cargar(ruta, columnas)
+            os.utime(ruta)  # Marca de uso para el desalojo
+            with _lock:
+                _estadisticas['aciertos'] += 1
+            return tabla
+        except Exception:
+            # Entrada dañada o de otra versión: se vuelve a leer el workbook
+            _borrar(ruta)
+
+    with _lock:
+        _estadisticas['fallos'] += 1
+    encabezado, filas, arreglos = _leer_codificado(archivo, columnas, lector)
+    os.makedirs(carpeta(), exist_ok=True)
+    _guardar(ruta, archivo, encabezado, filas, arreglos)
+    # Versiones anteriores del mismo workbook (las de otras columnas del contenido actual se quedan)
+    invalidar(archivo, conservar=_hash_contenido(archivo)[:32])
+    _aplicar_limite(conservar=ruta)
+    return _tabla(encabezado, filas, columnas, arreglos, False)
+
+def estadisticas_cache_excel():
+    """Aciertos, fallos y desalojos de este proceso; entradas y bytes de la carpeta"""
+    entradas = _entradas()
+    with _lock:
+        return dict(_estadisticas, entradas=len(entradas), bytes=sum(e[1] for e in entradas))
+
+if __name__ == "__main__":
+    archivo = sys.argv[1] if len(sys.argv) > 1 else EXCEL
+    for intento in ("primera carga", "segunda carga"):
+        inicio = time.perf_counter()
+        tabla = cargar_excel(archivo)
+        print(f"{intento:<14s} {(time.perf_counter() - inicio) * 1000:9.1f} ms  "
+              f"{tabla.filas:,} filas ({'caché' if tabla.desde_cache else 'workbook'})")
+    print(f"Caché en {carpeta()}: {estadisticas_cache_excel()}")
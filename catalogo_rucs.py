@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Catálogo de RUCs en memoria para las sugerencias de Registrar Pago
+Se carga una vez por proceso (y BD) y se recarga cuando cambia la tabla rucs, según la
+versión del ámbito 'rucs' de versiones_datos. Índices:
+- RUCs distintos en una lista ordenada: búsqueda exacta y por prefijo con bisect
+- Palabras de la razón social (sin tildes, en minúsculas) en una lista ordenada con los
+  RUCs de cada palabra: búsqueda por palabras que empiezan con lo escrito
+Las columnas se guardan por separado (arrays y listas) y las filas se arman al consultar,
+con las mismas columnas que obtener_ruc_por_numero (una fila por campaña del RUC).
+"""
+
+import heapq
+import math
+import os
+import sqlite3
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+import database
+
+# Sugerencias que se muestran por búsqueda
+LIMITE_SUGERENCIAS = 10
+
+# Separa las razones sociales normalizadas en un solo texto
+_SEPARADOR = '\x00'
+
+def normalizar(texto):
+    """Texto en minúsculas y sin tildes, para buscar 'munoz' y encontrar 'MUÑOZ'"""
+    texto = texto or ''
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+def _fin_prefijo(prefijo):
+    """Menor texto mayor que todos los que empiezan con prefijo (para bisect)"""
+    return prefijo + '\U0010ffff'
+
+class CatalogoRucs:
+    """Índice de solo lectura sobre las filas de rucs"""
+
+    def __init__(self, filas, version=None):
+        """
+        filas: (id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin)
+        ordenadas por ruc (ver cargar_catalogo)
+        """
+        self.version = version
+        self.rucs = []              # RUCs distintos, ordenados
+        self._desde = array('l')    # Primera fila de cada RUC (y el total al final)
+        self._ids = array('q')
+        self._documentos = []
+        self._razones = []
+        self._campanas = []
+        self._asesores = []
+        self._deudas = array('d')   # NaN = sin dato
+        self._gastos = array('d')
+
+        compartidos = {}            # Una sola copia de cada campaña y asesor
+        normalizadas = []           # Razón social normalizada de cada RUC
+        palabras = {}               # palabra -> posiciones de los RUCs que la tienen
+        vistas = {}                 # palabra original -> normalizada
+        for fila in filas:
+            id_, ruc, documento, razon, campaña, asesor, deuda, gasto = fila
+            if not self.rucs or self.rucs[-1] != ruc:
+                posicion = len(self.rucs)
+                self.rucs.append(ruc)
+                self._desde.append(len(self._ids))
+                normalizadas.append('')
+            # Se normaliza por palabra: las palabras se repiten mucho entre razones sociales
+            palabras_razon = [vistas.get(p) or vistas.setdefault(p, normalizar(p)) for p in (razon or '').split()]
+            normalizada = ' '.join(palabras_razon)
+            if normalizada not in normalizadas[posicion]:
+                normalizadas[posicion] = (normalizadas[posicion] + ' ' + normalizada).strip()
+                for palabra in set(palabras_razon):
+                    apariciones = palabras.setdefault(palabra, array('l'))
+                    if not apariciones or apariciones[-1] != posicion:
+                        apariciones.append(posicion)
+
+            self._ids.append(id_)
+            self._documentos.append(documento)
+            self._razones.append(razon)
+            self._campanas.append(compartidos.setdefault(campaña, campaña))
+            self._asesores.append(compartidos.setdefault(asesor, asesor))
+            self._deudas.append(math.nan if deuda is None else deuda)
+            self._gastos.append(math.nan if gasto is None else gasto)
+        self._desde.append(len(self._ids))
+
+        # Razones normalizadas en un solo texto (para comprobar frases de varias palabras)
+        self._texto = _SEPARADOR.join(normalizadas)
+        self._inicios = array('l')
+        posicion = 0
+        for normalizada in normalizadas:
+            self._inicios.append(posicion)
+            posicion += len(normalizada) + 1
+        self._inicios.append(posicion)
+
+        # Vocabulario ordenado; _acumulado[i] = apariciones de las palabras anteriores a la i
+        self._palabras = sorted(palabras)
+        self._apariciones = [palabras[p] for p in self._palabras]
+        self._acumulado = array('q', [0])
+        for apariciones in self._apariciones:
+            self._acumulado.append(self._acumulado[-1] + len(apariciones))
+
+    def __len__(self):
+        return len(self.rucs)
+
+    def _filas(self, posicion):
+        """Filas (una por campaña) del RUC en la posición indicada"""
+        ruc = self.rucs[posicion]
+        filas = []
+        for j in range(self._desde[posicion], self._desde[posicion + 1]):
+            deuda, gasto = self._deudas[j], self._gastos[j]
+            filas.append((self._ids[j], ruc, self._documentos[j], self._razones[j],
+                          self._campanas[j], self._asesores[j],
+                          None if math.isnan(deuda) else deuda, None if math.isnan(gasto) else gasto))
+        return filas
+
+    def _normalizada(self, posicion):
+        return self._texto[self._inicios[posicion]:self._inicios[posicion + 1] - 1]
+
+    def buscar_ruc(self, ruc):
+        """Filas del RUC (una por campaña); lista vacía si no existe"""
+        i = bisect_left(self.rucs, ruc)
+        if i < len(self.rucs) and self.rucs[i] == ruc:
+            return self._filas(i)
+        return []
+
+    def buscar_prefijo(self, prefijo, limite=LIMITE_SUGERENCIAS):
+        """[(ruc, filas)] de los RUCs que empiezan con prefijo, en orden de RUC"""
+        inicio = bisect_left(self.rucs, prefijo)
+        fin = min(bisect_right(self.rucs, _fin_prefijo(prefijo)), inicio + limite)
+        return [(self.rucs[i], self._filas(i)) for i in range(inicio, fin)]
+
+    def _rango_palabras(self, prefijo):
+        """(desde, hasta) de las palabras del vocabulario que empiezan con prefijo"""
+        return (bisect_left(self._palabras, prefijo),
+                bisect_right(self._palabras, _fin_prefijo(prefijo)))
+
+    def buscar_razon_social(self, texto, limite=LIMITE_SUGERENCIAS):
+        """
+        [(ruc, filas)] de los RUCs en cuya razón social cada palabra escrita es el comienzo de
+        alguna palabra ('inv and' encuentra 'INVERSIONES ANDINA'), en orden de RUC.
+        Recorre solo los RUCs de la palabra escrita con menos apariciones.
+        """
+        escritas = normalizar(texto).split()
+        if not escritas:
+            return []
+        rangos = [self._rango_palabras(p) for p in escritas]
+        # La palabra más selectiva da los candidatos; las demás se comprueban en el texto
+        desde, hasta = min(rangos, key=lambda r: self._acumulado[r[1]] - self._acumulado[r[0]])
+        if desde == hasta:
+            return []
+        if hasta - desde == 1:
+            candidatos = self._apariciones[desde]
+        else:
+            candidatos = heapq.merge(*self._apariciones[desde:hasta])
+
+        resultados = []
+        anterior = -1
+        for posicion in candidatos:
+            if posicion == anterior:
+                continue
+            anterior = posicion
+            if len(escritas) > 1:
+                palabras = self._normalizada(posicion).split()
+                if not all(any(p.startswith(e) for p in palabras) for e in escritas):
+                    continue
+            resultados.append((self.rucs[posicion], self._filas(posicion)))
+            if len(resultados) >= limite:
+                break
+        return resultados
+
+    def sugerencias(self, texto, limite=LIMITE_SUGERENCIAS):
+        """Sugerencias para lo que se escribió: prefijo de RUC si son dígitos, si no razón social"""
+        texto = (texto or '').strip()
+        if not texto:
+            return []
+        if texto.isdigit():
+            return self.buscar_prefijo(texto, limite)
+        return self.buscar_razon_social(texto, limite)
+
+    def memoria(self):
+        """Bytes aproximados del índice (contenedores y los textos que guarda)"""
+        total = sys.getsizeof(self._texto)
+        for contenedor in (self.rucs, self._documentos, self._razones, self._palabras):
+            total += sys.getsizeof(contenedor) + sum(sys.getsizeof(t) for t in contenedor)
+        for contenedor in (self._campanas, self._asesores, self._apariciones):
+            total += sys.getsizeof(contenedor)
+        total += sum(sys.getsizeof(a) for a in self._apariciones)
+        total += sum(sys.getsizeof(t) for t in set(self._campanas) | set(self._asesores))
+        for columna in (self._desde, self._ids, self._deudas, self._gastos, self._inicios, self._acumulado):
+            total += sys.getsizeof(columna)
+        return total
+
+def cargar_catalogo(version=None):
+    """Lee la tabla rucs completa y arma el índice"""
+    with database.conectar() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        SELECT id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin
+        FROM rucs
+        ORDER BY ruc, id
+        ''')
+
+        return CatalogoRucs(cursor, version)
+
+_catalogos = {}
+_lock_catalogos = threading.Lock()
+
+def obtener_catalogo():
+    """
+    Catálogo de la BD actual (database.DB_PATH). Lo recarga si la versión de 'rucs' cambió
+    desde que se cargó (escrituras de este u otro proceso).
+    """
+    ruta = os.path.abspath(database.DB_PATH)
+    try:
+        version = database._versiones(('rucs',))
+    except sqlite3.OperationalError:
+        # BD sin versiones_datos (init_db no corrió): sin forma de saber si cambió
+        version = None
+
+    catalogo = _catalogos.get(ruta)
+    if catalogo is not None and version is not None and catalogo.version == version:
+        return catalogo
+
+    with _lock_catalogos:
+        catalogo = _catalogos.get(ruta)
+        if catalogo is None or version is None or catalogo.version != version:
+            catalogo = cargar_catalogo(version)
+            _catalogos[ruta] = catalogo
+    return catalogo
+
+def limpiar_catalogos():
+    """Descarta los catálogos cargados"""
+    with _lock_catalogos:
+        _catalogos.clear()
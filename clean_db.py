@@ -1,135 +1,66 @@
 #!/usr/bin/env python3
 """
-Script para limpiar la BD y crear nueva estructura
+Script para poner el catálogo de RUCs al día con el Excel
+Por defecto sincroniza (sincronizar_catalogo.py): aplica solo las entradas nuevas, modificadas
+y eliminadas, sin borrar la BD ni tocar los registros de pagos. Solo se eliminan entradas del
+mes del archivo (DATA ENERO 2026 -> 2026-01): los RUCs de otros meses se conservan.
+Con --desde-cero borra pagos.db y la vuelve a crear (se pierden los registros de pagos).
+Uso: python clean_db.py [archivo.xlsx] [--desde-cero]
 """
 
-import sqlite3
 import os
-from datetime import datetime
-import openpyxl
+import sys
+
+import database
+from sincronizar_catalogo import sincronizar_catalogo
 
 DB_PATH = "pagos.db"
 
 def crear_nueva_bd():
-    """Crea una nueva BD con la estructura correcta"""
-    
+    """Borra la BD y la crea vacía con el esquema de database.init_db"""
+
     # Eliminar BD anterior
     if os.path.exists(DB_PATH):
         os.remove(DB_PATH)
         print(f"✓ Base de datos anterior eliminada")
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Tabla de RUCs base (sin pagos)
-    cursor.execute('''
-    CREATE TABLE rucs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ruc TEXT UNIQUE NOT NULL,
-        id_documento TEXT UNIQUE NOT NULL,
-        razon_social TEXT NOT NULL,
-        campaña TEXT NOT NULL,
-        asesor TEXT,
-        fecha_creacion TEXT NOT NULL
-    )
-    ''')
-    
-    # Tabla ÚNICA de registros de pagos diarios
-    cursor.execute('''
-    CREATE TABLE registros_pagos (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        fecha_reporte TEXT NOT NULL,
-        ruc TEXT NOT NULL,
-        id_documento TEXT NOT NULL,
-        campaña TEXT NOT NULL,
-        asesor TEXT,
-        promesa_ga TEXT,
-        monto_gasto REAL,
-        fecha_pago_gasto TEXT,
-        promesa_planilla TEXT,
-        monto_planilla REAL,
-        fecha_pago_planilla TEXT,
-        observaciones TEXT,
-        fecha_registro TEXT NOT NULL
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+
+    database.DB_PATH = DB_PATH
+    database.init_db(forzar=True)
     print(f"✓ Nueva base de datos creada: {DB_PATH}")
 
 def importar_rucs_desde_excel(archivo_excel=r'DATA ENERO 2026.xlsx'):
-    """Importa solo los RUCs únicos del Excel"""
-    
-    print(f"\nImportando RUCs desde: {archivo_excel}")
-    
+    """Sincroniza los RUCs del Excel (una entrada por RUC y campaña)"""
+
+    print(f"\nSincronizando RUCs desde: {archivo_excel}")
+
     try:
-        wb = openpyxl.load_workbook(archivo_excel)
-        ws = wb.active
-        
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        rucs_procesados = set()
-        count = 0
-        
-        # Procesar filas (saltando encabezado)
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 1):
-            try:
-                if row_idx > 1 and row_idx % 1000 == 0:
-                    print(f"  Procesados {row_idx-1} registros...")
-                
-                campaña = row[0]
-                documento = str(int(row[1])) if row[1] else None
-                razon_social = row[2]
-                deuda_total = float(row[3]) if row[3] else 0
-                gastos_admin = float(row[4]) if row[4] else 0
-                periodos = row[5]
-                asesor = row[6]
-                
-                if not documento or not razon_social or not campaña:
-                    continue
-                
-                # Usar documento como RUC
-                ruc = documento
-                
-                # Evitar duplicados
-                if (ruc, campaña) in rucs_procesados:
-                    continue
-                
-                rucs_procesados.add((ruc, campaña))
-                
-                try:
-                    cursor.execute('''
-                    INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (ruc, documento, razon_social, campaña, asesor, datetime.now().isoformat()))
-                    count += 1
-                except sqlite3.IntegrityError:
-                    pass
-                
-            except Exception as e:
-                continue
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"✓ {count} RUCs únicos importados correctamente")
-        return count
-        
+        database.DB_PATH = DB_PATH
+        # Crea las tablas que falten y migra rucs a UNIQUE (ruc, campaña) si hace falta
+        database.init_db()
+        resultado = sincronizar_catalogo(archivo_excel, DB_PATH)
+
+        print(f"✓ {resultado.reporte()}")
+        return resultado
+
     except Exception as e:
-        print(f"✗ Error al importar: {e}")
-        return 0
+        print(f"✗ Error al sincronizar: {e}")
+        return None
 
 if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    archivo = argumentos[0] if argumentos else 'DATA ENERO 2026.xlsx'
+
     print("=" * 70)
-    print("HERRAMIENTA DE LIMPIEZA Y REINICIO DE BASE DE DATOS")
+    print("SINCRONIZACIÓN DEL CATÁLOGO DE RUCs")
     print("=" * 70)
-    
-    crear_nueva_bd()
-    count = importar_rucs_desde_excel()
-    
+
+    if '--desde-cero' in sys.argv:
+        crear_nueva_bd()
+    resultado = importar_rucs_desde_excel(archivo)
+    if resultado is None:
+        sys.exit(1)
+
     print("\n" + "=" * 70)
-    print(f"✓ PROCESO COMPLETADO - {count} RUCs en la base de datos")
+    print(f"✓ PROCESO COMPLETADO - {database.obtener_conteos()['rucs']} RUCs en la base de datos")
     print("=" * 70)
     print("\nAhora puedes usar la app para registrar pagos diarios.")
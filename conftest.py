@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Fixtures comunes de las pruebas
+"""
+
+import pytest
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+@pytest.fixture
+def bd_prueba(tmp_path, monkeypatch):
+    """
+    Fábrica de BDs de prueba en tmp_path. Cada llamada apunta database.DB_PATH a la BD,
+    renueva su pool y la crea:
+    - con n_registros > 0, sintética (generar_bd_sintetica con n_rucs y dias)
+    - si no, vacía con init_db (esquema=False solo configura el pool, sin crear nada)
+    Uso: bd_prueba("saldos.db", n_registros=1000, n_rucs=50, dias=10)
+    Retorna: ruta de la BD. Al terminar la prueba se cierran los pools.
+    """
+    def crear(nombre="pagos.db", n_registros=0, n_rucs=2000, dias=60, esquema=True):
+        db_path = str(tmp_path / nombre)
+        monkeypatch.setattr(database, 'DB_PATH', db_path)
+        database.configurar_pool()
+        if n_registros:
+            generar_bd_sintetica(db_path, n_registros=n_registros, n_rucs=n_rucs, dias=dias)
+        elif esquema:
+            database.init_db()
+        return db_path
+
+    yield crear
+    database.cerrar_pools()
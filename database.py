@@ -4,190 +4,1813 @@ Módulo de base de datos para Sistema de Registro de Pagos Diarios
 Estructura: Tabla de RUCs base + Tabla de registros de pagos diarios
 """
 
+import functools
+import hashlib
+import json
+import os
+import queue
 import sqlite3
-from datetime import datetime, date
-import pandas as pd
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import NamedTuple
 
 DB_PATH = "pagos.db"
 
-def init_db():
-    """Inicializa la base de datos (ya fue creada por clean_db.py)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Verificar que las tablas existan
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='rucs'")
-    if not cursor.fetchone():
-        # Si no existe, crearlas
-        cursor.execute('''
-        CREATE TABLE rucs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ruc TEXT UNIQUE NOT NULL,
-            id_documento TEXT UNIQUE NOT NULL,
-            razon_social TEXT NOT NULL,
-            campaña TEXT NOT NULL,
-            asesor TEXT,
-            deuda_total REAL,
-            gasto_admin REAL,
-            fecha_creacion TEXT NOT NULL
+# Tamaño del pool de conexiones (0 = sin pool, abre y cierra en cada llamada)
+POOL_SIZE = int(os.environ.get("PAGOS_POOL_SIZE", "4"))
+
+# Sentencias preparadas que sqlite3 mantiene en caché por conexión
+CACHED_STATEMENTS = 256
+
+# Perfiles de almacenamiento: journal_mode se fija en el archivo desde init_db(),
+# el resto de PRAGMAs se aplica una sola vez al crear cada conexión del pool
+PERFILES_ALMACENAMIENTO = {
+    # Comportamiento por defecto de SQLite (rollback journal), un solo usuario
+    'clasico': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # Varios asesores a la vez: con WAL los lectores no bloquean al escritor
+    'concurrente': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 134217728,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+    # WAL con fsync en cada commit (máxima durabilidad)
+    'seguro': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+
+PERFIL_ALMACENAMIENTO = os.environ.get("PAGOS_PERFIL", "concurrente")
+
+# Índices secundarios que init_db() crea y mantiene (nombre -> tabla y columnas).
+# Los índices con prefijo idx_ que ya no estén aquí se eliminan.
+INDICES_GESTIONADOS = {
+    # Registros de un día (Dashboard, Ver Registros) y rangos (Ranking)
+    'idx_registros_fecha_reporte': 'registros_pagos (fecha_reporte, ruc)',
+    # Saldo por RUC y búsqueda de duplicados
+    'idx_registros_ruc': 'registros_pagos (ruc, fecha_reporte)',
+    # Duplicados exactos: una sola búsqueda por huella de contenido
+    'idx_registros_huella': 'registros_pagos (huella)',
+    # Resúmenes por fecha de pago: cubren promesa, asesor y monto sin leer la tabla
+    'idx_registros_pago_gasto': 'registros_pagos (fecha_pago_gasto, promesa_ga, asesor, monto_gasto)',
+    'idx_registros_pago_planilla': 'registros_pagos (fecha_pago_planilla, promesa_planilla, asesor, monto_planilla)',
+    # Promesas por estado dentro de un rango de fechas de reporte
+    'idx_registros_estado_ga': 'registros_pagos (estado_ga, fecha_reporte)',
+    'idx_registros_estado_planilla': 'registros_pagos (estado_planilla, fecha_reporte)',
+    # Motor de vencimiento: solo toca las filas que cambian de estado
+    'idx_registros_vencimiento_ga': 'registros_pagos (estado_ga, fecha_pago_gasto)',
+    'idx_registros_vencimiento_planilla': 'registros_pagos (estado_planilla, fecha_pago_planilla)',
+    # Mínimo y máximo de una campaña al quitar un extremo de estadisticas_montos
+    'idx_registros_extremos_gasto': 'registros_pagos (campaña, monto_gasto) WHERE monto_gasto > 0',
+    'idx_registros_extremos_planilla': 'registros_pagos (campaña, monto_planilla) WHERE monto_planilla > 0',
+    # Listas de campañas y asesores del catálogo de RUCs
+    'idx_rucs_campana': 'rucs (campaña)',
+    'idx_rucs_asesor': 'rucs (asesor)',
+}
+
+# Columnas de cada tipo de pago en registros_pagos: (fecha_pago, promesa, estado, monto)
+COLUMNAS_TIPO_PAGO = {
+    'gasto': ('fecha_pago_gasto', 'promesa_ga', 'estado_ga', 'monto_gasto'),
+    'planilla': ('fecha_pago_planilla', 'promesa_planilla', 'estado_planilla', 'monto_planilla'),
+}
+
+# Campos que definen un registro duplicado (detectar_duplicado_exacto) y su tipo
+CAMPOS_HUELLA = [
+    ('fecha_reporte', 'texto'), ('ruc', 'texto'), ('id_documento', 'texto'),
+    ('campaña', 'texto'), ('asesor', 'texto'),
+    ('promesa_ga', 'texto'), ('monto_gasto', 'monto'), ('fecha_pago_gasto', 'texto'),
+    ('promesa_planilla', 'texto'), ('monto_planilla', 'monto'), ('fecha_pago_planilla', 'texto'),
+    ('observaciones', 'texto'),
+]
+
+# detectar_monto_anormal: con al menos MIN_MUESTRAS_DESVIACION montos se alerta a más de
+# UMBRAL_DESVIACIONES desviaciones estándar del promedio; con menos, fuera del 50%-150%
+MIN_MUESTRAS_DESVIACION = 30
+UMBRAL_DESVIACIONES = 3
+
+# Diferencia de monto que se tolera entre resumen_diario y un recálculo completo
+# (las sumas y restas incrementales de REAL acumulan error de redondeo)
+TOLERANCIA_RESUMEN = 0.005
+
+def validar_perfil(perfil):
+    """Valida el nombre de un perfil de almacenamiento y retorna sus PRAGMAs"""
+    if perfil not in PERFILES_ALMACENAMIENTO:
+        raise ValueError(
+            f"Perfil de almacenamiento desconocido: {perfil} "
+            f"(opciones: {', '.join(PERFILES_ALMACENAMIENTO)})"
         )
-        ''')
-    else:
-        # Agregar columnas si no existen
-        cursor.execute("PRAGMA table_info(rucs)")
-        columns = [col[1] for col in cursor.fetchall()]
+    return PERFILES_ALMACENAMIENTO[perfil]
+
+class PoolConexiones:
+    """
+    Pool de conexiones SQLite reutilizables.
+    Cada conexión se crea una vez con sus PRAGMAs y conserva su caché de
+    sentencias entre llamadas. Una conexión solo la usa un hilo a la vez.
+    """
+    
+    def __init__(self, db_path, tamano=POOL_SIZE, perfil=None):
+        self.db_path = db_path
+        self.tamano = tamano
+        self.perfil = perfil or PERFIL_ALMACENAMIENTO
+        self.pragmas = {k: v for k, v in validar_perfil(self.perfil).items()
+                        if k != 'journal_mode'}
+        self._libres = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._creadas = 0
+    
+    def _crear_conexion(self):
+        """Abre una conexión nueva y le aplica los PRAGMAs del pool"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        for nombre, valor in self.pragmas.items():
+            conn.execute(f'PRAGMA {nombre} = {valor}')
+        return conn
+    
+    def obtener(self):
+        """Toma una conexión libre, crea una nueva o espera a que se libere una"""
+        if self.tamano <= 0:
+            return self._crear_conexion()
+        
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            crear = self._creadas < self.tamano
+            if crear:
+                self._creadas += 1
+        
+        if crear:
+            try:
+                return self._crear_conexion()
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                raise
         
-        if 'deuda_total' not in columns:
-            cursor.execute('ALTER TABLE rucs ADD COLUMN deuda_total REAL')
+        return self._libres.get()
+    
+    def devolver(self, conn):
+        """Devuelve una conexión al pool (o la cierra si el pool está desactivado)"""
+        if conn.in_transaction:
+            conn.rollback()
         
-        if 'gasto_admin' not in columns:
-            cursor.execute('ALTER TABLE rucs ADD COLUMN gasto_admin REAL')
+        if self.tamano <= 0:
+            conn.close()
+        else:
+            self._libres.put(conn)
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='registros_pagos'")
-    if not cursor.fetchone():
+    @contextmanager
+    def conexion(self):
+        """Context manager: presta una conexión y la devuelve al salir"""
+        conn = self.obtener()
+        try:
+            yield conn
+        finally:
+            self.devolver(conn)
+    
+    def cerrar(self):
+        """Cierra todas las conexiones libres del pool"""
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._creadas -= 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def obtener_pool(db_path=None):
+    """Obtiene (o crea) el pool de conexiones para la ruta de BD indicada"""
+    db_path = db_path or DB_PATH
+    clave = (os.getpid(), os.path.abspath(db_path))
+    
+    pool = _pools.get(clave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                pool = PoolConexiones(db_path)
+                _pools[clave] = pool
+    return pool
+
+def configurar_pool(tamano=None, perfil=None, db_path=None):
+    """Reemplaza el pool de la BD con un nuevo tamaño y/o perfil de almacenamiento"""
+    db_path = db_path or DB_PATH
+    clave = (os.getpid(), os.path.abspath(db_path))
+    
+    with _pools_lock:
+        anterior = _pools.pop(clave, None)
+        if anterior is not None:
+            anterior.cerrar()
+            if perfil is None:
+                perfil = anterior.perfil
+        pool = PoolConexiones(
+            db_path,
+            tamano=POOL_SIZE if tamano is None else tamano,
+            perfil=perfil
+        )
+        _pools[clave] = pool
+    return pool
+
+def cerrar_pools():
+    """Cierra todas las conexiones libres de todos los pools"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.cerrar()
+        _pools.clear()
+
+@contextmanager
+def conectar():
+    """Presta una conexión del pool de DB_PATH (uso: with conectar() as conn)"""
+    with obtener_pool().conexion() as conn:
+        yield conn
+
+def aplicar_perfil(perfil=None):
+    """
+    Pone pagos.db en el perfil de almacenamiento indicado (None = el perfil actual).
+    Fija journal_mode en el archivo y, si cambió el perfil, recrea el pool
+    para que todas las conexiones usen los nuevos PRAGMAs.
+    Retorna: journal_mode vigente
+    """
+    pool = obtener_pool()
+    perfil = perfil or pool.perfil
+    journal_mode = validar_perfil(perfil)['journal_mode']
+    
+    if pool.perfil != perfil:
+        pool = configurar_pool(perfil=perfil)
+    
+    with pool.conexion() as conn:
+        modo = conn.execute(f'PRAGMA journal_mode = {journal_mode}').fetchone()[0]
+    return modo
+
+# Esquemas ya verificados por init_db en este proceso: (ruta, perfil) -> firma del archivo
+_esquemas_verificados = {}
+
+def _firma_esquema():
+    """
+    (inodo, PRAGMA schema_version) del archivo de la BD, o None si no existe.
+    Cambia si el archivo se recrea (clean_db.py) o si alguien altera el esquema.
+    """
+    try:
+        inodo = os.stat(DB_PATH).st_ino
+    except FileNotFoundError:
+        return None
+    with conectar() as conn:
+        return inodo, conn.execute('PRAGMA schema_version').fetchone()[0]
+
+# Tabla de RUCs: una fila por RUC y campaña (un RUC puede estar en varias campañas)
+_SQL_TABLA_RUCS = '''
+            CREATE TABLE {tabla} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ruc TEXT NOT NULL,
+                id_documento TEXT NOT NULL,
+                razon_social TEXT NOT NULL,
+                campaña TEXT NOT NULL,
+                asesor TEXT,
+                deuda_total REAL,
+                gasto_admin REAL,
+                fecha_creacion TEXT NOT NULL,
+                mes TEXT,
+                UNIQUE (ruc, campaña)
+            )
+            '''
+
+def _migrar_rucs_por_campana(cursor):
+    """
+    Si rucs tiene los UNIQUE anteriores (ruc e id_documento solos, que descartaban las demás
+    campañas de un RUC), la reconstruye con UNIQUE (ruc, campaña) conservando filas e ids.
+    Sus triggers e índices se van con la tabla vieja: init_db los vuelve a crear después.
+    Retorna: True si migró
+    """
+    cursor.execute("PRAGMA index_list(rucs)")
+    unicos = [fila[1] for fila in cursor.fetchall() if fila[2]]
+    claves = []
+    for indice in unicos:
+        cursor.execute(f"PRAGMA index_info('{indice}')")
+        claves.append([fila[2] for fila in cursor.fetchall()])
+    if ['ruc', 'campaña'] in claves and not (['ruc'] in claves or ['id_documento'] in claves):
+        return False
+    
+    columnas = ('id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin, '
+                'fecha_creacion, mes')
+    cursor.execute('DROP TABLE IF EXISTS rucs_migracion')
+    cursor.execute(_SQL_TABLA_RUCS.format(tabla='rucs_migracion'))
+    # Si ya había (ruc, campaña) repetidos (no debería) queda la fila más antigua
+    cursor.execute(f'INSERT OR IGNORE INTO rucs_migracion ({columnas}) SELECT {columnas} FROM rucs ORDER BY id')
+    cursor.execute('DROP TABLE rucs')
+    cursor.execute('ALTER TABLE rucs_migracion RENAME TO rucs')
+    return True
+
+def init_db(perfil=None, forzar=False):
+    """Inicializa la base de datos (ya fue creada por clean_db.py)
+    perfil: perfil de almacenamiento (ver PERFILES_ALMACENAMIENTO)
+    Las verificaciones del esquema se hacen una vez por proceso: si el archivo y su
+    esquema no cambiaron desde la última vez, no se repiten (forzar=True las repite).
+    Retorna: True si verificó el esquema, False si ya estaba verificado"""
+    clave = (os.path.abspath(DB_PATH), perfil or obtener_pool().perfil)
+    if not forzar and clave in _esquemas_verificados:
+        firma = _firma_esquema()
+        if firma is not None and firma == _esquemas_verificados[clave]:
+            return False
+    
+    aplicar_perfil(perfil)
+    
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Verificar que las tablas existan
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='rucs'")
+        if not cursor.fetchone():
+            # Si no existe, crearlas
+            cursor.execute(_SQL_TABLA_RUCS.format(tabla='rucs'))
+        else:
+            # Agregar columnas si no existen
+            cursor.execute("PRAGMA table_info(rucs)")
+            columns = [col[1] for col in cursor.fetchall()]
+            
+            if 'deuda_total' not in columns:
+                cursor.execute('ALTER TABLE rucs ADD COLUMN deuda_total REAL')
+            
+            if 'gasto_admin' not in columns:
+                cursor.execute('ALTER TABLE rucs ADD COLUMN gasto_admin REAL')
+            
+            # Mes del workbook de donde vino el RUC ('2026-01'), ver importador_excel.mes_de_archivo
+            if 'mes' not in columns:
+                cursor.execute('ALTER TABLE rucs ADD COLUMN mes TEXT')
+            
+            _migrar_rucs_por_campana(cursor)
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='registros_pagos'")
+        if not cursor.fetchone():
+            cursor.execute('''
+            CREATE TABLE registros_pagos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fecha_reporte TEXT NOT NULL,
+                ruc TEXT NOT NULL,
+                id_documento TEXT NOT NULL,
+                campaña TEXT NOT NULL,
+                asesor TEXT,
+                promesa_ga TEXT,
+                monto_gasto REAL,
+                fecha_pago_gasto TEXT,
+                estado_ga TEXT DEFAULT 'A VENCER',
+                promesa_planilla TEXT,
+                monto_planilla REAL,
+                fecha_pago_planilla TEXT,
+                estado_planilla TEXT DEFAULT 'A VENCER',
+                observaciones TEXT,
+                fecha_registro TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1
+            )
+            ''')
+        else:
+            # Agregar columnas de estado si no existen
+            cursor.execute("PRAGMA table_info(registros_pagos)")
+            columns = [col[1] for col in cursor.fetchall()]
+            
+            if 'estado_ga' not in columns:
+                cursor.execute('ALTER TABLE registros_pagos ADD COLUMN estado_ga TEXT DEFAULT "A VENCER"')
+            
+            if 'estado_planilla' not in columns:
+                cursor.execute('ALTER TABLE registros_pagos ADD COLUMN estado_planilla TEXT DEFAULT "A VENCER"')
+            
+            # Versión de la fila para la edición optimista (actualizar_registro_si_version)
+            if 'version' not in columns:
+                cursor.execute('ALTER TABLE registros_pagos ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+        
+        # Huella de contenido para detectar duplicados exactos (columna generada;
+        # al crear idx_registros_huella se calcula para todos los registros existentes)
+        cursor.execute("PRAGMA table_xinfo(registros_pagos)")
+        if 'huella' not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute(f'''
+            ALTER TABLE registros_pagos ADD COLUMN huella TEXT
+            GENERATED ALWAYS AS ({_sql_huella()}) VIRTUAL
+            ''')
+        
+        # Metadatos clave/valor (marcas de agua, huellas de archivos, etc.)
         cursor.execute('''
-        CREATE TABLE registros_pagos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            fecha_reporte TEXT NOT NULL,
-            ruc TEXT NOT NULL,
-            id_documento TEXT NOT NULL,
-            campaña TEXT NOT NULL,
-            asesor TEXT,
-            promesa_ga TEXT,
-            monto_gasto REAL,
-            fecha_pago_gasto TEXT,
-            estado_ga TEXT DEFAULT 'A VENCER',
-            promesa_planilla TEXT,
-            monto_planilla REAL,
-            fecha_pago_planilla TEXT,
-            estado_planilla TEXT DEFAULT 'A VENCER',
-            observaciones TEXT,
-            fecha_registro TEXT NOT NULL
+        CREATE TABLE IF NOT EXISTS metadatos (
+            clave TEXT PRIMARY KEY,
+            valor TEXT,
+            actualizado TEXT NOT NULL
         )
         ''')
-    else:
-        # Agregar columnas de estado si no existen
-        cursor.execute("PRAGMA table_info(registros_pagos)")
-        columns = [col[1] for col in cursor.fetchall()]
         
-        if 'estado_ga' not in columns:
-            cursor.execute('ALTER TABLE registros_pagos ADD COLUMN estado_ga TEXT DEFAULT "A VENCER"')
+        # Estado de las tareas de mantenimiento (ver programador.py)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tareas_programadas (
+            nombre TEXT PRIMARY KEY,
+            estado TEXT NOT NULL,
+            proxima TEXT,
+            ultimo_inicio TEXT,
+            ultimo_fin TEXT,
+            duracion_ms REAL,
+            resultado TEXT,
+            error TEXT,
+            ejecuciones INTEGER NOT NULL DEFAULT 0,
+            fallos INTEGER NOT NULL DEFAULT 0,
+            proceso TEXT
+        )
+        ''')
         
-        if 'estado_planilla' not in columns:
-            cursor.execute('ALTER TABLE registros_pagos ADD COLUMN estado_planilla TEXT DEFAULT "A VENCER"')
+        mantener_indices(cursor)
+        mantener_resumen_diario(cursor)
+        mantener_estadisticas_montos(cursor)
+        mantener_saldos_ruc(cursor)
+        mantener_versiones_datos(cursor)
+        mantener_contadores(cursor)
+
+        conn.commit()
+    
+    _esquemas_verificados[clave] = _firma_esquema()
+    return True
+
+def mantener_indices(cursor):
+    """
+    Crea los índices de INDICES_GESTIONADOS que falten y elimina los idx_ obsoletos.
+    Si hubo cambios, actualiza las estadísticas del planificador.
+    Retorna: (creados, eliminados)
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx\\_%' ESCAPE '\\'")
+    existentes = {row[0] for row in cursor.fetchall()}
+    
+    creados = []
+    for nombre, definicion in INDICES_GESTIONADOS.items():
+        if nombre not in existentes:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {nombre} ON {definicion}')
+            creados.append(nombre)
+    
+    eliminados = []
+    for nombre in sorted(existentes - set(INDICES_GESTIONADOS)):
+        cursor.execute(f'DROP INDEX IF EXISTS {nombre}')
+        eliminados.append(nombre)
+    
+    if creados or eliminados:
+        cursor.execute('ANALYZE')
     
-    conn.commit()
-    conn.close()
+    return creados, eliminados
+
+def _mantener_triggers(cursor, prefijo, triggers):
+    """
+    Crea los triggers que falten (nombre -> CREATE TRIGGER), vuelve a crear los que cambiaron
+    de definición y elimina los que empiezan con prefijo y ya no están en triggers.
+    Retorna: lista de triggers creados
+    """
+    patron = prefijo.replace('_', '\\_') + '%'
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name LIKE ? ESCAPE '\\'",
+                   (patron,))
+    existentes = dict(cursor.fetchall())
+
+    # sqlite_master guarda el texto del CREATE TRIGGER tal como se ejecutó
+    for nombre in sorted(existentes):
+        if nombre not in triggers or existentes[nombre] != triggers[nombre].strip():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nombre}')
+
+    faltantes = [nombre for nombre in triggers
+                 if existentes.get(nombre) != triggers[nombre].strip()]
+    for nombre in faltantes:
+        cursor.execute(triggers[nombre])
+    return faltantes
+
+# Versiones de datos: un contador por ámbito ('registros', 'registros.fecha_reporte:<fecha>',
+# 'registros.fecha_pago:<fecha>', 'registros.ruc:<ruc>', 'rucs', 'rucs.ruc:<ruc>') que los
+# triggers suben en cada escritura, también las hechas por otros procesos o scripts.
+# La caché de consultas guarda cada resultado con las versiones de los ámbitos que leyó.
+# '__epoca__' cambia cuando se (re)crean los triggers, para no confundir BDs recreadas.
+
+EPOCA_DATOS = '__epoca__'
 
+def _sql_ambitos_registro(fila):
+    """Expresiones SQL de los ámbitos de la fila NEW/OLD de registros_pagos"""
+    return [f"'registros.fecha_reporte:' || {fila}.fecha_reporte",
+            f"'registros.fecha_pago:' || {fila}.fecha_pago_gasto",
+            f"'registros.fecha_pago:' || {fila}.fecha_pago_planilla",
+            f"'registros.ruc:' || {fila}.ruc"]
+
+def _sql_subir_versiones(ambitos):
+    """Sentencia de trigger que suma 1 a la versión de cada ámbito (una vez por ámbito)"""
+    seleccion = ' UNION '.join(f'SELECT {ambito} AS ambito' for ambito in ambitos)
+    return f'''
+        INSERT INTO versiones_datos (ambito, version)
+        SELECT ambito, 1 FROM ({seleccion}) WHERE ambito IS NOT NULL
+        ON CONFLICT (ambito) DO UPDATE SET version = version + 1;'''
+
+def triggers_versiones_datos():
+    """Triggers que mantienen versiones_datos (nombre -> sentencia CREATE TRIGGER)"""
+    ambitos = {
+        'registros_pagos': ("'registros'", _sql_ambitos_registro),
+        'rucs': ("'rucs'", lambda fila: [f"'rucs.ruc:' || {fila}.ruc"]),
+    }
+    triggers = {}
+    for tabla, (general, por_fila) in ambitos.items():
+        for evento, filas in (('insert', ['NEW']), ('update', ['OLD', 'NEW']), ('delete', ['OLD'])):
+            nombre = f'trg_versiones_{tabla}_{evento}'
+            sentencia = _sql_subir_versiones([general] + [a for fila in filas for a in por_fila(fila)])
+            triggers[nombre] = f'''
+            CREATE TRIGGER {nombre} AFTER {evento.upper()} ON {tabla}
+            BEGIN{sentencia}
+            END'''
+    return triggers
+
+def mantener_versiones_datos(cursor):
+    """
+    Crea versiones_datos y sus triggers si faltan (y en ese caso cambia la época).
+    Retorna: True si se cambió la época
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS versiones_datos (
+        ambito TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+
+    faltantes = _mantener_triggers(cursor, 'trg_versiones_', triggers_versiones_datos())
+    cursor.execute('SELECT 1 FROM versiones_datos WHERE ambito = ?', (EPOCA_DATOS,))
+    if faltantes or not cursor.fetchone():
+        cursor.execute('INSERT OR REPLACE INTO versiones_datos (ambito, version) VALUES (?, ?)',
+                       (EPOCA_DATOS, int.from_bytes(os.urandom(7), 'big')))
+        return True
+    return False
+
+def _versiones(ambitos):
+    """Versiones actuales de los ámbitos (0 si nunca se escribió), más la época"""
+    ambitos = (EPOCA_DATOS,) + ambitos
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT ambito, version FROM versiones_datos
+        WHERE ambito IN ({', '.join('?' * len(ambitos))})
+        ''', ambitos)
+        versiones = dict(cursor.fetchall())
+    return tuple(versiones.get(ambito, 0) for ambito in ambitos)
+
+# Entradas de la caché de consultas (0 = sin caché)
+CACHE_CONSULTAS = int(os.environ.get("PAGOS_CACHE_CONSULTAS", "512"))
+
+class CacheConsultas:
+    """
+    Caché LRU de resultados de lectura, compartida por todos los hilos (usuarios).
+    Cada entrada guarda las versiones de datos con que se calculó y solo se reutiliza
+    mientras sigan siendo las mismas.
+    """
+
+    def __init__(self, tamano=CACHE_CONSULTAS):
+        self.tamano = tamano
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.limpiar()
+
+    def obtener(self, clave, versiones):
+        """Retorna (encontrado, resultado) y cuenta el acierto o fallo"""
+        nombre = clave[0]
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            encontrado = entrada is not None and entrada[0] == versiones
+            if encontrado:
+                self._entradas.move_to_end(clave)
+            contador = self._por_funcion.setdefault(nombre, [0, 0])
+            contador[0 if encontrado else 1] += 1
+            if encontrado:
+                self.aciertos += 1
+                return True, entrada[1]
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, clave, versiones, resultado):
+        """Guarda un resultado y desaloja el menos usado si se pasa del tamaño"""
+        with self._lock:
+            self._entradas[clave] = (versiones, resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.tamano:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores"""
+        with self._lock:
+            self._entradas.clear()
+            self._por_funcion = {}
+            self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self):
+        """Contadores de la caché: aciertos, fallos, desalojos, entradas y por función"""
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+                'entradas': len(self._entradas),
+                'tamano': self.tamano,
+                'por_funcion': {nombre: tuple(c) for nombre, c in self._por_funcion.items()},
+            }
+
+_cache_consultas = CacheConsultas()
+
+def estadisticas_cache():
+    """Aciertos, fallos y desalojos de la caché de consultas"""
+    return _cache_consultas.estadisticas()
+
+def limpiar_cache():
+    """Vacía la caché de consultas"""
+    _cache_consultas.limpiar()
+
+def _copiar_resultado(resultado):
+    """Copia superficial de listas y dicts para que quien llama no altere la caché"""
+    if isinstance(resultado, list):
+        return list(resultado)
+    if isinstance(resultado, dict):
+        return {k: _copiar_resultado(v) for k, v in resultado.items()}
+    return resultado
+
+def cacheado(*ambitos):
+    """
+    Decorador de funciones de lectura: reutiliza el resultado para los mismos argumentos
+    mientras no cambien las versiones de sus ámbitos. Cada ámbito es un texto o una función
+    que recibe los mismos argumentos y retorna el texto (p. ej. el ámbito de una fecha).
+    La función original queda en .sin_cache.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if _cache_consultas.tamano <= 0:
+                return funcion(*args, **kwargs)
+            # El día forma parte de la clave: varias lecturas usan "hoy" por defecto
+            clave = (funcion.__name__, os.path.abspath(DB_PATH), date.today().isoformat(),
+                     args, tuple(sorted(kwargs.items())))
+            try:
+                hash(clave)
+                versiones = _versiones(tuple(a(*args, **kwargs) if callable(a) else a for a in ambitos))
+            except (TypeError, sqlite3.OperationalError):
+                # Argumentos no hashables o BD sin versiones_datos (init_db no corrió)
+                return funcion(*args, **kwargs)
+
+            encontrado, resultado = _cache_consultas.obtener(clave, versiones)
+            if not encontrado:
+                # Las versiones se leyeron antes de la consulta: si hay una escritura en medio,
+                # la entrada queda con versiones viejas y la próxima lectura la recalcula
+                resultado = funcion(*args, **kwargs)
+                _cache_consultas.guardar(clave, versiones, resultado)
+            return _copiar_resultado(resultado)
+        envoltura.sin_cache = funcion
+        return envoltura
+    return decorador
+
+# Lotes de lecturas independientes (las de una página) ejecutadas en paralelo.
+# Cada lectura toma su propia conexión del pool; sqlite3 libera el GIL mientras SQLite
+# ejecuta la consulta y en WAL los lectores no se bloquean entre sí.
+
+# Hilos para los lotes de lecturas (1 = en secuencia, en el hilo que las envía)
+HILOS_CONSULTAS = int(os.environ.get("PAGOS_HILOS_CONSULTAS", str(max(POOL_SIZE, 1))))
+
+_ejecutor_consultas = None
+_ejecutor_lock = threading.Lock()
+
+def _obtener_ejecutor():
+    """Pool de hilos de las lecturas en paralelo (uno por proceso, creado al primer uso)"""
+    global _ejecutor_consultas
+    with _ejecutor_lock:
+        if _ejecutor_consultas is None or _ejecutor_consultas[0] != os.getpid():
+            _ejecutor_consultas = (os.getpid(), ThreadPoolExecutor(max_workers=HILOS_CONSULTAS,
+                                                                   thread_name_prefix='consultas'))
+        return _ejecutor_consultas[1]
+
+class LoteConsultas:
+    """
+    Lecturas independientes enviadas juntas: enviar() no espera y resultado() espera la
+    lectura pedida (y relanza su excepción, si la hubo). Sin paralelo (HILOS_CONSULTAS <= 1)
+    cada lectura se ejecuta al enviarla, como una llamada normal.
+    Solo para funciones de lectura de este módulo: no deben usar st.* ni enviar otros lotes.
+    """
+
+    def __init__(self, paralelo=None):
+        self.paralelo = HILOS_CONSULTAS > 1 if paralelo is None else paralelo
+        self._lecturas = {}
+
+    def enviar(self, nombre, funcion, *args, **kwargs):
+        """Envía funcion(*args, **kwargs) con el nombre indicado. Retorna: el lote"""
+        if self.paralelo:
+            lectura = _obtener_ejecutor().submit(funcion, *args, **kwargs)
+        else:
+            lectura = Future()
+            try:
+                lectura.set_result(funcion(*args, **kwargs))
+            except Exception as e:
+                lectura.set_exception(e)
+        self._lecturas[nombre] = lectura
+        return self
+
+    def resultado(self, nombre):
+        """Espera y retorna el resultado de la lectura nombre"""
+        return self._lecturas[nombre].result()
+
+    def resultados(self):
+        """Espera todas las lecturas: {nombre: resultado}"""
+        return {nombre: lectura.result() for nombre, lectura in self._lecturas.items()}
+
+def consultar_en_paralelo(paralelo=None, **lecturas):
+    """
+    Ejecuta lecturas independientes y retorna {nombre: resultado}.
+    Cada lectura es una tupla (funcion, *args), p. ej. conteos=(obtener_conteos,)
+    """
+    lote = LoteConsultas(paralelo)
+    for nombre, (funcion, *args) in lecturas.items():
+        lote.enviar(nombre, funcion, *args)
+    return lote.resultados()
+
+def _ambito_fecha_reporte(fecha=None):
+    """Ámbito de los registros reportados en una fecha (hoy por defecto)"""
+    return f'registros.fecha_reporte:{fecha or date.today().isoformat()}'
+
+def _ambito_fecha_pago(fecha=None):
+    """Ámbito de los pagos de gasto o planilla con fecha de pago en una fecha (hoy por defecto)"""
+    return f'registros.fecha_pago:{fecha or date.today().isoformat()}'
+
+# Contadores para el panel de estado: total de registros, registros por fecha de reporte
+# ('registros:<fecha>') y RUCs cargados, con la hora de la última escritura de cada tabla.
+# Los mantienen triggers, así el panel no depende del tamaño del historial.
+
+_SQL_AHORA = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+def _sql_sumar_contadores(cambios):
+    """Sentencia de trigger que suma a cada contador (clave SQL -> incremento) y marca la hora"""
+    seleccion = ' UNION ALL '.join(f'SELECT {clave} AS clave, {incremento} AS valor'
+                                   for clave, incremento in cambios)
+    return f'''
+        INSERT INTO contadores (clave, valor, actualizado)
+        SELECT clave, valor, {_SQL_AHORA} FROM ({seleccion}) WHERE true
+        ON CONFLICT (clave) DO UPDATE SET
+            valor = valor + excluded.valor,
+            actualizado = excluded.actualizado;'''
+
+def triggers_contadores():
+    """Triggers que mantienen contadores (nombre -> sentencia CREATE TRIGGER)"""
+    dia = "'registros:' || {fila}.fecha_reporte"
+    cambios = {
+        ('registros_pagos', 'insert'): [("'registros'", 1), (dia.format(fila='NEW'), 1)],
+        ('registros_pagos', 'update'): [("'registros'", 0), (dia.format(fila='OLD'), -1),
+                                        (dia.format(fila='NEW'), 1)],
+        ('registros_pagos', 'delete'): [("'registros'", -1), (dia.format(fila='OLD'), -1)],
+        ('rucs', 'insert'): [("'rucs'", 1)],
+        ('rucs', 'update'): [("'rucs'", 0)],
+        ('rucs', 'delete'): [("'rucs'", -1)],
+    }
+    triggers = {}
+    for (tabla, evento), suma in cambios.items():
+        nombre = f'trg_contadores_{tabla}_{evento}'
+        triggers[nombre] = f'''
+        CREATE TRIGGER {nombre} AFTER {evento.upper()} ON {tabla}
+        BEGIN{_sql_sumar_contadores(suma)}
+        END'''
+    return triggers
+
+def _calcular_contadores(cursor):
+    """Recalcula los contadores desde las tablas: dict clave -> valor"""
+    cursor.execute('SELECT fecha_reporte, COUNT(*) FROM registros_pagos GROUP BY fecha_reporte')
+    contadores = {f'registros:{fecha}': n for fecha, n in cursor.fetchall()}
+    contadores['registros'] = sum(contadores.values())
+    cursor.execute('SELECT COUNT(*) FROM rucs')
+    contadores['rucs'] = cursor.fetchone()[0]
+    return contadores
+
+def _reconstruir_contadores(cursor):
+    """Vacía y vuelve a llenar contadores, sin hacer commit"""
+    contadores = _calcular_contadores(cursor)
+    # Última escritura conocida: la fecha de alta más reciente de cada tabla
+    cursor.execute('SELECT (SELECT MAX(fecha_registro) FROM registros_pagos), (SELECT MAX(fecha_creacion) FROM rucs)')
+    ahora = datetime.now().isoformat(timespec='milliseconds')
+    ultima = dict(zip(('registros', 'rucs'), (valor or ahora for valor in cursor.fetchone())))
+    cursor.execute('DELETE FROM contadores')
+    cursor.executemany('INSERT INTO contadores (clave, valor, actualizado) VALUES (?, ?, ?)',
+                       ((clave, valor, ultima.get(clave, ahora)) for clave, valor in contadores.items()))
+    return len(contadores)
+
+def mantener_contadores(cursor):
+    """
+    Crea contadores y sus triggers si faltan (y en ese caso la reconstruye).
+    Retorna: True si se reconstruyó
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS contadores (
+        clave TEXT PRIMARY KEY,
+        valor INTEGER NOT NULL,
+        actualizado TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''')
+
+    faltantes = _mantener_triggers(cursor, 'trg_contadores_', triggers_contadores())
+    if faltantes:
+        _reconstruir_contadores(cursor)
+    return bool(faltantes)
+
+def verificar_contadores():
+    """
+    Compara contadores con un recálculo desde las tablas.
+    Retorna: lista de diferencias (clave, esperado, actual); vacía si es consistente
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        esperado = _calcular_contadores(cursor)
+        cursor.execute('SELECT clave, valor FROM contadores')
+        actual = dict(cursor.fetchall())
+    return [(clave, esperado.get(clave, 0), actual.get(clave, 0))
+            for clave in sorted(set(esperado) | set(actual))
+            if esperado.get(clave, 0) != actual.get(clave, 0)]
+
+def obtener_conteos():
+    """
+    Estado de la BD para el panel lateral, con una lectura por clave primaria.
+    Retorna: dict con total_registros, registros_hoy, rucs y ultima_escritura
+    (hora ISO de la última escritura en registros_pagos o rucs, None si no hubo)
+    """
+    hoy = f'registros:{date.today().isoformat()}'
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT clave, valor, actualizado FROM contadores WHERE clave IN ('registros', 'rucs', ?)",
+                       (hoy,))
+        filas = {clave: (valor, actualizado) for clave, valor, actualizado in cursor.fetchall()}
+
+    return {
+        'total_registros': filas.get('registros', (0, None))[0],
+        'registros_hoy': filas.get(hoy, (0, None))[0],
+        'rucs': filas.get('rucs', (0, None))[0],
+        'ultima_escritura': max((filas[c][1] for c in ('registros', 'rucs') if c in filas), default=None),
+    }
+
+# Resumen diario materializado: una fila por (fecha_pago, tipo_pago, asesor, promesa, estado)
+# con la cantidad de registros y el monto cobrado. Los triggers de registros_pagos lo
+# mantienen al día, así los resúmenes del Dashboard no dependen del tamaño del historial.
+# asesor, promesa y estado NULL se guardan como '' para que formen parte de la clave.
+
+def _sql_sumar_resumen(tipo, fila):
+    """Sentencias de trigger que suman la fila NEW/OLD al resumen del tipo de pago"""
+    fecha, promesa, estado, monto = COLUMNAS_TIPO_PAGO[tipo]
+    return f'''
+        INSERT INTO resumen_diario
+        (fecha_pago, tipo_pago, asesor, promesa, estado, registros, registros_con_monto, monto)
+        SELECT {fila}.{fecha}, '{tipo}', COALESCE({fila}.asesor, ''),
+               COALESCE({fila}.{promesa}, ''), COALESCE({fila}.{estado}, ''), 1,
+               CASE WHEN {fila}.{monto} > 0 THEN 1 ELSE 0 END,
+               CASE WHEN {fila}.{monto} > 0 THEN {fila}.{monto} ELSE 0 END
+        WHERE {fila}.{fecha} IS NOT NULL
+        ON CONFLICT (fecha_pago, tipo_pago, asesor, promesa, estado) DO UPDATE SET
+            registros = registros + excluded.registros,
+            registros_con_monto = registros_con_monto + excluded.registros_con_monto,
+            monto = monto + excluded.monto;
+        INSERT INTO resumen_diario_rucs (fecha_pago, tipo_pago, asesor, ruc, registros)
+        SELECT {fila}.{fecha}, '{tipo}', COALESCE({fila}.asesor, ''), {fila}.ruc, 1
+        WHERE {fila}.{fecha} IS NOT NULL AND {fila}.{monto} > 0
+        ON CONFLICT (fecha_pago, tipo_pago, asesor, ruc) DO UPDATE SET
+            registros = registros + 1;'''
+
+def _sql_restar_resumen(tipo, fila):
+    """Sentencias de trigger que restan la fila NEW/OLD del resumen del tipo de pago"""
+    fecha, promesa, estado, monto = COLUMNAS_TIPO_PAGO[tipo]
+    clave = f'''fecha_pago = {fila}.{fecha} AND tipo_pago = '{tipo}'
+            AND asesor = COALESCE({fila}.asesor, '')'''
+    clave_resumen = f'''{clave}
+            AND promesa = COALESCE({fila}.{promesa}, '') AND estado = COALESCE({fila}.{estado}, '')'''
+    return f'''
+        UPDATE resumen_diario SET
+            registros = registros - 1,
+            registros_con_monto = registros_con_monto - (CASE WHEN {fila}.{monto} > 0 THEN 1 ELSE 0 END),
+            monto = monto - (CASE WHEN {fila}.{monto} > 0 THEN {fila}.{monto} ELSE 0 END)
+        WHERE {clave_resumen};
+        DELETE FROM resumen_diario WHERE {clave_resumen} AND registros <= 0;
+        UPDATE resumen_diario_rucs SET registros = registros - 1
+        WHERE {clave} AND ruc = {fila}.ruc AND {fila}.{monto} > 0;
+        DELETE FROM resumen_diario_rucs
+        WHERE {clave} AND ruc = {fila}.ruc AND registros <= 0;'''
+
+def triggers_resumen_diario():
+    """Triggers que mantienen resumen_diario (nombre -> sentencia CREATE TRIGGER)"""
+    triggers = {}
+    for tipo, (fecha, promesa, estado, monto) in COLUMNAS_TIPO_PAGO.items():
+        columnas = (fecha, promesa, estado, monto, 'asesor', 'ruc')
+        cambio = ' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in columnas)
+
+        triggers[f'trg_resumen_{tipo}_insert'] = f'''
+        CREATE TRIGGER trg_resumen_{tipo}_insert AFTER INSERT ON registros_pagos
+        BEGIN{_sql_sumar_resumen(tipo, 'NEW')}
+        END'''
+        triggers[f'trg_resumen_{tipo}_update'] = f'''
+        CREATE TRIGGER trg_resumen_{tipo}_update
+        AFTER UPDATE OF {', '.join(columnas)} ON registros_pagos
+        WHEN {cambio}
+        BEGIN{_sql_restar_resumen(tipo, 'OLD')}{_sql_sumar_resumen(tipo, 'NEW')}
+        END'''
+        triggers[f'trg_resumen_{tipo}_delete'] = f'''
+        CREATE TRIGGER trg_resumen_{tipo}_delete AFTER DELETE ON registros_pagos
+        BEGIN{_sql_restar_resumen(tipo, 'OLD')}
+        END'''
+    return triggers
+
+def _agregar_resumen_diario(cursor):
+    """
+    Recalcula el resumen desde registros_pagos (sin tocar las tablas de resumen).
+    Retorna: (filas de resumen_diario, filas de resumen_diario_rucs) como dicts clave -> valores
+    """
+    resumen = {}
+    rucs = {}
+    for tipo, (fecha, promesa, estado, monto) in COLUMNAS_TIPO_PAGO.items():
+        cursor.execute(f'''
+        SELECT {fecha}, '{tipo}', COALESCE(asesor, ''), COALESCE({promesa}, ''), COALESCE({estado}, ''),
+               COUNT(*),
+               SUM(CASE WHEN {monto} > 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {monto} > 0 THEN {monto} ELSE 0 END)
+        FROM registros_pagos
+        WHERE {fecha} IS NOT NULL
+        GROUP BY 1, 3, 4, 5
+        ''')
+        for fila in cursor.fetchall():
+            resumen[fila[:5]] = fila[5:]
+
+        cursor.execute(f'''
+        SELECT {fecha}, '{tipo}', COALESCE(asesor, ''), ruc, COUNT(*)
+        FROM registros_pagos
+        WHERE {fecha} IS NOT NULL AND {monto} > 0
+        GROUP BY 1, 3, 4
+        ''')
+        for fila in cursor.fetchall():
+            rucs[fila[:4]] = fila[4:]
+    return resumen, rucs
+
+def _reconstruir_resumen_diario(cursor):
+    """Vacía y vuelve a llenar las tablas de resumen, sin hacer commit"""
+    resumen, rucs = _agregar_resumen_diario(cursor)
+
+    cursor.execute('DELETE FROM resumen_diario')
+    cursor.execute('DELETE FROM resumen_diario_rucs')
+    cursor.executemany('''
+    INSERT INTO resumen_diario
+    (fecha_pago, tipo_pago, asesor, promesa, estado, registros, registros_con_monto, monto)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (clave + valores for clave, valores in resumen.items()))
+    cursor.executemany('''
+    INSERT INTO resumen_diario_rucs (fecha_pago, tipo_pago, asesor, ruc, registros)
+    VALUES (?, ?, ?, ?, ?)
+    ''', (clave + valores for clave, valores in rucs.items()))
+    return len(resumen)
+
+def mantener_resumen_diario(cursor):
+    """
+    Crea las tablas de resumen y sus triggers si faltan.
+    Si hubo que crear algún trigger, el resumen puede estar desactualizado y se reconstruye.
+    Retorna: True si se reconstruyó
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resumen_diario (
+        fecha_pago TEXT NOT NULL,
+        tipo_pago TEXT NOT NULL,
+        asesor TEXT NOT NULL,
+        promesa TEXT NOT NULL,
+        estado TEXT NOT NULL,
+        registros INTEGER NOT NULL,
+        registros_con_monto INTEGER NOT NULL,
+        monto REAL NOT NULL,
+        PRIMARY KEY (fecha_pago, tipo_pago, asesor, promesa, estado)
+    ) WITHOUT ROWID
+    ''')
+    # RUCs distintos con monto por día y asesor (columnas RUCs del resumen de asesores)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resumen_diario_rucs (
+        fecha_pago TEXT NOT NULL,
+        tipo_pago TEXT NOT NULL,
+        asesor TEXT NOT NULL,
+        ruc TEXT NOT NULL,
+        registros INTEGER NOT NULL,
+        PRIMARY KEY (fecha_pago, tipo_pago, asesor, ruc)
+    ) WITHOUT ROWID
+    ''')
+
+    faltantes = _mantener_triggers(cursor, 'trg_resumen_', triggers_resumen_diario())
+    if faltantes:
+        _reconstruir_resumen_diario(cursor)
+    return bool(faltantes)
+
+def reconstruir_resumen_diario():
+    """Reconstruye resumen_diario desde registros_pagos. Retorna: filas de resumen"""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        filas = _reconstruir_resumen_diario(cursor)
+        conn.commit()
+    return filas
+
+def verificar_resumen_diario():
+    """
+    Compara resumen_diario con un recálculo completo desde registros_pagos.
+    Retorna: lista de diferencias (tabla, clave, esperado, actual); vacía si es consistente
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        esperado_resumen, esperado_rucs = _agregar_resumen_diario(cursor)
+
+        cursor.execute('''
+        SELECT fecha_pago, tipo_pago, asesor, promesa, estado, registros, registros_con_monto, monto
+        FROM resumen_diario
+        ''')
+        actual_resumen = {fila[:5]: fila[5:] for fila in cursor.fetchall()}
+
+        cursor.execute('SELECT fecha_pago, tipo_pago, asesor, ruc, registros FROM resumen_diario_rucs')
+        actual_rucs = {fila[:4]: fila[4:] for fila in cursor.fetchall()}
+
+    def iguales(a, b):
+        if a is None or b is None:
+            return a == b
+        return a[:-1] == b[:-1] and abs(a[-1] - b[-1]) <= TOLERANCIA_RESUMEN
+
+    diferencias = []
+    for tabla, esperado, actual in (('resumen_diario', esperado_resumen, actual_resumen),
+                                    ('resumen_diario_rucs', esperado_rucs, actual_rucs)):
+        for clave in sorted(set(esperado) | set(actual)):
+            if not iguales(esperado.get(clave), actual.get(clave)):
+                diferencias.append((tabla, clave, esperado.get(clave), actual.get(clave)))
+    return diferencias
+
+# Estadísticas de montos por tipo de pago y campaña (campaña '' = todas), mantenidas
+# por triggers con el algoritmo de Welford: n, media y M2 (suma de cuadrados de las
+# desviaciones) se actualizan al sumar o quitar un monto sin releer la tabla.
+# Solo al quitar el mínimo o el máximo se vuelve a consultar: la campaña con los índices
+# idx_registros_extremos_* y el total ('') con los extremos de las campañas.
+
+def _sql_sumar_estadistica(tipo, fila):
+    """
+    Sentencia de trigger que agrega el monto de la fila NEW/OLD a las estadísticas: al total
+    (campaña '') y a su campaña. Una fila con campaña vacía solo cuenta en el total.
+    """
+    _, _, _, monto = COLUMNAS_TIPO_PAGO[tipo]
+    return f'''
+        INSERT INTO estadisticas_montos (tipo_pago, campaña, n, media, m2, minimo, maximo)
+        SELECT '{tipo}', grupo.campaña, 1, {fila}.{monto}, 0, {fila}.{monto}, {fila}.{monto}
+        FROM (SELECT '' AS campaña UNION ALL SELECT {fila}.campaña WHERE {fila}.campaña != '') AS grupo
+        WHERE {fila}.{monto} > 0
+        ON CONFLICT (tipo_pago, campaña) DO UPDATE SET
+            n = n + 1,
+            media = media + (excluded.media - media) / (n + 1),
+            m2 = m2 + (excluded.media - media) * (excluded.media - (media + (excluded.media - media) / (n + 1))),
+            minimo = MIN(COALESCE(minimo, excluded.minimo), excluded.minimo),
+            maximo = MAX(COALESCE(maximo, excluded.maximo), excluded.maximo);'''
+
+def _sql_quitar_estadistica(tipo, fila):
+    """Sentencias de trigger que quitan el monto de la fila NEW/OLD de las estadísticas"""
+    _, _, _, monto = COLUMNAS_TIPO_PAGO[tipo]
+    x = f'{fila}.{monto}'
+    media_nueva = f'(media * n - {x}) / (n - 1)'
+
+    def quitar(condicion, extremo):
+        return f'''
+        UPDATE estadisticas_montos SET
+            n = n - 1,
+            media = CASE WHEN n > 1 THEN {media_nueva} ELSE 0 END,
+            m2 = CASE WHEN n > 1 THEN MAX(m2 - ({x} - media) * ({x} - {media_nueva}), 0) ELSE 0 END,
+            minimo = CASE WHEN n <= 1 THEN NULL WHEN {x} <= minimo THEN {extremo('MIN', 'minimo')} ELSE minimo END,
+            maximo = CASE WHEN n <= 1 THEN NULL WHEN {x} >= maximo THEN {extremo('MAX', 'maximo')} ELSE maximo END
+        WHERE tipo_pago = '{tipo}' AND {condicion} AND {x} > 0;'''
+
+    # Primero la campaña: su extremo sale de idx_registros_extremos_{tipo} (la tabla ya sin la fila)
+    campaña = quitar(f"campaña = {fila}.campaña AND {fila}.campaña != ''", lambda funcion, _: f'''(
+                SELECT {funcion}(r.{monto}) FROM registros_pagos r
+                WHERE r.campaña = estadisticas_montos.campaña AND r.{monto} > 0)''')
+    # Después el total: su extremo es el de las campañas, ya actualizadas, y el de las filas
+    # sin campaña (que solo están en el total; también por el índice)
+    total = quitar("campaña = ''", lambda funcion, columna: f'''(
+                SELECT {funcion}(x) FROM (
+                    SELECT e.{columna} AS x FROM estadisticas_montos e
+                    WHERE e.tipo_pago = '{tipo}' AND e.campaña != ''
+                    UNION ALL
+                    SELECT {funcion}(r.{monto}) FROM registros_pagos r
+                    WHERE r.campaña = '' AND r.{monto} > 0))''')
+    return campaña + total
+
+def triggers_estadisticas_montos():
+    """Triggers que mantienen estadisticas_montos (nombre -> sentencia CREATE TRIGGER)"""
+    triggers = {}
+    for tipo, (_, _, _, monto) in COLUMNAS_TIPO_PAGO.items():
+        triggers[f'trg_estadisticas_{tipo}_insert'] = f'''
+        CREATE TRIGGER trg_estadisticas_{tipo}_insert AFTER INSERT ON registros_pagos
+        BEGIN{_sql_sumar_estadistica(tipo, 'NEW')}
+        END'''
+        triggers[f'trg_estadisticas_{tipo}_update'] = f'''
+        CREATE TRIGGER trg_estadisticas_{tipo}_update AFTER UPDATE OF {monto}, campaña ON registros_pagos
+        WHEN OLD.{monto} IS NOT NEW.{monto} OR OLD.campaña IS NOT NEW.campaña
+        BEGIN{_sql_quitar_estadistica(tipo, 'OLD')}{_sql_sumar_estadistica(tipo, 'NEW')}
+        END'''
+        triggers[f'trg_estadisticas_{tipo}_delete'] = f'''
+        CREATE TRIGGER trg_estadisticas_{tipo}_delete AFTER DELETE ON registros_pagos
+        BEGIN{_sql_quitar_estadistica(tipo, 'OLD')}
+        END'''
+    return triggers
+
+def _calcular_estadisticas_montos(cursor):
+    """
+    Recalcula las estadísticas desde registros_pagos (en dos pasadas, sin Welford).
+    Retorna: dict (tipo_pago, campaña) -> (n, media, m2, minimo, maximo)
+    """
+    estadisticas = {}
+    for tipo, (_, _, _, monto) in COLUMNAS_TIPO_PAGO.items():
+        cursor.execute(f'''
+        WITH grupos AS (
+            SELECT '' AS campaña, {monto} AS x FROM registros_pagos WHERE {monto} > 0
+            UNION ALL
+            SELECT campaña, {monto} FROM registros_pagos WHERE {monto} > 0 AND campaña != ''
+        ),
+        medias AS (
+            SELECT campaña, COUNT(*) AS n, AVG(x) AS media, MIN(x) AS minimo, MAX(x) AS maximo
+            FROM grupos GROUP BY campaña
+        )
+        SELECT m.campaña, m.n, m.media, SUM((g.x - m.media) * (g.x - m.media)), m.minimo, m.maximo
+        FROM grupos g JOIN medias m ON g.campaña = m.campaña
+        GROUP BY m.campaña
+        ''')
+        for campaña, *valores in cursor.fetchall():
+            estadisticas[(tipo, campaña)] = tuple(valores)
+    return estadisticas
+
+def _reconstruir_estadisticas_montos(cursor):
+    """Vacía y vuelve a llenar estadisticas_montos, sin hacer commit"""
+    estadisticas = _calcular_estadisticas_montos(cursor)
+    cursor.execute('DELETE FROM estadisticas_montos')
+    cursor.executemany('''
+    INSERT INTO estadisticas_montos (tipo_pago, campaña, n, media, m2, minimo, maximo)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (clave + valores for clave, valores in estadisticas.items()))
+    return len(estadisticas)
+
+def mantener_estadisticas_montos(cursor):
+    """
+    Crea estadisticas_montos y sus triggers si faltan (y en ese caso la reconstruye).
+    Retorna: True si se reconstruyó
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS estadisticas_montos (
+        tipo_pago TEXT NOT NULL,
+        campaña TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        media REAL NOT NULL,
+        m2 REAL NOT NULL,
+        minimo REAL,
+        maximo REAL,
+        PRIMARY KEY (tipo_pago, campaña)
+    ) WITHOUT ROWID
+    ''')
+
+    faltantes = _mantener_triggers(cursor, 'trg_estadisticas_', triggers_estadisticas_montos())
+    if faltantes:
+        _reconstruir_estadisticas_montos(cursor)
+    return bool(faltantes)
+
+def reconstruir_estadisticas_montos():
+    """Reconstruye estadisticas_montos desde registros_pagos. Retorna: grupos calculados"""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        grupos = _reconstruir_estadisticas_montos(cursor)
+        conn.commit()
+    return grupos
+
+def verificar_estadisticas_montos(tolerancia=1e-6):
+    """
+    Compara estadisticas_montos con un recálculo completo desde registros_pagos.
+    media y m2 se comparan con tolerancia relativa; n, mínimo y máximo deben ser iguales.
+    Retorna: lista de diferencias ((tipo_pago, campaña), esperado, actual); vacía si es consistente
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        esperado = _calcular_estadisticas_montos(cursor)
+        cursor.execute('SELECT tipo_pago, campaña, n, media, m2, minimo, maximo FROM estadisticas_montos WHERE n > 0')
+        actual = {fila[:2]: fila[2:] for fila in cursor.fetchall()}
+
+    def cercano(a, b):
+        return abs(a - b) <= tolerancia * max(1.0, abs(a), abs(b))
+
+    diferencias = []
+    for clave in sorted(set(esperado) | set(actual)):
+        e, a = esperado.get(clave), actual.get(clave)
+        if e is None or a is None or not (
+                e[0] == a[0] and cercano(e[1], a[1]) and cercano(e[2], a[2])
+                and e[3] == a[3] and e[4] == a[4]):
+            diferencias.append((clave, e, a))
+    return diferencias
+
+@cacheado('registros')
+def obtener_estadistica_monto(tipo_pago='ga', campaña=None):
+    """
+    Estadísticas de montos de un tipo de pago ('ga'/'gasto' o 'planilla'), de una campaña
+    o de todas (campaña=None). Es una sola lectura por clave primaria.
+    Retorna: dict con n, promedio, desviacion, minimo, maximo (n = 0 si no hay datos)
+    """
+    tipo = 'planilla' if tipo_pago == 'planilla' else 'gasto'
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT n, media, m2, minimo, maximo FROM estadisticas_montos
+        WHERE tipo_pago = ? AND campaña = ?
+        ''', (tipo, campaña or ''))
+        fila = cursor.fetchone()
+
+    n, media, m2, minimo, maximo = fila if fila else (0, 0, 0, None, None)
+    return {
+        'n': n,
+        'promedio': media if n else 0,
+        'desviacion': (m2 / (n - 1)) ** 0.5 if n > 1 else 0,
+        'minimo': minimo or 0,
+        'maximo': maximo or 0,
+    }
+
+# Saldos por RUC y tipo de pago en céntimos (enteros, sin error de redondeo acumulado):
+# pendiente (A VENCER), caido (PROMESA CAIDA) y cobrado (promesa COBR... o estado COBRADO).
+# Como el saldo que sumaba detectar_monto_anormal, solo cuentan las filas con promesa y con
+# monto; el monto se suma con su signo (una corrección negativa descuenta).
+# Los triggers de registros_pagos lo mantienen en todas las escrituras, incluido el
+# cambio de estado que hace el motor de vencimiento.
+
+def _sql_categoria_saldo(tipo, fila):
+    """Expresión SQL con la categoría de saldo (pendiente/caido/cobrado) de la fila NEW/OLD"""
+    _, promesa, estado, _ = COLUMNAS_TIPO_PAGO[tipo]
+    return f'''(CASE WHEN {fila}.{promesa} LIKE 'COBR%' OR {fila}.{estado} = 'COBRADO' THEN 'cobrado'
+                 WHEN {fila}.{estado} = 'PROMESA CAIDA' THEN 'caido'
+                 ELSE 'pendiente' END)'''
+
+def _sql_cuenta_en_saldo(tipo, fila):
+    """Condición SQL: la fila NEW/OLD entra en los saldos (tiene promesa y monto)"""
+    _, promesa, _, monto = COLUMNAS_TIPO_PAGO[tipo]
+    return f'{fila}.{promesa} IS NOT NULL AND {fila}.{monto} IS NOT NULL'
+
+def _sql_mover_saldo(tipo, fila, signo):
+    """Sentencia de trigger que suma (signo '+') o resta ('-') el monto de la fila a su saldo"""
+    _, _, _, monto = COLUMNAS_TIPO_PAGO[tipo]
+    categoria = _sql_categoria_saldo(tipo, fila)
+    centimos = f'CAST(ROUND({fila}.{monto} * 100) AS INTEGER)'
+    valores = {c: f"(CASE WHEN {categoria} = '{c}' THEN {signo}{centimos} ELSE 0 END)"
+               for c in ('pendiente', 'caido', 'cobrado')}
+    return f'''
+        INSERT INTO saldos_ruc (ruc, tipo_pago, pendiente, caido, cobrado)
+        SELECT {fila}.ruc, '{tipo}', {valores['pendiente']}, {valores['caido']}, {valores['cobrado']}
+        WHERE {_sql_cuenta_en_saldo(tipo, fila)}
+        ON CONFLICT (ruc, tipo_pago) DO UPDATE SET
+            pendiente = pendiente + excluded.pendiente,
+            caido = caido + excluded.caido,
+            cobrado = cobrado + excluded.cobrado;'''
+
+def triggers_saldos_ruc():
+    """Triggers que mantienen saldos_ruc (nombre -> sentencia CREATE TRIGGER)"""
+    triggers = {}
+    for tipo, (_, promesa, estado, monto) in COLUMNAS_TIPO_PAGO.items():
+        columnas = (monto, promesa, estado, 'ruc')
+        cambio = ' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in columnas)
+
+        triggers[f'trg_saldos_{tipo}_insert'] = f'''
+        CREATE TRIGGER trg_saldos_{tipo}_insert AFTER INSERT ON registros_pagos
+        BEGIN{_sql_mover_saldo(tipo, 'NEW', '+')}
+        END'''
+        triggers[f'trg_saldos_{tipo}_update'] = f'''
+        CREATE TRIGGER trg_saldos_{tipo}_update AFTER UPDATE OF {', '.join(columnas)} ON registros_pagos
+        WHEN {cambio}
+        BEGIN{_sql_mover_saldo(tipo, 'OLD', '-')}{_sql_mover_saldo(tipo, 'NEW', '+')}
+        END'''
+        triggers[f'trg_saldos_{tipo}_delete'] = f'''
+        CREATE TRIGGER trg_saldos_{tipo}_delete AFTER DELETE ON registros_pagos
+        BEGIN{_sql_mover_saldo(tipo, 'OLD', '-')}
+        END'''
+    return triggers
+
+def _calcular_saldos_ruc(cursor):
+    """
+    Recalcula los saldos desde registros_pagos.
+    Retorna: dict (ruc, tipo_pago) -> (pendiente, caido, cobrado) en céntimos
+    """
+    saldos = {}
+    for tipo, (_, _, _, monto) in COLUMNAS_TIPO_PAGO.items():
+        categoria = _sql_categoria_saldo(tipo, 'registros_pagos')
+        centimos = f'CAST(ROUND({monto} * 100) AS INTEGER)'
+        cursor.execute(f'''
+        SELECT ruc,
+            SUM(CASE WHEN {categoria} = 'pendiente' THEN {centimos} ELSE 0 END),
+            SUM(CASE WHEN {categoria} = 'caido' THEN {centimos} ELSE 0 END),
+            SUM(CASE WHEN {categoria} = 'cobrado' THEN {centimos} ELSE 0 END)
+        FROM registros_pagos
+        WHERE {_sql_cuenta_en_saldo(tipo, 'registros_pagos')}
+        GROUP BY ruc
+        ''')
+        for ruc, *valores in cursor.fetchall():
+            saldos[(ruc, tipo)] = tuple(valores)
+    return saldos
+
+def _reconstruir_saldos_ruc(cursor):
+    """Vacía y vuelve a llenar saldos_ruc, sin hacer commit"""
+    saldos = _calcular_saldos_ruc(cursor)
+    cursor.execute('DELETE FROM saldos_ruc')
+    cursor.executemany('''
+    INSERT INTO saldos_ruc (ruc, tipo_pago, pendiente, caido, cobrado) VALUES (?, ?, ?, ?, ?)
+    ''', (clave + valores for clave, valores in saldos.items()))
+    return len(saldos)
+
+def mantener_saldos_ruc(cursor):
+    """
+    Crea saldos_ruc y sus triggers si faltan (y en ese caso la reconstruye).
+    Retorna: True si se reconstruyó
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS saldos_ruc (
+        ruc TEXT NOT NULL,
+        tipo_pago TEXT NOT NULL,
+        pendiente INTEGER NOT NULL,
+        caido INTEGER NOT NULL,
+        cobrado INTEGER NOT NULL,
+        PRIMARY KEY (ruc, tipo_pago)
+    ) WITHOUT ROWID
+    ''')
+
+    faltantes = _mantener_triggers(cursor, 'trg_saldos_', triggers_saldos_ruc())
+    if faltantes:
+        _reconstruir_saldos_ruc(cursor)
+    return bool(faltantes)
+
+def reconciliar_saldos_ruc(reconstruir=False):
+    """
+    Compara saldos_ruc con un recálculo desde registros_pagos y, si se pide, lo reconstruye.
+    Retorna: lista de diferencias ((ruc, tipo_pago), esperado, actual) en céntimos,
+    tal como estaban antes de reconstruir
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        esperado = _calcular_saldos_ruc(cursor)
+        cursor.execute('SELECT ruc, tipo_pago, pendiente, caido, cobrado FROM saldos_ruc')
+        actual = {fila[:2]: fila[2:] for fila in cursor.fetchall()}
+
+        cero = (0, 0, 0)
+        diferencias = [
+            (clave, esperado.get(clave, cero), actual.get(clave, cero))
+            for clave in sorted(set(esperado) | set(actual))
+            if esperado.get(clave, cero) != actual.get(clave, cero)
+        ]
+
+        if reconstruir:
+            _reconstruir_saldos_ruc(cursor)
+            conn.commit()
+    return diferencias
+
+@cacheado(lambda ruc: f'registros.ruc:{ruc}')
+def obtener_saldo_ruc(ruc):
+    """
+    Saldos de un RUC en soles, por tipo de pago (una lectura por clave primaria).
+    Retorna: {'ga': {...}, 'planilla': {...}} con pendiente, caido, cobrado y por_cobrar
+    (por_cobrar = pendiente + caido). Solo cuentan los registros con promesa y monto;
+    los montos se suman con su signo.
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT tipo_pago, pendiente, caido, cobrado FROM saldos_ruc WHERE ruc = ?', (ruc,))
+        filas = {fila[0]: fila[1:] for fila in cursor.fetchall()}
+
+    saldos = {}
+    for clave, tipo in (('ga', 'gasto'), ('planilla', 'planilla')):
+        pendiente, caido, cobrado = (c / 100 for c in filas.get(tipo, (0, 0, 0)))
+        saldos[clave] = {
+            'pendiente': pendiente,
+            'caido': caido,
+            'cobrado': cobrado,
+            'por_cobrar': pendiente + caido,
+        }
+    return saldos
+
+def _sql_huella(parametros=False):
+    """
+    Expresión SQL de la huella de contenido de un registro: los campos de CAMPOS_HUELLA
+    normalizados (NULL = '' o 0, montos como REAL) y separados por el carácter 0x1F.
+    parametros=True usa :campo en lugar de las columnas, para comparar contra valores nuevos.
+    """
+    partes = []
+    for campo, tipo in CAMPOS_HUELLA:
+        valor = f':{campo}' if parametros else campo
+        if tipo == 'monto':
+            partes.append(f"CAST(COALESCE({valor}, 0) AS REAL)")
+        else:
+            partes.append(f"COALESCE({valor}, '')")
+    return " || char(31) || ".join(partes)
+
+def _leer_metadato(cursor, clave):
+    """Lee un valor de la tabla metadatos (None si no existe)"""
+    cursor.execute('SELECT valor FROM metadatos WHERE clave = ?', (clave,))
+    fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+def _guardar_metadato(cursor, clave, valor):
+    """Guarda (o reemplaza) un valor en la tabla metadatos, sin hacer commit"""
+    cursor.execute('''
+    INSERT INTO metadatos (clave, valor, actualizado) VALUES (?, ?, ?)
+    ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor, actualizado = excluded.actualizado
+    ''', (clave, valor, datetime.now().isoformat()))
+
+def obtener_metadato(clave):
+    """Obtiene un valor de la tabla metadatos (None si no existe)"""
+    with conectar() as conn:
+        return _leer_metadato(conn.cursor(), clave)
+
+# Tareas programadas: una fila por tarea de programador.py con su estado
+# (PENDIENTE, EJECUTANDO, OK, ERROR), la próxima ejecución y el resultado de la última.
+# Las fechas son ISO locales, así se comparan como texto.
+
+def reclamar_tarea(nombre, ahora, proceso, abandonada_antes):
+    """
+    Marca la tarea como EJECUTANDO si le toca (proxima vacía o ya pasada) y nadie la está
+    ejecutando; una ejecución iniciada antes de abandonada_antes se da por abandonada.
+    Es una sola sentencia, así dos procesos no ejecutan la misma tarea a la vez.
+    Retorna: True si este proceso la reclamó
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO tareas_programadas (nombre, estado) VALUES (?, 'PENDIENTE')",
+                       (nombre,))
+        cursor.execute('''
+        UPDATE tareas_programadas SET estado = 'EJECUTANDO', ultimo_inicio = ?, proceso = ?
+        WHERE nombre = ? AND (proxima IS NULL OR proxima <= ?)
+          AND (estado != 'EJECUTANDO' OR ultimo_inicio < ?)
+        ''', (ahora, proceso, nombre, ahora, abandonada_antes))
+        reclamada = cursor.rowcount == 1
+        conn.commit()
+    return reclamada
+
+def terminar_tarea(nombre, fin, duracion_ms, proxima, resultado=None, error=None):
+    """Guarda el resultado de una ejecución (error=None: OK) y la próxima ejecución"""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE tareas_programadas
+        SET estado = ?, ultimo_fin = ?, duracion_ms = ?, proxima = ?, resultado = ?, error = ?,
+            ejecuciones = ejecuciones + 1, fallos = fallos + ?
+        WHERE nombre = ?
+        ''', ('OK' if error is None else 'ERROR', fin, duracion_ms, proxima, resultado, error,
+              int(error is not None), nombre))
+        conn.commit()
+
+def programar_tarea_ahora(nombre):
+    """Adelanta la próxima ejecución de la tarea (la toma el programador en su siguiente vuelta)"""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE tareas_programadas SET proxima = NULL WHERE nombre = ?", (nombre,))
+        conn.commit()
+        return cursor.rowcount == 1
+
+def obtener_tareas_programadas():
+    """
+    Estado de las tareas programadas, por nombre.
+    Retorna: lista de (nombre, estado, proxima, ultimo_inicio, ultimo_fin, duracion_ms,
+    resultado, error, ejecuciones, fallos, proceso)
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT nombre, estado, proxima, ultimo_inicio, ultimo_fin, duracion_ms,
+               resultado, error, ejecuciones, fallos, proceso
+        FROM tareas_programadas
+        ORDER BY nombre
+        ''')
+        return cursor.fetchall()
+
+def refrescar_agregados():
+    """
+    Compara las tablas mantenidas por triggers (resumen_diario, estadisticas_montos,
+    saldos_ruc y contadores) con un recálculo completo y reconstruye las que difieran.
+    Retorna: {tabla: diferencias encontradas}
+    """
+    diferencias = {
+        'resumen_diario': len(verificar_resumen_diario()),
+        'estadisticas_montos': len(verificar_estadisticas_montos()),
+        'saldos_ruc': len(reconciliar_saldos_ruc()),
+        'contadores': len(verificar_contadores()),
+    }
+    if diferencias['resumen_diario']:
+        reconstruir_resumen_diario()
+    if diferencias['estadisticas_montos']:
+        reconstruir_estadisticas_montos()
+    if diferencias['saldos_ruc']:
+        reconciliar_saldos_ruc(reconstruir=True)
+    if diferencias['contadores']:
+        with conectar() as conn:
+            cursor = conn.cursor()
+            _reconstruir_contadores(cursor)
+            conn.commit()
+    return diferencias
+
+def optimizar_bd(analizar=False):
+    """
+    Actualiza las estadísticas del planificador: PRAGMA optimize (solo las tablas que lo
+    necesitan) o, con analizar=True, ANALYZE completo.
+    Retorna: filas de sqlite_stat1 después de actualizar
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute('ANALYZE' if analizar else 'PRAGMA optimize')
+        conn.commit()
+        try:
+            cursor.execute('SELECT COUNT(*) FROM sqlite_stat1')
+        except sqlite3.OperationalError:
+            return 0
+        return cursor.fetchone()[0]
+
+@cacheado('rucs')
 def obtener_rucs():
     """Obtiene todos los RUCs base"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT id, ruc, razon_social, campaña, asesor FROM rucs ORDER BY ruc')
-    rucs = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id, ruc, razon_social, campaña, asesor FROM rucs ORDER BY ruc')
+        rucs = cursor.fetchall()
     return rucs
 
+@cacheado(lambda ruc: f'rucs.ruc:{ruc}')
 def obtener_ruc_por_numero(ruc):
     """Obtiene información de un RUC específico"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin FROM rucs WHERE ruc = ?', (ruc,))
-    resultados = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin FROM rucs WHERE ruc = ?', (ruc,))
+        resultados = cursor.fetchall()
     return resultados
 
+@cacheado('rucs')
 def obtener_rucs_con_campanas():
     """Obtiene todos los RUCs con sus campañas asociadas como lista de tuplas"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT DISTINCT ruc, campaña FROM rucs ORDER BY ruc
-    ''')
-    
-    resultados = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT DISTINCT ruc, campaña FROM rucs ORDER BY ruc
+        ''')
+        
+        resultados = cursor.fetchall()
     return resultados
 
+@cacheado('rucs')
 def obtener_campanas():
     """Obtiene todas las campañas únicas"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT DISTINCT campaña FROM rucs ORDER BY campaña')
-    campanas = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT DISTINCT campaña FROM rucs ORDER BY campaña')
+        campanas = [row[0] for row in cursor.fetchall()]
     return campanas
 
+def _fecha_iso(fecha):
+    """
+    Una fecha de pago como texto ISO (YYYY-MM-DD), también si viene sin ceros ('2026-1-5').
+    Se guarda así para que el vencimiento (comparación de texto en SQL) la reconozca;
+    lo que no es una fecha se deja como está.
+    """
+    if isinstance(fecha, str):
+        try:
+            return datetime.strptime(fecha, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            pass
+    return fecha
+
+def _estados_iniciales(fecha_pago_gasto, fecha_pago_planilla):
+    """
+    Determina el estado inicial de las promesas de un registro nuevo.
+    Si la fecha de pago ya pasó y aún no hay cobro registrado: PROMESA CAIDA
+    (mismo criterio que evaluar_vencimiento_promesas)
+    """
+    estados = []
+    hoy = date.today()
+    for fecha_pago_str in (fecha_pago_gasto, fecha_pago_planilla):
+        estado = 'A VENCER'
+        if fecha_pago_str:
+            try:
+                fecha_pago = datetime.strptime(fecha_pago_str, '%Y-%m-%d').date()
+                if fecha_pago < hoy:
+                    estado = 'PROMESA CAIDA'
+            except:
+                pass
+        estados.append(estado)
+    return tuple(estados)
+
+def _datos_registro(fecha_reporte, ruc, id_documento, campaña, asesor,
+                    promesa_ga, monto_gasto, fecha_pago_gasto,
+                    promesa_planilla, monto_planilla, fecha_pago_planilla,
+                    observaciones):
+    """Arma el dict de columnas de un registro nuevo (con estados y fecha de registro)"""
+    fecha_pago_gasto, fecha_pago_planilla = _fecha_iso(fecha_pago_gasto), _fecha_iso(fecha_pago_planilla)
+    estado_ga, estado_planilla = _estados_iniciales(fecha_pago_gasto, fecha_pago_planilla)
+    return {
+        'fecha_reporte': fecha_reporte, 'ruc': ruc, 'id_documento': id_documento,
+        'campaña': campaña, 'asesor': asesor,
+        'promesa_ga': promesa_ga, 'monto_gasto': monto_gasto,
+        'fecha_pago_gasto': fecha_pago_gasto, 'estado_ga': estado_ga,
+        'promesa_planilla': promesa_planilla, 'monto_planilla': monto_planilla,
+        'fecha_pago_planilla': fecha_pago_planilla, 'estado_planilla': estado_planilla,
+        'observaciones': observaciones, 'fecha_registro': datetime.now().isoformat(),
+    }
+
+_COLUMNAS_INSERT = ('fecha_reporte', 'ruc', 'id_documento', 'campaña', 'asesor',
+                    'promesa_ga', 'monto_gasto', 'fecha_pago_gasto', 'estado_ga',
+                    'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla', 'estado_planilla',
+                    'observaciones', 'fecha_registro')
+
 def registrar_pago(fecha_reporte, ruc, id_documento, campaña, asesor,
                    promesa_ga=None, monto_gasto=None, fecha_pago_gasto=None,
                    promesa_planilla=None, monto_planilla=None, fecha_pago_planilla=None,
                    observaciones=""):
     """Registra un pago diario con la estructura especificada"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    fecha_registro = datetime.now().isoformat()
-    
-    # Determinar estado de promesas automáticamente
-    estado_ga = 'A VENCER'
-    estado_planilla = 'A VENCER'
-    
-    # Si la fecha de pago ya pasó y aún no hay cobro registrado
-    hoy = date.today()
-    if fecha_pago_gasto and promesa_ga:
-        try:
-            fecha_pago = datetime.strptime(fecha_pago_gasto, '%Y-%m-%d').date()
-            if fecha_pago < hoy:
-                estado_ga = 'PROMESA CAIDA'
-        except:
-            pass
-    
-    if fecha_pago_planilla and promesa_planilla:
-        try:
-            fecha_pago = datetime.strptime(fecha_pago_planilla, '%Y-%m-%d').date()
-            if fecha_pago < hoy:
-                estado_planilla = 'PROMESA CAIDA'
-        except:
-            pass
+    datos = _datos_registro(fecha_reporte, ruc, id_documento, campaña, asesor,
+                            promesa_ga, monto_gasto, fecha_pago_gasto,
+                            promesa_planilla, monto_planilla, fecha_pago_planilla,
+                            observaciones)
     
-    cursor.execute('''
-    INSERT INTO registros_pagos 
-    (fecha_reporte, ruc, id_documento, campaña, asesor, 
-     promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
-     promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
-     observaciones, fecha_registro)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (fecha_reporte, ruc, id_documento, campaña, asesor,
-          promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
-          promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
-          observaciones, fecha_registro))
-    
-    conn.commit()
-    registro_id = cursor.lastrowid
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(f'''
+        INSERT INTO registros_pagos ({', '.join(_COLUMNAS_INSERT)})
+        VALUES ({', '.join(':' + c for c in _COLUMNAS_INSERT)})
+        ''', datos)
+        
+        conn.commit()
+        registro_id = cursor.lastrowid
     return registro_id
 
+def registrar_pago_sin_duplicar(fecha_reporte, ruc, id_documento, campaña, asesor,
+                                promesa_ga=None, monto_gasto=None, fecha_pago_gasto=None,
+                                promesa_planilla=None, monto_planilla=None, fecha_pago_planilla=None,
+                                observaciones=""):
+    """
+    Registra un pago solo si no existe un duplicado exacto (ver detectar_duplicado_exacto).
+    La verificación y el INSERT son una única sentencia, así dos envíos simultáneos
+    del mismo pago no pueden registrarse ambos.
+    Retorna: (registro_id, id_duplicado) - uno de los dos es None
+    """
+    datos = _datos_registro(fecha_reporte, ruc, id_documento, campaña, asesor,
+                            promesa_ga, monto_gasto, fecha_pago_gasto,
+                            promesa_planilla, monto_planilla, fecha_pago_planilla,
+                            observaciones)
+    
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(f'''
+        INSERT INTO registros_pagos ({', '.join(_COLUMNAS_INSERT)})
+        SELECT {', '.join(':' + c for c in _COLUMNAS_INSERT)}
+        WHERE NOT EXISTS (SELECT 1 FROM registros_pagos WHERE huella = {_sql_huella(parametros=True)})
+        ''', datos)
+        
+        if cursor.rowcount == 1:
+            conn.commit()
+            return cursor.lastrowid, None
+        
+        cursor.execute(f'SELECT id FROM registros_pagos WHERE huella = {_sql_huella(parametros=True)} LIMIT 1',
+                       datos)
+        fila = cursor.fetchone()
+    return None, fila[0] if fila else None
+
+def _sql_estado_promesa(fecha, hoy):
+    """CASE con el estado de una promesa según su fecha de pago (expresiones SQL): caída si ya pasó"""
+    return (f"CASE WHEN {fecha} GLOB {_PATRON_FECHA_ISO} AND {fecha} < {hoy} "
+            f"THEN 'PROMESA CAIDA' ELSE 'A VENCER' END")
+
+def registrar_pagos_lote(pagos, omitir_duplicados=True, metadatos=None):
+    """
+    Registra muchos pagos en una sola transacción.
+    pagos: iterable de dicts con los argumentos de registrar_pago, o tuplas en el mismo orden
+    omitir_duplicados: no registra duplicados exactos (ya existentes o repetidos en el lote)
+    metadatos: dict clave -> valor (o función(resultado) -> valor) que se guarda en metadatos en
+    la misma transacción (el punto de control de importador_csv queda confirmado junto con sus pagos)
+    Los pagos se cargan con executemany en una tabla temporal; duplicados y estados
+    se resuelven para todo el lote con una consulta cada uno. Las fechas de pago se
+    normalizan antes con _fecha_iso, igual que en registrar_pago.
+    Retorna: lista alineada con pagos de (registro_id, id_duplicado).
+    Con omitir_duplicados, uno de los dos es None (un pago repetido dentro del lote
+    apunta al id del primero); sin omitirlos, id_duplicado informa el registro que ya existía.
+    """
+    campos = [campo for campo, _ in CAMPOS_HUELLA]
+    posiciones_fecha = [campos.index(fecha) for fecha, _, _, _ in COLUMNAS_TIPO_PAGO.values()]
+    filas = []
+    for pos, pago in enumerate(pagos):
+        if isinstance(pago, dict):
+            valores = [pago.get(campo) for campo in campos]
+            if 'observaciones' not in pago:
+                valores[-1] = ""
+        else:
+            valores = list(pago) + [None] * (len(campos) - len(pago))
+            if len(pago) < len(campos):
+                valores[-1] = ""
+        for i in posiciones_fecha:
+            valores[i] = _fecha_iso(valores[i])
+        filas.append([pos] + valores)
+
+    if not filas:
+        if metadatos:
+            with conectar() as conn:
+                cursor = conn.cursor()
+                for clave, valor in metadatos.items():
+                    _guardar_metadato(cursor, clave, valor([]) if callable(valor) else valor)
+                conn.commit()
+        return []
+
+    estados = {tipo: _sql_estado_promesa(fecha, ':hoy') for tipo, (fecha, _, _, _) in COLUMNAS_TIPO_PAGO.items()}
+
+    with conectar() as conn:
+        cursor = conn.cursor()
+
+        # Tomar el bloqueo de escritura desde el inicio: la verificación de duplicados
+        # y el INSERT ven los mismos datos
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(f'''
+        CREATE TEMP TABLE IF NOT EXISTS lote_pagos (
+            pos INTEGER PRIMARY KEY,
+            {', '.join(campos)},
+            huella TEXT GENERATED ALWAYS AS ({_sql_huella()}) VIRTUAL
+        )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS temp.idx_lote_pagos_huella ON lote_pagos (huella)')
+        cursor.execute('DELETE FROM lote_pagos')
+        cursor.executemany(f'''
+        INSERT INTO lote_pagos (pos, {', '.join(campos)})
+        VALUES ({', '.join('?' * (len(campos) + 1))})
+        ''', filas)
+
+        # Duplicados contra la BD y primer pago de cada huella dentro del lote
+        cursor.execute('''
+        SELECT l.pos,
+            (SELECT r.id FROM registros_pagos r WHERE r.huella = l.huella LIMIT 1),
+            (SELECT MIN(l2.pos) FROM lote_pagos l2 WHERE l2.huella = l.huella)
+        FROM lote_pagos l
+        ORDER BY l.pos
+        ''')
+        verificacion = cursor.fetchall()
+
+        if omitir_duplicados:
+            insertar = [pos for pos, id_bd, primero in verificacion if id_bd is None and primero == pos]
+        else:
+            insertar = [pos for pos, _, _ in verificacion]
+
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM registros_pagos')
+        ultimo_id = cursor.fetchone()[0]
+
+        omitidos = set(pos for pos, _, _ in verificacion) - set(insertar)
+        cursor.executemany('DELETE FROM lote_pagos WHERE pos = ?', [(pos,) for pos in sorted(omitidos)])
+        cursor.execute(f'''
+        INSERT INTO registros_pagos ({', '.join(_COLUMNAS_INSERT)})
+        SELECT {', '.join(campos[:8])}, {estados['gasto']},
+               {', '.join(campos[8:11])}, {estados['planilla']},
+               observaciones, :fecha_registro
+        FROM lote_pagos
+        ORDER BY pos
+        ''', {'hoy': date.today().isoformat(), 'fecha_registro': datetime.now().isoformat()})
+
+        # Con el bloqueo tomado, los ids nuevos son los mayores a ultimo_id, en orden de pos
+        cursor.execute('SELECT id FROM registros_pagos WHERE id > ? ORDER BY id', (ultimo_id,))
+        nuevos = dict(zip(insertar, (fila[0] for fila in cursor.fetchall())))
+
+        resultado = []
+        for pos, id_bd, primero in verificacion:
+            if pos in nuevos:
+                resultado.append((nuevos[pos], id_bd))
+            else:
+                resultado.append((None, id_bd if id_bd is not None else nuevos.get(primero)))
+
+        cursor.execute('DELETE FROM lote_pagos')
+        for clave, valor in (metadatos or {}).items():
+            _guardar_metadato(cursor, clave, valor(resultado) if callable(valor) else valor)
+        conn.commit()
+    return resultado
+
+@cacheado(_ambito_fecha_reporte)
 def obtener_registros_por_fecha(fecha):
     """Obtiene todos los registros de una fecha específica"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
-           promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
-           observaciones
-    FROM registros_pagos
-    WHERE fecha_reporte = ?
-    ORDER BY ruc
-    ''', (fecha,))
-    
-    registros = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
+               promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
+               observaciones
+        FROM registros_pagos
+        WHERE fecha_reporte = ?
+        ORDER BY ruc
+        ''', (fecha,))
+        
+        registros = cursor.fetchall()
     return registros
 
 def obtener_registros_hoy():
@@ -195,55 +1818,211 @@ def obtener_registros_hoy():
     hoy = date.today().isoformat()
     return obtener_registros_por_fecha(hoy)
 
+@cacheado('registros')
 def obtener_todos_registros():
     """Obtiene todos los registros"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
-           promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
-           observaciones
-    FROM registros_pagos
-    ORDER BY fecha_reporte DESC, ruc
-    ''')
-    
-    registros = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
+               promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
+               observaciones
+        FROM registros_pagos
+        ORDER BY fecha_reporte DESC, ruc
+        ''')
+        
+        registros = cursor.fetchall()
     return registros
 
+# Ver Registros: columnas de cada fila, en el orden de obtener_todos_registros
+COLUMNAS_REGISTRO = ('id', 'fecha_reporte', 'ruc', 'id_documento', 'campaña', 'asesor',
+                     'promesa_ga', 'monto_gasto', 'fecha_pago_gasto', 'estado_ga',
+                     'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla', 'estado_planilla',
+                     'observaciones')
+
+# Órdenes de Ver Registros (nombre -> columnas de la clave, dirección). Todos terminan en id
+# y siguen un índice (el rowid va implícito al final de cada índice), así cada página es
+# una búsqueda por rango que no depende del tamaño de la tabla.
+ORDENES_REGISTROS = {
+    'reciente': (('fecha_reporte', 'ruc', 'id'), 'DESC'),
+    'antiguo': (('fecha_reporte', 'ruc', 'id'), 'ASC'),
+    'ruc': (('ruc', 'fecha_reporte', 'id'), 'ASC'),
+    'ultimos_ingresados': (('id',), 'DESC'),
+}
+
+def _sql_filtros_registros(fecha_desde=None, fecha_hasta=None, asesor=None, campaña=None,
+                           estado=None, ruc_prefijo=None, monto_min=None, monto_max=None):
+    """
+    Condiciones WHERE de los filtros de Ver Registros (None = sin filtrar).
+    estado se compara con estado_ga o estado_planilla; el monto es gasto + planilla.
+    Retorna: (lista de condiciones SQL, parámetros)
+    """
+    condiciones, parametros = [], []
+    if fecha_desde:
+        condiciones.append('fecha_reporte >= ?')
+        parametros.append(fecha_desde)
+    if fecha_hasta:
+        condiciones.append('fecha_reporte <= ?')
+        parametros.append(fecha_hasta)
+    if asesor:
+        condiciones.append('asesor = ?')
+        parametros.append(asesor)
+    if campaña:
+        condiciones.append('campaña = ?')
+        parametros.append(campaña)
+    if estado:
+        condiciones.append('(estado_ga = ? OR estado_planilla = ?)')
+        parametros.extend([estado, estado])
+    if ruc_prefijo:
+        # Rango en vez de LIKE para que use idx_registros_ruc
+        condiciones.append('ruc >= ? AND ruc < ?')
+        parametros.extend([ruc_prefijo, ruc_prefijo[:-1] + chr(ord(ruc_prefijo[-1]) + 1)])
+    monto = 'COALESCE(monto_gasto, 0) + COALESCE(monto_planilla, 0)'
+    if monto_min is not None:
+        condiciones.append(f'{monto} >= ?')
+        parametros.append(monto_min)
+    if monto_max is not None:
+        condiciones.append(f'{monto} <= ?')
+        parametros.append(monto_max)
+    return condiciones, parametros
+
+@cacheado('registros')
+def buscar_registros(orden='reciente', despues_de=None, limite=50, **filtros):
+    """
+    Una página de registros filtrada y ordenada en SQL, con paginación por clave (keyset).
+    orden: clave de ORDENES_REGISTROS
+    despues_de: cursor retornado por la página anterior (None = primera página)
+    filtros: ver _sql_filtros_registros
+    Retorna: (registros, cursor de la página siguiente o None si es la última)
+    """
+    columnas, direccion = ORDENES_REGISTROS[orden]
+    condiciones, parametros = _sql_filtros_registros(**filtros)
+    if despues_de is not None:
+        comparador = '<' if direccion == 'DESC' else '>'
+        condiciones.append(f"({', '.join(columnas)}) {comparador} ({', '.join('?' * len(columnas))})")
+        parametros.extend(despues_de)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT {', '.join(COLUMNAS_REGISTRO)}
+        FROM registros_pagos
+        {where}
+        ORDER BY {', '.join(f'{c} {direccion}' for c in columnas)}
+        LIMIT ?
+        ''', parametros + [limite + 1])
+        registros = cursor.fetchall()
+
+    if len(registros) <= limite:
+        return registros, None
+    registros = registros[:limite]
+    posiciones = [COLUMNAS_REGISTRO.index(c) for c in columnas]
+    return registros, tuple(registros[-1][i] for i in posiciones)
+
+@cacheado('registros')
+def contar_registros(**filtros):
+    """
+    Cantidad de registros que cumplen los filtros de Ver Registros.
+    Sin filtros o solo por fechas suma la tabla contadores; con otros filtros cuenta en SQL.
+    """
+    condiciones, parametros = _sql_filtros_registros(**filtros)
+    fechas = {k: filtros.get(k) for k in ('fecha_desde', 'fecha_hasta')}
+    solo_fechas = not _sql_filtros_registros(**{k: v for k, v in filtros.items() if k not in fechas})[0]
+
+    with conectar() as conn:
+        cursor = conn.cursor()
+        if solo_fechas:
+            cursor.execute('''
+            SELECT COALESCE(SUM(valor), 0) FROM contadores
+            WHERE clave >= ? AND clave <= ?
+            ''', ('registros:' + (fechas['fecha_desde'] or ''),
+                  'registros:' + (fechas['fecha_hasta'] or '\uffff')))
+        else:
+            cursor.execute(f"SELECT COUNT(*) FROM registros_pagos WHERE {' AND '.join(condiciones)}",
+                           parametros)
+        return cursor.fetchone()[0]
+
+# Campos que se pueden editar desde Ver Registros
+CAMPOS_EDITABLES = ('promesa_ga', 'monto_gasto', 'fecha_pago_gasto',
+                    'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla',
+                    'observaciones')
+
+def _leer_registro(cursor, registro_id):
+    cursor.execute(f"SELECT {', '.join(COLUMNAS_REGISTRO)}, version FROM registros_pagos WHERE id = ?",
+                   (registro_id,))
+    fila = cursor.fetchone()
+    return dict(zip(COLUMNAS_REGISTRO + ('version',), fila)) if fila else None
+
+def _actualizar_campos(cursor, registro_id, campos, version=None):
+    """
+    UPDATE de los CAMPOS_EDITABLES que vengan en campos; sube la versión de la fila.
+    Con version, solo actualiza si la fila sigue en esa versión.
+    Retorna: filas actualizadas
+    """
+    campos_update = {k: v for k, v in campos.items() if k in CAMPOS_EDITABLES}
+    if not campos_update:
+        return 0
+    for fecha_col, _, _, _ in COLUMNAS_TIPO_PAGO.values():
+        if fecha_col in campos_update:
+            campos_update[fecha_col] = _fecha_iso(campos_update[fecha_col])
+    
+    asignaciones = [f"{k} = ?" for k in campos_update.keys()]
+    valores = list(campos_update.values())
+    # Cambió una fecha de pago: el estado de esa promesa se recalcula en el mismo UPDATE
+    # (el motor de vencimiento solo corre una vez por día). COBRADO y otros estados no se tocan.
+    for fecha_col, _, estado_col, _ in COLUMNAS_TIPO_PAGO.values():
+        if fecha_col in campos_update:
+            asignaciones.append(f"{estado_col} = CASE WHEN {estado_col} IN ('A VENCER', 'PROMESA CAIDA') "
+                                f"THEN {_sql_estado_promesa('?', '?')} ELSE {estado_col} END")
+            valores += [campos_update[fecha_col], campos_update[fecha_col], date.today().isoformat()]
+    valores.append(registro_id)
+    condicion = 'id = ?'
+    if version is not None:
+        condicion += ' AND version = ?'
+        valores.append(version)
+    
+    cursor.execute(f"UPDATE registros_pagos SET {', '.join(asignaciones)}, version = version + 1 "
+                   f"WHERE {condicion}", valores)
+    return cursor.rowcount
+
+def obtener_registro(registro_id):
+    """
+    Un registro por su ID, sin pasar por la caché (el editor necesita la versión vigente).
+    Retorna: dict con COLUMNAS_REGISTRO y 'version', o None si no existe
+    """
+    with conectar() as conn:
+        return _leer_registro(conn.cursor(), registro_id)
+
 def actualizar_registro(registro_id, **campos):
-    """Actualiza un registro de pago existente"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Construir query dinámicamente
-    campos_permitidos = [
-        'promesa_ga', 'monto_gasto', 'fecha_pago_gasto',
-        'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla',
-        'observaciones'
-    ]
-    
-    campos_update = {k: v for k, v in campos.items() if k in campos_permitidos}
-    
-    if campos_update:
-        set_clause = ', '.join([f"{k} = ?" for k in campos_update.keys()])
-        valores = list(campos_update.values()) + [registro_id]
-        
-        cursor.execute(f'UPDATE registros_pagos SET {set_clause} WHERE id = ?', valores)
+    """Actualiza un registro de pago existente (sin comprobar la versión)"""
+    with conectar() as conn:
+        cursor = conn.cursor()
+        if _actualizar_campos(cursor, registro_id, campos):
+            conn.commit()
+
+def actualizar_registro_si_version(registro_id, version, **campos):
+    """
+    Actualiza el registro solo si sigue en la versión con la que se abrió (edición optimista:
+    si otro usuario guardó antes, no se pisan sus cambios).
+    Retorna: (True, registro actualizado) o (False, registro vigente; None si ya no existe)
+    """
+    with conectar() as conn:
+        cursor = conn.cursor()
+        actualizado = _actualizar_campos(cursor, registro_id, campos, version) == 1
+        registro = _leer_registro(cursor, registro_id)
         conn.commit()
-    
-    conn.close()
+    return actualizado, registro
 
 def eliminar_registro(registro_id):
     """Elimina un registro de pago"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM registros_pagos WHERE id = ?', (registro_id,))
-    conn.commit()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM registros_pagos WHERE id = ?', (registro_id,))
+        conn.commit()
 
 def detectar_duplicado_exacto(fecha_reporte, ruc, id_documento, campaña, asesor,
                               promesa_ga=None, monto_gasto=None, fecha_pago_gasto=None,
@@ -253,91 +2032,82 @@ def detectar_duplicado_exacto(fecha_reporte, ruc, id_documento, campaña, asesor
     Detecta si existe un registro exactamente igual (mismo RUC, fecha y todos los datos)
     Retorna: (existe_duplicado, id_duplicado, mensaje)
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT id FROM registros_pagos
-    WHERE 
-        fecha_reporte = ?
-        AND ruc = ?
-        AND id_documento = ?
-        AND campaña = ?
-        AND COALESCE(asesor, '') = COALESCE(?, '')
-        AND COALESCE(promesa_ga, '') = COALESCE(?, '')
-        AND COALESCE(monto_gasto, 0) = COALESCE(?, 0)
-        AND COALESCE(fecha_pago_gasto, '') = COALESCE(?, '')
-        AND COALESCE(promesa_planilla, '') = COALESCE(?, '')
-        AND COALESCE(monto_planilla, 0) = COALESCE(?, 0)
-        AND COALESCE(fecha_pago_planilla, '') = COALESCE(?, '')
-        AND COALESCE(observaciones, '') = COALESCE(?, '')
-    LIMIT 1
-    ''', (fecha_reporte, ruc, id_documento, campaña, asesor,
-          promesa_ga, monto_gasto, fecha_pago_gasto,
-          promesa_planilla, monto_planilla, fecha_pago_planilla,
-          observaciones))
-    
-    resultado = cursor.fetchone()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Una búsqueda en idx_registros_huella en lugar de comparar campo por campo
+        cursor.execute(f'''
+        SELECT id FROM registros_pagos
+        WHERE huella = {_sql_huella(parametros=True)}
+        LIMIT 1
+        ''', {
+            'fecha_reporte': fecha_reporte, 'ruc': ruc, 'id_documento': id_documento,
+            'campaña': campaña, 'asesor': asesor,
+            'promesa_ga': promesa_ga, 'monto_gasto': monto_gasto, 'fecha_pago_gasto': fecha_pago_gasto,
+            'promesa_planilla': promesa_planilla, 'monto_planilla': monto_planilla,
+            'fecha_pago_planilla': fecha_pago_planilla, 'observaciones': observaciones,
+        })
+        
+        resultado = cursor.fetchone()
     
     if resultado:
         return True, resultado[0], f"⚠️ Duplicado detectado: Este registro ya existe (ID: {resultado[0]})"
     else:
         return False, None, None
 
+@cacheado('registros')
 def obtener_ranking_asesores(fecha_inicio=None, fecha_fin=None):
     """Obtiene ranking de asesores por total cobrado en el período"""
     if fecha_inicio is None:
         fecha_inicio = date.today().isoformat()
     
     if fecha_fin is None:
-        fecha_fin = date.today().isoformat()
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT 
-        COALESCE(asesor, 'SIN ASESOR') as asesor,
-        COUNT(DISTINCT ruc) as total_rucs,
-        COUNT(DISTINCT CASE WHEN monto_gasto > 0 THEN ruc END) as rucs_ga,
-        COUNT(DISTINCT CASE WHEN monto_planilla > 0 THEN ruc END) as rucs_planilla,
-        COALESCE(SUM(CASE WHEN monto_gasto > 0 THEN monto_gasto ELSE 0 END), 0) as total_ga,
-        COALESCE(SUM(CASE WHEN monto_planilla > 0 THEN monto_planilla ELSE 0 END), 0) as total_planilla,
-        COALESCE(SUM(CASE WHEN monto_gasto > 0 THEN monto_gasto ELSE 0 END), 0) 
-        + COALESCE(SUM(CASE WHEN monto_planilla > 0 THEN monto_planilla ELSE 0 END), 0) as total_cobrado
-    FROM registros_pagos
-    WHERE fecha_reporte BETWEEN ? AND ?
-    GROUP BY asesor
-    ORDER BY total_cobrado DESC
-    ''', (fecha_inicio, fecha_fin))
+        fecha_fin = date.today().isoformat()
     
-    resultados = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT 
+            COALESCE(asesor, 'SIN ASESOR') as asesor,
+            COUNT(DISTINCT ruc) as total_rucs,
+            COUNT(DISTINCT CASE WHEN monto_gasto > 0 THEN ruc END) as rucs_ga,
+            COUNT(DISTINCT CASE WHEN monto_planilla > 0 THEN ruc END) as rucs_planilla,
+            COALESCE(SUM(CASE WHEN monto_gasto > 0 THEN monto_gasto ELSE 0 END), 0) as total_ga,
+            COALESCE(SUM(CASE WHEN monto_planilla > 0 THEN monto_planilla ELSE 0 END), 0) as total_planilla,
+            COALESCE(SUM(CASE WHEN monto_gasto > 0 THEN monto_gasto ELSE 0 END), 0) 
+            + COALESCE(SUM(CASE WHEN monto_planilla > 0 THEN monto_planilla ELSE 0 END), 0) as total_cobrado
+        FROM registros_pagos
+        WHERE fecha_reporte BETWEEN ? AND ?
+        GROUP BY asesor
+        ORDER BY total_cobrado DESC
+        ''', (fecha_inicio, fecha_fin))
+        
+        resultados = cursor.fetchall()
     
     return resultados
 
+@cacheado(_ambito_fecha_reporte)
 def obtener_estadisticas_hoy():
     """Obtiene estadísticas de pagos de hoy"""
     hoy = date.today().isoformat()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Total de montos registrados
-    cursor.execute('''
-    SELECT 
-        COUNT(*) as total_registros,
-        SUM(CASE WHEN monto_gasto > 0 THEN 1 ELSE 0 END) as registros_gasto,
-        SUM(CASE WHEN monto_planilla > 0 THEN 1 ELSE 0 END) as registros_planilla,
-        SUM(COALESCE(monto_gasto, 0)) as total_gasto,
-        SUM(COALESCE(monto_planilla, 0)) as total_planilla,
-        SUM(COALESCE(monto_gasto, 0) + COALESCE(monto_planilla, 0)) as total_cobrado
-    FROM registros_pagos
-    WHERE fecha_reporte = ?
-    ''', (hoy,))
-    
-    stats = cursor.fetchone()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Total de montos registrados
+        cursor.execute('''
+        SELECT 
+            COUNT(*) as total_registros,
+            SUM(CASE WHEN monto_gasto > 0 THEN 1 ELSE 0 END) as registros_gasto,
+            SUM(CASE WHEN monto_planilla > 0 THEN 1 ELSE 0 END) as registros_planilla,
+            SUM(COALESCE(monto_gasto, 0)) as total_gasto,
+            SUM(COALESCE(monto_planilla, 0)) as total_planilla,
+            SUM(COALESCE(monto_gasto, 0) + COALESCE(monto_planilla, 0)) as total_cobrado
+        FROM registros_pagos
+        WHERE fecha_reporte = ?
+        ''', (hoy,))
+        
+        stats = cursor.fetchone()
     
     return {
         'total_registros': stats[0] or 0,
@@ -348,41 +2118,45 @@ def obtener_estadisticas_hoy():
         'total_cobrado': stats[5] or 0
     }
 
+@cacheado('rucs')
 def obtener_ruc_por_id(ruc_id):
     """Obtiene información del RUC basado en ruc_id"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT id, ruc, id_documento, razon_social, campaña FROM rucs WHERE id = ?', (ruc_id,))
-    resultado = cursor.fetchone()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id, ruc, id_documento, razon_social, campaña FROM rucs WHERE id = ?', (ruc_id,))
+        resultado = cursor.fetchone()
     return resultado
 
+@cacheado('registros')
 def obtener_resumen_por_ruc():
     """Obtiene un resumen de registros por RUC"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT 
-        ruc,
-        COUNT(*) as total_registros,
-        SUM(COALESCE(monto_gasto, 0)) as total_gasto,
-        SUM(COALESCE(monto_planilla, 0)) as total_planilla,
-        SUM(COALESCE(monto_gasto, 0) + COALESCE(monto_planilla, 0)) as total_cobrado
-    FROM registros_pagos
-    GROUP BY ruc
-    ORDER BY ruc
-    ''')
-    
-    resumen = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT 
+            ruc,
+            COUNT(*) as total_registros,
+            SUM(COALESCE(monto_gasto, 0)) as total_gasto,
+            SUM(COALESCE(monto_planilla, 0)) as total_planilla,
+            SUM(COALESCE(monto_gasto, 0) + COALESCE(monto_planilla, 0)) as total_cobrado
+        FROM registros_pagos
+        GROUP BY ruc
+        ORDER BY ruc
+        ''')
+        
+        resumen = cursor.fetchall()
     return resumen
 
 def exportar_a_csv():
     """Exporta registros a CSV"""
-    df = pd.read_sql_query('SELECT * FROM registros_pagos ORDER BY fecha_reporte DESC', 
-                          sqlite3.connect(DB_PATH))
+    import pandas as pd
+    
+    with conectar() as conn:
+        df = pd.read_sql_query('SELECT * FROM registros_pagos ORDER BY fecha_reporte DESC', conn)
+    # huella es una columna generada, no se exporta
+    df = df.drop(columns=['huella'], errors='ignore')
     filename = f"registros_pagos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     df.to_csv(filename, index=False, encoding='utf-8')
     return filename
@@ -391,49 +2165,49 @@ def importar_excel(file_path):
     """Ya no se usa - los RUCs se importaron con clean_db.py"""
     pass
 
+@cacheado('rucs')
 def obtener_campanas_unicas():
     """Obtiene las campañas únicas de los RUCs"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT DISTINCT campaña FROM rucs ORDER BY campaña')
-    campanas = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT DISTINCT campaña FROM rucs ORDER BY campaña')
+        campanas = [row[0] for row in cursor.fetchall()]
     return campanas
 
+@cacheado('rucs')
 def obtener_asesores_unicos():
     """Obtiene los asesores únicos"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT DISTINCT asesor FROM rucs WHERE asesor IS NOT NULL ORDER BY asesor')
-    asesores = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT DISTINCT asesor FROM rucs WHERE asesor IS NOT NULL ORDER BY asesor')
+        asesores = [row[0] for row in cursor.fetchall()]
     return asesores
 
+@cacheado(_ambito_fecha_pago)
 def obtener_promesas_por_fecha(fecha):
     """Obtiene los pagos prometidos para una fecha específica (solo A VENCER)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Pagos de gasto prometidos para esa fecha (solo A VENCER)
-    cursor.execute('''
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           promesa_ga, monto_gasto, fecha_pago_gasto,
-           'GASTO' as tipo_pago, observaciones
-    FROM registros_pagos
-    WHERE fecha_pago_gasto = ? AND promesa_ga = 'A VEN...'
-    UNION ALL
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           promesa_planilla, monto_planilla, fecha_pago_planilla,
-           'PLANILLA' as tipo_pago, observaciones
-    FROM registros_pagos
-    WHERE fecha_pago_planilla = ? AND promesa_planilla = 'A VEN...'
-    ORDER BY ruc
-    ''', (fecha, fecha))
-    
-    registros = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Pagos de gasto prometidos para esa fecha (solo A VENCER)
+        cursor.execute('''
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               promesa_ga, monto_gasto, fecha_pago_gasto,
+               'GASTO' as tipo_pago, observaciones
+        FROM registros_pagos
+        WHERE fecha_pago_gasto = ? AND promesa_ga = 'A VEN...'
+        UNION ALL
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               promesa_planilla, monto_planilla, fecha_pago_planilla,
+               'PLANILLA' as tipo_pago, observaciones
+        FROM registros_pagos
+        WHERE fecha_pago_planilla = ? AND promesa_planilla = 'A VEN...'
+        ORDER BY ruc
+        ''', (fecha, fecha))
+        
+        registros = cursor.fetchall()
     return registros
 
 def obtener_promesas_hoy():
@@ -441,35 +2215,35 @@ def obtener_promesas_hoy():
     hoy = date.today().isoformat()
     return obtener_promesas_por_fecha(hoy)
 
+@cacheado(_ambito_fecha_pago)
 def obtener_estadisticas_promesas_hoy():
     """Obtiene estadísticas de promesas para hoy (solo A VENCER)"""
     hoy = date.today().isoformat()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Promesas de Gasto para hoy (solo A VENCER)
-    cursor.execute('''
-    SELECT COUNT(*), SUM(COALESCE(monto_gasto, 0))
-    FROM registros_pagos
-    WHERE fecha_pago_gasto = ? AND promesa_ga = 'A VEN...'
-    ''', (hoy,))
-    
-    gasto_result = cursor.fetchone()
-    gasto_count = gasto_result[0] or 0
-    gasto_monto = gasto_result[1] or 0
-    
-    # Promesas de Planilla para hoy (solo A VENCER)
-    cursor.execute('''
-    SELECT COUNT(*), SUM(COALESCE(monto_planilla, 0))
-    FROM registros_pagos
-    WHERE fecha_pago_planilla = ? AND promesa_planilla = 'A VEN...'
-    ''', (hoy,))
-    
-    planilla_result = cursor.fetchone()
-    planilla_count = planilla_result[0] or 0
-    planilla_monto = planilla_result[1] or 0
-    
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Promesas de Gasto para hoy (solo A VENCER)
+        cursor.execute('''
+        SELECT COUNT(*), SUM(COALESCE(monto_gasto, 0))
+        FROM registros_pagos
+        WHERE fecha_pago_gasto = ? AND promesa_ga = 'A VEN...'
+        ''', (hoy,))
+        
+        gasto_result = cursor.fetchone()
+        gasto_count = gasto_result[0] or 0
+        gasto_monto = gasto_result[1] or 0
+        
+        # Promesas de Planilla para hoy (solo A VENCER)
+        cursor.execute('''
+        SELECT COUNT(*), SUM(COALESCE(monto_planilla, 0))
+        FROM registros_pagos
+        WHERE fecha_pago_planilla = ? AND promesa_planilla = 'A VEN...'
+        ''', (hoy,))
+        
+        planilla_result = cursor.fetchone()
+        planilla_count = planilla_result[0] or 0
+        planilla_monto = planilla_result[1] or 0
+        
     
     return {
         'promesas_gasto_count': gasto_count,
@@ -480,6 +2254,7 @@ def obtener_estadisticas_promesas_hoy():
         'total_monto_promesas': gasto_monto + planilla_monto
     }
 
+@cacheado(lambda tipo_pago='gasto', fecha=None: _ambito_fecha_pago(fecha))
 def obtener_resumen_por_asesor_promesa(tipo_pago='gasto', fecha=None):
     """
     Obtiene resumen agrupado por Asesor y Promesa
@@ -489,103 +2264,157 @@ def obtener_resumen_por_asesor_promesa(tipo_pago='gasto', fecha=None):
     if fecha is None:
         fecha = date.today().isoformat()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if tipo_pago == 'gasto':
-        # Resumen de Gasto Administrativo
-        cursor.execute('''
-        SELECT 
-            asesor,
-            promesa_ga as promesa,
-            COUNT(*) as count_ruc,
-            SUM(COALESCE(monto_gasto, 0)) as monto
-        FROM registros_pagos
-        WHERE fecha_pago_gasto = ? AND monto_gasto > 0
-        GROUP BY asesor, promesa_ga
-        ORDER BY asesor, promesa_ga
-        ''', (fecha,))
-    else:
-        # Resumen de Planilla
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Lee el resumen materializado (ver mantener_resumen_diario)
         cursor.execute('''
         SELECT 
-            asesor,
-            promesa_planilla as promesa,
-            COUNT(*) as count_ruc,
-            SUM(COALESCE(monto_planilla, 0)) as monto
-        FROM registros_pagos
-        WHERE fecha_pago_planilla = ? AND monto_planilla > 0
-        GROUP BY asesor, promesa_planilla
-        ORDER BY asesor, promesa_planilla
-        ''', (fecha,))
-    
-    resultados = cursor.fetchall()
-    conn.close()
+            NULLIF(asesor, '') as asesor,
+            NULLIF(promesa, '') as promesa,
+            SUM(registros_con_monto) as count_ruc,
+            SUM(monto) as monto
+        FROM resumen_diario
+        WHERE fecha_pago = ? AND tipo_pago = ? AND registros_con_monto > 0
+        GROUP BY asesor, promesa
+        ORDER BY asesor, promesa
+        ''', (fecha, 'gasto' if tipo_pago == 'gasto' else 'planilla'))
+        
+        resultados = cursor.fetchall()
     
     return resultados
 
+@cacheado(lambda tipo_pago='gasto', fecha=None: _ambito_fecha_pago(fecha))
 def obtener_resumen_total_por_promesa(tipo_pago='gasto', fecha=None):
     """Obtiene totales por Promesa (A VENCER, COBRADO, Total)"""
     if fecha is None:
         fecha = date.today().isoformat()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if tipo_pago == 'gasto':
-        cursor.execute('''
-        SELECT 
-            promesa_ga as promesa,
-            COUNT(*) as count_ruc,
-            SUM(COALESCE(monto_gasto, 0)) as monto
-        FROM registros_pagos
-        WHERE fecha_pago_gasto = ? AND monto_gasto > 0
-        GROUP BY promesa_ga
-        ORDER BY promesa_ga
-        ''', (fecha,))
-    else:
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute('''
         SELECT 
-            promesa_planilla as promesa,
-            COUNT(*) as count_ruc,
-            SUM(COALESCE(monto_planilla, 0)) as monto
-        FROM registros_pagos
-        WHERE fecha_pago_planilla = ? AND monto_planilla > 0
-        GROUP BY promesa_planilla
-        ORDER BY promesa_planilla
-        ''', (fecha,))
-    
-    resultados = cursor.fetchall()
-    conn.close()
+            NULLIF(promesa, '') as promesa,
+            SUM(registros_con_monto) as count_ruc,
+            SUM(monto) as monto
+        FROM resumen_diario
+        WHERE fecha_pago = ? AND tipo_pago = ? AND registros_con_monto > 0
+        GROUP BY promesa
+        ORDER BY promesa
+        ''', (fecha, 'gasto' if tipo_pago == 'gasto' else 'planilla'))
+        
+        resultados = cursor.fetchall()
     
     return resultados
 
+class ResumenTipoPago(NamedTuple):
+    """Resumen de un tipo de pago (gasto o planilla) en el Dashboard"""
+    por_promesa: tuple    # (promesa, rucs, monto) por promesa
+    por_asesor: tuple     # (asesor, promesa, rucs, monto) por asesor y promesa
+    total_monto: float
+    total_rucs: int
+
+    def promesa(self, nombre):
+        """(promesa, rucs, monto) de una promesa, o None si no hay montos con esa promesa"""
+        return next((fila for fila in self.por_promesa if fila[0] == nombre), None)
+
+class SnapshotDashboard(NamedTuple):
+    """Todo lo que muestra el Dashboard para una fecha (ver obtener_snapshot_dashboard)"""
+    fecha: str
+    gasto: ResumenTipoPago
+    planilla: ResumenTipoPago
+    registros: int        # registros reportados en la fecha
+    rucs_unicos: int      # RUCs distintos reportados en la fecha
+
+    @property
+    def total_general(self):
+        return self.gasto.total_monto + self.planilla.total_monto
+
+def _resumen_tipo_pago(por_asesor):
+    """Arma ResumenTipoPago a partir de las filas (asesor, promesa, rucs, monto) ordenadas"""
+    por_promesa = {}
+    for _, promesa, rucs, monto in por_asesor:
+        acumulado = por_promesa.get(promesa, (0, 0))
+        por_promesa[promesa] = (acumulado[0] + rucs, acumulado[1] + monto)
+    # Mismo orden que ORDER BY promesa (NULL primero)
+    filas = tuple((promesa, rucs, monto) for promesa, (rucs, monto)
+                  in sorted(por_promesa.items(), key=lambda p: (p[0] is not None, p[0] or '')))
+    return ResumenTipoPago(filas, tuple(por_asesor),
+                           sum(f[2] for f in filas), sum(f[1] for f in filas))
+
+@cacheado(lambda fecha=None: _ambito_fecha_pago(fecha), lambda fecha=None: _ambito_fecha_reporte(fecha))
+def obtener_snapshot_dashboard(fecha=None):
+    """
+    Datos del Dashboard de una fecha (hoy por defecto) en una sola consulta: los montos
+    y RUCs por asesor y promesa de gasto y planilla (resumen materializado por fecha de pago)
+    y los registros y RUCs distintos reportados ese día.
+    Los totales por promesa se suman de las filas por asesor.
+    Retorna: SnapshotDashboard
+    """
+    if fecha is None:
+        fecha = date.today()
+    fecha = fecha.isoformat() if isinstance(fecha, date) else fecha
+
+    with conectar() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        SELECT tipo_pago, NULLIF(asesor, '') as asesor, NULLIF(promesa, '') as promesa,
+               SUM(registros_con_monto), SUM(monto)
+        FROM resumen_diario
+        WHERE fecha_pago = ? AND registros_con_monto > 0
+        GROUP BY tipo_pago, asesor, promesa
+        UNION ALL
+        SELECT 'registros', NULL, NULL, COUNT(*), COUNT(DISTINCT ruc)
+        FROM registros_pagos
+        WHERE fecha_reporte = ?
+        ORDER BY 1, 2, 3
+        ''', (fecha, fecha))
+
+        filas = cursor.fetchall()
+
+    por_tipo = {'gasto': [], 'planilla': []}
+    registros = rucs_unicos = 0
+    for tipo, asesor, promesa, cantidad, monto in filas:
+        if tipo == 'registros':
+            registros, rucs_unicos = cantidad, monto
+        else:
+            por_tipo[tipo].append((asesor, promesa, cantidad, monto))
+
+    return SnapshotDashboard(fecha, _resumen_tipo_pago(por_tipo['gasto']),
+                             _resumen_tipo_pago(por_tipo['planilla']), registros, rucs_unicos)
+
+@cacheado(_ambito_fecha_pago)
 def obtener_resumen_asesores_diario(fecha=None):
     """Obtiene resumen diario de lo cobrado por cada asesor (GA + Planilla)"""
     if fecha is None:
         fecha = date.today().isoformat()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT 
-        COALESCE(asesor, 'SIN ASESOR') as asesor,
-        COUNT(DISTINCT CASE WHEN monto_gasto > 0 THEN ruc END) as rucs_ga,
-        COUNT(DISTINCT CASE WHEN monto_planilla > 0 THEN ruc END) as rucs_planilla,
-        COALESCE(SUM(CASE WHEN fecha_pago_gasto = ? AND monto_gasto > 0 THEN monto_gasto ELSE 0 END), 0) as total_ga,
-        COALESCE(SUM(CASE WHEN fecha_pago_planilla = ? AND monto_planilla > 0 THEN monto_planilla ELSE 0 END), 0) as total_planilla
-    FROM registros_pagos
-    WHERE (fecha_pago_gasto = ? OR fecha_pago_planilla = ?)
-    GROUP BY asesor
-    ORDER BY (total_ga + total_planilla) DESC
-    ''', (fecha, fecha, fecha, fecha))
-    
-    resultados = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # RUCs: distintos con monto cobrado ese día en cada tipo de pago
+        cursor.execute('''
+        SELECT 
+            COALESCE(NULLIF(r.asesor, ''), 'SIN ASESOR') as asesor,
+            (SELECT COUNT(*) FROM resumen_diario_rucs x
+             WHERE x.fecha_pago = r.fecha_pago AND x.tipo_pago = 'gasto' AND x.asesor = r.asesor) as rucs_ga,
+            (SELECT COUNT(*) FROM resumen_diario_rucs x
+             WHERE x.fecha_pago = r.fecha_pago AND x.tipo_pago = 'planilla' AND x.asesor = r.asesor) as rucs_planilla,
+            SUM(CASE WHEN r.tipo_pago = 'gasto' THEN r.monto ELSE 0 END) as total_ga,
+            SUM(CASE WHEN r.tipo_pago = 'planilla' THEN r.monto ELSE 0 END) as total_planilla
+        FROM resumen_diario r
+        WHERE r.fecha_pago = ?
+        GROUP BY r.asesor
+        ORDER BY (total_ga + total_planilla) DESC
+        ''', (fecha,))
+        
+        resultados = cursor.fetchall()
     
     return resultados
 
+@cacheado('registros')
 def obtener_promesas_pendientes(fecha_inicio=None, fecha_fin=None):
     """Obtiene promesas pendientes (A VENCER) con fecha de pago entre dos fechas"""
     if fecha_inicio is None:
@@ -595,103 +2424,62 @@ def obtener_promesas_pendientes(fecha_inicio=None, fecha_fin=None):
         # Por defecto, mostrar los próximos 30 días
         fecha_fin = (date.today() + __import__('datetime').timedelta(days=30)).isoformat()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # RUCs con promesas A VENCER que tengan fecha de pago en el rango especificado
-    cursor.execute('''
-    SELECT DISTINCT
-        ruc,
-        id_documento,
-        asesor,
-        campaña,
-        promesa_ga,
-        promesa_planilla,
-        CASE 
-            WHEN promesa_ga = 'A VEN...' AND fecha_pago_gasto != '' AND fecha_pago_gasto IS NOT NULL THEN fecha_pago_gasto
-            WHEN promesa_planilla = 'A VEN...' AND fecha_pago_planilla != '' AND fecha_pago_planilla IS NOT NULL THEN fecha_pago_planilla
-            ELSE NULL
-        END as fecha_pago_pendiente,
-        MAX(fecha_reporte) as ultima_fecha
-    FROM registros_pagos
-    WHERE 
-        (promesa_ga = 'A VEN...' OR promesa_planilla = 'A VEN...')
-        AND (
-            (promesa_ga = 'A VEN...' AND fecha_pago_gasto BETWEEN ? AND ? AND fecha_pago_gasto != '')
-            OR (promesa_planilla = 'A VEN...' AND fecha_pago_planilla BETWEEN ? AND ? AND fecha_pago_planilla != '')
-        )
-    GROUP BY ruc
-    ORDER BY fecha_pago_pendiente, asesor, ruc
-    ''', (fecha_inicio, fecha_fin, fecha_inicio, fecha_fin))
-    
-    resultados = cursor.fetchall()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # RUCs con promesas A VENCER que tengan fecha de pago en el rango especificado
+        cursor.execute('''
+        SELECT DISTINCT
+            ruc,
+            id_documento,
+            asesor,
+            campaña,
+            promesa_ga,
+            promesa_planilla,
+            CASE 
+                WHEN promesa_ga = 'A VEN...' AND fecha_pago_gasto != '' AND fecha_pago_gasto IS NOT NULL THEN fecha_pago_gasto
+                WHEN promesa_planilla = 'A VEN...' AND fecha_pago_planilla != '' AND fecha_pago_planilla IS NOT NULL THEN fecha_pago_planilla
+                ELSE NULL
+            END as fecha_pago_pendiente,
+            MAX(fecha_reporte) as ultima_fecha
+        FROM registros_pagos
+        WHERE 
+            (promesa_ga = 'A VEN...' OR promesa_planilla = 'A VEN...')
+            AND (
+                (promesa_ga = 'A VEN...' AND fecha_pago_gasto BETWEEN ? AND ? AND fecha_pago_gasto != '')
+                OR (promesa_planilla = 'A VEN...' AND fecha_pago_planilla BETWEEN ? AND ? AND fecha_pago_planilla != '')
+            )
+        GROUP BY ruc
+        ORDER BY fecha_pago_pendiente, asesor, ruc
+        ''', (fecha_inicio, fecha_fin, fecha_inicio, fecha_fin))
+        
+        resultados = cursor.fetchall()
     
     return resultados
 
-def obtener_estadisticas_montos():
-    """Obtiene estadísticas de montos para detectar valores anormales"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Estadísticas de Gasto Administrativo
-    cursor.execute('''
-    SELECT 
-        AVG(monto_gasto) as promedio_ga,
-        MIN(monto_gasto) as min_ga,
-        MAX(monto_gasto) as max_ga,
-        COUNT(*) as count_ga
-    FROM registros_pagos
-    WHERE monto_gasto > 0
-    ''')
-    
-    stats_ga = cursor.fetchone()
-    
-    # Estadísticas de Planilla
-    cursor.execute('''
-    SELECT 
-        AVG(monto_planilla) as promedio_plan,
-        MIN(monto_planilla) as min_plan,
-        MAX(monto_planilla) as max_plan,
-        COUNT(*) as count_plan
-    FROM registros_pagos
-    WHERE monto_planilla > 0
-    ''')
-    
-    stats_plan = cursor.fetchone()
-    
-    conn.close()
-    
-    return {
-        'ga': stats_ga if stats_ga[0] else (0, 0, 0, 0),
-        'planilla': stats_plan if stats_plan[0] else (0, 0, 0, 0)
-    }
+def obtener_estadisticas_montos(campaña=None):
+    """Obtiene estadísticas de montos para detectar valores anormales
+    Lee estadisticas_montos (mantenida por triggers), no recorre registros_pagos"""
+    stats = {}
+    for clave, tipo in (('ga', 'gasto'), ('planilla', 'planilla')):
+        est = obtener_estadistica_monto(tipo, campaña)
+        stats[clave] = (est['promedio'], est['minimo'], est['maximo'], est['n']) if est['n'] else (0, 0, 0, 0)
+    return stats
 
-def detectar_monto_anormal(monto, tipo_pago='ga', ruc=None):
+def detectar_monto_anormal(monto, tipo_pago='ga', ruc=None, campaña=None):
     """
     Detecta si un monto es anormalmente alto o bajo
     Si se proporciona RUC, compara contra el saldo del RUC específico
-    Si no hay RUC, compara contra el promedio general
+    Si no hay RUC, compara contra el promedio general (de la campaña si tiene suficientes datos)
     tipo_pago: 'ga' o 'planilla'
     Retorna: (es_anormal, tipo_anomalia, mensaje)
     """
     if monto <= 0:
         return False, None, None
     
-    # Si se proporciona RUC, comparar contra su saldo específico
+    # Si se proporciona RUC, comparar contra su saldo por cobrar (pendiente + caído)
     if ruc:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        if tipo_pago == 'ga':
-            cursor.execute('SELECT SUM(monto_gasto) FROM registros_pagos WHERE ruc = ? AND promesa_ga != "COBRADO"', (ruc,))
-        else:
-            cursor.execute('SELECT SUM(monto_planilla) FROM registros_pagos WHERE ruc = ? AND promesa_planilla != "COBRADO"', (ruc,))
-        
-        resultado = cursor.fetchone()
-        conn.close()
-        
-        saldo_ruc = resultado[0] if resultado[0] else 0
+        saldo_ruc = obtener_saldo_ruc(ruc)['planilla' if tipo_pago == 'planilla' else 'ga']['por_cobrar']
         
         # Si hay saldo del RUC, comparar contra él
         if saldo_ruc > 0:
@@ -719,19 +2507,42 @@ def detectar_monto_anormal(monto, tipo_pago='ga', ruc=None):
                     f"Este monto es el **{porcentaje:.0f}%** del saldo del RUC."
                 )
     
-    # Fallback: comparar contra el promedio general
-    stats = obtener_estadisticas_montos()
+    # Fallback: comparar contra el promedio general (una lectura de estadisticas_montos)
+    est = obtener_estadistica_monto(tipo_pago, campaña)
+    if campaña and est['n'] < MIN_MUESTRAS_DESVIACION:
+        est = obtener_estadistica_monto(tipo_pago)
     
-    if tipo_pago == 'ga':
-        promedio, minimo, maximo, count = stats['ga']
-    else:
-        promedio, minimo, maximo, count = stats['planilla']
+    promedio, desviacion, count = est['promedio'], est['desviacion'], est['n']
     
     # Si no hay suficientes datos, no alertar
     if count == 0 or promedio == 0:
         return False, None, None
     
-    # Calcular rangos tolerables (50% - 150% del promedio)
+    # Con suficientes datos: alertar a más de UMBRAL_DESVIACIONES desviaciones del promedio
+    if count >= MIN_MUESTRAS_DESVIACION and desviacion > 0:
+        desviaciones = (monto - promedio) / desviacion
+        
+        if desviaciones < -UMBRAL_DESVIACIONES:
+            return True, "BAJO", (
+                f"⚠️ **Monto ANORMALMENTE BAJO**\n\n"
+                f"Monto ingresado: S/. {monto:,.2f}\n"
+                f"Promedio histórico: S/. {promedio:,.2f}\n"
+                f"Desviación estándar: S/. {desviacion:,.2f}\n\n"
+                f"Este monto está **{-desviaciones:.1f} desviaciones** por debajo del promedio."
+            )
+        
+        elif desviaciones > UMBRAL_DESVIACIONES:
+            return True, "ALTO", (
+                f"⚠️ **Monto ANORMALMENTE ALTO**\n\n"
+                f"Monto ingresado: S/. {monto:,.2f}\n"
+                f"Promedio histórico: S/. {promedio:,.2f}\n"
+                f"Desviación estándar: S/. {desviacion:,.2f}\n\n"
+                f"Este monto está **{desviaciones:.1f} desviaciones** por encima del promedio."
+            )
+        
+        return False, None, None
+    
+    # Pocos datos: rangos tolerables (50% - 150% del promedio)
     rango_bajo = promedio * 0.5
     rango_alto = promedio * 1.5
     
@@ -758,143 +2569,198 @@ def detectar_monto_anormal(monto, tipo_pago='ga', ruc=None):
     
     return False, None, None
 
-def actualizar_rucs_desde_excel(excel_path="DATA ENERO 2026.xlsx"):
-    """Actualiza los datos de deuda_total y gasto_admin desde el Excel"""
+# Huella del Excel de RUCs ya sincronizado: si no cambió, no se vuelve a leer
+CLAVE_HUELLA_EXCEL = 'huella_excel_rucs'
+
+def _hash_archivo(ruta, bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for trozo in iter(lambda: f.read(bloque), b''):
+            h.update(trozo)
+    return h.hexdigest()
+
+def _estado_rucs(cursor):
+    """Resumen barato de la tabla rucs (cantidad, último id) para saber si se recargó"""
+    cursor.execute('SELECT COUNT(*), MAX(id) FROM rucs')
+    return list(cursor.fetchone())
+
+def _leer_montos_excel(excel_path):
+    """Lee los montos del Excel por RUC y campaña: {(documento, campaña): (deuda_total, gasto_admin)}
+    Las columnas salen de cache_excel: el workbook solo se vuelve a leer si cambió."""
+    import cache_excel
+    
+    tabla = cache_excel.cargar_excel(excel_path)
+    montos = {}
+    # Si un RUC y campaña se repiten gana la primera fila, como en el catálogo (sincronizar_catalogo)
+    for campaña, documento, deuda_total, gasto_admin in tabla.tuplas(
+            ['CAMPAÑA', 'DOCUMENTO', 'DEUDA TOTAL', 'GASTOS ADMIN']):
+        clave = (documento, str(campaña).strip() if campaña is not None else '')
+        montos.setdefault(clave, (deuda_total, gasto_admin))
+    return montos
+
+def actualizar_rucs_desde_excel(excel_path="DATA ENERO 2026.xlsx", forzar=False):
+    """Actualiza los datos de deuda_total y gasto_admin desde el Excel
+
+    Guarda la huella del archivo (tamaño, fecha de modificación y SHA-256) en metadatos:
+    si el archivo no cambió no se lee. Si cambió, solo se actualizan los RUCs cuya
+    deuda o gasto administrativo son distintos, en una sola transacción.
+    Retorna (exito, mensaje).
+    """
     try:
-        # Leer Excel
-        df = pd.read_excel(excel_path)
-        
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Mapear columnas del Excel
-        for _, row in df.iterrows():
-            documento = str(row.get('DOCUMENTO', '')).strip()
-            deuda_total = float(row.get('DEUDA TOTAL', 0)) if pd.notna(row.get('DEUDA TOTAL')) else None
-            gasto_admin = float(row.get('GASTOS ADMIN', 0)) if pd.notna(row.get('GASTOS ADMIN')) else None
-            
-            # Buscar RUC por ID Documento
-            cursor.execute('SELECT id FROM rucs WHERE id_documento = ?', (documento,))
-            resultado = cursor.fetchone()
-            
-            if resultado:
-                ruc_id = resultado[0]
-                cursor.execute('''
-                    UPDATE rucs 
-                    SET deuda_total = ?, gasto_admin = ?
-                    WHERE id = ?
-                ''', (deuda_total, gasto_admin, ruc_id))
-        
-        conn.commit()
-        conn.close()
-        return True, "Datos del Excel actualizados correctamente"
+        stat = os.stat(excel_path)
+
+        with conectar() as conn:
+            cursor = conn.cursor()
+            guardada = _leer_metadato(cursor, CLAVE_HUELLA_EXCEL)
+            guardada = json.loads(guardada) if guardada else {}
+            estado_rucs = _estado_rucs(cursor)
+
+            # Sin RUCs todavía no hay nada que actualizar ni huella que guardar
+            if not estado_rucs[0]:
+                return True, "No hay RUCs cargados para actualizar"
+
+            # Si la tabla rucs se recargó hay que volver a aplicar el Excel aunque no cambie
+            mismo_destino = not forzar and guardada.get('rucs') == estado_rucs
+            if (mismo_destino and guardada.get('tamaño') == stat.st_size
+                    and guardada.get('mtime') == stat.st_mtime_ns):
+                return True, "El Excel no cambió desde la última actualización"
+
+            huella = {'tamaño': stat.st_size, 'mtime': stat.st_mtime_ns,
+                      'sha256': _hash_archivo(excel_path), 'rucs': estado_rucs}
+            if mismo_destino and guardada.get('sha256') == huella['sha256']:
+                # Solo cambió la fecha de modificación (copia, touch): no hace falta leerlo
+                _guardar_metadato(cursor, CLAVE_HUELLA_EXCEL, json.dumps(huella))
+                conn.commit()
+                return True, "El Excel no cambió desde la última actualización"
+
+            nuevos = _leer_montos_excel(excel_path)
+            # rucs es única por (ruc, campaña): cada campaña de un RUC tiene sus propios montos
+            cursor.execute('SELECT ruc, campaña, deuda_total, gasto_admin FROM rucs')
+            cambios = [(*nuevos[(ruc, campaña)], ruc, campaña)
+                       for ruc, campaña, deuda_total, gasto_admin in cursor.fetchall()
+                       if nuevos.get((ruc, campaña), (deuda_total, gasto_admin)) != (deuda_total, gasto_admin)]
+
+            cursor.executemany('''
+                UPDATE rucs
+                SET deuda_total = ?, gasto_admin = ?
+                WHERE ruc = ? AND campaña = ?
+            ''', cambios)
+            _guardar_metadato(cursor, CLAVE_HUELLA_EXCEL, json.dumps(huella))
+            conn.commit()
+        return True, f"Datos del Excel actualizados correctamente ({len(cambios)} RUCs modificados)"
     except Exception as e:
         return False, f"Error al actualizar datos: {str(e)}"
-def detectar_promesas_caidas(fecha_actual=None):
-    """Detecta promesas que vencieron pero no fueron cobradas (PROMESAS CAIDAS)
-    y actualiza su estado automáticamente. También revierte el estado de promesas
-    que se marcaron como caídas pero cuya fecha aún no ha pasado."""
+
+# Marca de agua: última fecha para la que se evaluó el vencimiento de promesas
+CLAVE_PROMESAS_EVALUADAS = 'promesas_evaluadas_hasta'
+
+# Solo fechas ISO (YYYY-MM-DD) participan en la comparación de vencimientos
+_PATRON_FECHA_ISO = "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+
+def evaluar_vencimiento_promesas(fecha_actual=None, forzar=False):
+    """
+    Motor de vencimiento de promesas basado en conjuntos.
+    - A VENCER con fecha de pago pasada -> PROMESA CAIDA
+    - PROMESA CAIDA con fecha de pago hoy o futura -> A VENCER
+    Se ejecuta una sola vez por día: si la marca de agua ya es fecha_actual
+    la llamada solo lee una fila de metadatos (a menos que forzar=True).
+    Retorna: dict con ids que cayeron, cantidad de revertidas y si se evaluó
+    """
     if fecha_actual is None:
         fecha_actual = date.today()
+    hoy = fecha_actual.isoformat() if hasattr(fecha_actual, 'isoformat') else str(fecha_actual)
+    
+    resultado = {
+        'evaluada': False,
+        'caidas_ga': [],
+        'caidas_planilla': [],
+        'revertidas_ga': 0,
+        'revertidas_planilla': 0,
+    }
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Obtener promesas que están en estado 'A VENCER' o 'PROMESA CAIDA'
-    cursor.execute('''
-    SELECT id, fecha_pago_gasto, estado_ga, fecha_pago_planilla, estado_planilla
-    FROM registros_pagos
-    WHERE (estado_ga IN ('A VENCER', 'PROMESA CAIDA') OR estado_planilla IN ('A VENCER', 'PROMESA CAIDA'))
-    ''')
-    
-    registros = cursor.fetchall()
-    caidas_ga = []
-    caidas_planilla = []
-    
-    for registro in registros:
-        registro_id, fecha_ga, estado_ga, fecha_planilla, estado_planilla = registro
+    with conectar() as conn:
+        cursor = conn.cursor()
         
-        # Verificar promesa GA
-        if fecha_ga and estado_ga in ('A VENCER', 'PROMESA CAIDA'):
-            try:
-                fecha_pago = datetime.strptime(fecha_ga, '%Y-%m-%d').date()
-                
-                if fecha_pago < fecha_actual and estado_ga == 'A VENCER':
-                    # La fecha pasó y aún está "A VENCER" → Marcar como CAIDA
-                    cursor.execute('UPDATE registros_pagos SET estado_ga = ? WHERE id = ?', 
-                                 ('PROMESA CAIDA', registro_id))
-                    caidas_ga.append(registro_id)
-                elif fecha_pago >= fecha_actual and estado_ga == 'PROMESA CAIDA':
-                    # La fecha aún no pasa pero está marcada como CAIDA → Revertir a "A VENCER"
-                    cursor.execute('UPDATE registros_pagos SET estado_ga = ? WHERE id = ?', 
-                                 ('A VENCER', registro_id))
-            except:
-                pass
+        if not forzar and _leer_metadato(cursor, CLAVE_PROMESAS_EVALUADAS) == hoy:
+            return resultado
         
-        # Verificar promesa Planilla
-        if fecha_planilla and estado_planilla in ('A VENCER', 'PROMESA CAIDA'):
-            try:
-                fecha_pago = datetime.strptime(fecha_planilla, '%Y-%m-%d').date()
-                
-                if fecha_pago < fecha_actual and estado_planilla == 'A VENCER':
-                    # La fecha pasó y aún está "A VENCER" → Marcar como CAIDA
-                    cursor.execute('UPDATE registros_pagos SET estado_planilla = ? WHERE id = ?', 
-                                 ('PROMESA CAIDA', registro_id))
-                    caidas_planilla.append(registro_id)
-                elif fecha_pago >= fecha_actual and estado_planilla == 'PROMESA CAIDA':
-                    # La fecha aún no pasa pero está marcada como CAIDA → Revertir a "A VENCER"
-                    cursor.execute('UPDATE registros_pagos SET estado_planilla = ? WHERE id = ?', 
-                                 ('A VENCER', registro_id))
-            except:
-                pass
-    
-    conn.commit()
-    conn.close()
+        for tipo, estado_col, fecha_col in (('ga', 'estado_ga', 'fecha_pago_gasto'),
+                                            ('planilla', 'estado_planilla', 'fecha_pago_planilla')):
+            # La fecha pasó y aún está "A VENCER" → Marcar como CAIDA
+            condicion_caida = (f"{estado_col} = 'A VENCER' AND {fecha_col} < ? "
+                               f"AND {fecha_col} GLOB {_PATRON_FECHA_ISO}")
+            cursor.execute(f'SELECT id FROM registros_pagos WHERE {condicion_caida}', (hoy,))
+            resultado[f'caidas_{tipo}'] = [row[0] for row in cursor.fetchall()]
+            
+            if resultado[f'caidas_{tipo}']:
+                cursor.execute(f"UPDATE registros_pagos SET {estado_col} = 'PROMESA CAIDA', "
+                               f"version = version + 1 WHERE {condicion_caida}", (hoy,))
+            
+            # La fecha aún no pasa pero está marcada como CAIDA → Revertir a "A VENCER"
+            cursor.execute(f"""
+            UPDATE registros_pagos SET {estado_col} = 'A VENCER', version = version + 1
+            WHERE {estado_col} = 'PROMESA CAIDA' AND {fecha_col} >= ?
+              AND {fecha_col} GLOB {_PATRON_FECHA_ISO}
+            """, (hoy,))
+            resultado[f'revertidas_{tipo}'] = cursor.rowcount
+        
+        _guardar_metadato(cursor, CLAVE_PROMESAS_EVALUADAS, hoy)
+        conn.commit()
     
-    return caidas_ga, caidas_planilla
+    resultado['evaluada'] = True
+    return resultado
+
+def detectar_promesas_caidas(fecha_actual=None, forzar=False):
+    """Detecta promesas que vencieron pero no fueron cobradas (PROMESAS CAIDAS)
+    y actualiza su estado automáticamente. También revierte el estado de promesas
+    que se marcaron como caídas pero cuya fecha aún no ha pasado.
+    Usa evaluar_vencimiento_promesas(): a lo sumo una evaluación por día."""
+    resultado = evaluar_vencimiento_promesas(fecha_actual, forzar=forzar)
+    return resultado['caidas_ga'], resultado['caidas_planilla']
 
+@cacheado('registros')
 def obtener_promesas_caidas(fecha_inicio=None, fecha_fin=None):
     """Obtiene todas las promesas caídas en un rango de fechas
     Solo muestra promesas que están como CAIDA pero cuyo estado original era A VENCER"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if fecha_inicio is None:
-        fecha_inicio = (date.today() - pd.Timedelta(days=30)).strftime('%Y-%m-%d')
-    if fecha_fin is None:
-        fecha_fin = date.today().strftime('%Y-%m-%d')
-    
-    # Promesas GA caídas (excluir si ALGUNO de los dos está COBRADO)
-    cursor.execute('''
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           'GASTO ADMINISTRATIVO' as tipo_promesa,
-           promesa_ga as estado_promesa, monto_gasto as monto,
-           fecha_pago_gasto as fecha_vencimiento, observaciones
-    FROM registros_pagos
-    WHERE estado_ga = 'PROMESA CAIDA'
-    AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
-    AND fecha_reporte BETWEEN ? AND ?
-    ORDER BY fecha_pago_gasto DESC
-    ''', (fecha_inicio, fecha_fin))
-    
-    caidas_ga = cursor.fetchall()
-    
-    # Promesas Planilla caídas (excluir si ALGUNO de los dos está COBRADO)
-    cursor.execute('''
-    SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
-           'PLANILLA' as tipo_promesa,
-           promesa_planilla as estado_promesa, monto_planilla as monto,
-           fecha_pago_planilla as fecha_vencimiento, observaciones
-    FROM registros_pagos
-    WHERE estado_planilla = 'PROMESA CAIDA'
-    AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
-    AND fecha_reporte BETWEEN ? AND ?
-    ORDER BY fecha_pago_planilla DESC
-    ''', (fecha_inicio, fecha_fin))
-    
-    caidas_planilla = cursor.fetchall()
-    
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        if fecha_inicio is None:
+            fecha_inicio = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
+        if fecha_fin is None:
+            fecha_fin = date.today().strftime('%Y-%m-%d')
+        
+        # Promesas GA caídas (excluir si ALGUNO de los dos está COBRADO)
+        cursor.execute('''
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               'GASTO ADMINISTRATIVO' as tipo_promesa,
+               promesa_ga as estado_promesa, monto_gasto as monto,
+               fecha_pago_gasto as fecha_vencimiento, observaciones
+        FROM registros_pagos
+        WHERE estado_ga = 'PROMESA CAIDA'
+        AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
+        AND fecha_reporte BETWEEN ? AND ?
+        ORDER BY fecha_pago_gasto DESC
+        ''', (fecha_inicio, fecha_fin))
+        
+        caidas_ga = cursor.fetchall()
+        
+        # Promesas Planilla caídas (excluir si ALGUNO de los dos está COBRADO)
+        cursor.execute('''
+        SELECT id, fecha_reporte, ruc, id_documento, campaña, asesor,
+               'PLANILLA' as tipo_promesa,
+               promesa_planilla as estado_promesa, monto_planilla as monto,
+               fecha_pago_planilla as fecha_vencimiento, observaciones
+        FROM registros_pagos
+        WHERE estado_planilla = 'PROMESA CAIDA'
+        AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
+        AND fecha_reporte BETWEEN ? AND ?
+        ORDER BY fecha_pago_planilla DESC
+        ''', (fecha_inicio, fecha_fin))
+        
+        caidas_planilla = cursor.fetchall()
+        
     
     # Combinar resultados
     todas_caidas = caidas_ga + caidas_planilla
@@ -902,79 +2768,78 @@ def obtener_promesas_caidas(fecha_inicio=None, fecha_fin=None):
 
 def marcar_promesa_cobrada(registro_id, tipo_promesa):
     """Marca una promesa caída como cobrada"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if tipo_promesa == 'GASTO ADMINISTRATIVO':
-        cursor.execute('UPDATE registros_pagos SET estado_ga = ? WHERE id = ?',
-                     ('COBRADO', registro_id))
-    else:
-        cursor.execute('UPDATE registros_pagos SET estado_planilla = ? WHERE id = ?',
-                     ('COBRADO', registro_id))
-    
-    conn.commit()
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        if tipo_promesa == 'GASTO ADMINISTRATIVO':
+            cursor.execute('UPDATE registros_pagos SET estado_ga = ?, version = version + 1 WHERE id = ?',
+                         ('COBRADO', registro_id))
+        else:
+            cursor.execute('UPDATE registros_pagos SET estado_planilla = ?, version = version + 1 WHERE id = ?',
+                         ('COBRADO', registro_id))
+        
+        conn.commit()
     return True
 
+@cacheado('registros')
 def obtener_estadisticas_promesas_caidas():
     """Obtiene estadísticas de promesas caídas
     Los pagos de PLANILLA y GASTO ADMINISTRATIVO son independientes
     Se cuentan solo si su estado es PROMESA CAIDA
     Excluye si ALGUNO está COBRADO
     Los RUCs se cuentan sin duplicados"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Filtro: mostrar si CUALQUIERA es PROMESA CAIDA, PERO excluir si ALGUNO está COBRADO
-    filtro_caidas = "(estado_ga = 'PROMESA CAIDA' OR estado_planilla = 'PROMESA CAIDA') AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'"
-    
-    # Total de promesas caídas
-    cursor.execute(f'''
-    SELECT COUNT(*) FROM registros_pagos
-    WHERE {filtro_caidas}
-    ''')
-    total_caidas = cursor.fetchone()[0]
-    
-    # RUCs únicos con promesas caídas
-    cursor.execute(f'''
-    SELECT COUNT(DISTINCT ruc) FROM registros_pagos
-    WHERE {filtro_caidas}
-    ''')
-    rucs_unicos = cursor.fetchone()[0]
-    
-    # Monto total de promesas caídas
-    cursor.execute(f'''
-    SELECT COALESCE(SUM(CASE WHEN estado_ga = 'PROMESA CAIDA'
-                             THEN monto_gasto ELSE 0 END), 0) +
-           COALESCE(SUM(CASE WHEN estado_planilla = 'PROMESA CAIDA'
-                             THEN monto_planilla ELSE 0 END), 0)
-    FROM registros_pagos
-    WHERE estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
-    '''
-    )
-    monto_total = cursor.fetchone()[0] or 0
-    
-    # Por asesor (RUCs únicos)
-    cursor.execute(f'''
-    SELECT asesor, COUNT(DISTINCT ruc) as cantidad
-    FROM registros_pagos
-    WHERE {filtro_caidas}
-    GROUP BY asesor
-    ORDER BY cantidad DESC
-    ''')
-    por_asesor = cursor.fetchall()
-    
-    # Por campaña (RUCs únicos)
-    cursor.execute(f'''
-    SELECT campaña, COUNT(DISTINCT ruc) as cantidad
-    FROM registros_pagos
-    WHERE {filtro_caidas}
-    GROUP BY campaña
-    ORDER BY cantidad DESC
-    ''')
-    por_campana = cursor.fetchall()
-    
-    conn.close()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        
+        # Filtro: mostrar si CUALQUIERA es PROMESA CAIDA, PERO excluir si ALGUNO está COBRADO
+        filtro_caidas = "(estado_ga = 'PROMESA CAIDA' OR estado_planilla = 'PROMESA CAIDA') AND estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'"
+        
+        # Total de promesas caídas
+        cursor.execute(f'''
+        SELECT COUNT(*) FROM registros_pagos
+        WHERE {filtro_caidas}
+        ''')
+        total_caidas = cursor.fetchone()[0]
+        
+        # RUCs únicos con promesas caídas
+        cursor.execute(f'''
+        SELECT COUNT(DISTINCT ruc) FROM registros_pagos
+        WHERE {filtro_caidas}
+        ''')
+        rucs_unicos = cursor.fetchone()[0]
+        
+        # Monto total de promesas caídas
+        cursor.execute(f'''
+        SELECT COALESCE(SUM(CASE WHEN estado_ga = 'PROMESA CAIDA'
+                                 THEN monto_gasto ELSE 0 END), 0) +
+               COALESCE(SUM(CASE WHEN estado_planilla = 'PROMESA CAIDA'
+                                 THEN monto_planilla ELSE 0 END), 0)
+        FROM registros_pagos
+        WHERE estado_ga != 'COBRADO' AND estado_planilla != 'COBRADO'
+        '''
+        )
+        monto_total = cursor.fetchone()[0] or 0
+        
+        # Por asesor (RUCs únicos)
+        cursor.execute(f'''
+        SELECT asesor, COUNT(DISTINCT ruc) as cantidad
+        FROM registros_pagos
+        WHERE {filtro_caidas}
+        GROUP BY asesor
+        ORDER BY cantidad DESC
+        ''')
+        por_asesor = cursor.fetchall()
+        
+        # Por campaña (RUCs únicos)
+        cursor.execute(f'''
+        SELECT campaña, COUNT(DISTINCT ruc) as cantidad
+        FROM registros_pagos
+        WHERE {filtro_caidas}
+        GROUP BY campaña
+        ORDER BY cantidad DESC
+        ''')
+        por_campana = cursor.fetchall()
+        
     
     return {
         'total': total_caidas,
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas y benchmarks
+Crea una BD con la misma estructura de pagos.db y la llena con RUCs y registros aleatorios,
+y workbooks de RUCs con las columnas de "DATA ENERO 2026.xlsx"
+"""
+
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+ASESORES = ['Laura ...', 'Lesly ...', 'Tereza ...', 'Carla ...', 'Miguel ...', None]
+CAMPANAS = ['FLUJO', 'REDI...', 'PRES...']
+PROMESAS = ['A VEN...', 'COBR...', None]
+COLUMNAS_EXCEL = ('CAMPAÑA', 'DOCUMENTO', 'RAZON SOCIAL', 'DEUDA TOTAL', 'GASTOS ADMIN',
+                  'PERIODOS ASIGNADOS', 'ASESOR')
+
+def generar_registro(rnd, rucs, hoy, dias=60):
+    """Genera una tupla de registro de pago con fechas alrededor de hoy"""
+    ruc, id_documento, campaña, asesor = rnd.choice(rucs)
+    fecha_reporte = (hoy - timedelta(days=rnd.randint(0, dias))).isoformat()
+
+    promesa_ga = rnd.choice(PROMESAS)
+    monto_gasto = round(rnd.uniform(50, 800), 2) if promesa_ga else None
+    fecha_pago_gasto = (hoy + timedelta(days=rnd.randint(-dias, 30))).isoformat() if promesa_ga else None
+
+    promesa_planilla = rnd.choice(PROMESAS)
+    monto_planilla = round(rnd.uniform(200, 4000), 2) if promesa_planilla else None
+    fecha_pago_planilla = (hoy + timedelta(days=rnd.randint(-dias, 30))).isoformat() if promesa_planilla else None
+
+    # Mismo criterio que registrar_pago(): fecha de pago pasada => PROMESA CAIDA
+    estado_ga = 'PROMESA CAIDA' if promesa_ga and fecha_pago_gasto < hoy.isoformat() else 'A VENCER'
+    estado_planilla = 'PROMESA CAIDA' if promesa_planilla and fecha_pago_planilla < hoy.isoformat() else 'A VENCER'
+
+    return (fecha_reporte, ruc, id_documento, campaña, asesor,
+            promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
+            promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
+            '', datetime.now().isoformat())
+
+def generar_pagos(n, semilla=1, n_rucs=50, dias=20):
+    """Genera n pagos como dicts con los argumentos de registrar_pago()"""
+    rnd = random.Random(semilla)
+    hoy = date.today()
+    rucs = [(str(20000000000 + i), str(70000000 + i), CAMPANAS[i % len(CAMPANAS)], ASESORES[i % len(ASESORES)])
+            for i in range(n_rucs)]
+    campos = ('fecha_reporte', 'ruc', 'id_documento', 'campaña', 'asesor',
+              'promesa_ga', 'monto_gasto', 'fecha_pago_gasto',
+              'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla', 'observaciones')
+    pagos = []
+    for _ in range(n):
+        r = generar_registro(rnd, rucs, hoy, dias)
+        pagos.append(dict(zip(campos, r[:8] + r[9:12] + (r[13],))))
+    return pagos
+
+# Columnas del CSV de exportar_a_csv
+COLUMNAS_CSV = ('id', 'fecha_reporte', 'ruc', 'id_documento', 'campaña', 'asesor', 'promesa_ga', 'monto_gasto',
+                'fecha_pago_gasto', 'promesa_planilla', 'monto_planilla', 'fecha_pago_planilla', 'observaciones',
+                'fecha_registro', 'estado_ga', 'estado_planilla')
+
+def generar_csv_pagos(ruta, n_filas=10000, semilla=1, n_rucs=2000, dias=60):
+    """Escribe en ruta un CSV de pagos como el de exportar_a_csv, fila por fila (sin armarlo en memoria)"""
+    import csv
+
+    rnd = random.Random(semilla)
+    hoy = date.today()
+    rucs = [(str(20000000000 + i), str(20000000000 + i), CAMPANAS[i % len(CAMPANAS)], ASESORES[i % len(ASESORES)])
+            for i in range(n_rucs)]
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUMNAS_CSV)
+        for i in range(n_filas):
+            r = generar_registro(rnd, rucs, hoy, dias)
+            escritor.writerow((i + 1,) + r[:8] + r[9:12] + (r[13], r[14], r[8], r[12]))
+
+def generar_bd_sintetica(db_path, n_registros=10000, n_rucs=2000, semilla=42, dias=60):
+    """
+    Crea (o completa) una BD sintética en db_path.
+    Usa init_db() para crear el esquema, así la BD queda igual que pagos.db
+    Retorna: cantidad de registros insertados
+    """
+    import database
+
+    ruta_anterior = database.DB_PATH
+    database.DB_PATH = db_path
+    try:
+        database.init_db()
+    finally:
+        database.DB_PATH = ruta_anterior
+
+    rnd = random.Random(semilla)
+    hoy = date.today()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # RUCs base
+    rucs = []
+    for i in range(n_rucs):
+        ruc = str(20000000000 + i)
+        rucs.append((ruc, str(70000000 + i), CAMPANAS[i % len(CAMPANAS)], ASESORES[i % len(ASESORES)]))
+
+    cursor.executemany('''
+    INSERT OR IGNORE INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(r, d, f"EMPRESA {r} S.A.C.", c, a, datetime.now().isoformat()) for r, d, c, a in rucs])
+
+    # Registros de pagos en bloques para no cargar todo en memoria
+    bloque = 50000
+    insertados = 0
+    while insertados < n_registros:
+        n = min(bloque, n_registros - insertados)
+        cursor.executemany('''
+        INSERT INTO registros_pagos
+        (fecha_reporte, ruc, id_documento, campaña, asesor,
+         promesa_ga, monto_gasto, fecha_pago_gasto, estado_ga,
+         promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla,
+         observaciones, fecha_registro)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (generar_registro(rnd, rucs, hoy, dias) for _ in range(n)))
+        insertados += n
+
+    conn.commit()
+    conn.close()
+    return insertados
+
+def generar_excel_rucs(ruta, n_filas=10000, semilla=42, campañas=CAMPANAS, primer_documento=10000000000,
+                       repetidas=0.02, invalidas=0.01):
+    """
+    Escribe en ruta un workbook de RUCs como "DATA ENERO 2026.xlsx" (modo write_only).
+    Una fracción de filas repite un DOCUMENTO anterior y otra viene sin DOCUMENTO.
+    Retorna: cantidad de documentos distintos válidos
+    """
+    import openpyxl
+
+    rnd = random.Random(semilla)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(COLUMNAS_EXCEL)
+    documentos = 0
+    for i in range(n_filas):
+        azar = rnd.random()
+        if azar < invalidas:
+            documento = None
+        elif azar < invalidas + repetidas and documentos:
+            documento = primer_documento + rnd.randrange(documentos)
+        else:
+            documento = primer_documento + documentos
+            documentos += 1
+        deuda = round(rnd.uniform(100, 5000), 2)
+        ws.append((campañas[i % len(campañas)], documento, f"EMPRESA {documento} S.A.C.", deuda,
+                   round(deuda * 0.177, 2), '202510, 202511', ASESORES[i % (len(ASESORES) - 1)]))
+    wb.save(ruta)
+    return documentos
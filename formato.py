@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Formato de presentación de montos, fechas y estados para las páginas de app.py
+Las funciones de columnas trabajan sobre la Serie completa (pandas/NumPy), sin recorrer
+celda por celda. Los montos se dejan numéricos y se muestran con column_config.
+pandas y NumPy se importan dentro de las funciones que los usan, para no cargarlos
+en las páginas que solo muestran métricas.
+"""
+
+from datetime import datetime
+
+import streamlit as st
+
+# Formatos printf de st.column_config.NumberColumn
+FORMATO_MONEDA = "S/. %,.2f"
+FORMATO_MONEDA_ENTERO = "S/. %,.0f"
+FORMATO_PORCENTAJE = "%.1f%%"
+FORMATO_FECHA = "DD/MM/YYYY"
+
+# Ícono por promesa en las tablas del Dashboard (el resto se considera cobrado)
+ICONOS_PROMESA = {'PROMESA CAIDA': '⚠️', 'A VEN...': '⏳'}
+ICONO_COBRADO = '✅'
+
+# Ícono por estado de las tareas programadas (programador.py)
+ICONOS_TAREA = {'OK': '✅', 'ERROR': '❌', 'EJECUTANDO': '⏳'}
+ICONO_TAREA_PENDIENTE = '🕒'
+
+# Color de fondo por tipo de pago (Promesas de Hoy)
+COLORES_TIPO_PAGO = {'GASTO': '#ffe6e6', 'PLANILLA': '#e6f3ff'}
+
+MEDALLAS = ('🥇', '🥈', '🥉')
+
+def texto_moneda(monto, decimales=2):
+    """Un monto como texto 'S/. 1,234.56' (métricas y mensajes)"""
+    return f"S/. {monto or 0:,.{decimales}f}"
+
+def texto_fecha(fecha, formato='%d/%m/%Y'):
+    """Una fecha ISO como texto; '-' si está vacía y el texto original si no es ISO"""
+    if not fecha:
+        return "-"
+    if hasattr(fecha, 'strftime'):
+        return fecha.strftime(formato)
+    try:
+        return datetime.fromisoformat(fecha).strftime(formato)
+    except ValueError:
+        return fecha
+
+def montos(serie):
+    """Montos numéricos; los vacíos, cero o negativos quedan como NaN (celda vacía)"""
+    import pandas as pd
+    valores = pd.to_numeric(serie, errors='coerce')
+    return valores.where(valores > 0)
+
+def fechas(serie):
+    """Fechas ISO (YYYY-MM-DD) convertidas de una vez a datetime; las vacías o inválidas quedan NaT"""
+    import pandas as pd
+    return pd.to_datetime(serie, errors='coerce', format='%Y-%m-%d')
+
+def iconos(serie, mapa=ICONOS_PROMESA, defecto=ICONO_COBRADO):
+    """Reemplaza cada valor por su ícono (un solo lookup por valor distinto)"""
+    return serie.map(mapa).fillna(defecto)
+
+def nombres_cortos(serie, vacio='N/A'):
+    """Primer nombre de cada asesor ('SIN ASESOR' se deja completo); se calcula por asesor distinto"""
+    import numpy as np
+    import pandas as pd
+    codigos, asesores = pd.factorize(serie)
+    unicos = pd.Series(asesores, dtype=object)
+    cortos = unicos.str.split(n=1).str[0].where(unicos != 'SIN ASESOR', unicos)
+    cortos = cortos.mask(cortos.fillna('') == '', vacio).to_numpy()
+    # factorize marca los vacíos con -1
+    return pd.Series(np.append(cortos, vacio)[codigos], index=serie.index, name=serie.name)
+
+def medallas(n):
+    """Posiciones 1..n como 🥇, 🥈, 🥉, #4, #5, ..."""
+    import pandas as pd
+    posiciones = ('#' + pd.RangeIndex(1, n + 1).astype(str)).to_numpy(dtype=object)
+    posiciones[:min(n, len(MEDALLAS))] = MEDALLAS[:n]
+    return posiciones
+
+def columna_moneda(titulo=None, entero=False, **kwargs):
+    """Columna de monto para st.dataframe(column_config=...)"""
+    return st.column_config.NumberColumn(titulo, format=FORMATO_MONEDA_ENTERO if entero else FORMATO_MONEDA,
+                                         **kwargs)
+
+def columna_porcentaje(titulo=None, **kwargs):
+    """Columna de porcentaje (valores 0-100) para st.dataframe(column_config=...)"""
+    return st.column_config.NumberColumn(titulo, format=FORMATO_PORCENTAJE, **kwargs)
+
+def columna_fecha(titulo=None, **kwargs):
+    """Columna de fecha (datetime, ver fechas()) para st.dataframe(column_config=...)"""
+    return st.column_config.DateColumn(titulo, format=FORMATO_FECHA, **kwargs)
+
+def config_montos(columnas, entero=False):
+    """column_config con las columnas indicadas como montos"""
+    return {columna: columna_moneda(entero=entero) for columna in columnas}
+
+def estilo_por_categoria(df, columna, colores):
+    """
+    Styler que pinta el fondo de cada fila según el valor de columna (valor -> color).
+    Arma la matriz de estilos de una vez en vez de llamar una función por fila.
+    Si la tabla supera el límite de celdas del Styler (styler.render.max_elements, que
+    st.dataframe rechaza con error) devuelve el DataFrame sin colores.
+    """
+    import numpy as np
+    import pandas as pd
+    if df.size > pd.get_option("styler.render.max_elements"):
+        return df
+    css = ('background-color: ' + df[columna].map(colores)).fillna('')
+    matriz = np.repeat(css.to_numpy()[:, None], df.shape[1], axis=1)
+    return df.style.apply(lambda _: pd.DataFrame(matriz, index=df.index, columns=df.columns), axis=None)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Importador de pagos desde CSV por bloques, con punto de control para retomar
+- Lee el archivo como flujo (nunca completo en memoria) y registra cada bloque de tamano_lote
+  filas con registrar_pagos_lote (omite duplicados exactos), un bloque por transacción
+- En la misma transacción guarda el punto de control en metadatos: SHA-256 del archivo, byte
+  donde empieza la fila siguiente, filas leídas y conteos acumulados
+- Si la importación se interrumpe (error, corte, kill), la siguiente llamada con el mismo archivo
+  sigue desde el último bloque confirmado; un archivo ya importado completo no se vuelve a procesar
+Las columnas son las de exportar_a_csv; las que falten toman los valores por defecto de pago_desde_fila.
+Uso: python importador_csv.py archivo.csv [tamaño_lote] [--reiniciar]
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import NamedTuple
+
+import database
+
+TAMANO_LOTE = 5000
+# Clave en metadatos del punto de control de un archivo: PREFIJO + SHA-256 del contenido
+PREFIJO_PUNTO_CONTROL = 'importacion_csv:'
+
+def _monto(texto):
+    try:
+        return float(texto) if texto else None
+    except ValueError:
+        return None
+
+def pago_desde_fila(fila):
+    """
+    Convierte una fila del CSV (dict por columna) en los argumentos de registrar_pago.
+    Retorna: dict, o None si la fila no tiene RUC
+    """
+    def campo(nombre, defecto=''):
+        return (fila.get(nombre) or defecto).strip()
+
+    ruc = campo('ruc')
+    if not ruc:
+        return None
+    return {
+        'fecha_reporte': campo('fecha_reporte', '2026-01-14'),
+        'ruc': ruc,
+        'id_documento': campo('id_documento', ruc),
+        'campaña': campo('campaña', 'ENERO 2026'),
+        'asesor': campo('asesor') or None,
+        'promesa_ga': campo('promesa_ga') or None,
+        'monto_gasto': _monto(campo('monto_gasto')),
+        'fecha_pago_gasto': campo('fecha_pago_gasto') or None,
+        'promesa_planilla': campo('promesa_planilla') or None,
+        'monto_planilla': _monto(campo('monto_planilla')),
+        'fecha_pago_planilla': campo('fecha_pago_planilla') or None,
+        'observaciones': campo('observaciones'),
+    }
+
+class ResultadoImportacionCsv(NamedTuple):
+    # Conteos de esta ejecución (sin lo confirmado por ejecuciones anteriores del mismo archivo)
+    filas: int
+    insertados: int
+    duplicados: int
+    invalidas: int
+    segundos: float
+    # Filas ya confirmadas al empezar (> 0 si se retomó un punto de control)
+    filas_previas: int = 0
+    # El archivo ya estaba importado completo: no se leyó
+    ya_importado: bool = False
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def reporte(self):
+        if self.ya_importado:
+            return f"El archivo ya estaba importado ({self.filas_previas:,} filas): no se volvió a procesar"
+        texto = (f"{self.filas:,} filas en {self.segundos:.2f} s ({self.filas_por_segundo:,.0f} filas/s): "
+                 f"{self.insertados:,} registrados, {self.duplicados:,} duplicados omitidos, "
+                 f"{self.invalidas:,} sin RUC")
+        if self.filas_previas:
+            texto += f" · retomado después de {self.filas_previas:,} filas"
+        return texto
+
+def punto_de_control(archivo_csv, sha256=None):
+    """Punto de control guardado del archivo (dict) o None si nunca se empezó a importar"""
+    sha256 = sha256 or database._hash_archivo(archivo_csv)
+    valor = database.obtener_metadato(PREFIJO_PUNTO_CONTROL + sha256)
+    return json.loads(valor) if valor else None
+
+def _lineas(archivo, posicion):
+    """Líneas decodificadas de un archivo binario; posicion[0] queda en el byte siguiente a la última"""
+    for linea in archivo:
+        posicion[0] += len(linea)
+        yield linea.decode('utf-8-sig' if posicion[0] == len(linea) else 'utf-8')
+
+def importar_pagos_csv(archivo_csv, tamano_lote=TAMANO_LOTE, reiniciar=False, progreso=None):
+    """
+    Importa (o retoma) un CSV de pagos por bloques de tamano_lote filas.
+    reiniciar: descarta el punto de control y lee desde el principio (los pagos ya
+    registrados se omiten como duplicados).
+    progreso: función(punto de control) que se llama después de confirmar cada bloque.
+    Retorna: ResultadoImportacionCsv
+    """
+    database.init_db()
+    inicio = time.perf_counter()
+    sha256 = database._hash_archivo(archivo_csv)
+    clave = PREFIJO_PUNTO_CONTROL + sha256
+    estado = None if reiniciar else punto_de_control(archivo_csv, sha256)
+    if estado and estado['completo']:
+        return ResultadoImportacionCsv(0, 0, 0, 0, time.perf_counter() - inicio, estado['fila'], True)
+
+    tamaño = os.path.getsize(archivo_csv)
+    with open(archivo_csv, 'rb') as f:
+        posicion = [0]
+        if estado:
+            # El encabezado se guardó con el punto de control: se sigue justo después del último bloque
+            f.seek(estado['byte'])
+            posicion[0] = estado['byte']
+            encabezado = estado['encabezado']
+            lector = csv.reader(_lineas(f, posicion))
+        else:
+            lector = csv.reader(_lineas(f, posicion))
+            encabezado = [c.strip() for c in next(lector, [])]
+            estado = {'archivo': os.path.abspath(archivo_csv), 'encabezado': encabezado, 'byte': posicion[0],
+                      'fila': 0, 'insertados': 0, 'duplicados': 0, 'invalidas': 0, 'completo': False}
+        previas = dict(estado)
+
+        def confirmar(resultado, leidas, invalidas):
+            """Punto de control del bloque, calculado dentro de la transacción que lo registra"""
+            insertados = sum(1 for registro_id, _ in resultado if registro_id)
+            estado.update(byte=posicion[0], fila=estado['fila'] + leidas,
+                          insertados=estado['insertados'] + insertados,
+                          duplicados=estado['duplicados'] + len(resultado) - insertados,
+                          invalidas=estado['invalidas'] + invalidas, completo=posicion[0] >= tamaño)
+            return json.dumps(estado, ensure_ascii=False)
+
+        while not estado['completo']:
+            pagos, leidas = [], 0
+            for fila in islice(lector, tamano_lote):
+                leidas += 1
+                pago = pago_desde_fila(dict(zip(encabezado, fila)))
+                if pago is not None:
+                    pagos.append(pago)
+            if not leidas:
+                # Solo quedaban líneas vacías al final
+                posicion[0] = tamaño
+            invalidas = leidas - len(pagos)
+            database.registrar_pagos_lote(
+                pagos, metadatos={clave: lambda resultado: confirmar(resultado, leidas, invalidas)})
+            if progreso:
+                progreso(dict(estado))
+
+    return ResultadoImportacionCsv(
+        estado['fila'] - previas['fila'], estado['insertados'] - previas['insertados'],
+        estado['duplicados'] - previas['duplicados'], estado['invalidas'] - previas['invalidas'],
+        time.perf_counter() - inicio, previas['fila'])
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not argumentos:
+        sys.exit("Uso: python importador_csv.py archivo.csv [tamaño_lote] [--reiniciar]")
+    archivo = argumentos[0]
+    if not os.path.exists(archivo):
+        sys.exit(f"❌ Archivo no encontrado: {archivo}")
+
+    resultado = importar_pagos_csv(
+        archivo, int(argumentos[1]) if len(argumentos) > 1 else TAMANO_LOTE, reiniciar='--reiniciar' in sys.argv,
+        progreso=lambda p: print(f"  {p['fila']:,} filas confirmadas ({p['byte'] / 2**20:.1f} MB)", flush=True))
+    print(f"✅ {resultado.reporte()}")
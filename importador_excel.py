@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Importador de RUCs desde Excel por lotes, sin cargar el workbook en memoria
+- Lee la hoja fila por fila: leer_xml recorre el XML del .xlsx con iterparse (varias veces
+  más rápido que openpyxl); leer_openpyxl usa openpyxl en modo read_only/values_only;
+  leer_cache sirve las filas desde cache_excel si el workbook ya se leyó (carga las columnas
+  completas en memoria: para workbooks muy grandes leer_xml mantiene la memoria plana)
+- Valida y quita repetidos de cada lote
+- Inserta cada lote con executemany INSERT OR IGNORE en una transacción
+  (gana la primera fila de cada RUC y campaña, como al insertar fila por fila)
+Reporta filas por segundo y el pico de memoria del proceso (RSS, donde exista el módulo resource).
+Varios workbooks (una carpeta o un patrón como "DATA *.xlsx"): importar_rucs_carpeta los lee en
+paralelo, uno por proceso, y un solo escritor los inserta en orden de mes, marcando cada RUC con
+el mes del archivo más reciente
+donde aparece.
+Uso: python importador_excel.py [archivo.xlsx | carpeta | "patrón*.xlsx"] [tamaño_lote] [procesos]
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice, repeat
+from typing import NamedTuple, Optional
+
+import database
+
+EXCEL = 'DATA ENERO 2026.xlsx'
+TAMANO_LOTE = 5000
+
+def leer_openpyxl(archivo_excel, encabezado=False):
+    """Filas de la hoja activa (sin encabezado, salvo que se pida) con openpyxl en modo de solo lectura"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(archivo_excel, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(min_row=1 if encabezado else 2, values_only=True)
+    finally:
+        wb.close()
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_FILA, _CELDA, _VALOR, _TEXTO, _COMPARTIDO, _DIMENSION, _DATOS = (
+    f'{_NS}{tag}' for tag in ('row', 'c', 'v', 't', 'si', 'dimension', 'sheetData'))
+
+def _ruta_hoja_activa(zip_xlsx):
+    """Ruta dentro del .xlsx de la hoja activa (workbookView activeTab, por defecto la primera)"""
+    import posixpath
+    from xml.etree import ElementTree
+
+    libro = ElementTree.fromstring(zip_xlsx.read('xl/workbook.xml'))
+    vista = libro.find(f'{_NS}bookViews/{_NS}workbookView')
+    activa = int(vista.get('activeTab', 0)) if vista is not None else 0
+    hoja = libro.findall(f'{_NS}sheets/{_NS}sheet')[activa]
+    relaciones = ElementTree.fromstring(zip_xlsx.read('xl/_rels/workbook.xml.rels'))
+    destino = next(r.get('Target') for r in relaciones if r.get('Id') == hoja.get(f'{_NS_REL}id'))
+    return destino.lstrip('/') if destino.startswith('/') else posixpath.normpath(f'xl/{destino}')
+
+_COLUMNAS = {}
+
+def _columna(referencia):
+    """Índice 0-based de la columna de una referencia como 'C12'"""
+    letras = referencia.rstrip('0123456789')
+    indice = _COLUMNAS.get(letras)
+    if indice is None:
+        indice = -1
+        for letra in letras:
+            indice = (indice + 1) * 26 + ord(letra) - 65
+        _COLUMNAS[letras] = indice
+    return indice
+
+def _numero(texto):
+    # Igual que openpyxl: entero si no tiene parte decimal ni exponente
+    return float(texto) if any(c in texto for c in '.eE') else int(texto)
+
+def leer_xml(archivo_excel, encabezado=False):
+    """
+    Filas de la hoja activa (sin encabezado, salvo que se pida) leyendo el XML del .xlsx con iterparse.
+    Cada fila se libera al procesarla: la memoria no crece con el archivo (salvo la tabla
+    de textos compartidos). No convierte fechas: las columnas de RUCs no tienen.
+    """
+    import zipfile
+    from xml.etree import ElementTree
+
+    with zipfile.ZipFile(archivo_excel) as zip_xlsx:
+        compartidos = []
+        if 'xl/sharedStrings.xml' in zip_xlsx.namelist():
+            with zip_xlsx.open('xl/sharedStrings.xml') as xml:
+                for _, elemento in ElementTree.iterparse(xml):
+                    if elemento.tag == _COMPARTIDO:
+                        compartidos.append(''.join(t.text or '' for t in elemento.iter(_TEXTO)))
+                        elemento.clear()
+
+        with zip_xlsx.open(_ruta_hoja_activa(zip_xlsx)) as xml:
+            # Como openpyxl: filas completadas hasta el ancho de la hoja y filas vacías por los huecos
+            ancho, numero, datos = 0, 0, None
+            primera = 1 if encabezado else 2
+            for evento, elemento in ElementTree.iterparse(xml, ('start', 'end')):
+                if evento == 'start':
+                    if elemento.tag == _DATOS:
+                        datos = elemento
+                    continue
+                if elemento.tag == _DIMENSION:
+                    ancho = _columna(elemento.get('ref', 'A1').split(':')[-1]) + 1
+                    continue
+                if elemento.tag != _FILA:
+                    continue
+                valores = {}
+                for posicion, celda in enumerate(elemento.iter(_CELDA)):
+                    referencia, tipo = celda.get('r'), celda.get('t', 'n')
+                    columna = _columna(referencia) if referencia else posicion
+                    if tipo == 'inlineStr':
+                        if len(celda):  # Sin <is> es una celda vacía (openpyxl la lee como None)
+                            valores[columna] = ''.join(t.text or '' for t in celda.iter(_TEXTO))
+                        continue
+                    texto = celda.findtext(_VALOR)
+                    if texto is None:
+                        continue
+                    if tipo == 's':
+                        valores[columna] = compartidos[int(texto)]
+                    elif tipo == 'n':
+                        valores[columna] = _numero(texto)
+                    elif tipo == 'b':
+                        valores[columna] = texto == '1'
+                    else:
+                        valores[columna] = texto
+                anterior, numero = numero, int(elemento.get('r', numero + 1))
+                # Se sueltan las filas ya leídas (si no, sheetData las sigue guardando vacías)
+                datos.clear()
+                largo = max(ancho, max(valores) + 1 if valores else 0)
+                for _ in range(max(anterior + 1, primera), numero):
+                    yield (None,) * largo
+                if numero >= primera:
+                    yield tuple(valores.get(i) for i in range(largo))
+
+def leer_cache(archivo_excel, encabezado=False):
+    """
+    Filas con las columnas del Excel de RUCs desde cache_excel: el workbook solo se vuelve
+    a leer (con leer_xml) si cambió su contenido
+    """
+    import cache_excel
+
+    tabla = cache_excel.cargar_excel(archivo_excel)
+    if encabezado:
+        yield tuple(tabla.columnas)
+    yield from tabla.tuplas()
+
+# Lectores disponibles: nombre -> función(archivo, encabezado=False) que genera tuplas por fila
+LECTORES = {'cache': leer_cache, 'xml': leer_xml, 'openpyxl': leer_openpyxl}
+
+def _texto(valor):
+    return str(valor).strip() if valor is not None else ''
+
+def _monto(valor):
+    try:
+        return float(valor) if valor not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+def normalizar_documento(valor):
+    """DOCUMENTO como texto: 10000672454, 10000672454.0 y ' 10000672454 ' dan '10000672454'"""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return _texto(valor)
+
+MESES = {'ENERO': 1, 'FEBRERO': 2, 'MARZO': 3, 'ABRIL': 4, 'MAYO': 5, 'JUNIO': 6, 'JULIO': 7,
+         'AGOSTO': 8, 'SETIEMBRE': 9, 'SEPTIEMBRE': 9, 'OCTUBRE': 10, 'NOVIEMBRE': 11, 'DICIEMBRE': 12}
+
+def mes_de_archivo(archivo_excel):
+    """Mes de un workbook según su nombre: 'DATA ENERO 2026.xlsx' -> '2026-01' (None si no lo dice)"""
+    palabras = re.findall(r'[^\W\d_]+|\d+', os.path.basename(str(archivo_excel)).upper())
+    mes = next((MESES[p] for p in palabras if p in MESES), None)
+    año = next((p for p in palabras if len(p) == 4 and p.isdigit()), None)
+    return f"{año}-{mes:02d}" if mes and año else None
+
+def fila_ruc(fila):
+    """
+    Valida una fila del Excel (CAMPAÑA, DOCUMENTO, RAZON SOCIAL, DEUDA TOTAL, GASTOS ADMIN,
+    PERIODOS ASIGNADOS, ASESOR).
+    Retorna: (ruc, razon_social, campaña, asesor, deuda_total, gasto_admin) o None si no es válida
+    """
+    fila = tuple(fila) + (None,) * (7 - len(fila))
+    documento = normalizar_documento(fila[1])
+    campaña, razon_social = _texto(fila[0]), _texto(fila[2])
+    if not documento.isdigit() or not razon_social or not campaña:
+        return None
+    return documento, razon_social, campaña, fila[6] or None, _monto(fila[3]), _monto(fila[4])
+
+def validar_filas(filas):
+    """
+    Valida filas del Excel y quita los RUC y campaña repetidos entre ellas (queda la primera).
+    Retorna: (filas válidas como las da fila_ruc, cantidad de inválidas)
+    """
+    validas, vistos, invalidas = [], set(), 0
+    for fila in filas:
+        valida = fila_ruc(fila)
+        if valida is None:
+            invalidas += 1
+        elif (valida[0], valida[2]) not in vistos:
+            vistos.add((valida[0], valida[2]))
+            validas.append(valida)
+    return validas, invalidas
+
+class ResultadoImportacion(NamedTuple):
+    filas: int
+    insertados: int
+    repetidos: int
+    invalidas: int
+    segundos: float
+    # Pico de memoria residente del proceso en bytes (None si no se puede medir)
+    memoria_pico: Optional[int] = None
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def reporte(self):
+        texto = (f"{self.filas:,} filas en {self.segundos:.2f} s ({self.filas_por_segundo:,.0f} filas/s): "
+                 f"{self.insertados:,} RUCs nuevos, {self.repetidos:,} repetidos, "
+                 f"{self.invalidas:,} inválidas")
+        if self.memoria_pico is not None:
+            texto += f" · memoria pico {self.memoria_pico / 2**20:.1f} MB"
+        return texto
+
+def memoria_pico():
+    """Pico de memoria residente del proceso en bytes (None en Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+def _sql_insertar(cursor):
+    """
+    INSERT OR IGNORE con las columnas de rucs que existan (BDs antiguas no tienen los montos ni el mes).
+    Retorna: (sql, (con montos, con mes))
+    """
+    cursor.execute('PRAGMA table_info(rucs)')
+    existentes = {col[1] for col in cursor.fetchall()}
+    montos, con_mes = {'deuda_total', 'gasto_admin'} <= existentes, 'mes' in existentes
+    columnas = ['ruc', 'id_documento', 'razon_social', 'campaña', 'asesor', 'fecha_creacion']
+    if montos:
+        columnas += ['deuda_total', 'gasto_admin']
+    if con_mes:
+        columnas.append('mes')
+    return (f"INSERT OR IGNORE INTO rucs ({', '.join(columnas)}) "
+            f"VALUES ({', '.join('?' * len(columnas))})"), (montos, con_mes)
+
+def insertar_lote(cursor, sql, opcionales, validas, mes=None):
+    """
+    Inserta un lote de filas validadas (opcionales: lo que retorna _sql_insertar).
+    Las que ya existían conservan sus datos, pero su mes pasa a mes si es más reciente
+    (como en sincronizar_catalogo: el mes de una entrada es el último workbook que la trae).
+    Retorna: RUCs insertados
+    """
+    ahora = datetime.now().isoformat()
+    montos, con_mes = opcionales
+    extra = (mes,) if con_mes else ()
+    if montos:
+        parametros = [(ruc, ruc, razon, campaña, asesor, ahora, deuda, gasto) + extra
+                      for ruc, razon, campaña, asesor, deuda, gasto in validas]
+    else:
+        parametros = [(ruc, ruc, razon, campaña, asesor, ahora) + extra
+                      for ruc, razon, campaña, asesor, _, _ in validas]
+    cursor.executemany(sql, parametros)
+    insertados = cursor.rowcount
+    if con_mes and mes:
+        cursor.executemany('UPDATE rucs SET mes = ? WHERE ruc = ? AND campaña = ? AND (mes IS NULL OR mes < ?)',
+                           [(mes, ruc, campaña, mes) for ruc, _, campaña, _, _, _ in validas])
+    return insertados
+
+def importar_rucs_excel(archivo_excel=EXCEL, db_path=None, tamano_lote=TAMANO_LOTE, lector='xml',
+                        progreso=None, mes=None):
+    """
+    Importa los RUCs del Excel a la tabla rucs (que debe existir) por lotes de tamano_lote filas.
+    lector: nombre en LECTORES o función(archivo) que genera las filas sin encabezado.
+    progreso: función(filas_leidas) que se llama después de cada lote.
+    mes: mes con el que se marcan los RUCs (por defecto, el del nombre del archivo)
+    Retorna: ResultadoImportacion
+    """
+    leer = LECTORES[lector] if isinstance(lector, str) else lector
+    mes = mes or mes_de_archivo(archivo_excel)
+    inicio = time.perf_counter()
+    filas = insertados = repetidos = invalidas = 0
+
+    conn = sqlite3.connect(db_path or database.DB_PATH, timeout=30)
+    try:
+        cursor = conn.cursor()
+        sql, opcionales = _sql_insertar(cursor)
+        iterador = iter(leer(archivo_excel))
+        while True:
+            lote = list(islice(iterador, tamano_lote))
+            if not lote:
+                break
+            filas += len(lote)
+
+            # Repetidos dentro del lote se quitan aquí; entre lotes los ignora INSERT OR IGNORE
+            validas, invalidas_lote = validar_filas(lote)
+            invalidas += invalidas_lote
+
+            nuevos = insertar_lote(cursor, sql, opcionales, validas, mes)
+            conn.commit()
+            insertados += nuevos
+            repetidos = filas - invalidas - insertados
+            if progreso:
+                progreso(filas)
+    finally:
+        conn.close()
+
+    return ResultadoImportacion(filas, insertados, repetidos, invalidas,
+                                time.perf_counter() - inicio, memoria_pico())
+
+def archivos_excel(origen):
+    """
+    Workbooks de una carpeta o de un patrón glob, en el orden en que se importan: por mes
+    (los que no dicen mes al final) y luego por nombre. Omite los temporales de Excel (~$...).
+    """
+    patron = os.path.join(origen, '*.xlsx') if os.path.isdir(origen) else origen
+    archivos = [a for a in glob.glob(patron) if not os.path.basename(a).startswith('~$')]
+    return sorted(archivos, key=lambda a: (mes_de_archivo(a) is None, mes_de_archivo(a) or '',
+                                           os.path.basename(a)))
+
+def leer_validas(archivo_excel, lector='xml'):
+    """
+    Lee y valida un workbook completo (corre en un proceso del pool de importar_rucs_carpeta).
+    Retorna: (filas leídas, válidas sin repetidos, inválidas, segundos)
+    """
+    inicio = time.perf_counter()
+    filas = 0
+
+    def contar(iterador):
+        nonlocal filas
+        for fila in iterador:
+            filas += 1
+            yield fila
+
+    validas, invalidas = validar_filas(contar(LECTORES[lector](archivo_excel)))
+    return filas, validas, invalidas, time.perf_counter() - inicio
+
+class ResultadoArchivo(NamedTuple):
+    archivo: str
+    mes: Optional[str]
+    # segundos = lectura (en su proceso) + escritura
+    importacion: ResultadoImportacion
+    segundos_lectura: float
+
+class ResultadoCarpeta(NamedTuple):
+    archivos: list
+    segundos: float
+    procesos: int
+
+    @property
+    def filas(self):
+        return sum(r.importacion.filas for r in self.archivos)
+
+    @property
+    def insertados(self):
+        return sum(r.importacion.insertados for r in self.archivos)
+
+    def reporte(self):
+        lineas = [f"{'Archivo':<32s} {'Mes':<8s} {'Filas':>9s} {'Nuevos':>9s} {'Repetidos':>9s} "
+                  f"{'Inválidas':>9s} {'Lectura':>9s} {'Escritura':>9s}"]
+        for r in self.archivos:
+            i = r.importacion
+            lineas.append(f"{os.path.basename(r.archivo)[:32]:<32s} {r.mes or '-':<8s} {i.filas:>9,d} "
+                          f"{i.insertados:>9,d} {i.repetidos:>9,d} {i.invalidas:>9,d} "
+                          f"{r.segundos_lectura:>8.2f}s {i.segundos - r.segundos_lectura:>8.2f}s")
+        filas_por_segundo = self.filas / self.segundos if self.segundos else 0.0
+        lineas.append(f"Total: {len(self.archivos)} archivos, {self.filas:,} filas, {self.insertados:,} RUCs "
+                      f"nuevos en {self.segundos:.2f} s ({filas_por_segundo:,.0f} filas/s, "
+                      f"{self.procesos} procesos)")
+        return "\n".join(lineas)
+
+def importar_rucs_carpeta(origen, db_path=None, procesos=None, lector='xml', tamano_lote=TAMANO_LOTE,
+                          progreso=None):
+    """
+    Importa varios workbooks (carpeta o patrón, ver archivos_excel) a la tabla rucs.
+    Cada workbook se lee y valida en su propio proceso (hasta procesos, por defecto uno por núcleo);
+    este proceso es el único que escribe: inserta cada archivo en una transacción, en el orden
+    de archivos_excel, así que queda lo mismo que importarlos uno tras otro con importar_rucs_excel
+    (gana la primera fila de cada RUC y campaña). procesos=1 lee en este mismo proceso.
+    progreso: función(ResultadoArchivo) que se llama al terminar cada archivo.
+    Retorna: ResultadoCarpeta
+    """
+    archivos = archivos_excel(origen)
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(archivos)))
+    inicio = time.perf_counter()
+    resultados = []
+
+    pool = ProcessPoolExecutor(procesos) if procesos > 1 else None
+    conn = sqlite3.connect(db_path or database.DB_PATH, timeout=30)
+    try:
+        cursor = conn.cursor()
+        sql, opcionales = _sql_insertar(cursor)
+        # map entrega en orden de archivos aunque los procesos terminen en otro
+        lecturas = (pool.map if pool else map)(leer_validas, archivos, repeat(lector))
+        for archivo, (filas, validas, invalidas, lectura) in zip(archivos, lecturas):
+            escritura = time.perf_counter()
+            mes = mes_de_archivo(archivo)
+            insertados = 0
+            for i in range(0, len(validas), tamano_lote):
+                insertados += insertar_lote(cursor, sql, opcionales, validas[i:i + tamano_lote], mes)
+            conn.commit()
+            importacion = ResultadoImportacion(filas, insertados, filas - invalidas - insertados, invalidas,
+                                               lectura + time.perf_counter() - escritura)
+            resultados.append(ResultadoArchivo(archivo, mes, importacion, lectura))
+            if progreso:
+                progreso(resultados[-1])
+    finally:
+        conn.close()
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    return ResultadoCarpeta(resultados, time.perf_counter() - inicio, procesos)
+
+if __name__ == "__main__":
+    archivo = sys.argv[1] if len(sys.argv) > 1 else EXCEL
+    tamano = int(sys.argv[2]) if len(sys.argv) > 2 else TAMANO_LOTE
+    database.init_db()
+
+    if os.path.isdir(archivo) or glob.has_magic(archivo):
+        procesos = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        resultado = importar_rucs_carpeta(archivo, tamano_lote=tamano, procesos=procesos,
+                                          progreso=lambda r: print(f"  {os.path.basename(r.archivo)}: "
+                                                                   f"{r.importacion.filas:,} filas", flush=True))
+        if not resultado.archivos:
+            sys.exit(f"❌ No hay workbooks en: {archivo}")
+        print(resultado.reporte())
+        sys.exit(0)
+
+    if not os.path.exists(archivo):
+        sys.exit(f"❌ Archivo no encontrado: {archivo}")
+    resultado = importar_rucs_excel(archivo, tamano_lote=tamano,
+                                    progreso=lambda n: print(f"  Procesadas {n:,} filas...", flush=True))
+    print(f"✅ {resultado.reporte()}")
@@ -1,10 +1,12 @@
-import openpyxl
+from itertools import islice
 
-wb = openpyxl.load_workbook('DATA ENERO 2026.xlsx', data_only=True)
-ws = wb.active
+from cache_excel import cargar_excel
+
+# Columnas desde la caché del workbook (se lee solo si cambió)
+tabla = cargar_excel('DATA ENERO 2026.xlsx')
 
 # Get headers
-headers = [cell.value for cell in ws[1]]
+headers = list(tabla.encabezado)
 print("📋 Columnas del Excel:")
 for i, h in enumerate(headers, 1):
     print(f"  {i:2d}. {h}")
@@ -20,17 +22,18 @@ for i, h in enumerate(headers):
         print(f"  Columna {i+1} ({h}) podría ser campaña")
 
 # Get first 10 rows
+columnas = list(tabla.columnas)
 print("\n📊 Primeros 10 registros:")
-for row_num, row in enumerate(ws.iter_rows(min_row=2, max_row=11, values_only=True), 2):
+for row_num, row in enumerate(islice(tabla.tuplas(), 10), 2):
     print(f"  Row {row_num}: {row[:8]}")
 
 # Get unique values in each column to find campaigns
 print("\n🔢 Valores únicos por columna (primeras 30 filas):")
-for col_idx in range(len(headers)):
+for col_idx, nombre in enumerate(columnas):
     values = set()
-    for row in ws.iter_rows(min_row=2, max_row=31, values_only=True):
+    for row in islice(tabla.tuplas(), 30):
         val = row[col_idx]
         if val:
             values.add(str(val).strip())
     if len(values) <= 10:  # Only show columns with few unique values
-        print(f"  Columna {col_idx+1} ({headers[col_idx]}): {sorted(values)}")
+        print(f"  Columna {col_idx+1} ({nombre}): {sorted(values)}")
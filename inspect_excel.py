@@ -1,26 +1,31 @@
 #!/usr/bin/env python3
 """
 Script para inspeccionar el archivo Excel
+Las columnas salen de cache_excel: el workbook solo se vuelve a leer si cambió
+Uso: python inspect_excel.py [archivo.xlsx]
 """
 
+import sys
+
 try:
-    import openpyxl
+    from cache_excel import cargar_excel
     
-    archivo = r'C:\Users\USUARIO\Desktop\REGISTRO DE PAGOS\DATA ENERO 2026.xlsx'
+    archivo = sys.argv[1] if len(sys.argv) > 1 else 'DATA ENERO 2026.xlsx'
     print(f"Leyendo archivo: {archivo}\n")
     
-    wb = openpyxl.load_workbook(archivo)
-    ws = wb.active
+    tabla = cargar_excel(archivo)
     
     print("Columnas:")
-    encabezados = [cell.value for cell in ws[1]]
-    for i, col in enumerate(encabezados, 1):
+    for i, col in enumerate(tabla.encabezado, 1):
         print(f"  {i}. {col}")
     
-    print(f"\nTotal de filas: {ws.max_row}")
+    print(f"\nTotal de filas: {tabla.filas + 1}")
     print(f"\nPrimeras 5 filas de datos:")
     
-    for row_idx, row in enumerate(ws.iter_rows(min_row=1, max_row=6, values_only=True), 1):
+    print(f"Fila 1: {tuple(tabla.columnas)}")
+    for row_idx, row in enumerate(tabla.tuplas(), 2):
+        if row_idx > 6:
+            break
         print(f"Fila {row_idx}: {row}")
     
 except Exception as e:
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Programador de tareas de mantenimiento en segundo plano
+Un hilo por proceso (app.py lo inicia una vez por servidor con st.cache_resource) que:
+- evalúa el vencimiento de promesas al cambiar el día
+- actualiza deuda y gasto administrativo de los RUCs si cambió el Excel
+- PRAGMA optimize cada hora y ANALYZE una vez al día
+- compara las tablas de resumen con un recálculo y las reconstruye si difieren
+El estado de cada tarea se guarda en tareas_programadas (database.py): como cada ejecución
+se reclama con una sola sentencia, varios procesos (o el worker independiente) no repiten
+la misma tarea. Las páginas de app.py solo leen; no cambian estados al dibujarse.
+Uso como worker independiente: python programador.py   (con PAGOS_PROGRAMADOR=0 en app.py)
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, NamedTuple, Optional
+
+import database
+
+# PAGOS_PROGRAMADOR=0 desactiva el hilo de app.py (por ejemplo si corre el worker aparte)
+ACTIVO = os.environ.get("PAGOS_PROGRAMADOR", "1") != "0"
+
+# Máximo que duerme el hilo entre vueltas (para ver tareas adelantadas desde otro proceso)
+PAUSA_MAXIMA = 60
+# Espera antes de reintentar una tarea que falló
+REINTENTO = timedelta(minutes=5)
+# Una ejecución que lleva más que esto se da por abandonada (proceso caído)
+ABANDONADA = timedelta(hours=1)
+
+class Tarea(NamedTuple):
+    nombre: str
+    descripcion: str
+    funcion: Callable[[], object]
+    # None = una vez por día, al cambiar la fecha
+    intervalo: Optional[timedelta] = None
+    # Tiempo desde que arranca el programador antes de la primera ejecución
+    # (las tareas pesadas no compiten con el primer dibujo de la app)
+    espera_inicial: timedelta = timedelta(0)
+
+    def proxima(self, ahora):
+        """Próxima ejecución después de una ejecución correcta en ahora"""
+        if self.intervalo is None:
+            return datetime.combine(ahora.date() + timedelta(days=1), datetime.min.time())
+        return ahora + self.intervalo
+
+def _vencer_promesas():
+    resultado = database.evaluar_vencimiento_promesas(date.today())
+    return {clave: len(valor) if isinstance(valor, list) else valor for clave, valor in resultado.items()}
+
+def _actualizar_rucs():
+    exito, mensaje = database.actualizar_rucs_desde_excel()
+    if not exito:
+        raise RuntimeError(mensaje)
+    return mensaje
+
+TAREAS = (
+    Tarea('vencimiento_promesas', "A VENCER con fecha pasada → PROMESA CAIDA (y al revés)",
+          _vencer_promesas),
+    Tarea('rucs_desde_excel', "Deuda total y gasto admin de los RUCs desde el Excel, si cambió",
+          _actualizar_rucs, timedelta(minutes=10), timedelta(seconds=30)),
+    Tarea('optimizar', "PRAGMA optimize", database.optimizar_bd, timedelta(hours=1)),
+    Tarea('analizar', "ANALYZE completo", lambda: database.optimizar_bd(analizar=True),
+          None, timedelta(minutes=5)),
+    Tarea('agregados', "Resúmenes y saldos contra un recálculo completo (reconstruye si difieren)",
+          database.refrescar_agregados, timedelta(hours=6), timedelta(minutes=5)),
+)
+
+def _texto(valor):
+    return valor if isinstance(valor, str) else json.dumps(valor, ensure_ascii=False, default=str)
+
+class Programador:
+    """Ejecuta las tareas que tocan en un hilo de fondo (o a mano con ejecutar_pendientes)"""
+
+    def __init__(self, tareas=TAREAS, pausa_maxima=PAUSA_MAXIMA):
+        self.tareas = {tarea.nombre: tarea for tarea in tareas}
+        self.pausa_maxima = pausa_maxima
+        self.proceso = f"{socket.gethostname()}:{os.getpid()}"
+        self.inicio = datetime.now()
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self._hilo = None
+
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        if not self.activo():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="programador-pagos", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self, espera=None):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(espera)
+
+    def despertar(self):
+        """Hace que el hilo revise las tareas ahora (por ejemplo tras programar_tarea_ahora)"""
+        self._despertar.set()
+
+    def ejecutar(self, tarea):
+        """Ejecuta una tarea ya reclamada y guarda el resultado. Retorna: True si terminó bien"""
+        inicio = time.perf_counter()
+        try:
+            resultado, error = _texto(tarea.funcion()), None
+        except Exception as e:
+            resultado, error = None, f"{type(e).__name__}: {e}"
+        fin = datetime.now()
+        proxima = fin + REINTENTO if error else tarea.proxima(fin)
+        database.terminar_tarea(tarea.nombre, fin.isoformat(), (time.perf_counter() - inicio) * 1000,
+                                proxima.isoformat(), resultado, error)
+        return error is None
+
+    def ejecutar_pendientes(self, ahora=None):
+        """Ejecuta, en orden, las tareas a las que les toca. Retorna: nombres ejecutados"""
+        ahora = ahora or datetime.now()
+        ejecutadas = []
+        for tarea in self.tareas.values():
+            if ahora < self.inicio + tarea.espera_inicial:
+                continue
+            if database.reclamar_tarea(tarea.nombre, ahora.isoformat(), self.proceso,
+                                       (ahora - ABANDONADA).isoformat()):
+                self.ejecutar(tarea)
+                ejecutadas.append(tarea.nombre)
+        return ejecutadas
+
+    def _espera(self):
+        """Segundos hasta la próxima tarea (entre 1 y pausa_maxima)"""
+        ahora = datetime.now()
+        proximas = [self.inicio + tarea.espera_inicial for tarea in self.tareas.values()
+                    if ahora < self.inicio + tarea.espera_inicial]
+        for nombre, estado, proxima, *_ in database.obtener_tareas_programadas():
+            # Las que ejecuta otro proceso se vuelven a ver al terminar (o en pausa_maxima)
+            if nombre in self.tareas and proxima and estado != 'EJECUTANDO':
+                proximas.append(datetime.fromisoformat(proxima))
+        segundos = min((p - ahora).total_seconds() for p in proximas) if proximas else self.pausa_maxima
+        return min(max(segundos, 1), self.pausa_maxima)
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                self.ejecutar_pendientes()
+                espera = self._espera()
+            except Exception as e:
+                # BD ocupada o todavía sin esquema: se reintenta en la siguiente vuelta
+                print(f"programador: {type(e).__name__}: {e}", file=sys.stderr)
+                espera = self.pausa_maxima
+            self._despertar.wait(espera)
+            self._despertar.clear()
+
+_programador = None
+_lock = threading.Lock()
+
+def iniciar_programador():
+    """Inicia (una vez por proceso) el programador de fondo; None si está desactivado"""
+    global _programador
+    if not ACTIVO:
+        return None
+    with _lock:
+        if _programador is None:
+            _programador = Programador()
+        return _programador.iniciar()
+
+def obtener_programador():
+    """Programador de este proceso (None si no se inició)"""
+    return _programador
+
+if __name__ == "__main__":
+    database.init_db()
+    programador = Programador()
+    print(f"Programador de tareas en {programador.proceso} (Ctrl+C para salir)")
+    for tarea in programador.tareas.values():
+        print(f"  {tarea.nombre:<22s} {tarea.descripcion}")
+    programador.iniciar()
+    try:
+        while programador.activo():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        programador.detener()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Sincronización incremental del catálogo de RUCs con el Excel (reemplaza borrar pagos.db y recargar)
+- Las entradas del workbook (una por RUC y campaña, gana la primera fila como al importar)
+  se cargan en una tabla temporal
+- La diferencia con rucs se calcula en SQL: entradas nuevas, modificadas (razón social,
+  asesor, deuda o gasto administrativo distintos) y eliminadas (ya no están en el Excel)
+- Solo se eliminan entradas del mismo mes que el workbook (mes_de_archivo; las de un archivo sin
+  mes en el nombre, las que tienen mes NULL): el catálogo guarda varios meses (importar_rucs_carpeta)
+  y sincronizar el mes actual no debe borrar los anteriores
+- El mes de una entrada es el más reciente de los workbooks que la traen: una entrada de enero que
+  sigue en febrero pasa a febrero (y solo el workbook de febrero la puede eliminar)
+- Se aplica en una sola transacción con INSERT ... ON CONFLICT (ruc, campaña) DO UPDATE, que solo
+  toca las filas que cambian, y un DELETE de las eliminadas; registros_pagos no se toca
+Las filas sin cambios conservan id, fecha de creación y mes, y no suben las versiones de datos
+(la caché de consultas y el catálogo en memoria de esos RUCs siguen válidos).
+Uso: python sincronizar_catalogo.py [archivo.xlsx] [--conservar]   (--conservar no borra las eliminadas)
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+import database
+from importador_excel import EXCEL, fila_ruc, mes_de_archivo
+
+# Columnas que, si cambian en el Excel, actualizan la entrada
+COLUMNAS_COMPARADAS = ('razon_social', 'asesor', 'deuda_total', 'gasto_admin')
+
+def _sql_mes(actual, nuevo):
+    """Mes de una entrada que vuelve a aparecer: el más reciente; un workbook sin mes no lo cambia"""
+    return f"COALESCE(MAX({actual}, {nuevo}), {actual}, {nuevo})"
+
+class ResultadoSincronizacion(NamedTuple):
+    filas: int
+    invalidas: int
+    nuevos: int
+    modificados: int
+    eliminados: int
+    sin_cambios: int
+    segundos: float
+
+    def reporte(self):
+        return (f"{self.filas:,} filas del Excel en {self.segundos:.2f} s: {self.nuevos:,} nuevos, "
+                f"{self.modificados:,} modificados, {self.eliminados:,} eliminados, "
+                f"{self.sin_cambios:,} sin cambios, {self.invalidas:,} filas inválidas")
+
+def _entradas_excel(archivo_excel, lector):
+    """Filas válidas del workbook como las da fila_ruc. Retorna: (filas leídas, válidas, inválidas)"""
+    if lector == 'cache':
+        import cache_excel
+        tabla = cache_excel.cargar_excel(archivo_excel)
+        filas = tabla.tuplas(['CAMPAÑA', 'DOCUMENTO', 'RAZON SOCIAL', 'DEUDA TOTAL', 'GASTOS ADMIN',
+                              'PERIODOS ASIGNADOS', 'ASESOR'])
+    else:
+        from importador_excel import LECTORES
+        filas = LECTORES[lector](archivo_excel)
+
+    validas, leidas = [], 0
+    for fila in filas:
+        leidas += 1
+        valida = fila_ruc(fila)
+        if valida is not None:
+            validas.append(valida)
+    return leidas, validas, leidas - len(validas)
+
+def sincronizar_catalogo(archivo_excel=EXCEL, db_path=None, eliminar=True, lector='cache'):
+    """
+    Deja la tabla rucs igual al Excel aplicando solo la diferencia, en una transacción.
+    Se eliminan las entradas del mismo mes que el Excel que ya no están en él; las de otros meses
+    no se tocan. eliminar=False las conserva (y las informa como 0 eliminadas).
+    lector: 'cache' (cache_excel) o un nombre de importador_excel.LECTORES.
+    Retorna: ResultadoSincronizacion
+    """
+    inicio = time.perf_counter()
+    filas, validas, invalidas = _entradas_excel(archivo_excel, lector)
+    ahora = datetime.now().isoformat()
+    mes = mes_de_archivo(archivo_excel)
+    distinto = ' OR '.join(f'r.{c} IS NOT e.{c}' for c in COLUMNAS_COMPARADAS)
+
+    conn = sqlite3.connect(db_path or database.DB_PATH, timeout=30, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('''
+            CREATE TEMP TABLE catalogo_excel (
+                ruc TEXT NOT NULL,
+                campaña TEXT NOT NULL,
+                razon_social TEXT NOT NULL,
+                asesor TEXT,
+                deuda_total REAL,
+                gasto_admin REAL,
+                PRIMARY KEY (ruc, campaña)
+            ) WITHOUT ROWID
+            ''')
+            # OR IGNORE: de un RUC y campaña repetidos en el Excel queda la primera fila
+            cursor.executemany('INSERT OR IGNORE INTO catalogo_excel VALUES (?, ?, ?, ?, ?, ?)',
+                               ((ruc, campaña, razon, asesor, deuda, gasto)
+                                for ruc, razon, campaña, asesor, deuda, gasto in validas))
+
+            # Modificadas: cambió alguna columna comparada o el mes avanza
+            cursor.execute(f'''
+            SELECT COUNT(*) FILTER (WHERE r.id IS NULL),
+                   COUNT(*) FILTER (WHERE r.id IS NOT NULL AND ({distinto} OR r.mes IS NOT {_sql_mes('r.mes', '?')})),
+                   COUNT(*)
+            FROM catalogo_excel e
+            LEFT JOIN rucs r ON r.ruc = e.ruc AND r.campaña = e.campaña
+            ''', (mes, mes))
+            nuevos, modificados, entradas = cursor.fetchone()
+            cursor.execute('''
+            SELECT COUNT(*) FROM rucs r
+            WHERE r.mes IS ?
+              AND NOT EXISTS (SELECT 1 FROM catalogo_excel e WHERE e.ruc = r.ruc AND e.campaña = r.campaña)
+            ''', (mes,))
+            ausentes = cursor.fetchone()[0]
+
+            # Nuevas y modificadas; el WHERE del DO UPDATE deja sin tocar las que no cambiaron
+            cursor.execute(f'''
+            INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin,
+                              fecha_creacion, mes)
+            SELECT ruc, ruc, razon_social, campaña, asesor, deuda_total, gasto_admin, ?, ?
+            FROM catalogo_excel WHERE true
+            ON CONFLICT (ruc, campaña) DO UPDATE SET
+                {', '.join(f'{c} = excluded.{c}' for c in COLUMNAS_COMPARADAS)},
+                mes = {_sql_mes('mes', 'excluded.mes')}
+            WHERE {' OR '.join(f'{c} IS NOT excluded.{c}' for c in COLUMNAS_COMPARADAS)}
+               OR mes IS NOT {_sql_mes('mes', 'excluded.mes')}
+            ''', (ahora, mes))
+
+            eliminados = 0
+            if eliminar and ausentes:
+                cursor.execute('''
+                DELETE FROM rucs
+                WHERE mes IS ?
+                  AND NOT EXISTS (SELECT 1 FROM catalogo_excel e
+                                  WHERE e.ruc = rucs.ruc AND e.campaña = rucs.campaña)
+                ''', (mes,))
+                eliminados = cursor.rowcount
+
+            cursor.execute('DROP TABLE temp.catalogo_excel')
+            cursor.execute('COMMIT')
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+    return ResultadoSincronizacion(filas, invalidas, nuevos, modificados, eliminados,
+                                   entradas - nuevos - modificados, time.perf_counter() - inicio)
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    archivo = argumentos[0] if argumentos else EXCEL
+    if not os.path.exists(archivo):
+        sys.exit(f"❌ Archivo no encontrado: {archivo}")
+
+    database.init_db()
+    resultado = sincronizar_catalogo(archivo, eliminar='--conservar' not in sys.argv)
+    print(f"✅ {resultado.reporte()}")
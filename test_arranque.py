@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Prueba del arranque de app.py: el Dashboard se dibuja sin cargar openpyxl, y init_db
+verifica el esquema una sola vez por proceso salvo que el esquema cambie
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+DASHBOARD = '''
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.run()
+import arranque
+json.dump({"excepciones": [str(e.value) for e in at.exception],
+           "metricas": len(at.metric),
+           "pasos": [nombre for nombre, _ in arranque.ultimo.pasos],
+           "openpyxl": "openpyxl" in sys.modules}, sys.stdout)
+'''
+
+def test_dashboard_sin_openpyxl(tmp_path):
+    """El primer dibujo del Dashboard (en un proceso nuevo) no importa openpyxl"""
+    generar_bd_sintetica(str(tmp_path / "pagos.db"), n_registros=2000, n_rucs=100, dias=5)
+    shutil.copy(os.path.join(REPO, "DATA ENERO 2026.xlsx"), tmp_path)
+
+    salida = subprocess.run([sys.executable, "-c", DASHBOARD, os.path.join(REPO, "app.py")],
+                            cwd=tmp_path, capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PAGOS_TIEMPOS_INICIO="1", PYTHONPATH=REPO))
+    resultado = json.loads(salida.stdout)
+
+    assert resultado["excepciones"] == []
+    assert resultado["metricas"] >= 4
+    assert "primer dibujo Dashboard" in resultado["pasos"]
+    assert not resultado["openpyxl"]
+    print("✓ Dashboard dibujado sin openpyxl")
+
+def test_init_db_una_vez_por_esquema(bd_prueba):
+    """init_db no repite la verificación mientras el esquema no cambie"""
+    bd_prueba("arranque.db", esquema=False)
+
+    assert database.init_db() is True
+    assert database.init_db() is False
+
+    # Un cambio de esquema (aquí se borra un trigger) obliga a verificar de nuevo
+    with sqlite3.connect(database.DB_PATH) as conn:
+        trigger = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchone()[0]
+        conn.execute(f"DROP TRIGGER {trigger}")
+    assert database.init_db() is True
+    with sqlite3.connect(database.DB_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = ?", (trigger,)).fetchone()[0] == 1
+
+    assert database.init_db(forzar=True) is True
+    database.cerrar_pools()
+    print("✓ init_db verifica el esquema solo cuando cambia")
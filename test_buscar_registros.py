@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Prueba de buscar_registros / contar_registros (Ver Registros paginado en SQL)
+Recorrer todas las páginas debe dar lo mismo que filtrar y ordenar la tabla completa en Python
+"""
+
+from datetime import date, timedelta
+
+import database
+
+HOY = date.today()
+
+# Clave de orden en Python equivalente a cada orden de ORDENES_REGISTROS
+CLAVES_PYTHON = {
+    'reciente': (lambda r: (r[1], r[2], r[0]), True),
+    'antiguo': (lambda r: (r[1], r[2], r[0]), False),
+    'ruc': (lambda r: (r[2], r[1], r[0]), False),
+    'ultimos_ingresados': (lambda r: r[0], True),
+}
+
+FILTROS = [
+    {},
+    {'fecha_desde': (HOY - timedelta(days=3)).isoformat(), 'fecha_hasta': HOY.isoformat()},
+    {'asesor': 'Laura ...', 'estado': 'PROMESA CAIDA'},
+    {'campaña': 'FLUJO', 'ruc_prefijo': '2000000001'},
+    {'monto_min': 1000.0, 'monto_max': 3000.0, 'fecha_desde': (HOY - timedelta(days=5)).isoformat()},
+]
+
+def _cumple(r, fecha_desde=None, fecha_hasta=None, asesor=None, campaña=None,
+            estado=None, ruc_prefijo=None, monto_min=None, monto_max=None):
+    monto = (r[7] or 0) + (r[11] or 0)
+    return ((not fecha_desde or r[1] >= fecha_desde) and (not fecha_hasta or r[1] <= fecha_hasta)
+            and (not asesor or r[5] == asesor) and (not campaña or r[4] == campaña)
+            and (not estado or estado in (r[9], r[13]))
+            and (not ruc_prefijo or r[2].startswith(ruc_prefijo))
+            and (monto_min is None or monto >= monto_min) and (monto_max is None or monto <= monto_max))
+
+def _recorrer(orden, limite, **filtros):
+    filas, cursor, paginas = [], None, 0
+    while True:
+        pagina, cursor = database.buscar_registros(orden, cursor, limite, **filtros)
+        assert len(pagina) <= limite
+        filas.extend(pagina)
+        paginas += 1
+        if cursor is None:
+            return filas, paginas
+
+def test_paginas_iguales_a_filtrar_en_python(bd_prueba):
+    """Cada orden y combinación de filtros recorre exactamente las filas esperadas"""
+    bd_prueba("buscar.db", n_registros=2000, n_rucs=200, dias=10)
+    todos = database.obtener_todos_registros()
+
+    for filtros in FILTROS:
+        esperados = [r for r in todos if _cumple(r, **filtros)]
+        assert database.contar_registros(**filtros) == len(esperados)
+        for orden, (clave, descendente) in CLAVES_PYTHON.items():
+            filas, paginas = _recorrer(orden, 37, **filtros)
+            assert filas == sorted(esperados, key=clave, reverse=descendente), (orden, filtros)
+            assert paginas == max(1, -(-len(esperados) // 37))
+    database.cerrar_pools()
+    print(f"✓ {len(FILTROS)} filtros x {len(CLAVES_PYTHON)} órdenes paginados correctamente")
+
+def test_pagina_vacia_y_altas_entre_paginas(bd_prueba):
+    """Sin resultados retorna ([], None); un alta entre páginas no repite ni salta filas"""
+    bd_prueba("buscar.db", n_registros=300, n_rucs=20, dias=5)
+
+    assert database.buscar_registros(ruc_prefijo='9') == ([], None)
+    assert database.contar_registros(ruc_prefijo='9') == 0
+
+    primera, cursor = database.buscar_registros('ultimos_ingresados', limite=100)
+    database.registrar_pago(HOY.isoformat(), '20000000001', '70000001', 'FLUJO', None)
+    resto, _ = database.buscar_registros('ultimos_ingresados', cursor, limite=1000)
+    ids = [r[0] for r in primera + resto]
+    assert ids == list(range(300, 0, -1))
+    database.cerrar_pools()
+    print("✓ Paginación estable frente a altas")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Prueba de la caché de consultas por versión de datos
+Cada escritura debe invalidar exactamente las lecturas de los ámbitos que toca
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import database
+
+HOY = date.today()
+D1, D2 = (HOY - timedelta(days=1)).isoformat(), (HOY - timedelta(days=2)).isoformat()
+F1, F2 = (HOY + timedelta(days=5)).isoformat(), (HOY + timedelta(days=6)).isoformat()
+R1, R2 = '20000000001', '20000000002'
+
+# Lecturas observadas: nombre -> (función, argumentos)
+LECTURAS = {
+    'registros_d1': (database.obtener_registros_por_fecha, (D1,)),
+    'registros_d2': (database.obtener_registros_por_fecha, (D2,)),
+    'todos': (database.obtener_todos_registros, ()),
+    'ranking': (database.obtener_ranking_asesores, (D2, D1)),
+    'resumen_f1': (database.obtener_resumen_total_por_promesa, ('gasto', F1)),
+    'resumen_f2': (database.obtener_resumen_total_por_promesa, ('gasto', F2)),
+    'promesas_f1': (database.obtener_promesas_por_fecha, (F1,)),
+    'promesas_f2': (database.obtener_promesas_por_fecha, (F2,)),
+    'saldo_r1': (database.obtener_saldo_ruc, (R1,)),
+    'saldo_r2': (database.obtener_saldo_ruc, (R2,)),
+    'campanas': (database.obtener_campanas_unicas, ()),
+    'ruc_r1': (database.obtener_ruc_por_numero, (R1,)),
+}
+
+# Lecturas que dependen de toda la tabla registros_pagos
+GENERALES = {'todos', 'ranking'}
+
+def _leer_todo():
+    """Ejecuta todas las lecturas y retorna el conjunto de las que fallaron en la caché"""
+    fallidas = set()
+    for nombre, (funcion, args) in LECTURAS.items():
+        antes = database.estadisticas_cache()['fallos']
+        resultado = funcion(*args)
+        assert resultado == funcion.sin_cache(*args), nombre
+        if database.estadisticas_cache()['fallos'] > antes:
+            fallidas.add(nombre)
+    return fallidas
+
+def test_lecturas_repetidas_aciertan(bd_prueba):
+    """Sin escrituras, la segunda ronda de lecturas sale entera de la caché"""
+    bd_prueba("cache.db", n_registros=500, n_rucs=20, dias=5)
+    database.limpiar_cache()
+    assert _leer_todo() == set(LECTURAS)
+    assert _leer_todo() == set()
+    stats = database.estadisticas_cache()
+    assert stats['aciertos'] == stats['fallos'] == len(LECTURAS)
+    assert stats['por_funcion']['obtener_registros_por_fecha'] == (2, 2)
+    database.cerrar_pools()
+    print("✓ Lecturas repetidas servidas desde la caché")
+
+def test_escrituras_invalidan_solo_lo_afectado(bd_prueba):
+    """registrar_pago, actualizar_registro y eliminar_registro invalidan sus ámbitos y nada más"""
+    bd_prueba("cache.db", n_registros=500, n_rucs=20, dias=5)
+    database.limpiar_cache()
+    _leer_todo()
+
+    # Alta reportada en D1, RUC R1, promesa de gasto con fecha de pago F1
+    registro_id = database.registrar_pago(D1, R1, '70000001', 'FLUJO', 'Laura ...',
+                                          promesa_ga='A VEN...', monto_gasto=321.0,
+                                          fecha_pago_gasto=F1)
+    assert _leer_todo() == GENERALES | {'registros_d1', 'resumen_f1', 'promesas_f1', 'saldo_r1'}
+
+    # Mover la fecha de pago de F1 a F2 invalida las dos fechas (y el mismo día/RUC)
+    database.actualizar_registro(registro_id, fecha_pago_gasto=F2)
+    assert _leer_todo() == GENERALES | {'registros_d1', 'resumen_f1', 'resumen_f2',
+                                        'promesas_f1', 'promesas_f2', 'saldo_r1'}
+
+    database.eliminar_registro(registro_id)
+    assert _leer_todo() == GENERALES | {'registros_d1', 'resumen_f2', 'promesas_f2', 'saldo_r1'}
+
+    # Un cambio en el catálogo de RUCs no toca las lecturas de registros
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("UPDATE rucs SET campaña = 'NUEVA' WHERE ruc = ?", (R2,))
+    assert _leer_todo() == {'campanas'}
+    assert 'NUEVA' in database.obtener_campanas_unicas()
+    database.cerrar_pools()
+    print("✓ Cada escritura invalidó exactamente sus lecturas")
+
+def test_lru_acotada(monkeypatch, bd_prueba):
+    """La caché no pasa de su tamaño y desaloja la entrada menos usada"""
+    bd_prueba("cache.db", n_registros=500, n_rucs=20, dias=5)
+    database.limpiar_cache()
+    monkeypatch.setattr(database._cache_consultas, 'tamano', 3)
+    fechas = [(HOY - timedelta(days=i)).isoformat() for i in range(4)]
+
+    for fecha in fechas[:3]:
+        database.obtener_registros_por_fecha(fecha)
+    database.obtener_registros_por_fecha(fechas[0])  # la más antigua pasa a ser la más usada
+    database.obtener_registros_por_fecha(fechas[3])  # desaloja fechas[1]
+
+    stats = database.estadisticas_cache()
+    assert (stats['entradas'], stats['desalojos']) == (3, 1)
+    antes = stats['fallos']
+    database.obtener_registros_por_fecha(fechas[0])
+    database.obtener_registros_por_fecha(fechas[1])
+    assert database.estadisticas_cache()['fallos'] == antes + 1
+    database.cerrar_pools()
+    print("✓ Caché LRU acotada")
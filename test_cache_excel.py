@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Prueba de la caché de workbooks leídos (cache_excel.py)
+Acierto sin volver a leer el workbook, invalidación al modificarlo, clave por columnas,
+desalojo por tamaño, recuperación de una entrada dañada y mismo resultado que leerlo directo
+"""
+
+import os
+
+import openpyxl
+import pytest
+
+import cache_excel
+import importador_excel
+from datos_sinteticos import generar_excel_rucs
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_excel, 'CARPETA', str(tmp_path / "cache"))
+    monkeypatch.setattr(cache_excel, 'ACTIVA', True)
+    monkeypatch.setattr(cache_excel, '_estadisticas', {'aciertos': 0, 'fallos': 0, 'desalojos': 0})
+    lecturas = []
+    original = importador_excel.leer_xml
+
+    def leer_contando(archivo, encabezado=False):
+        lecturas.append(archivo)
+        return original(archivo, encabezado)
+
+    monkeypatch.setitem(importador_excel.LECTORES, 'xml', leer_contando)
+    return lecturas
+
+def _excel(tmp_path, nombre="rucs.xlsx", filas=200, semilla=1):
+    archivo = str(tmp_path / nombre)
+    generar_excel_rucs(archivo, filas, semilla=semilla, repetidas=0.1, invalidas=0.05)
+    return archivo
+
+def _directo(archivo, columnas=cache_excel.COLUMNAS_RUCS):
+    return list(cache_excel.cargar_excel(archivo, columnas, usar_cache=False).tuplas())
+
+def test_acierto_sin_leer_el_workbook(tmp_path, cache):
+    """La segunda carga sale del .npz, sin leer el workbook, y da las mismas filas"""
+    archivo = _excel(tmp_path)
+    primera = cache_excel.cargar_excel(archivo)
+    assert not primera.desde_cache and len(cache) == 1
+
+    segunda = cache_excel.cargar_excel(archivo)
+    assert segunda.desde_cache and len(cache) == 1
+    assert segunda.filas == primera.filas == 200
+    assert segunda.encabezado == primera.encabezado
+    assert list(segunda.tuplas()) == list(primera.tuplas()) == _directo(archivo)
+    assert cache_excel.estadisticas_cache_excel()['aciertos'] == 1
+    print("✓ Acierto sin leer el workbook")
+
+def test_igual_que_leer_directo(tmp_path, cache):
+    """Textos, documentos normalizados, números y celdas vacías quedan igual que en el workbook"""
+    archivo = str(tmp_path / "valores.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.append(['DOCUMENTO', 'CAMPAÑA', 'DEUDA TOTAL', 'RAZON SOCIAL'])
+    wb.active.append([20100000001, 'FLUJO', 10.5, 'ÑANDÚ S.A.C.'])
+    wb.active.append(['20100000002 ', None, None, 'EMPRESA DOS'])
+    wb.active.append([2.0100000003e10, 'REDI', 'no es número', ''])
+    wb.save(archivo)
+
+    cache_excel.cargar_excel(archivo)
+    tabla = cache_excel.cargar_excel(archivo)
+    assert tabla.desde_cache
+    assert list(tabla.tuplas(['DOCUMENTO', 'CAMPAÑA', 'DEUDA TOTAL', 'RAZON SOCIAL', 'ASESOR'])) == [
+        ('20100000001', 'FLUJO', 10.5, 'ÑANDÚ S.A.C.', None),
+        ('20100000002', None, None, 'EMPRESA DOS', None),
+        ('20100000003', 'REDI', None, None, None)]
+    print("✓ Igual que leer directo")
+
+def test_workbook_modificado_invalida(tmp_path, cache):
+    """Otro contenido es otra clave; la entrada de la versión anterior se borra"""
+    archivo = _excel(tmp_path)
+    cache_excel.cargar_excel(archivo)
+    anterior = cache_excel.clave(archivo)
+
+    generar_excel_rucs(archivo, 150, semilla=2)
+    tabla = cache_excel.cargar_excel(archivo)
+    assert not tabla.desde_cache and tabla.filas == 150
+    assert cache_excel.clave(archivo) != anterior
+    assert [os.path.basename(e[0]) for e in cache_excel._entradas()] == [f"{cache_excel.clave(archivo)}.npz"]
+    assert list(tabla.tuplas()) == _directo(archivo)
+    print("✓ Workbook modificado invalida la entrada")
+
+def test_clave_por_columnas(tmp_path, cache):
+    """Pedir otras columnas del mismo workbook usa otra entrada"""
+    archivo = _excel(tmp_path)
+    montos = {'DOCUMENTO': 'documento', 'DEUDA TOTAL': 'numero'}
+    cache_excel.cargar_excel(archivo)
+    tabla = cache_excel.cargar_excel(archivo, montos)
+    assert not tabla.desde_cache and list(tabla.columnas) == list(montos)
+    assert cache_excel.clave(archivo, montos) != cache_excel.clave(archivo)
+    assert cache_excel.cargar_excel(archivo, montos).desde_cache
+    assert cache_excel.cargar_excel(archivo).desde_cache
+    assert len(cache) == 2
+    print("✓ Clave por columnas")
+
+def test_desaloja_la_menos_usada(tmp_path, cache, monkeypatch):
+    """Sobre el límite se borra la entrada usada hace más tiempo"""
+    archivos = [_excel(tmp_path, f"rucs_{i}.xlsx", semilla=i) for i in range(3)]
+    cache_excel.cargar_excel(archivos[0])
+    cache_excel.cargar_excel(archivos[1])
+    tamano = max(e[1] for e in cache_excel._entradas())
+    # Entradas con fechas de uso distintas: la 0 se usó después que la 1
+    os.utime(os.path.join(cache_excel.carpeta(), f"{cache_excel.clave(archivos[1])}.npz"), (1, 1))
+    monkeypatch.setattr(cache_excel, 'LIMITE_MB', tamano * 2.5 / 2**20)
+
+    cache_excel.cargar_excel(archivos[2])
+    assert cache_excel.estadisticas_cache_excel()['desalojos'] == 1
+    assert cache_excel.cargar_excel(archivos[0]).desde_cache
+    assert cache_excel.cargar_excel(archivos[2]).desde_cache
+    assert not cache_excel.cargar_excel(archivos[1]).desde_cache
+    print("✓ Desaloja la entrada menos usada")
+
+def test_entrada_danada_y_sin_cache(tmp_path, cache):
+    """Una entrada dañada se vuelve a leer; usar_cache=False no lee ni escribe la carpeta"""
+    archivo = _excel(tmp_path)
+    cache_excel.cargar_excel(archivo)
+    ruta = os.path.join(cache_excel.carpeta(), f"{cache_excel.clave(archivo)}.npz")
+    with open(ruta, 'wb') as f:
+        f.write(b'no es un npz')
+
+    tabla = cache_excel.cargar_excel(archivo)
+    assert not tabla.desde_cache and list(tabla.tuplas()) == _directo(archivo)
+    assert cache_excel.cargar_excel(archivo).desde_cache
+
+    cache_excel.invalidar()
+    assert not cache_excel.cargar_excel(archivo, usar_cache=False).desde_cache
+    assert cache_excel._entradas() == []
+    print("✓ Entrada dañada y sin caché")
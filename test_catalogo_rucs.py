@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Prueba del catálogo de RUCs en memoria (catalogo_rucs.py)
+Las búsquedas deben dar lo mismo que filtrar la tabla rucs en Python, y el catálogo
+debe recargarse cuando cambia la tabla
+"""
+
+import random
+import sqlite3
+from datetime import datetime
+
+import catalogo_rucs
+import database
+from catalogo_rucs import CatalogoRucs, normalizar
+
+PALABRAS = ['COMERCIAL', 'INVERSIONES', 'ANDINA', 'MUÑOZ', 'GARCÍA', 'PERÚ', 'NORTE', 'LOGÍSTICA']
+
+def _cargar_rucs(n_rucs=400):
+    """RUCs al azar en la BD de prueba, con los catálogos en memoria vacíos"""
+    catalogo_rucs.limpiar_catalogos()
+    rnd = random.Random(9)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.executemany('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, deuda_total, fecha_creacion)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(str(20000000000 + rnd.randint(0, 10**6)), str(70000000 + i),
+               ' '.join(rnd.sample(PALABRAS, 3)) + ' S.A.C.', rnd.choice(['FLUJO', 'REDI...']),
+               rnd.choice(['Laura ...', None]), rnd.choice([None, 1500.0]), datetime.now().isoformat())
+              for i in range(n_rucs)])
+
+def _tabla():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('''
+        SELECT id, ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin
+        FROM rucs ORDER BY ruc, id
+        ''').fetchall()
+
+def _coincide(razon, texto):
+    palabras = normalizar(razon).split()
+    return all(any(p.startswith(e) for p in palabras) for e in normalizar(texto).split())
+
+def test_igual_a_filtrar_la_tabla(bd_prueba):
+    """Exacta, prefijo y razón social coinciden con la tabla filtrada en Python"""
+    bd_prueba("catalogo.db")
+    _cargar_rucs()
+    filas = _tabla()
+    catalogo = catalogo_rucs.obtener_catalogo()
+    assert len(catalogo) == len(filas)
+
+    for fila in filas[::7]:
+        assert catalogo.buscar_ruc(fila[1]) == [fila] == database.obtener_ruc_por_numero(fila[1])
+    assert catalogo.buscar_ruc('99999999999') == []
+
+    for prefijo in ('2', '2000', '20000', '200001', filas[3][1], '3'):
+        esperado = [f[1] for f in filas if f[1].startswith(prefijo)][:10]
+        assert [ruc for ruc, _ in catalogo.sugerencias(prefijo)] == esperado
+
+    for texto in ('munoz', 'Garcia Com', 'per and', 'sac', 'NORTE INV LOG', 'zzz', 'omercial'):
+        esperado = [f[1] for f in filas if _coincide(f[3], texto)]
+        assert [ruc for ruc, _ in catalogo.buscar_razon_social(texto, limite=len(filas))] == esperado
+        assert [ruc for ruc, _ in catalogo.sugerencias(texto)] == esperado[:10]
+    database.cerrar_pools()
+    print("✓ Búsquedas iguales a filtrar la tabla")
+
+def test_todas_las_campanas_del_ruc():
+    """Un RUC con varias campañas devuelve todas sus filas en cada búsqueda"""
+    filas = [
+        (1, '20100000001', '701', 'ANDINA S.A.C.', 'FLUJO', 'Laura ...', 10.0, None),
+        (7, '20100000001', '702', 'ANDINA S.A.C.', 'REDI...', None, None, 5.0),
+        (3, '20100000002', '703', 'PERÚ NORTE S.A.', 'FLUJO', None, None, None),
+    ]
+    catalogo = CatalogoRucs(filas)
+    assert len(catalogo) == 2
+    assert catalogo.buscar_ruc('20100000001') == filas[:2]
+    assert catalogo.sugerencias('2010') == [('20100000001', filas[:2]), ('20100000002', filas[2:])]
+    assert catalogo.sugerencias('andina') == [('20100000001', filas[:2])]
+    assert catalogo.sugerencias('peru n') == [('20100000002', filas[2:])]
+
+def test_recarga_al_cambiar_la_tabla(bd_prueba):
+    """Un cambio en rucs (de cualquier conexión) hace que obtener_catalogo recargue"""
+    bd_prueba("catalogo.db")
+    _cargar_rucs(n_rucs=50)
+    catalogo = catalogo_rucs.obtener_catalogo()
+    assert catalogo_rucs.obtener_catalogo() is catalogo
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, fecha_creacion)
+        VALUES ('10999999999', '79999999', 'NUEVA EMPRESA E.I.R.L.', 'FLUJO', ?)
+        ''', (datetime.now().isoformat(),))
+    nuevo = catalogo_rucs.obtener_catalogo()
+    assert nuevo is not catalogo and len(nuevo) == len(catalogo) + 1
+    assert nuevo.sugerencias('nueva emp')[0][0] == '10999999999'
+    database.cerrar_pools()
+    print("✓ Catálogo recargado al cambiar la tabla")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Prueba de concurrencia: N hilos escritores y M hilos lectores contra la API de database.py
+Reporta throughput y tiempos de espera por perfil de almacenamiento
+Uso: python test_concurrencia.py [escritores] [lectores] [segundos]
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+import database
+from datos_sinteticos import generar_bd_sintetica
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+def ejecutar_carga(perfil, escritores=4, lectores=4, duracion=2.0):
+    """
+    Corre escritores (registrar_pago) y lectores (consultas de las páginas admin)
+    en paralelo sobre DB_PATH durante `duracion` segundos.
+    Retorna: dict con operaciones, errores de bloqueo y latencias (ms)
+    """
+    database.configurar_pool(tamano=escritores + lectores, perfil=perfil)
+    database.init_db(perfil=perfil)
+
+    fin = time.perf_counter() + duracion
+    lock = threading.Lock()
+    resultado = {
+        'escrituras': 0, 'lecturas': 0, 'bloqueos': 0,
+        'lat_escritura': [], 'lat_lectura': []
+    }
+
+    def escritor(n):
+        hoy = date.today().isoformat()
+        i = 0
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                database.registrar_pago(
+                    fecha_reporte=hoy, ruc=str(30000000000 + n), id_documento=str(n),
+                    campaña='FLUJO', asesor=f'Asesor {n}', promesa_ga='A VEN...',
+                    monto_gasto=100 + i, fecha_pago_gasto=hoy
+                )
+                ok = True
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                ok = False
+            latencia = (time.perf_counter() - inicio) * 1000
+            with lock:
+                if ok:
+                    resultado['escrituras'] += 1
+                    resultado['lat_escritura'].append(latencia)
+                else:
+                    resultado['bloqueos'] += 1
+            i += 1
+
+    def lector(n):
+        consultas = [database.obtener_todos_registros,
+                     database.obtener_estadisticas_promesas_caidas]
+        i = 0
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                consultas[i % len(consultas)]()
+                ok = True
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                ok = False
+            latencia = (time.perf_counter() - inicio) * 1000
+            with lock:
+                if ok:
+                    resultado['lecturas'] += 1
+                    resultado['lat_lectura'].append(latencia)
+                else:
+                    resultado['bloqueos'] += 1
+            i += 1
+
+    hilos = [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    hilos += [threading.Thread(target=lector, args=(n,)) for n in range(lectores)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    return resultado
+
+def imprimir_reporte(perfil, r, duracion):
+    print(f"Perfil '{perfil}':")
+    print(f"  Escrituras: {r['escrituras']:6d} ({r['escrituras'] / duracion:8.1f}/s)  "
+          f"espera p50 {statistics.median(r['lat_escritura'] or [0]):7.2f} ms  "
+          f"p95 {_percentil(r['lat_escritura'], 0.95):7.2f} ms  "
+          f"máx {max(r['lat_escritura'] or [0]):7.2f} ms")
+    print(f"  Lecturas:   {r['lecturas']:6d} ({r['lecturas'] / duracion:8.1f}/s)  "
+          f"espera p50 {statistics.median(r['lat_lectura'] or [0]):7.2f} ms  "
+          f"p95 {_percentil(r['lat_lectura'], 0.95):7.2f} ms  "
+          f"máx {max(r['lat_lectura'] or [0]):7.2f} ms")
+    print(f"  Errores 'database is locked': {r['bloqueos']}")
+
+def test_perfil_concurrente_sin_bloqueos(bd_prueba):
+    """Con WAL, lectores y escritores simultáneos no deben ver 'database is locked'"""
+    bd_prueba("concurrencia.db", n_registros=2000, n_rucs=200)
+
+    r = ejecutar_carga('concurrente', escritores=3, lectores=3, duracion=1.0)
+    database.cerrar_pools()
+
+    assert r['bloqueos'] == 0
+    assert r['escrituras'] > 0 and r['lecturas'] > 0
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    print(f"✓ {r['escrituras']} escrituras y {r['lecturas']} lecturas sin bloqueos")
+
+if __name__ == "__main__":
+    escritores = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    lectores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duracion = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    print("=" * 70)
+    print(f"PRUEBA DE CONCURRENCIA: {escritores} escritores, {lectores} lectores, {duracion}s")
+    print("=" * 70)
+
+    for perfil in database.PERFILES_ALMACENAMIENTO:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_PATH = os.path.join(tmp, "concurrencia.db")
+            generar_bd_sintetica(database.DB_PATH, n_registros=5000, n_rucs=500)
+            resultado = ejecutar_carga(perfil, escritores, lectores, duracion)
+            database.cerrar_pools()
+            imprimir_reporte(perfil, resultado, duracion)
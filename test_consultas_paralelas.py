@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Prueba de los lotes de lecturas en paralelo (LoteConsultas / consultar_en_paralelo)
+Mismos resultados que en secuencia, en hilos del pool y con las excepciones de cada lectura
+"""
+
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import database
+
+def test_mismos_resultados_que_en_secuencia(bd_prueba):
+    """Las lecturas de las páginas dan lo mismo en paralelo que una por una"""
+    bd_prueba("paralelo.db", n_registros=3000, n_rucs=200, dias=10)
+    hoy = date.today()
+    lecturas = dict(
+        conteos=(database.obtener_conteos,),
+        snapshot=(database.obtener_snapshot_dashboard, hoy),
+        ranking=(database.obtener_ranking_asesores, (hoy - timedelta(days=10)).isoformat(), hoy.isoformat()),
+        pendientes=(database.obtener_promesas_pendientes,),
+        estadisticas=(database.obtener_estadisticas_promesas_hoy,),
+        promesas=(database.obtener_promesas_hoy,),
+    )
+
+    secuencia = database.consultar_en_paralelo(False, **lecturas)
+    paralelo = database.consultar_en_paralelo(True, **lecturas)
+    assert paralelo == secuencia
+    assert secuencia['ranking'] and secuencia['conteos']['total_registros'] == 3000
+    database.cerrar_pools()
+    print(f"✓ {len(lecturas)} lecturas iguales en paralelo y en secuencia")
+
+def test_hilos_y_excepciones(bd_prueba):
+    """En paralelo cada lectura corre en un hilo del pool; la excepción sale en resultado()"""
+    bd_prueba("paralelo.db", n_registros=3000, n_rucs=200, dias=10)
+    barrera = threading.Barrier(2, timeout=5)
+
+    def leer():
+        # Las dos lecturas deben estar en curso a la vez para pasar la barrera
+        barrera.wait()
+        return threading.current_thread().name, database.obtener_conteos()['total_registros']
+
+    def fallar():
+        raise ValueError("consulta inválida")
+
+    lote = database.LoteConsultas(paralelo=True)
+    lote.enviar('a', leer).enviar('b', leer).enviar('error', fallar)
+    (hilo_a, total_a), (hilo_b, total_b) = lote.resultado('a'), lote.resultado('b')
+    assert hilo_a != hilo_b and hilo_a.startswith('consultas')
+    assert total_a == total_b == 3000
+    with pytest.raises(ValueError, match="consulta inválida"):
+        lote.resultado('error')
+
+    # En secuencia se ejecuta en el hilo que envía
+    secuencia = database.LoteConsultas(paralelo=False).enviar('nombre', lambda: threading.current_thread().name)
+    assert secuencia.resultado('nombre') == threading.current_thread().name
+    database.cerrar_pools()
+    print("✓ Lecturas en hilos distintos y excepciones propagadas")
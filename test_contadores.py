@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Prueba de los contadores del panel de estado (tabla contadores)
+Deben coincidir con COUNT(*) después de altas, ediciones y bajas por cualquier camino
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import database
+from datos_sinteticos import generar_pagos
+
+def _contar():
+    hoy = date.today().isoformat()
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('''
+        SELECT (SELECT COUNT(*) FROM registros_pagos),
+               (SELECT COUNT(*) FROM registros_pagos WHERE fecha_reporte = ?),
+               (SELECT COUNT(*) FROM rucs)
+        ''', (hoy,)).fetchone()
+
+def _conteos():
+    conteos = database.obtener_conteos()
+    return conteos['total_registros'], conteos['registros_hoy'], conteos['rucs']
+
+def test_contadores_iguales_a_count(bd_prueba):
+    """Altas, lotes, cambios de fecha de reporte y bajas mantienen los contadores"""
+    bd_prueba("contadores.db", n_registros=1000, n_rucs=50, dias=10)
+    assert _conteos() == _contar()
+    rnd = random.Random(3)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        ids = [fila[0] for fila in conn.execute('SELECT id FROM registros_pagos')]
+
+    for paso in range(300):
+        operacion = rnd.random()
+        if operacion < 0.3:
+            ids.append(database.registrar_pago(**generar_pagos(1, semilla=paso)[0]))
+        elif operacion < 0.35:
+            ids.extend(i for i, _ in database.registrar_pagos_lote(generar_pagos(10, semilla=paso)) if i)
+        elif operacion < 0.6:
+            fecha = (date.today() - timedelta(days=rnd.randint(0, 2))).isoformat()
+            with sqlite3.connect(database.DB_PATH) as conn:
+                conn.execute('UPDATE registros_pagos SET fecha_reporte = ? WHERE id = ?', (fecha, rnd.choice(ids)))
+        elif operacion < 0.7:
+            database.actualizar_registro(rnd.choice(ids), observaciones=f"paso {paso}")
+        else:
+            registro_id = rnd.choice(ids)
+            ids.remove(registro_id)
+            database.eliminar_registro(registro_id)
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("INSERT INTO rucs (ruc, id_documento, razon_social, campaña, fecha_creacion) "
+                     "VALUES ('99999999999', '99999999', 'Nueva', 'FLUJO', '2026-01-01')")
+
+    assert _conteos() == _contar()
+    assert database.verificar_contadores() == []
+    database.cerrar_pools()
+    print("✓ Contadores iguales a COUNT(*)")
+
+def test_ultima_escritura_y_reconstruccion(bd_prueba):
+    """La hora de última escritura avanza con cada escritura; sin triggers se reconstruye"""
+    bd_prueba("contadores.db", n_registros=1000, n_rucs=50, dias=10)
+    antes = database.obtener_conteos()['ultima_escritura']
+    database.registrar_pago(**generar_pagos(1, semilla=99)[0])
+    despues = database.obtener_conteos()['ultima_escritura']
+    assert despues > antes
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('DROP TRIGGER trg_contadores_registros_pagos_insert')
+        conn.execute("UPDATE contadores SET valor = 0 WHERE clave = 'registros'")
+    database.init_db()
+    assert _conteos() == _contar()
+    database.cerrar_pools()
+    print("✓ Última escritura y reconstrucción de contadores")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Prueba de la edición optimista de registros (obtener_registro / actualizar_registro_si_version)
+Dos editores abren el mismo registro: el primero que guarda gana y el segundo recibe
+el conflicto con los valores vigentes, sin pisarlos
+"""
+
+import os
+import threading
+
+import database
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+def test_dos_editores(bd_prueba):
+    """El segundo editor con la versión vieja recibe el conflicto y el registro vigente"""
+    bd_prueba("edicion.db", n_registros=500, n_rucs=50, dias=5)
+    editor_a = database.obtener_registro(1)
+    editor_b = database.obtener_registro(1)
+    assert editor_a == editor_b and editor_a['version'] == 1
+
+    guardado, registro = database.actualizar_registro_si_version(1, editor_a['version'], observaciones="editor A")
+    assert guardado and registro['version'] == 2 and registro['observaciones'] == "editor A"
+
+    guardado, vigente = database.actualizar_registro_si_version(1, editor_b['version'], observaciones="editor B",
+                                                                 monto_gasto=1.0)
+    assert not guardado
+    assert vigente == database.obtener_registro(1)
+    assert vigente['version'] == 2 and vigente['observaciones'] == "editor A"
+    assert vigente['monto_gasto'] == editor_b['monto_gasto']
+
+    # Con la versión vigente sí guarda; las demás escrituras también suben la versión
+    assert database.actualizar_registro_si_version(1, 2, observaciones="editor B")[0]
+    database.marcar_promesa_cobrada(1, 'GASTO ADMINISTRATIVO')
+    database.actualizar_registro(1, observaciones="sin versión")
+    assert database.obtener_registro(1)['version'] == 5
+
+    database.eliminar_registro(1)
+    assert database.obtener_registro(1) is None
+    assert database.actualizar_registro_si_version(1, 5, observaciones="borrado") == (False, None)
+    database.cerrar_pools()
+    print("✓ El segundo editor recibe el conflicto")
+
+def test_editores_simultaneos(bd_prueba):
+    """Varios hilos guardan a la vez la misma versión: exactamente uno lo consigue"""
+    bd_prueba("edicion.db", n_registros=500, n_rucs=50, dias=5)
+    version = database.obtener_registro(7)['version']
+    barrera = threading.Barrier(8, timeout=10)
+    resultados = {}
+
+    def editar(nombre):
+        barrera.wait()
+        resultados[nombre] = database.actualizar_registro_si_version(7, version, observaciones=nombre)
+
+    hilos = [threading.Thread(target=editar, args=(f"editor {i}",)) for i in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    ganadores = [nombre for nombre, (guardado, _) in resultados.items() if guardado]
+    assert len(ganadores) == 1
+    final = database.obtener_registro(7)
+    assert final['version'] == version + 1 and final['observaciones'] == ganadores[0]
+    assert all(registro == final for _, registro in resultados.values())
+    database.cerrar_pools()
+    print(f"✓ Un solo guardado entre {len(hilos)} editores")
+
+def test_editar_por_id_muestra_conflicto(bd_prueba):
+    """Ver Registros abre el registro por ID y avisa si otro usuario guardó antes"""
+    from streamlit.testing.v1 import AppTest
+
+    bd_prueba("edicion.db", n_registros=500, n_rucs=50, dias=5)
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.session_state['pagina_actual'] = "📋 Ver Registros"
+    at.session_state['contraseña_editar_correcta'] = True
+    at.run()
+    at.number_input(key="id_editar").set_value(3).run()
+    at.button(key="btn_abrir_edit").click().run()
+    assert at.session_state['registro_editando']['id'] == 3
+
+    # Otro usuario guarda mientras el formulario está abierto
+    assert database.actualizar_registro_si_version(3, 1, observaciones="otro usuario")[0]
+    at.text_area(key="obs_edit_3_1").set_value("mis cambios")
+    at.button(key="btn_save_edit").click().run()
+    assert not at.exception
+    assert any("Otro usuario modificó" in e.value for e in at.error)
+    assert at.text_area(key="obs_edit_3_2").value == "otro usuario"
+    assert database.obtener_registro(3)['observaciones'] == "otro usuario"
+    database.cerrar_pools()
+    print("✓ Conflicto mostrado en la página")
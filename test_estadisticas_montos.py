@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Prueba de las estadísticas incrementales de montos (estadisticas_montos)
+Después de altas, ediciones y bajas al azar deben coincidir con un recálculo completo
+"""
+
+import random
+import sqlite3
+import statistics
+
+import database
+from datos_sinteticos import CAMPANAS, generar_pagos
+
+def _montos(columna, campaña=None):
+    with sqlite3.connect(database.DB_PATH) as conn:
+        filtro = 'AND campaña = ?' if campaña else ''
+        return [fila[0] for fila in conn.execute(
+            f'SELECT {columna} FROM registros_pagos WHERE {columna} > 0 {filtro}',
+            (campaña,) if campaña else ())]
+
+def test_incremental_igual_a_recalculo(bd_prueba):
+    """Altas, ediciones de monto y campaña, y bajas al azar mantienen las estadísticas exactas"""
+    bd_prueba("estadisticas.db", n_registros=1000, n_rucs=100, dias=10)
+    rnd = random.Random(11)
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        ids = [fila[0] for fila in conn.execute('SELECT id FROM registros_pagos')]
+
+    for paso in range(600):
+        operacion = rnd.random()
+        if operacion < 0.25:
+            ids.append(database.registrar_pago(**generar_pagos(1, semilla=paso)[0]))
+        elif operacion < 0.3:
+            lote = database.registrar_pagos_lote(generar_pagos(20, semilla=paso), omitir_duplicados=False)
+            ids.extend(registro_id for registro_id, _ in lote)
+        elif operacion < 0.55:
+            database.actualizar_registro(rnd.choice(ids), monto_gasto=rnd.choice([None, 0, 1.5, 99999.0, 420.0]))
+        elif operacion < 0.65:
+            with sqlite3.connect(database.DB_PATH) as conn:
+                conn.execute('UPDATE registros_pagos SET campaña = ?, monto_planilla = ? WHERE id = ?',
+                             (rnd.choice(CAMPANAS), rnd.choice([None, 10.0, 5000.0]), rnd.choice(ids)))
+        else:
+            registro_id = rnd.choice(ids)
+            ids.remove(registro_id)
+            database.eliminar_registro(registro_id)
+
+        if paso % 150 == 0:
+            assert database.verificar_estadisticas_montos() == []
+
+    assert database.verificar_estadisticas_montos() == []
+
+    # También contra statistics de Python, global y por campaña
+    for tipo, columna in (('ga', 'monto_gasto'), ('planilla', 'monto_planilla')):
+        for campaña in (None, 'FLUJO'):
+            montos = _montos(columna, campaña)
+            est = database.obtener_estadistica_monto(tipo, campaña)
+            assert est['n'] == len(montos)
+            assert abs(est['promedio'] - statistics.fmean(montos)) < 1e-6 * statistics.fmean(montos)
+            assert abs(est['desviacion'] - statistics.stdev(montos)) < 1e-6 * statistics.stdev(montos)
+            assert (est['minimo'], est['maximo']) == (min(montos), max(montos))
+
+    database.cerrar_pools()
+    print("✓ Estadísticas incrementales iguales al recálculo completo")
+
+def test_quitar_extremos_y_reconstruir(bd_prueba):
+    """Borrar el mínimo y el máximo los recalcula; reconstruir corrige una tabla alterada"""
+    bd_prueba("estadisticas.db", n_registros=1000, n_rucs=100, dias=10)
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        extremos = conn.execute('''
+        SELECT (SELECT id FROM registros_pagos WHERE monto_gasto > 0 ORDER BY monto_gasto LIMIT 1),
+               (SELECT id FROM registros_pagos WHERE monto_gasto > 0 ORDER BY monto_gasto DESC LIMIT 1)
+        ''').fetchone()
+    for registro_id in extremos:
+        database.eliminar_registro(registro_id)
+
+    montos = _montos('monto_gasto')
+    est = database.obtener_estadistica_monto('ga')
+    assert (est['minimo'], est['maximo']) == (min(montos), max(montos))
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("UPDATE estadisticas_montos SET media = media * 2 WHERE campaña = ''")
+    assert len(database.verificar_estadisticas_montos()) == 2
+    database.reconstruir_estadisticas_montos()
+    assert database.verificar_estadisticas_montos() == []
+    database.cerrar_pools()
+    print("✓ Mínimo y máximo recalculados al borrar extremos")
+
+def test_trigger_anterior_se_reemplaza(bd_prueba):
+    """init_db vuelve a crear un trigger cuya definición cambió y reconstruye las estadísticas"""
+    bd_prueba("estadisticas.db", n_registros=1000, n_rucs=100, dias=10)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('DROP TRIGGER trg_estadisticas_gasto_delete')
+        conn.execute('''CREATE TRIGGER trg_estadisticas_gasto_delete AFTER DELETE ON registros_pagos
+                        BEGIN SELECT 1; END''')
+        conn.execute('DELETE FROM registros_pagos WHERE id % 10 = 0')
+    assert database.verificar_estadisticas_montos() != []
+
+    database.init_db(forzar=True)
+    assert database.verificar_estadisticas_montos() == []
+    with sqlite3.connect(database.DB_PATH) as conn:
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'trg_estadisticas_gasto_delete'").fetchone()[0]
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT MAX(monto_gasto) FROM registros_pagos "
+                            "WHERE campaña = 'FLUJO' AND monto_gasto > 0").fetchall()
+    assert sql == database.triggers_estadisticas_montos()['trg_estadisticas_gasto_delete'].strip()
+    # El extremo de una campaña se busca en el índice parcial, sin recorrer la tabla
+    assert 'idx_registros_extremos_gasto' in plan[0][-1]
+    database.cerrar_pools()
+    print("✓ Trigger anterior reemplazado")
+
+def test_campana_vacia(bd_prueba):
+    """Un pago sin campaña cuenta una sola vez en el total, también al borrarlo o al quitar un extremo"""
+    bd_prueba("estadisticas.db")
+    sin_campaña = database.registrar_pago('2026-01-14', '20100000001', '20100000001', '', None, monto_gasto=100)
+    flujo = database.registrar_pago('2026-01-14', '20100000002', '20100000002', 'FLUJO', None, monto_gasto=300)
+
+    assert database.obtener_estadisticas_montos()['ga'] == (200, 100, 300, 2)
+    assert database.obtener_estadisticas_montos('FLUJO')['ga'] == (300, 300, 300, 1)
+    assert database.verificar_estadisticas_montos() == []
+
+    # Sin el de FLUJO, el mínimo y el máximo del total son los del pago sin campaña
+    database.eliminar_registro(flujo)
+    assert database.obtener_estadisticas_montos()['ga'] == (100, 100, 100, 1)
+    assert database.verificar_estadisticas_montos() == []
+
+    database.eliminar_registro(sin_campaña)
+    assert database.obtener_estadisticas_montos()['ga'] == (0, 0, 0, 0)
+    assert database.verificar_estadisticas_montos() == []
+    database.cerrar_pools()
+    print("✓ Campaña vacía contada una vez")
+
+def test_alerta_por_desviaciones(bd_prueba):
+    """Con suficientes datos la alerta usa desviaciones estándar del promedio"""
+    bd_prueba("estadisticas.db", n_registros=1000, n_rucs=100, dias=10)
+    est = database.obtener_estadistica_monto('ga')
+    assert est['n'] >= database.MIN_MUESTRAS_DESVIACION
+
+    alto = est['promedio'] + (database.UMBRAL_DESVIACIONES + 1) * est['desviacion']
+    normal = est['promedio'] + est['desviacion']
+    assert database.detectar_monto_anormal(alto, 'ga')[1] == 'ALTO'
+    assert database.detectar_monto_anormal(normal, 'ga')[0] is False
+    assert database.detectar_monto_anormal(alto, 'ga', campaña='FLUJO')[1] == 'ALTO'
+    database.cerrar_pools()
+    print("✓ Alertas por desviación estándar")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Prueba de formato.py: las funciones por columna dan lo mismo que el formato celda por celda
+que usaban las páginas
+"""
+
+import pandas as pd
+
+import formato
+import utils
+
+def test_montos_y_fechas():
+    """Vacíos, cero y negativos quedan vacíos; las fechas inválidas quedan NaT"""
+    serie = pd.Series([1234.5, None, 0, -3, '12.5', 'x'])
+    assert formato.montos(serie).tolist()[0] == 1234.5
+    assert formato.montos(serie).isna().tolist() == [False, True, True, True, False, True]
+
+    fechas = formato.fechas(pd.Series(['2026-01-15', None, '', 'PENDIENTE']))
+    assert fechas.iloc[0] == pd.Timestamp(2026, 1, 15)
+    assert fechas.isna().tolist() == [False, True, True, True]
+    assert formato.texto_fecha('2026-01-15') == '15/01/2026'
+    assert formato.texto_fecha(None) == '-'
+    print("✓ Montos y fechas por columna")
+
+def test_igual_a_formato_por_celda():
+    """Íconos, nombres cortos, medallas y texto de montos como los armaban las páginas"""
+    promesas = pd.Series(['PROMESA CAIDA', 'A VEN...', 'COBR...', None])
+    assert formato.iconos(promesas).tolist() == ['⚠️', '⏳', '✅', '✅']
+
+    asesores = ['Laura Pérez', 'SIN ASESOR', None, '', 'Ana', 'Laura Pérez']
+    esperado = [a.split()[0] if a and a != 'SIN ASESOR' else (a or 'N/A') for a in asesores]
+    assert formato.nombres_cortos(pd.Series(asesores)).tolist() == esperado
+
+    assert formato.medallas(5).tolist() == ['🥇', '🥈', '🥉', '#4', '#5']
+    assert formato.medallas(2).tolist() == ['🥇', '🥈']
+    assert formato.texto_moneda(1234567.891) == f"S/. {1234567.891:,.2f}"
+    assert formato.texto_moneda(None) == "S/. 0.00"
+    print("✓ Igual al formato celda por celda")
+
+def test_estilo_por_categoria():
+    """Cada fila toma el color de su categoría; sobre el límite del Styler se devuelve sin estilo"""
+    df = pd.DataFrame({'Tipo Pago': ['GASTO', 'PLANILLA', 'OTRO'], 'Monto': [1.0, 2.0, 3.0]})
+    estilos = formato.estilo_por_categoria(df, 'Tipo Pago', formato.COLORES_TIPO_PAGO)
+    estilos._compute()
+    assert estilos.ctx[(0, 1)] == [('background-color', '#ffe6e6')]
+    assert estilos.ctx[(1, 0)] == [('background-color', '#e6f3ff')]
+    assert (2, 0) not in estilos.ctx
+
+    with pd.option_context("styler.render.max_elements", 4):
+        assert formato.estilo_por_categoria(df, 'Tipo Pago', formato.COLORES_TIPO_PAGO) is df
+    print("✓ Colores por categoría")
+
+def test_utils_usa_formato():
+    """Los formateadores de utils.py son los de formato.py (una sola implementación)"""
+    assert utils.formatear_fecha('2026-01-15T08:30:00') == formato.texto_fecha('2026-01-15T08:30', '%d/%m/%Y %H:%M')
+    assert utils.formatear_fecha('2026-01-15') == '15/01/2026 00:00'
+    assert utils.formatear_fecha('') == '-'
+    assert utils.formatear_fecha('PENDIENTE') == 'PENDIENTE'
+    assert utils.formatear_moneda('1234.5') == formato.texto_moneda(1234.5) == 'S/. 1,234.50'
+    assert utils.formatear_moneda('x') == 'S/. x'
+    print("✓ utils delega en formato")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Prueba de la huella de contenido usada por detectar_duplicado_exacto
+Compara contra la consulta anterior (campo por campo), verifica la migración
+de una BD sin la columna huella y el registro atómico sin duplicados
+"""
+
+import sqlite3
+import threading
+from datetime import date
+
+import database
+from benchmark_duplicados import detectar_duplicado_anterior
+
+PAGO = dict(fecha_reporte=date.today().isoformat(), ruc='20000000001', id_documento='70000001',
+            campaña='FLUJO', asesor='Laura ...', promesa_ga='A VEN...', monto_gasto=150.0,
+            fecha_pago_gasto=date.today().isoformat(), observaciones='')
+
+def test_misma_deteccion_que_consulta_anterior(bd_prueba):
+    """La huella considera duplicados exactamente los mismos casos que la comparación campo por campo"""
+    bd_prueba("huella.db")
+    database.registrar_pago(**PAGO)
+    database.registrar_pago(**dict(PAGO, asesor=None, monto_gasto=None, observaciones=None))
+
+    variantes = [
+        PAGO,
+        dict(PAGO, monto_gasto=150),                 # entero vs REAL
+        dict(PAGO, monto_gasto=150.01),
+        dict(PAGO, observaciones=None),              # NULL = ''
+        dict(PAGO, observaciones='nota'),
+        dict(PAGO, asesor=''),
+        dict(PAGO, asesor=None, monto_gasto=0, observaciones=''),
+        dict(PAGO, ruc='20000000002'),
+        dict(PAGO, monto_planilla=10.0),
+        dict(PAGO, promesa_ga=None),
+    ]
+    with sqlite3.connect(database.DB_PATH) as conn:
+        for variante in variantes:
+            existe, registro_id, _ = database.detectar_duplicado_exacto(**variante)
+            assert registro_id == detectar_duplicado_anterior(conn, variante), variante
+            assert existe == (registro_id is not None)
+
+        plan = ' '.join(fila[3] for fila in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM registros_pagos WHERE huella = {database._sql_huella(True)}",
+            {campo: None for campo, _ in database.CAMPOS_HUELLA}))
+    database.cerrar_pools()
+    assert 'idx_registros_huella' in plan
+    print(f"✓ {len(variantes)} variantes detectadas igual que antes, con una búsqueda por índice")
+
+def test_migracion_bd_sin_huella(bd_prueba):
+    """init_db agrega la columna a una BD existente y detecta los registros anteriores"""
+    bd_prueba("antigua.db", esquema=False)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('''
+        CREATE TABLE registros_pagos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, fecha_reporte TEXT NOT NULL, ruc TEXT NOT NULL,
+            id_documento TEXT NOT NULL, campaña TEXT NOT NULL, asesor TEXT,
+            promesa_ga TEXT, monto_gasto REAL, fecha_pago_gasto TEXT,
+            promesa_planilla TEXT, monto_planilla REAL, fecha_pago_planilla TEXT,
+            observaciones TEXT, fecha_registro TEXT NOT NULL)
+        ''')
+        conn.execute('''
+        INSERT INTO registros_pagos (fecha_reporte, ruc, id_documento, campaña, asesor,
+            promesa_ga, monto_gasto, fecha_pago_gasto, observaciones, fecha_registro)
+        VALUES (:fecha_reporte, :ruc, :id_documento, :campaña, :asesor,
+            :promesa_ga, :monto_gasto, :fecha_pago_gasto, :observaciones, 'x')
+        ''', PAGO)
+
+    database.init_db()
+    existe, registro_id, _ = database.detectar_duplicado_exacto(**PAGO)
+    database.cerrar_pools()
+    assert existe and registro_id == 1
+    print("✓ Registros anteriores a la migración detectados como duplicados")
+
+def test_registro_atomico_sin_duplicados(bd_prueba):
+    """Varios envíos simultáneos del mismo pago registran uno solo"""
+    bd_prueba("huella.db")
+
+    resultados = []
+    barrera = threading.Barrier(8)
+
+    def enviar():
+        barrera.wait()
+        resultados.append(database.registrar_pago_sin_duplicar(**PAGO))
+
+    hilos = [threading.Thread(target=enviar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        total = conn.execute('SELECT COUNT(*) FROM registros_pagos').fetchone()[0]
+    database.cerrar_pools()
+
+    registrados = [registro_id for registro_id, _ in resultados if registro_id is not None]
+    assert total == 1 and len(registrados) == 1
+    assert all(id_dup == registrados[0] for registro_id, id_dup in resultados if registro_id is None)
+    print("✓ 8 envíos simultáneos, 1 registro")
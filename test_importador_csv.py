@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Prueba del importador de pagos desde CSV con punto de control (importador_csv.py)
+Por bloques queda lo mismo que en un solo lote; un proceso matado a mitad de la importación
+se retoma desde el último bloque confirmado, sin repetir ni perder filas; volver a ejecutar
+no registra nada
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import database
+import importador_csv
+from datos_sinteticos import COLUMNAS_CSV, generar_csv_pagos
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+COLUMNAS = ('fecha_reporte, ruc, id_documento, campaña, asesor, promesa_ga, monto_gasto, fecha_pago_gasto, '
+            'estado_ga, promesa_planilla, monto_planilla, fecha_pago_planilla, estado_planilla, observaciones')
+
+# Proceso hijo: importa el CSV avisando cada bloque confirmado (y esperando, para matarlo a mitad)
+HIJO = '''
+import sys, time
+import database, importador_csv
+database.DB_PATH = sys.argv[1]
+def progreso(punto):
+    print(punto['fila'], flush=True)
+    time.sleep(0.05)
+importador_csv.importar_pagos_csv(sys.argv[2], int(sys.argv[3]), progreso=progreso)
+'''
+
+def _registros(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f'SELECT {COLUMNAS} FROM registros_pagos ORDER BY id').fetchall()
+
+def _esperado(bd_prueba, archivo):
+    """Registros que deja el CSV completo registrado en un solo lote"""
+    import csv
+    bd_prueba("referencia.db")
+    with open(archivo, encoding='utf-8-sig', newline='') as f:
+        pagos = [importador_csv.pago_desde_fila(fila) for fila in csv.DictReader(f)]
+    database.registrar_pagos_lote([p for p in pagos if p])
+    return _registros(database.DB_PATH)
+
+def _csv_con_casos(ruta, n=3000):
+    """CSV sintético con BOM, observaciones de varias líneas con comillas y filas sin RUC"""
+    generar_csv_pagos(ruta, n)
+    with open(ruta, encoding='utf-8') as f:
+        lineas = f.read().splitlines(keepends=True)
+    vacia = ','.join('' for _ in COLUMNAS_CSV) + '\r\n'
+    lineas[10:10] = [vacia, vacia]
+    lineas.insert(500, '9999,2026-01-10,20100000001,20100000001,FLUJO,Laura,A VENCER,10.5,2026-02-01,,,,'
+                       '"Llamar, después\r\ndel ""cierre""",2026-01-10T10:00:00,A VENCER,A VENCER\r\n')
+    with open(ruta, 'w', encoding='utf-8-sig', newline='') as f:
+        f.writelines(lineas)
+    return n + 3
+
+def test_bloques_igual_que_un_lote_e_idempotente(tmp_path, bd_prueba):
+    """Por bloques pequeños queda lo mismo que en un lote; re-ejecutar no registra nada"""
+    archivo = str(tmp_path / "pagos.csv")
+    filas = _csv_con_casos(archivo)
+    esperado = _esperado(bd_prueba, archivo)
+
+    bd_prueba("bloques.db")
+    avances = []
+    resultado = importador_csv.importar_pagos_csv(archivo, tamano_lote=400, progreso=avances.append)
+    assert _registros(database.DB_PATH) == esperado
+    assert (resultado.filas, resultado.invalidas) == (filas, 2)
+    assert resultado.insertados == len(esperado) and resultado.duplicados == filas - 2 - len(esperado)
+    assert [a['fila'] for a in avances] == list(range(400, filas, 400)) + [filas]
+    assert avances[-1]['completo'] and avances[-1]['byte'] == os.path.getsize(archivo)
+    assert ('Llamar, después\r\ndel "cierre"',) in [(r[-1],) for r in esperado]
+
+    otra = importador_csv.importar_pagos_csv(archivo, tamano_lote=400)
+    assert otra.ya_importado and otra.filas == 0 and otra.filas_previas == filas
+    # Forzar desde el principio tampoco duplica: todo se omite como duplicado
+    reiniciada = importador_csv.importar_pagos_csv(archivo, tamano_lote=1000, reiniciar=True)
+    assert (reiniciada.insertados, reiniciada.duplicados) == (0, filas - 2)
+    assert _registros(database.DB_PATH) == esperado
+    database.cerrar_pools()
+    print(f"✓ {resultado.reporte()}")
+
+def test_matar_y_retomar(tmp_path, bd_prueba):
+    """Un proceso matado con SIGKILL se retoma desde el punto de control sin repetir ni perder filas"""
+    archivo = str(tmp_path / "pagos.csv")
+    generar_csv_pagos(archivo, 6000, semilla=3)
+    esperado = _esperado(bd_prueba, archivo)
+
+    db_path = bd_prueba("matado.db")
+    hijo = subprocess.Popen([sys.executable, "-c", HIJO, db_path, archivo, "250"], cwd=str(tmp_path),
+                            env=dict(os.environ, PYTHONPATH=REPO), stdout=subprocess.PIPE, text=True)
+    vistos = [int(hijo.stdout.readline()) for _ in range(3)]
+    hijo.kill()
+    hijo.wait()
+    assert vistos == [250, 500, 750]
+
+    punto = importador_csv.punto_de_control(archivo)
+    assert not punto['completo'] and 750 <= punto['fila'] < 6000
+    # Solo quedó lo confirmado: los registros coinciden con el punto de control
+    assert _registros(db_path) == esperado[:punto['insertados']]
+
+    resultado = importador_csv.importar_pagos_csv(archivo, tamano_lote=1000)
+    assert resultado.filas_previas == punto['fila']
+    assert resultado.filas == 6000 - punto['fila']
+    assert punto['insertados'] + resultado.insertados == len(esperado)
+    assert punto['duplicados'] + resultado.duplicados == 6000 - len(esperado)
+    assert _registros(db_path) == esperado
+    assert importador_csv.punto_de_control(archivo)['insertados'] == len(esperado)
+    assert database.verificar_contadores() == []
+    database.cerrar_pools()
+    print(f"✓ {resultado.reporte()}")
+
+def test_error_a_mitad_de_bloque(tmp_path, bd_prueba):
+    """Si un bloque falla no queda nada de él; al retomar se vuelve a leer desde ese bloque"""
+    archivo = str(tmp_path / "pagos.csv")
+    generar_csv_pagos(archivo, 2000, semilla=5)
+    esperado = _esperado(bd_prueba, archivo)
+
+    # Falla al insertar el registro 1000: a mitad del cuarto bloque
+    bd_prueba("error.db")
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("CREATE TRIGGER trg_prueba_falla BEFORE INSERT ON registros_pagos "
+                     "WHEN (SELECT COUNT(*) FROM registros_pagos) >= 999 BEGIN SELECT RAISE(ABORT, 'corte'); END")
+    with pytest.raises(sqlite3.IntegrityError):
+        importador_csv.importar_pagos_csv(archivo, tamano_lote=300)
+    punto = importador_csv.punto_de_control(archivo)
+    confirmados = _registros(database.DB_PATH)
+    assert punto['fila'] == 900 and not punto['completo']
+    assert confirmados == esperado[:punto['insertados']]
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('DROP TRIGGER trg_prueba_falla')
+    resultado = importador_csv.importar_pagos_csv(archivo, tamano_lote=300)
+    assert resultado.filas_previas == punto['fila'] and resultado.filas == 2000 - punto['fila']
+    assert _registros(database.DB_PATH) == esperado
+    database.cerrar_pools()
+    print("✓ Error a mitad de bloque")
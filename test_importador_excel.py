@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Prueba del importador de RUCs por lotes (importador_excel.py)
+Mismo resultado que insertar fila por fila (gana la primera fila de cada RUC y campaña), conteos
+correctos entre lotes y una segunda importación que no inserta nada
+"""
+
+import os
+import sqlite3
+
+import openpyxl
+
+import database
+import importador_excel
+from datos_sinteticos import generar_excel_rucs
+
+def _rucs():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('SELECT ruc, id_documento, razon_social, campaña, asesor, deuda_total, gasto_admin '
+                            'FROM rucs ORDER BY ruc, campaña').fetchall()
+
+def _esperado(archivo):
+    """Lo que deja la importación fila por fila: la primera fila válida de cada documento y campaña"""
+    esperado = {}
+    for fila in openpyxl.load_workbook(archivo).active.iter_rows(min_row=2, values_only=True):
+        if fila[0] and fila[1] and fila[2]:
+            documento = str(int(fila[1]))
+            esperado.setdefault((documento, fila[0]),
+                                (documento, documento, fila[2], fila[0], fila[6], fila[3], fila[4]))
+    return sorted(esperado.values())
+
+def test_lotes_igual_que_fila_por_fila(tmp_path, bd_prueba):
+    """Con lotes pequeños (repetidos entre lotes) queda lo mismo que fila por fila"""
+    bd_prueba("importador.db")
+    archivo = str(tmp_path / "rucs.xlsx")
+    documentos = generar_excel_rucs(archivo, 3000, repetidas=0.1, invalidas=0.05)
+    avances = []
+
+    resultado = importador_excel.importar_rucs_excel(archivo, tamano_lote=250, progreso=avances.append)
+    assert _rucs() == _esperado(archivo)
+    # Los documentos repetidos en otra campaña también quedan (una fila por RUC y campaña)
+    assert resultado.insertados == len(_esperado(archivo)) == len(_rucs()) > documentos
+    assert resultado.filas == 3000 == resultado.insertados + resultado.repetidos + resultado.invalidas
+    assert resultado.invalidas > 0 and resultado.repetidos > 0
+    assert avances == list(range(250, 3001, 250))
+    assert resultado.filas_por_segundo > 0
+
+    # Importar otra vez (con openpyxl) no inserta nada
+    otra = importador_excel.importar_rucs_excel(archivo, tamano_lote=1000, lector='openpyxl')
+    assert (otra.insertados, otra.repetidos) == (0, 3000 - otra.invalidas)
+    database.cerrar_pools()
+    print(f"✓ {resultado.reporte()}")
+
+def test_leer_xml_igual_que_openpyxl(tmp_path):
+    """leer_xml da las mismas filas que openpyxl (textos compartidos, en línea, números y huecos)"""
+    archivo = str(tmp_path / "huecos.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.append(['CAMPAÑA', 'DOCUMENTO', 'RAZON SOCIAL'])
+    wb.active.append(['FLUJO', 20100000001, 'ÑANDÚ S.A.C.', 1.5, None, None, 'Laura'])
+    wb.active.append([None, None, 'solo razón'])
+    wb.active.append([])
+    wb.active.append(['REDI', 2.5e10, True, ''])
+    wb.create_sheet('otra').append(['no', 'es', 'la', 'activa'])
+    wb.save(archivo)
+
+    for ruta in (archivo, os.path.join(os.path.dirname(os.path.abspath(__file__)), importador_excel.EXCEL)):
+        assert list(importador_excel.leer_xml(ruta)) == list(importador_excel.leer_openpyxl(ruta))
+    print("✓ leer_xml igual que openpyxl")
+
+def test_lector_y_esquema_sin_montos(tmp_path):
+    """Acepta otro lector de filas y la tabla rucs de clean_db (sin columnas de montos)"""
+    db_path = str(tmp_path / "clean.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+        CREATE TABLE rucs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ruc TEXT UNIQUE NOT NULL,
+            id_documento TEXT UNIQUE NOT NULL,
+            razon_social TEXT NOT NULL,
+            campaña TEXT NOT NULL,
+            asesor TEXT,
+            fecha_creacion TEXT NOT NULL
+        )''')
+
+    filas = [('FLUJO', 20100000001, 'EMPRESA UNO', 100.0, 17.7, '202510', 'Laura'),
+             ('FLUJO', '20100000002 ', 'EMPRESA DOS', None, None, '', None),
+             ('REDI', 20100000001.0, 'EMPRESA UNO (OTRA CAMPAÑA)', 5.0, 1.0, '', 'Carla'),
+             ('FLUJO', 'sin número', 'EMPRESA TRES', 1.0, 1.0, '', None),
+             (None, 20100000004, 'SIN CAMPAÑA'),
+             ('FLUJO', 20100000005, 'EMPRESA CINCO')]
+    resultado = importador_excel.importar_rucs_excel('filas', db_path, tamano_lote=2, lector=lambda _: iter(filas))
+
+    assert (resultado.filas, resultado.insertados, resultado.repetidos, resultado.invalidas) == (6, 3, 1, 2)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT ruc, razon_social, campaña, asesor FROM rucs ORDER BY ruc').fetchall() == [
+            ('20100000001', 'EMPRESA UNO', 'FLUJO', 'Laura'),
+            ('20100000002', 'EMPRESA DOS', 'FLUJO', None),
+            ('20100000005', 'EMPRESA CINCO', 'FLUJO', None)]
+    print("✓ Lector propio y esquema de clean_db")
+
+def _tabla_rucs(db_path):
+    # Sin id: los INSERT OR IGNORE que no insertan igual consumen ids, que dependen de los lotes
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute('SELECT ruc, razon_social, campaña, asesor, deuda_total, gasto_admin, mes '
+                            'FROM rucs ORDER BY ruc, campaña').fetchall()
+
+def test_carpeta_en_paralelo_igual_que_secuencial(tmp_path, bd_prueba):
+    """Varios workbooks leídos en procesos dan lo mismo que importarlos uno tras otro"""
+    carpeta = tmp_path / "meses"
+    carpeta.mkdir()
+    # Documentos que se repiten entre meses: gana el mes más antiguo, como uno tras otro
+    for i, nombre in enumerate(["DATA MARZO 2026.xlsx", "DATA ENERO 2026.xlsx", "DATA FEBRERO 2026.xlsx",
+                                "otros.xlsx"]):
+        generar_excel_rucs(str(carpeta / nombre), 800, semilla=i, primer_documento=10000000000 + 500 * i,
+                           repetidas=0.1, invalidas=0.05)
+    (carpeta / "~$DATA ENERO 2026.xlsx").write_bytes(b'temporal de Excel')
+
+    archivos = importador_excel.archivos_excel(str(carpeta))
+    assert [os.path.basename(a) for a in archivos] == [
+        "DATA ENERO 2026.xlsx", "DATA FEBRERO 2026.xlsx", "DATA MARZO 2026.xlsx", "otros.xlsx"]
+    assert importador_excel.archivos_excel(str(carpeta / "DATA *.xlsx")) == archivos[:3]
+
+    bd_prueba("importador.db")
+    secuencial = [importador_excel.importar_rucs_excel(a, tamano_lote=300) for a in archivos]
+    esperado = _tabla_rucs(database.DB_PATH)
+
+    paralelo_db = bd_prueba("paralelo.db")
+    avances = []
+    resultado = importador_excel.importar_rucs_carpeta(str(carpeta), procesos=3, tamano_lote=300,
+                                                       progreso=avances.append)
+
+    assert _tabla_rucs(paralelo_db) == esperado
+    assert {fila[-1] for fila in esperado} == {'2026-01', '2026-02', '2026-03', None}
+    assert resultado.procesos == 3 and len(avances) == 4
+    assert [(r.importacion.filas, r.importacion.insertados, r.importacion.repetidos, r.importacion.invalidas)
+            for r in resultado.archivos] == [(s.filas, s.insertados, s.repetidos, s.invalidas) for s in secuencial]
+    assert resultado.insertados == len(esperado) and resultado.filas == 3200
+    database.cerrar_pools()
+    print(f"✓ Carpeta en paralelo igual que secuencial\n{resultado.reporte()}")
+
+def test_mes_de_archivo():
+    assert importador_excel.mes_de_archivo("DATA ENERO 2026.xlsx") == '2026-01'
+    assert importador_excel.mes_de_archivo("/datos/data setiembre 2025.xlsx") == '2025-09'
+    assert importador_excel.mes_de_archivo("RUCS_DICIEMBRE_2025_v2.xlsx") == '2025-12'
+    assert importador_excel.mes_de_archivo("otros.xlsx") is None
+    assert importador_excel.mes_de_archivo("ENERO.xlsx") is None
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Prueba del programador de tareas (programador.py)
+Las tareas se ejecutan cuando les toca, guardan su estado en tareas_programadas y no se
+repiten entre procesos; las páginas de app.py ya no cambian estados al dibujarse
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import database
+import programador
+
+RUC = '20000000001'
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+def _preparar(bd_prueba):
+    """BD con una promesa A VENCER vencida ayer y sin evaluar hoy"""
+    bd_prueba("programador.db", n_registros=1000, n_rucs=50, dias=10)
+    ayer = (date.today() - timedelta(days=1)).isoformat()
+    with sqlite3.connect(database.DB_PATH) as conn:
+        registro_id = conn.execute('SELECT MIN(id) FROM registros_pagos').fetchone()[0]
+        conn.execute("UPDATE registros_pagos SET estado_ga = 'A VENCER', fecha_pago_gasto = ?, monto_gasto = 100 "
+                     "WHERE id = ?", (ayer, registro_id))
+        conn.execute('DELETE FROM metadatos WHERE clave = ?', (database.CLAVE_PROMESAS_EVALUADAS,))
+    return registro_id
+
+def _estado_ga(registro_id):
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('SELECT estado_ga FROM registros_pagos WHERE id = ?', (registro_id,)).fetchone()[0]
+
+def _tareas():
+    return {fila[0]: fila for fila in database.obtener_tareas_programadas()}
+
+def test_tareas_cuando_les_toca(bd_prueba):
+    """Primero las tareas sin espera inicial; las demás después; ninguna se repite antes de tiempo"""
+    registro_id = _preparar(bd_prueba)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("UPDATE saldos_ruc SET pendiente = pendiente + 100 WHERE ruc = ? AND tipo_pago = 'gasto'",
+                     (RUC,))
+
+    tareas = programador.Programador()
+    assert tareas.ejecutar_pendientes() == ['vencimiento_promesas', 'optimizar']
+    assert _estado_ga(registro_id) == 'PROMESA CAIDA'
+    estado = _tareas()['vencimiento_promesas']
+    assert estado[1] == 'OK' and estado[8] == 1 and estado[2] > datetime.now().isoformat()
+    assert tareas.ejecutar_pendientes() == []
+
+    # Pasada la espera inicial corren las pesadas; optimizar todavía no vuelve a tocar
+    ejecutadas = tareas.ejecutar_pendientes(tareas.inicio + timedelta(minutes=6))
+    assert {'rucs_desde_excel', 'analizar', 'agregados'} <= set(ejecutadas)
+    assert 'optimizar' not in ejecutadas
+    assert all(fila[1] == 'OK' for fila in _tareas().values())
+    assert '"saldos_ruc": 1' in _tareas()['agregados'][6]
+    assert database.reconciliar_saldos_ruc() == []
+    database.cerrar_pools()
+    print(f"✓ {len(_tareas())} tareas ejecutadas y registradas")
+
+def test_error_y_reintento(bd_prueba):
+    """Una tarea que falla queda en ERROR y se reintenta después de REINTENTO"""
+    _preparar(bd_prueba)
+    llamadas = []
+
+    def fallar():
+        llamadas.append(1)
+        raise ValueError("sin conexión")
+
+    tareas = programador.Programador([programador.Tarea('falla', "Siempre falla", fallar, timedelta(minutes=1))])
+    tareas.ejecutar_pendientes()
+    nombre, estado, proxima, *_, error, ejecuciones, fallos, _ = _tareas()['falla']
+    assert (estado, error, ejecuciones, fallos) == ('ERROR', 'ValueError: sin conexión', 1, 1)
+
+    assert tareas.ejecutar_pendientes(datetime.now() + programador.REINTENTO / 2) == []
+    assert tareas.ejecutar_pendientes(datetime.fromisoformat(proxima) + timedelta(seconds=1)) == ['falla']
+    assert len(llamadas) == 2 and _tareas()['falla'][9] == 2
+    database.cerrar_pools()
+    print("✓ Error registrado y reintentado")
+
+def test_una_ejecucion_entre_programadores(bd_prueba):
+    """Varios programadores a la vez (como varios procesos) ejecutan la tarea una sola vez"""
+    _preparar(bd_prueba)
+    llamadas = []
+
+    def lenta():
+        llamadas.append(threading.current_thread().name)
+        time.sleep(0.2)
+
+    tarea = programador.Tarea('lenta', "Tarda un poco", lenta, timedelta(hours=1))
+    hilos = [threading.Thread(target=programador.Programador([tarea]).ejecutar_pendientes) for _ in range(6)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(llamadas) == 1
+    assert _tareas()['lenta'][8] == 1
+    database.cerrar_pools()
+    print("✓ Una sola ejecución entre 6 programadores")
+
+def test_hilo_de_fondo(bd_prueba):
+    """El hilo ejecuta la tarea al arrancar y la vuelve a ejecutar cuando se adelanta"""
+    registro_id = _preparar(bd_prueba)
+    tareas = programador.Programador(programador.TAREAS[:1], pausa_maxima=0.2).iniciar()
+    try:
+        limite = time.time() + 10
+        while _estado_ga(registro_id) != 'PROMESA CAIDA' and time.time() < limite:
+            time.sleep(0.05)
+        assert _estado_ga(registro_id) == 'PROMESA CAIDA'
+
+        database.programar_tarea_ahora('vencimiento_promesas')
+        tareas.despertar()
+        while _tareas()['vencimiento_promesas'][8] < 2 and time.time() < limite:
+            time.sleep(0.05)
+        assert _tareas()['vencimiento_promesas'][8] == 2
+    finally:
+        tareas.detener(5)
+    assert not tareas.activo()
+    database.cerrar_pools()
+    print("✓ Hilo de fondo ejecuta y se detiene")
+
+def test_paginas_no_cambian_estados(monkeypatch, bd_prueba):
+    """Dibujar las páginas (sin programador) no modifica registros, RUCs ni metadatos"""
+    from streamlit.testing.v1 import AppTest
+
+    registro_id = _preparar(bd_prueba)
+    monkeypatch.setattr(programador, 'ACTIVO', False)
+    database.init_db()
+
+    def foto():
+        with sqlite3.connect(database.DB_PATH) as conn:
+            return (conn.execute("SELECT ambito, version FROM versiones_datos WHERE ambito IN ('registros', 'rucs')")
+                    .fetchall(), conn.execute('SELECT clave, valor FROM metadatos').fetchall())
+
+    antes = foto()
+    for pagina in ("📊 Dashboard", "⏳ Promesas Pendientes", "🎯 Promesas de Hoy", "📝 Registrar Pago",
+                   "⚙️ Tareas Programadas"):
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.session_state['pagina_actual'] = pagina
+        at.run()
+        assert not at.exception, pagina
+
+    assert foto() == antes
+    assert _estado_ga(registro_id) == 'A VENCER'
+    database.cerrar_pools()
+    print("✓ Las páginas solo leen")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Prueba de registrar_pagos_lote
+Compara contra registrar_pago fila por fila, verifica los duplicados (en la BD y
+dentro del lote) y la importación de CSV de importar_datos_nuevos
+"""
+
+import csv
+import sqlite3
+
+import database
+from datos_sinteticos import generar_pagos
+from importar_datos_nuevos import importar_csv_nuevos
+
+COLUMNAS = ('fecha_reporte, ruc, id_documento, campaña, asesor, promesa_ga, monto_gasto, '
+            'fecha_pago_gasto, estado_ga, promesa_planilla, monto_planilla, fecha_pago_planilla, '
+            'estado_planilla, observaciones')
+
+def _filas(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f'SELECT {COLUMNAS} FROM registros_pagos ORDER BY id').fetchall()
+
+def test_mismo_resultado_que_registrar_pago(bd_prueba):
+    """El lote guarda las mismas filas y estados que registrar_pago uno por uno"""
+    pagos = generar_pagos(500)
+
+    bd_prueba("uno_a_uno.db")
+    for pago in pagos:
+        database.registrar_pago(**pago)
+    esperado = _filas(database.DB_PATH)
+    database.cerrar_pools()
+
+    bd_prueba("lote.db")
+    resultados = database.registrar_pagos_lote(pagos, omitir_duplicados=False)
+    obtenido = _filas(database.DB_PATH)
+    consistente = database.verificar_resumen_diario()
+    database.cerrar_pools()
+
+    assert obtenido == esperado
+    assert [registro_id for registro_id, _ in resultados] == list(range(1, len(pagos) + 1))
+    assert consistente == []
+    print(f"✓ {len(pagos)} pagos iguales a registrar_pago")
+
+def test_duplicados_en_bd_y_en_lote(bd_prueba):
+    """Los duplicados se informan con el id existente y no se vuelven a registrar"""
+    bd_prueba("duplicados.db")
+    pagos = generar_pagos(20, semilla=2)
+    existente = database.registrar_pago(**pagos[0])
+
+    # Repetidos: uno ya registrado y otro dos veces dentro del lote (uno como tupla)
+    lote = pagos + [pagos[0], tuple(pagos[5].values())]
+    resultados = database.registrar_pagos_lote(lote)
+    total = len(_filas(database.DB_PATH))
+    database.cerrar_pools()
+
+    assert resultados[0] == (None, existente)
+    assert resultados[20] == (None, existente)
+    assert resultados[21] == (None, resultados[5][0])
+    assert all(registro_id for registro_id, _ in resultados[1:20])
+    assert total == 20
+    print("✓ Duplicados en la BD y dentro del lote detectados")
+
+def test_importar_csv(tmp_path, bd_prueba):
+    """importar_csv_nuevos registra el archivo y una segunda importación no duplica"""
+    bd_prueba("csv.db")
+    pagos = generar_pagos(300, semilla=3)
+    for i, pago in enumerate(pagos):
+        pago['observaciones'] = f"fila {i}"
+    archivo = tmp_path / "pagos.csv"
+    with open(archivo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(pagos[0]))
+        writer.writeheader()
+        for pago in pagos:
+            writer.writerow({k: '' if v is None else v for k, v in pago.items()})
+
+    primera = importar_csv_nuevos(str(archivo))
+    segunda = importar_csv_nuevos(str(archivo))
+    total = len(_filas(database.DB_PATH))
+    database.cerrar_pools()
+
+    assert primera == 300 and segunda == 0 and total == 300
+    print("✓ CSV importado una sola vez")
+
+def test_fechas_sin_ceros(bd_prueba):
+    """Una fecha de pago sin ceros ('2026-1-5') da el mismo estado y se guarda igual por ambos caminos"""
+    pago = {'fecha_reporte': '2026-01-14', 'ruc': '20100000001', 'id_documento': '20100000001',
+            'campaña': 'ENERO 2026', 'asesor': 'Asesor', 'promesa_ga': 'PROMESA', 'monto_gasto': 50.0,
+            'fecha_pago_gasto': '2000-1-5', 'promesa_planilla': 'PROMESA', 'monto_planilla': 80.0,
+            'fecha_pago_planilla': '2999-1-5', 'observaciones': ''}
+
+    bd_prueba("uno_a_uno.db")
+    database.registrar_pago(**pago)
+    esperado = _filas(database.DB_PATH)
+    database.cerrar_pools()
+
+    bd_prueba("lote.db")
+    database.registrar_pagos_lote([pago])
+    obtenido = _filas(database.DB_PATH)
+    # Ya guardada como ISO, el motor de vencimiento la reconoce
+    assert database.evaluar_vencimiento_promesas(forzar=True)['evaluada']
+    assert _filas(database.DB_PATH) == obtenido
+    database.cerrar_pools()
+
+    assert obtenido == esperado
+    assert obtenido[0][7:9] == ('2000-01-05', 'PROMESA CAIDA')
+    assert obtenido[0][11:13] == ('2999-01-05', 'A VENCER')
+    print("✓ Fechas sin ceros normalizadas")
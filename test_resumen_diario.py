@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Prueba del resumen diario materializado (resumen_diario)
+Verifica que los triggers lo mantienen igual a un recálculo completo
+y que los resúmenes del Dashboard dan lo mismo que consultar registros_pagos
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import database
+
+def _consulta_directa(tipo, fecha):
+    """Resumen por asesor y promesa calculado directamente sobre registros_pagos"""
+    fecha_col, promesa, _, monto = database.COLUMNAS_TIPO_PAGO[tipo]
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute(f'''
+        SELECT asesor, {promesa}, COUNT(*), SUM({monto})
+        FROM registros_pagos
+        WHERE {fecha_col} = ? AND {monto} > 0
+        GROUP BY asesor, {promesa}
+        ORDER BY asesor, {promesa}
+        ''', (fecha,)).fetchall()
+
+def _mutar(rnd, n=300):
+    """Aplica altas, ediciones, cobros y bajas al azar usando las funciones de database.py"""
+    hoy = date.today()
+    with sqlite3.connect(database.DB_PATH) as conn:
+        ids = [fila[0] for fila in conn.execute('SELECT id FROM registros_pagos')]
+
+    for _ in range(n):
+        operacion = rnd.random()
+        fecha = (hoy + timedelta(days=rnd.randint(-5, 5))).isoformat()
+        if operacion < 0.3:
+            ids.append(database.registrar_pago(
+                hoy.isoformat(), f"{20000000000 + rnd.randint(0, 199)}", '70000000', 'FLUJO',
+                rnd.choice(['Laura ...', 'Miguel ...', None]),
+                promesa_ga=rnd.choice(['A VEN...', 'COBR...', None]),
+                monto_gasto=rnd.choice([0, 120.55, 300.1]), fecha_pago_gasto=fecha))
+        elif operacion < 0.55:
+            database.actualizar_registro(rnd.choice(ids), monto_planilla=rnd.choice([None, 0, 999.99]),
+                                         fecha_pago_planilla=fecha)
+        elif operacion < 0.65:
+            # Reasignar asesor (no pasa por actualizar_registro)
+            with sqlite3.connect(database.DB_PATH) as conn:
+                conn.execute('UPDATE registros_pagos SET asesor = ? WHERE id = ?',
+                             (rnd.choice(['Carla ...', None]), rnd.choice(ids)))
+        elif operacion < 0.8:
+            database.marcar_promesa_cobrada(rnd.choice(ids), rnd.choice(['GASTO ADMINISTRATIVO', 'PLANILLA']))
+        else:
+            registro_id = rnd.choice(ids)
+            ids.remove(registro_id)
+            database.eliminar_registro(registro_id)
+
+def test_triggers_mantienen_resumen(bd_prueba):
+    """Tras escrituras mezcladas el resumen coincide con un recálculo y con la consulta directa"""
+    bd_prueba("resumen.db", n_registros=2000, n_rucs=200, dias=10)
+    assert database.verificar_resumen_diario() == []
+
+    _mutar(random.Random(7))
+    database.evaluar_vencimiento_promesas(date.today() + timedelta(days=2))
+
+    assert database.verificar_resumen_diario() == []
+    for dias in range(-5, 6):
+        fecha = (date.today() + timedelta(days=dias)).isoformat()
+        for tipo in ('gasto', 'planilla'):
+            directo = _consulta_directa(tipo, fecha)
+            resumen = database.obtener_resumen_por_asesor_promesa(tipo, fecha)
+            assert [fila[:3] for fila in resumen] == [fila[:3] for fila in directo]
+            assert all(abs(a[3] - b[3]) < 0.005 for a, b in zip(resumen, directo))
+
+            totales = database.obtener_resumen_total_por_promesa(tipo, fecha)
+            assert sum(fila[1] for fila in totales) == sum(fila[2] for fila in directo)
+
+        diario = database.obtener_resumen_asesores_diario(fecha)
+        total_ga = sum(fila[3] for fila in _consulta_directa('gasto', fecha))
+        assert abs(sum(fila[3] for fila in diario) - total_ga) < 0.005
+
+    database.cerrar_pools()
+    print("✓ Resumen diario consistente después de altas, ediciones, cobros y bajas")
+
+def test_verificar_y_reconstruir(bd_prueba):
+    """El verificador detecta un resumen alterado y la reconstrucción lo corrige"""
+    bd_prueba("resumen.db", n_registros=2000, n_rucs=200, dias=10)
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('UPDATE resumen_diario SET monto = monto + 10 '
+                     'WHERE fecha_pago = (SELECT MIN(fecha_pago) FROM resumen_diario)')
+        conn.execute('DELETE FROM resumen_diario_rucs WHERE ruc = ?', ('20000000001',))
+
+    diferencias = database.verificar_resumen_diario()
+    assert {d[0] for d in diferencias} == {'resumen_diario', 'resumen_diario_rucs'}
+
+    assert database.reconstruir_resumen_diario() > 0
+    assert database.verificar_resumen_diario() == []
+    database.cerrar_pools()
+    print(f"✓ {len(diferencias)} diferencias detectadas y corregidas")
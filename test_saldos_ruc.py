@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Prueba del libro de saldos por RUC (saldos_ruc)
+Cada camino de escritura de database.py debe dejarlo igual a un recálculo completo
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import database
+from datos_sinteticos import generar_pagos
+
+RUC = '20000000001'
+
+def test_caminos_de_escritura(bd_prueba):
+    """registrar, lote, editar, cobrar, vencer y eliminar mantienen los saldos"""
+    bd_prueba("saldos.db", n_registros=1000, n_rucs=50, dias=10)
+    rnd = random.Random(5)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        ids = [fila[0] for fila in conn.execute('SELECT id FROM registros_pagos')]
+
+    for paso in range(400):
+        operacion = rnd.random()
+        if operacion < 0.2:
+            ids.append(database.registrar_pago(**generar_pagos(1, semilla=paso)[0]))
+        elif operacion < 0.25:
+            ids.extend(i for i, _ in database.registrar_pagos_lote(generar_pagos(10, semilla=paso)) if i)
+        elif operacion < 0.5:
+            fecha = (date.today() + timedelta(days=rnd.randint(-3, 3))).isoformat()
+            database.actualizar_registro(rnd.choice(ids), monto_gasto=rnd.choice([None, 0, 250.75]),
+                                         promesa_planilla=rnd.choice([None, 'A VEN...', 'COBR...']),
+                                         fecha_pago_gasto=fecha)
+        elif operacion < 0.7:
+            database.marcar_promesa_cobrada(rnd.choice(ids), rnd.choice(['GASTO ADMINISTRATIVO', 'PLANILLA']))
+        elif operacion < 0.75:
+            database.evaluar_vencimiento_promesas(date.today() + timedelta(days=rnd.randint(-3, 3)), forzar=True)
+        else:
+            registro_id = rnd.choice(ids)
+            ids.remove(registro_id)
+            database.eliminar_registro(registro_id)
+
+    assert database.reconciliar_saldos_ruc() == []
+
+    # El saldo por cobrar es lo no cobrado de las promesas del RUC
+    with sqlite3.connect(database.DB_PATH) as conn:
+        esperado = conn.execute('''
+        SELECT COALESCE(SUM(monto_gasto), 0) FROM registros_pagos
+        WHERE ruc = ? AND promesa_ga IS NOT NULL
+          AND NOT (promesa_ga LIKE 'COBR%' OR estado_ga = 'COBRADO')
+        ''', (RUC,)).fetchone()[0]
+    assert abs(database.obtener_saldo_ruc(RUC)['ga']['por_cobrar'] - esperado) < 0.005
+    database.cerrar_pools()
+    print("✓ Saldos por RUC consistentes en todos los caminos de escritura")
+
+def test_que_cuenta_en_el_saldo(bd_prueba):
+    """Solo las filas con promesa y monto; los montos con su signo; COBR... y COBRADO van a cobrado"""
+    bd_prueba("reglas.db")
+    hoy = date.today()
+    base = dict(fecha_reporte=hoy.isoformat(), ruc='20999999999', id_documento='20999999999',
+                campaña='FLUJO', asesor='Laura')
+    futura, pasada = (hoy + timedelta(days=5)).isoformat(), (hoy - timedelta(days=5)).isoformat()
+    database.registrar_pagos_lote([
+        dict(base, promesa_ga='A VEN...', monto_gasto=100.0, fecha_pago_gasto=futura),
+        dict(base, promesa_ga='A VEN...', monto_gasto=-30.0, fecha_pago_gasto=futura, observaciones='nota de crédito'),
+        dict(base, promesa_ga='A VEN...', monto_gasto=40.0, fecha_pago_gasto=pasada),
+        dict(base, promesa_ga='COBR...', monto_gasto=25.0, fecha_pago_gasto=pasada),
+        # Sin promesa o sin monto no entran en el saldo
+        dict(base, promesa_ga=None, monto_gasto=500.0, fecha_pago_gasto=futura),
+        dict(base, promesa_ga='A VEN...', monto_gasto=None, fecha_pago_gasto=futura),
+    ])
+
+    saldo = database.obtener_saldo_ruc('20999999999')['ga']
+    assert (saldo['pendiente'], saldo['caido'], saldo['cobrado']) == (70.0, 40.0, 25.0)
+    assert saldo['por_cobrar'] == 110.0
+    assert database.reconciliar_saldos_ruc() == []
+    database.cerrar_pools()
+    print("✓ Reglas del saldo por RUC")
+
+def test_reconciliar_y_reconstruir(bd_prueba):
+    """La reconciliación informa las diferencias y reconstruir las corrige"""
+    bd_prueba("saldos.db", n_registros=1000, n_rucs=50, dias=10)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("UPDATE saldos_ruc SET pendiente = pendiente + 100 WHERE ruc = ?", (RUC,))
+        conn.execute("INSERT INTO saldos_ruc VALUES ('99999999999', 'gasto', 5, 0, 0)")
+
+    diferencias = database.reconciliar_saldos_ruc(reconstruir=True)
+    assert {clave[0] for clave, _, _ in diferencias} == {RUC, '99999999999'}
+    assert database.reconciliar_saldos_ruc() == []
+    database.cerrar_pools()
+    print(f"✓ {len(diferencias)} diferencias reconciliadas")
+
+def test_alerta_contra_saldo_del_ruc(bd_prueba):
+    """detectar_monto_anormal compara contra el saldo por cobrar del RUC"""
+    bd_prueba("saldos.db", n_registros=1000, n_rucs=50, dias=10)
+    por_cobrar = database.obtener_saldo_ruc(RUC)['planilla']['por_cobrar']
+    assert por_cobrar > 0
+
+    assert database.detectar_monto_anormal(por_cobrar * 2, 'planilla', RUC)[1] == 'ALTO'
+    assert database.detectar_monto_anormal(por_cobrar * 0.05, 'planilla', RUC)[1] == 'BAJO'
+    assert database.detectar_monto_anormal(por_cobrar, 'planilla', RUC)[0] is False
+    database.cerrar_pools()
+    print("✓ Alertas contra el saldo del RUC")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Prueba de la sincronización incremental del catálogo (sincronizar_catalogo.py)
+Migración de rucs a UNIQUE (ruc, campaña), conteos por tipo de cambio, filas sin cambios
+intactas, registros_pagos sin tocar y todo o nada en una transacción
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import database
+from sincronizar_catalogo import sincronizar_catalogo
+
+COLUMNAS = ['CAMPAÑA', 'DOCUMENTO', 'RAZON SOCIAL', 'DEUDA TOTAL', 'GASTOS ADMIN', 'PERIODOS ASIGNADOS', 'ASESOR']
+
+def _escribir_excel(ruta, filas):
+    pd.DataFrame(filas, columns=COLUMNAS).to_excel(ruta, index=False)
+
+def _filas(n=40):
+    """Un RUC por fila; los múltiplos de 5 también están en la campaña REDI"""
+    filas = [['FLUJO', 20000000000 + i, f"Empresa {i}", 1000.0 + i, 50.0 + i, '202511', 'Laura'] for i in range(n)]
+    filas += [['REDI', 20000000000 + i, f"Empresa {i}", 10.0 + i, 1.0, '202511', 'Carla'] for i in range(0, n, 5)]
+    return filas
+
+def _rucs():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return {(ruc, campaña): tuple(resto) for ruc, campaña, *resto in conn.execute(
+            'SELECT ruc, campaña, id, razon_social, asesor, deuda_total, gasto_admin, fecha_creacion FROM rucs')}
+
+def _registrar_pagos():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.executemany('''
+        INSERT INTO registros_pagos (fecha_reporte, ruc, id_documento, campaña, asesor, promesa_ga,
+                                     monto_gasto, fecha_pago_gasto, fecha_registro)
+        VALUES ('2026-01-10', ?, ?, 'FLUJO', 'Laura', 'PROMESA', 100.0, '2026-01-20', ?)
+        ''', [(str(20000000000 + i),) * 2 + (datetime.now().isoformat(),) for i in range(0, 40, 3)])
+
+def _registros():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return conn.execute('SELECT * FROM registros_pagos ORDER BY id').fetchall()
+
+def test_migra_unique_por_campana(bd_prueba):
+    """Una BD con rucs UNIQUE (ruc) pasa a UNIQUE (ruc, campaña) conservando filas e ids"""
+    db_path = bd_prueba("antigua.db", esquema=False)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+        CREATE TABLE rucs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ruc TEXT UNIQUE NOT NULL,
+            id_documento TEXT UNIQUE NOT NULL,
+            razon_social TEXT NOT NULL,
+            campaña TEXT NOT NULL,
+            asesor TEXT,
+            fecha_creacion TEXT NOT NULL
+        )''')
+        conn.executemany("INSERT INTO rucs (id, ruc, id_documento, razon_social, campaña, fecha_creacion) "
+                         "VALUES (?, ?, ?, ?, 'FLUJO', '2026-01-01')",
+                         [(10 * i, str(i), str(i), f"Empresa {i}") for i in range(1, 6)])
+    database.init_db()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT id, ruc FROM rucs ORDER BY id').fetchall() == [
+            (10 * i, str(i)) for i in range(1, 6)]
+        # El mismo RUC en otra campaña ya no se descarta; el mismo RUC y campaña sí
+        nuevo = conn.execute("INSERT INTO rucs (ruc, id_documento, razon_social, campaña, fecha_creacion) "
+                             "VALUES ('1', '1', 'Empresa 1', 'REDI', '2026-01-02')").lastrowid
+        assert nuevo == 51
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO rucs (ruc, id_documento, razon_social, campaña, fecha_creacion) "
+                         "VALUES ('1', '1', 'Empresa 1', 'REDI', '2026-01-02')")
+
+    # Los triggers se recrean con la tabla: contadores y versiones siguen al día
+    assert database.verificar_contadores() == []
+    assert database.obtener_conteos()['rucs'] == 6
+    assert not database._migrar_rucs_por_campana(sqlite3.connect(db_path).cursor())
+    database.cerrar_pools()
+    print("✓ Migración a UNIQUE (ruc, campaña)")
+
+def test_sincroniza_solo_la_diferencia(tmp_path, bd_prueba):
+    """Nuevos, modificados y eliminados por RUC y campaña; lo demás y registros_pagos intactos"""
+    bd_prueba("catalogo.db")
+    excel = str(tmp_path / "DATA ENERO 2026.xlsx")
+    filas = _filas()
+    _escribir_excel(excel, filas + [['FLUJO', 'sin número', 'Inválida', 1, 1, '', None],
+                                    ['FLUJO', 20000000000, 'Repetida: gana la primera', 1, 1, '', None]])
+
+    inicial = sincronizar_catalogo(excel)
+    assert (inicial.nuevos, inicial.modificados, inicial.eliminados, inicial.sin_cambios) == (48, 0, 0, 0)
+    assert (inicial.filas, inicial.invalidas) == (50, 1)
+    antes = _rucs()
+    assert antes[('20000000000', 'FLUJO')][1] == 'Empresa 0'
+    assert antes[('20000000005', 'REDI')][1:5] == ('Empresa 5', 'Carla', 15.0, 1.0)
+    _registrar_pagos()
+    registros = _registros()
+    version_sin_cambios = database._versiones(('rucs.ruc:20000000009',))
+
+    # Cambios: 2 razones sociales, 1 deuda, 1 asesor; se van 3 entradas (una sola de un RUC
+    # con dos campañas); entran 2 RUCs y 1 campaña nueva de un RUC existente
+    filas[2][2] = "Empresa 2 S.A.C."
+    filas[3][3] = 5.5
+    filas[4][6] = 'Jorge'
+    filas[40][2] = "Empresa 0 (REDI)"
+    quitadas = {(filas[i][1], filas[i][0]) for i in (6, 7, 41)}
+    filas = [f for f in filas if (f[1], f[0]) not in quitadas]
+    filas += [['FLUJO', 20000000100, 'Nueva 100', 1.0, 1.0, '', 'Laura'],
+              ['FLUJO', 20000000101, 'Nueva 101', 2.0, None, '', None],
+              ['REDI', 20000000001, 'Empresa 1', 3.0, 0.5, '', 'Carla']]
+    _escribir_excel(excel, filas)
+
+    resultado = sincronizar_catalogo(excel)
+    assert (resultado.nuevos, resultado.modificados, resultado.eliminados, resultado.sin_cambios) == (3, 4, 3, 41)
+    despues = _rucs()
+    assert len(despues) == 48 + 3 - 3
+    assert despues[('20000000002', 'FLUJO')][1] == "Empresa 2 S.A.C."
+    assert despues[('20000000003', 'FLUJO')][3] == 5.5
+    assert despues[('20000000004', 'FLUJO')][2] == 'Jorge'
+    assert despues[('20000000000', 'REDI')][1] == "Empresa 0 (REDI)"
+    assert despues[('20000000101', 'FLUJO')][4] is None
+    assert ('20000000001', 'REDI') in despues and ('20000000005', 'FLUJO') in despues
+    assert not set(despues) & {(str(doc), campaña) for doc, campaña in quitadas}
+    # Las que no cambiaron conservan id y fecha; las modificadas, su id
+    for clave in set(antes) & set(despues):
+        assert despues[clave][0] == antes[clave][0]
+        if clave not in {('20000000002', 'FLUJO'), ('20000000003', 'FLUJO'), ('20000000004', 'FLUJO'),
+                         ('20000000000', 'REDI')}:
+            assert despues[clave] == antes[clave]
+    assert database._versiones(('rucs.ruc:20000000009',)) == version_sin_cambios
+    assert _registros() == registros
+    assert database.verificar_contadores() == []
+
+    # Sin cambios en el Excel no se escribe nada
+    otra = sincronizar_catalogo(excel)
+    assert (otra.nuevos, otra.modificados, otra.eliminados, otra.sin_cambios) == (0, 0, 0, 48)
+    assert _rucs() == despues
+    database.cerrar_pools()
+    print(f"✓ {resultado.reporte()}")
+
+def test_conservar_y_todo_o_nada(tmp_path, bd_prueba):
+    """eliminar=False conserva las ausentes; si algo falla no queda ningún cambio a medias"""
+    bd_prueba("catalogo.db")
+    excel = str(tmp_path / "rucs.xlsx")
+    _escribir_excel(excel, _filas())
+    sincronizar_catalogo(excel)
+    antes = _rucs()
+
+    filas = _filas()[5:] + [['FLUJO', 20000000200, 'Nueva 200', 1.0, 1.0, '', None]]
+    filas[0][2] = "Empresa 5 modificada"
+    _escribir_excel(excel, filas)
+
+    # Un DELETE que falla deshace también los INSERT y UPDATE de la misma transacción
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("CREATE TRIGGER trg_prueba_sin_borrar BEFORE DELETE ON rucs "
+                     "BEGIN SELECT RAISE(ABORT, 'no se puede borrar'); END")
+    with pytest.raises(sqlite3.IntegrityError):
+        sincronizar_catalogo(excel)
+    assert _rucs() == antes
+
+    conservadas = sincronizar_catalogo(excel, eliminar=False)
+    assert (conservadas.nuevos, conservadas.modificados, conservadas.eliminados) == (1, 1, 0)
+    assert len(_rucs()) == len(antes) + 1
+    database.cerrar_pools()
+    print("✓ Conservar ausentes y todo o nada")
+
+def test_otros_meses_se_conservan(tmp_path, bd_prueba):
+    """
+    Sincronizar el workbook de un mes solo elimina entradas de ese mes, no las de meses anteriores.
+    Una entrada que sigue en el mes siguiente pasa a ese mes (al importar y al sincronizar).
+    """
+    import importador_excel
+
+    bd_prueba("catalogo.db")
+    enero = str(tmp_path / "DATA ENERO 2026.xlsx")
+    febrero = str(tmp_path / "DATA FEBRERO 2026.xlsx")
+    _escribir_excel(enero, [['FLUJO', 20000000001, 'Solo enero', 1.0, 1.0, '', None],
+                            ['FLUJO', 20000000002, 'Enero y febrero', 2.0, 1.0, '', None]])
+    _escribir_excel(febrero, [['FLUJO', 20000000002, 'Enero y febrero', 2.0, 1.0, '', None],
+                              ['FLUJO', 20000000003, 'Febrero 3', 3.0, 1.0, '', None]])
+    importador_excel.importar_rucs_carpeta(str(tmp_path / "DATA *.xlsx"), procesos=1)
+
+    def meses():
+        with sqlite3.connect(database.DB_PATH) as conn:
+            return conn.execute('SELECT ruc, mes FROM rucs ORDER BY ruc').fetchall()
+
+    def conteos(resultado):
+        return (resultado.nuevos, resultado.modificados, resultado.eliminados, resultado.sin_cambios)
+
+    assert meses() == [('20000000001', '2026-01'), ('20000000002', '2026-02'), ('20000000003', '2026-02')]
+
+    # Un enero corregido sin el RUC 2 no lo elimina: sigue en febrero
+    _escribir_excel(enero, [['FLUJO', 20000000001, 'Solo enero', 1.0, 1.0, '', None]])
+    assert conteos(sincronizar_catalogo(enero)) == (0, 0, 0, 1)
+
+    # En febrero se va el RUC 3: se elimina; el RUC de enero sigue
+    _escribir_excel(febrero, [['FLUJO', 20000000002, 'Enero y febrero', 2.0, 1.0, '', None]])
+    assert conteos(sincronizar_catalogo(febrero)) == (0, 0, 1, 1)
+    assert meses() == [('20000000001', '2026-01'), ('20000000002', '2026-02')]
+
+    # El RUC 1 aparece en febrero: pasa a febrero; se va el RUC 2 (que vino de enero): se elimina
+    _escribir_excel(febrero, [['FLUJO', 20000000001, 'Solo enero', 1.0, 1.0, '', None]])
+    assert conteos(sincronizar_catalogo(febrero)) == (0, 1, 1, 0)
+    assert meses() == [('20000000001', '2026-02')]
+
+    # Sincronizar de nuevo enero no lo devuelve a enero
+    assert conteos(sincronizar_catalogo(enero)) == (0, 0, 0, 1)
+    assert meses() == [('20000000001', '2026-02')]
+    database.cerrar_pools()
+    print("✓ Otros meses conservados")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Prueba de obtener_snapshot_dashboard
+Debe dar lo mismo que las consultas por separado que usaba el Dashboard, también tras escrituras
+"""
+
+import random
+from datetime import date, timedelta
+
+import database
+from datos_sinteticos import generar_pagos
+
+def _comparar(fecha):
+    """El snapshot de la fecha contra las funciones de una sola consulta"""
+    snapshot = database.obtener_snapshot_dashboard(fecha)
+    for tipo in ('gasto', 'planilla'):
+        resumen = getattr(snapshot, tipo)
+        totales = database.obtener_resumen_total_por_promesa(tipo, fecha)
+        detalle = database.obtener_resumen_por_asesor_promesa(tipo, fecha)
+        assert [f[:2] for f in resumen.por_promesa] == [f[:2] for f in totales]
+        assert all(abs(a[2] - b[2]) < 0.005 for a, b in zip(resumen.por_promesa, totales))
+        assert list(resumen.por_asesor) == detalle
+        assert resumen.total_rucs == sum(f[1] for f in totales)
+        assert abs(resumen.total_monto - sum(f[2] for f in totales)) < 0.005
+        for promesa, rucs, monto in totales:
+            assert resumen.promesa(promesa)[1] == rucs
+
+    registros = database.obtener_registros_por_fecha(fecha)
+    assert snapshot.registros == len(registros)
+    assert snapshot.rucs_unicos == len({r[2] for r in registros})
+    return snapshot
+
+def test_igual_a_consultas_separadas(bd_prueba):
+    """Para cada fecha, y tras altas, ediciones y bajas, el snapshot coincide"""
+    bd_prueba("snapshot.db", n_registros=2000, n_rucs=150, dias=5)
+    hoy = date.today()
+    fechas = [(hoy + timedelta(days=d)).isoformat() for d in range(-5, 3)]
+    for fecha in fechas:
+        _comparar(fecha)
+
+    rnd = random.Random(3)
+    ids = [database.registrar_pago(**pago) for pago in generar_pagos(50, semilla=4)]
+    for registro_id in rnd.sample(ids, 20):
+        database.actualizar_registro(registro_id, monto_gasto=rnd.choice([0, 75.5]),
+                                     fecha_pago_gasto=rnd.choice(fechas))
+    for registro_id in rnd.sample(ids, 10):
+        database.eliminar_registro(registro_id)
+
+    for fecha in fechas:
+        _comparar(fecha)
+    snapshot = _comparar(hoy)  # También acepta date
+    assert snapshot.fecha == hoy.isoformat()
+    assert database.obtener_snapshot_dashboard() == snapshot
+    database.cerrar_pools()
+    print("✓ Snapshot igual a las consultas separadas")
+
+def test_fecha_sin_datos(bd_prueba):
+    """Una fecha sin registros da un snapshot vacío"""
+    bd_prueba("snapshot.db", n_registros=2000, n_rucs=150, dias=5)
+    snapshot = database.obtener_snapshot_dashboard('1999-01-01')
+    assert snapshot.registros == snapshot.rucs_unicos == 0
+    assert snapshot.gasto.por_promesa == () and snapshot.planilla.por_asesor == ()
+    assert snapshot.total_general == 0 and snapshot.gasto.promesa('COBR...') is None
+    database.cerrar_pools()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Prueba de actualizar_rucs_desde_excel con huella del archivo
+Un Excel sin cambios no se vuelve a leer y uno modificado solo actualiza los RUCs distintos
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import database
+
+def _escribir_excel(ruta, filas):
+    pd.DataFrame(filas, columns=['CAMPAÑA', 'DOCUMENTO', 'RAZON SOCIAL', 'DEUDA TOTAL', 'GASTOS ADMIN',
+                                 'PERIODOS ASIGNADOS', 'ASESOR']).to_excel(ruta, index=False)
+
+def _cargar_rucs(n=50):
+    """n RUCs sin montos en la BD de prueba. Retorna: las filas del Excel con sus montos"""
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.executemany('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion)
+        VALUES (?, ?, ?, 'FLUJO', 'Asesor', ?)
+        ''', [(str(20000000000 + i), str(20000000000 + i), f"Empresa {i}", datetime.now().isoformat())
+              for i in range(n)])
+    return [['FLUJO', 20000000000 + i, f"Empresa {i}", 1000.0 + i, 50.0 + i, '2025-12', 'Asesor']
+            for i in range(n)]
+
+def _montos():
+    with sqlite3.connect(database.DB_PATH) as conn:
+        return dict((doc, (d, g)) for doc, d, g in
+                    conn.execute('SELECT id_documento, deuda_total, gasto_admin FROM rucs'))
+
+def test_omitir_si_no_cambio(tmp_path, monkeypatch, bd_prueba):
+    """La primera vez aplica todo; volver a ejecutar sin cambios no lee el Excel"""
+    bd_prueba("sync.db")
+    filas = _cargar_rucs()
+    excel = tmp_path / "rucs.xlsx"
+    _escribir_excel(excel, filas)
+
+    ok, mensaje = database.actualizar_rucs_desde_excel(str(excel))
+    assert ok and "50 RUCs" in mensaje
+    assert _montos()['20000000007'] == (1007.0, 57.0)
+
+    lecturas = []
+    leer = database._leer_montos_excel
+    monkeypatch.setattr(database, '_leer_montos_excel', lambda ruta: lecturas.append(ruta) or leer(ruta))
+    assert database.actualizar_rucs_desde_excel(str(excel))[0]
+
+    # Una copia idéntica (otra fecha de modificación) tampoco se vuelve a leer
+    os.utime(excel, ns=(0, os.stat(excel).st_mtime_ns + 10**9))
+    assert database.actualizar_rucs_desde_excel(str(excel))[0]
+    assert lecturas == []
+    database.cerrar_pools()
+    print("✓ Excel sin cambios omitido")
+
+def test_solo_filas_distintas(tmp_path, bd_prueba):
+    """Un Excel modificado actualiza únicamente los RUCs cuyos montos cambiaron"""
+    bd_prueba("sync.db")
+    filas = _cargar_rucs()
+    excel = tmp_path / "rucs.xlsx"
+    _escribir_excel(excel, filas)
+    database.actualizar_rucs_desde_excel(str(excel))
+
+    filas[3][3] = 9999.5
+    filas[10][4] = None
+    _escribir_excel(excel, filas)
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('CREATE TABLE cambios (id_documento TEXT)')
+        conn.execute('''
+        CREATE TRIGGER registrar_cambio AFTER UPDATE ON rucs
+        BEGIN INSERT INTO cambios VALUES (new.id_documento); END
+        ''')
+
+    ok, mensaje = database.actualizar_rucs_desde_excel(str(excel))
+    with sqlite3.connect(database.DB_PATH) as conn:
+        actualizados = sorted(fila[0] for fila in conn.execute('SELECT id_documento FROM cambios'))
+
+    assert ok and "2 RUCs" in mensaje
+    assert actualizados == ['20000000003', '20000000010']
+    montos = _montos()
+    assert montos['20000000003'] == (9999.5, 53.0)
+    assert montos['20000000010'] == (1010.0, None)
+    database.cerrar_pools()
+    print("✓ Solo se actualizaron los RUCs modificados")
+
+def test_rucs_recargados(tmp_path, bd_prueba):
+    """Si la tabla rucs se vuelve a cargar, el mismo Excel se aplica de nuevo"""
+    bd_prueba("sync.db")
+    filas = _cargar_rucs()
+    excel = tmp_path / "rucs.xlsx"
+    _escribir_excel(excel, filas)
+    database.actualizar_rucs_desde_excel(str(excel))
+
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('DELETE FROM rucs')
+    _cargar_rucs()
+    assert database.actualizar_rucs_desde_excel(str(excel))[0]
+    assert _montos()['20000000020'] == (1020.0, 70.0)
+    database.cerrar_pools()
+    print("✓ Excel aplicado de nuevo tras recargar los RUCs")
+
+def test_montos_por_campana(tmp_path, bd_prueba):
+    """Un RUC en dos campañas conserva los montos de cada una (rucs es única por RUC y campaña)"""
+    bd_prueba("sync.db")
+    filas = _cargar_rucs(n=5)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute('''
+        INSERT INTO rucs (ruc, id_documento, razon_social, campaña, asesor, fecha_creacion)
+        VALUES ('20000000001', '20000000001', 'Empresa 1', 'REDI', 'Asesor', ?)
+        ''', (datetime.now().isoformat(),))
+    filas.append(['REDI', 20000000001, 'Empresa 1', 7.0, 1.0, '2025-12', 'Asesor'])
+    excel = tmp_path / "rucs.xlsx"
+    _escribir_excel(excel, filas)
+
+    assert database.actualizar_rucs_desde_excel(str(excel))[0]
+    with sqlite3.connect(database.DB_PATH) as conn:
+        montos = dict(((ruc, campaña), (d, g)) for ruc, campaña, d, g in conn.execute(
+            "SELECT ruc, campaña, deuda_total, gasto_admin FROM rucs WHERE ruc = '20000000001'"))
+    assert montos == {('20000000001', 'FLUJO'): (1001.0, 51.0), ('20000000001', 'REDI'): (7.0, 1.0)}
+    # Volver a aplicar el mismo Excel no cambia nada
+    assert "0 RUCs" in database.actualizar_rucs_desde_excel(str(excel), forzar=True)[1]
+    database.cerrar_pools()
+    print("✓ Montos por RUC y campaña")
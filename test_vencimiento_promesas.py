@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Prueba del motor de vencimiento de promesas (evaluar_vencimiento_promesas)
+Compara contra la implementación anterior, verifica la marca de agua diaria y el estado al editar
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import database
+from benchmark_promesas import detectar_promesas_caidas_anterior
+
+def _estados(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            'SELECT id, estado_ga, estado_planilla FROM registros_pagos ORDER BY id'
+        ).fetchall()
+
+def test_mismo_resultado_que_implementacion_anterior(bd_prueba):
+    """El motor por conjuntos deja los mismos estados que el bucle anterior"""
+    fecha = date.today() + timedelta(days=7)
+
+    bd_prueba("anterior.db", n_registros=3000, n_rucs=300, dias=30)
+    anterior = detectar_promesas_caidas_anterior(fecha)
+    estados_anterior = _estados(database.DB_PATH)
+    database.cerrar_pools()
+
+    bd_prueba("motor.db", n_registros=3000, n_rucs=300, dias=30)
+    nuevo = database.detectar_promesas_caidas(fecha)
+    estados_nuevo = _estados(database.DB_PATH)
+
+    # Volver hacia atrás revierte las caídas cuya fecha aún no llega
+    revertido = database.evaluar_vencimiento_promesas(date.today())
+    database.cerrar_pools()
+
+    assert sorted(nuevo[0]) == sorted(anterior[0])
+    assert sorted(nuevo[1]) == sorted(anterior[1])
+    assert estados_nuevo == estados_anterior
+    assert revertido['revertidas_ga'] + revertido['revertidas_planilla'] > 0
+    print(f"✓ {len(nuevo[0]) + len(nuevo[1])} promesas caídas, igual que la implementación anterior")
+
+def test_marca_de_agua_diaria(bd_prueba):
+    """Dentro del mismo día solo se evalúa una vez"""
+    bd_prueba("marca.db", n_registros=3000, n_rucs=300, dias=30)
+    hoy = date.today()
+
+    primera = database.evaluar_vencimiento_promesas(hoy)
+    segunda = database.evaluar_vencimiento_promesas(hoy)
+    database.cerrar_pools()
+    assert primera['evaluada'] and not segunda['evaluada']
+    assert database.obtener_metadato(database.CLAVE_PROMESAS_EVALUADAS) == hoy.isoformat()
+    print("✓ Marca de agua diaria correcta")
+
+def test_editar_fecha_de_pago_recalcula_estado(bd_prueba):
+    """Editar una fecha de pago cambia el estado de esa promesa al guardar, sin esperar al motor"""
+    bd_prueba("edicion.db", n_registros=3000, n_rucs=300, dias=30)
+    hoy = date.today()
+    database.evaluar_vencimiento_promesas(hoy)
+    with sqlite3.connect(database.DB_PATH) as conn:
+        a_vencer, caida = [conn.execute(
+            f"SELECT id FROM registros_pagos WHERE {estado} AND fecha_pago_gasto IS NOT NULL LIMIT 1"
+        ).fetchone()[0] for estado in ("estado_ga = 'A VENCER'", "estado_ga = 'PROMESA CAIDA'")]
+        cobrado = conn.execute('SELECT id FROM registros_pagos WHERE id NOT IN (?, ?) LIMIT 1',
+                               (a_vencer, caida)).fetchone()[0]
+        conn.execute("UPDATE registros_pagos SET estado_ga = 'COBRADO' WHERE id = ?", (cobrado,))
+
+    # A una fecha pasada cae; a una futura vuelve a A VENCER; COBRADO no se toca
+    database.actualizar_registro(a_vencer, fecha_pago_gasto=(hoy - timedelta(days=1)).isoformat())
+    ok, registro = database.actualizar_registro_si_version(
+        caida, database.obtener_registro(caida)['version'], fecha_pago_gasto=(hoy + timedelta(days=3)).isoformat())
+    database.actualizar_registro(cobrado, fecha_pago_gasto=(hoy - timedelta(days=5)).isoformat(),
+                                 observaciones="editado")
+    estados = {id_: (ga, planilla) for id_, ga, planilla in _estados(database.DB_PATH)}
+
+    assert ok and registro['estado_ga'] == 'A VENCER'
+    assert estados[a_vencer][0] == 'PROMESA CAIDA'
+    assert estados[cobrado][0] == 'COBRADO'
+    # La marca de agua sigue vigente: el motor no necesita volver a evaluar hoy
+    assert not database.evaluar_vencimiento_promesas(hoy)['evaluada']
+    database.cerrar_pools()
+    print("✓ Estado recalculado al editar la fecha de pago")
@@ -1,22 +1,15 @@
-from datetime import datetime
-import pandas as pd
+from formato import texto_fecha, texto_moneda
 
 def formatear_fecha(fecha_str):
-    """Formatea una fecha ISO a formato legible"""
-    if not fecha_str:
-        return "-"
-    try:
-        fecha = datetime.fromisoformat(fecha_str)
-        return fecha.strftime('%d/%m/%Y %H:%M')
-    except:
-        return fecha_str
+    """Formatea una fecha ISO a formato legible (con hora)"""
+    return texto_fecha(fecha_str, '%d/%m/%Y %H:%M')
 
 def formatear_moneda(monto):
     """Formatea un monto como moneda"""
     try:
         monto_float = float(monto) if isinstance(monto, str) else monto
-        return f"S/. {monto_float:,.2f}"
-    except:
+        return texto_moneda(monto_float)
+    except (TypeError, ValueError):
         return f"S/. {monto}"
 
 def obtener_color_estado(estado):
@@ -31,6 +24,7 @@ def obtener_color_estado(estado):
 
 def crear_dataframe_pagos(pagos):
     """Crea un DataFrame formateado de pagos"""
+    import pandas as pd
     if not pagos:
         return pd.DataFrame()
     
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Verifica que resumen_diario coincida con un recálculo desde registros_pagos
+Uso: python verificar_resumen.py [--reconstruir]
+  --reconstruir  vuelve a calcular el resumen completo (también si no hay diferencias)
+"""
+
+import sys
+
+from database import init_db, verificar_resumen_diario, reconstruir_resumen_diario
+
+if __name__ == "__main__":
+    init_db()
+
+    print("=" * 60)
+    print("📊 VERIFICACIÓN DEL RESUMEN DIARIO")
+    print("=" * 60)
+
+    diferencias = verificar_resumen_diario()
+    if diferencias:
+        print(f"⚠️ {len(diferencias)} diferencias encontradas:")
+        for tabla, clave, esperado, actual in diferencias[:20]:
+            print(f"  {tabla} {clave}: esperado={esperado} actual={actual}")
+        if len(diferencias) > 20:
+            print(f"  ... y {len(diferencias) - 20} más")
+    else:
+        print("✓ El resumen diario es consistente")
+
+    if '--reconstruir' in sys.argv[1:]:
+        filas = reconstruir_resumen_diario()
+        print(f"✓ Resumen reconstruido: {filas} filas")
+        print(f"✓ Diferencias después de reconstruir: {len(verificar_resumen_diario())}")
+    elif diferencias:
+        print("\nEjecute con --reconstruir para corregirlo")
+        sys.exit(1)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Reconcilia saldos_ruc con registros_pagos: recalcula los saldos por RUC y muestra las diferencias
+Uso: python verificar_saldos.py [--reconstruir]
+  --reconstruir  reemplaza saldos_ruc con el recálculo
+"""
+
+import sys
+
+from database import init_db, reconciliar_saldos_ruc
+
+if __name__ == "__main__":
+    init_db()
+    reconstruir = '--reconstruir' in sys.argv[1:]
+
+    print("=" * 60)
+    print("💰 RECONCILIACIÓN DE SALDOS POR RUC")
+    print("=" * 60)
+
+    diferencias = reconciliar_saldos_ruc(reconstruir=reconstruir)
+    if diferencias:
+        print(f"⚠️ {len(diferencias)} saldos distintos (pendiente, caído, cobrado en S/.):")
+        for (ruc, tipo), esperado, actual in diferencias[:20]:
+            esperado_soles = tuple(c / 100 for c in esperado)
+            actual_soles = tuple(c / 100 for c in actual)
+            print(f"  RUC {ruc} {tipo}: esperado={esperado_soles} actual={actual_soles}")
+        if len(diferencias) > 20:
+            print(f"  ... y {len(diferencias) - 20} más")
+    else:
+        print("✓ Los saldos coinciden con registros_pagos")
+
+    if reconstruir:
+        print(f"✓ Saldos reconstruidos (diferencias restantes: {len(reconciliar_saldos_ruc())})")
+    elif diferencias:
+        print("\nEjecute con --reconstruir para corregirlos")
+        sys.exit(1)